@@ -0,0 +1,150 @@
+"""
+bench_lock_image.py
+-------------------
+
+Measures the cost of handing the lock screen frame to i3lock as a PNG file, at several
+compression levels, compared to raw RGBX pixels, at 1080p, 1440p and 4K. The decode time
+is what i3lock pays to read the frame back before it can show it.
+
+The blur quality levels are measured as well, with their mean difference to `exact`.
+
+Usage:
+    python -m benchmarks.bench_lock_image [--runs N] [--output-dir DIR] [--sigma S]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+
+from ebenezer.core.lock_image import BLUR_SCALES, blur_image, write_raw_image
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160),
+}
+
+
+def _build_frame(size: tuple[int, int]) -> Image.Image:
+    """
+    Builds a blurred frame with the low-frequency content of a blurred screenshot.
+    """
+    random.seed(42)
+    width, height = size
+    small = Image.frombytes(
+        "RGB",
+        (width // 16, height // 16),
+        bytes(random.randrange(256) for _ in range(width // 16 * height // 16 * 3)),
+    )
+    return small.resize(size, Image.Resampling.BILINEAR).filter(
+        ImageFilter.GaussianBlur(5)
+    )
+
+
+def _build_screen(size: tuple[int, int]) -> Image.Image:
+    """
+    Builds a sharp frame with the flat areas and hard edges of a screenshot.
+    """
+    random.seed(42)
+    width, height = size
+    small = Image.frombytes(
+        "RGB",
+        (width // 8, height // 8),
+        bytes(random.randrange(256) for _ in range(width // 8 * height // 8 * 3)),
+    )
+    return small.resize(size, Image.Resampling.NEAREST)
+
+
+def _measure(operation, runs: int) -> float:
+    durations = []
+
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - start_time)
+
+    return min(durations)
+
+
+def _bench_png(frame: Image.Image, output_file: str, level: int, runs: int):
+    encode = _measure(
+        lambda: frame.save(output_file, "PNG", compress_level=level), runs
+    )
+
+    def _decode():
+        with Image.open(output_file) as image:
+            image.load()
+
+    return encode, _measure(_decode, runs), os.path.getsize(output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--sigma", type=float, default=5.0)
+    parser.add_argument(
+        "--output-dir",
+        default="/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    )
+    args = parser.parse_args()
+
+    png_file = os.path.join(args.output_dir, "bench_lock_image.png")
+    raw_file = os.path.join(args.output_dir, "bench_lock_image.raw")
+
+    print(f"{'':8}{'format':10}{'encode':>12}{'decode':>12}{'size':>12}")
+
+    try:
+        for name, size in RESOLUTIONS.items():
+            frame = _build_frame(size)
+
+            for label, level in (("png -6", 6), ("png -1", 1), ("png -0", 0)):
+                encode, decode, file_size = _bench_png(
+                    frame, png_file, level, args.runs
+                )
+                print(
+                    f"{name:8}{label:10}{encode * 1000:9.1f} ms{decode * 1000:9.1f} ms"
+                    f"{file_size / 2**20:9.1f} MB"
+                )
+
+            raw = _measure(lambda: write_raw_image(frame, raw_file), args.runs)
+
+            def _read_raw():
+                with open(raw_file, "rb") as f:
+                    f.read()
+
+            read = _measure(_read_raw, args.runs)
+            print(
+                f"{name:8}{'raw rgbx':10}{raw * 1000:9.1f} ms{read * 1000:9.1f} ms"
+                f"{os.path.getsize(raw_file) / 2**20:9.1f} MB"
+            )
+
+        print()
+        print(f"{'':8}{'blur':10}{'time':>12}{'mean diff':>12}")
+
+        for name, size in RESOLUTIONS.items():
+            frame = _build_screen(size)
+            exact = None
+
+            for quality in reversed(BLUR_SCALES):
+                duration = _measure(
+                    lambda: blur_image(frame, args.sigma, quality), args.runs
+                )
+                blurred = blur_image(frame, args.sigma, quality)
+
+                if exact is None:
+                    exact = blurred
+
+                diff = max(ImageStat.Stat(ImageChops.difference(blurred, exact)).mean)
+                print(f"{name:8}{quality:10}{duration * 1000:9.1f} ms{diff:12.2f}")
+    finally:
+        for output_file in (png_file, raw_file):
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+bench_palette.py
+----------------
+
+Measures the cost of theming a wallpaper, extracting its palette from scratch compared
+to reading it back from the palette cache, which costs a hash of the image, at 1080p and
+4K, for PNG and JPEG wallpapers.
+
+Usage:
+    python -m benchmarks.bench_palette [--runs N]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from PIL import Image, ImageFilter
+
+from ebenezer.core.palette import PaletteCache, extract_palette, palette_colors
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+def _build_wallpaper(size: tuple[int, int]) -> Image.Image:
+    """
+    Builds an image with the smooth gradients of a photo.
+    """
+    random.seed(42)
+    width, height = size
+    small = Image.frombytes(
+        "RGB",
+        (width // 64, height // 64),
+        bytes(random.randrange(256) for _ in range(width // 64 * height // 64 * 3)),
+    )
+    return small.resize(size, Image.Resampling.BICUBIC).filter(
+        ImageFilter.GaussianBlur(4)
+    )
+
+
+def _measure(operation, runs: int) -> float:
+    durations = []
+
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - start_time)
+
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    cache = PaletteCache(os.path.join(tmp_dir, "palettes"))
+
+    print(f"{'':8}{'format':8}{'extract':>12}{'cached':>12}")
+
+    try:
+        for name, size in RESOLUTIONS.items():
+            wallpaper = _build_wallpaper(size)
+
+            for image_format in ("PNG", "JPEG"):
+                wallpaper_file = os.path.join(tmp_dir, f"{name}.{image_format}")
+                wallpaper.save(wallpaper_file, image_format)
+
+                extract = _measure(
+                    lambda: palette_colors(extract_palette(wallpaper_file)), args.runs
+                )
+                cache.get(wallpaper_file)
+                cached = _measure(
+                    lambda: palette_colors(cache.get(wallpaper_file)), args.runs
+                )
+                print(
+                    f"{name:8}{image_format.lower():8}{extract * 1000:9.1f} ms"
+                    f"{cached * 1000:9.1f} ms"
+                )
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
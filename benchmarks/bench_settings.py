@@ -0,0 +1,64 @@
+"""
+bench_settings.py
+-----------------
+
+Compares cold (YAML parsing) and warm (compiled cache) settings loads.
+
+Usage:
+    python -m benchmarks.bench_settings [--iterations N]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from ebenezer.config.loader import TEST_COLOR_CONFIG, TEST_CONFIG
+from ebenezer.config.settings import load_settings_by_files
+
+
+def _measure(fn, iterations: int) -> float:
+    start_time = time.perf_counter()
+
+    for _ in range(iterations):
+        fn()
+
+    return (time.perf_counter() - start_time) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp()
+
+    def _cold():
+        load_settings_by_files(
+            config_filepath=TEST_CONFIG,
+            colors_filepath=TEST_COLOR_CONFIG,
+            use_cache=False,
+        )
+
+    def _warm():
+        load_settings_by_files(
+            config_filepath=TEST_CONFIG, colors_filepath=TEST_COLOR_CONFIG
+        )
+
+    try:
+        with patch("ebenezer.core.cache.cache_home", cache_dir):
+            _warm()
+
+            cold = _measure(_cold, args.iterations)
+            warm = _measure(_warm, args.iterations)
+    finally:
+        shutil.rmtree(cache_dir)
+
+    print(f"cold load: {cold:8.3f} ms")
+    print(f"warm load: {warm:8.3f} ms")
+    print(f"speedup:   {cold / warm:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
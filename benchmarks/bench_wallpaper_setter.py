@@ -0,0 +1,142 @@
+"""
+bench_wallpaper_setter.py
+-------------------------
+
+Measures the time to set a pre-scaled wallpaper as the root pixmap, natively through
+MIT-SHM, natively through core `PutImage` requests, and with `feh --bg-scale` when it is
+installed, at 1080p and 4K.
+
+An Xvfb server of each resolution is started, unless `--display` names a running X
+server, whose own resolution is then used.
+
+Usage:
+    python -m benchmarks.bench_wallpaper_setter [--runs N] [--display DISPLAY]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from PIL import Image, ImageFilter
+
+from ebenezer.core.lock_image import screen_size
+from ebenezer.core.wallpaper_setter import set_feh_images, set_root_pixmap
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+def _build_wallpaper(size: tuple[int, int], output_file: str):
+    """
+    Writes a JPEG with the smooth gradients and details of a photo.
+    """
+    random.seed(42)
+    width, height = size
+    small = Image.frombytes(
+        "RGB",
+        (width // 32, height // 32),
+        bytes(random.randrange(256) for _ in range(width // 32 * height // 32 * 3)),
+    )
+    small.resize(size, Image.Resampling.BICUBIC).filter(
+        ImageFilter.GaussianBlur(2)
+    ).save(output_file, "JPEG", quality=92)
+
+
+def _measure(operation, runs: int) -> float:
+    durations = []
+
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - start_time)
+
+    return min(durations)
+
+
+@contextmanager
+def _display(size: tuple[int, int], display: str | None) -> Iterator[None]:
+    if display:
+        os.environ["DISPLAY"] = display
+        yield
+        return
+
+    width, height = size
+    server = subprocess.Popen(
+        [
+            "Xvfb",
+            "-displayfd",
+            "1",
+            "-nolisten",
+            "tcp",
+            "-screen",
+            "0",
+            f"{width}x{height}x24",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+
+    try:
+        os.environ["DISPLAY"] = f":{server.stdout.readline().strip()}"
+        yield
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--display", help="A running X server to measure on")
+    args = parser.parse_args()
+
+    if not args.display and not shutil.which("Xvfb"):
+        parser.error("Xvfb is not installed, name a running X server with --display")
+
+    has_feh = shutil.which("feh") is not None
+    wallpaper_file = os.path.join(tempfile.gettempdir(), "bench_wallpaper_setter.jpg")
+
+    print(f"{'':8}{'setter':14}{'time':>12}")
+
+    try:
+        for name, size in RESOLUTIONS.items():
+            with _display(size, args.display):
+                size = screen_size() or size
+                _build_wallpaper(size, wallpaper_file)
+
+                setters = {
+                    "native core": lambda: set_root_pixmap(
+                        [wallpaper_file], use_shm=False
+                    ),
+                }
+
+                # a remote server cannot attach the segment, the upload falls back to core
+                if set_root_pixmap([wallpaper_file]) == "shm":
+                    setters["native shm"] = lambda: set_root_pixmap([wallpaper_file])
+
+                if has_feh:
+                    setters["feh"] = lambda: set_feh_images([wallpaper_file])
+
+                for label, setter in setters.items():
+                    duration = _measure(setter, args.runs)
+                    print(f"{name:8}{label:14}{duration * 1000:9.1f} ms")
+
+            if args.display:
+                # a running server has a single resolution
+                break
+    finally:
+        if os.path.exists(wallpaper_file):
+            os.remove(wallpaper_file)
+
+
+if __name__ == "__main__":
+    main()
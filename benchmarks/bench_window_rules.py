@@ -0,0 +1,113 @@
+"""
+bench_window_rules.py
+---------------------
+
+Evaluates the compiled window rules against thousands of synthetic windows, compared to
+a linear scan over Qtile `Match` objects.
+
+Usage:
+    python -m benchmarks.bench_window_rules [--windows N] [--rules N]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from libqtile.config import Match
+
+from ebenezer.config.settings import AppSettings
+from ebenezer.config.window_rules import AppSettingsWindowRule
+from ebenezer.core.window_rules import build_window_rules
+
+
+class SyntheticWindow:
+    def __init__(self, wm_class: str, name: str):
+        self.wm_class = [wm_class.lower(), wm_class]
+        self.name = name
+        self.floating = False
+
+    def get_wm_class(self):
+        return self.wm_class
+
+    def match(self, match):
+        return match.compare(self)
+
+
+def _build_settings(rules: int) -> AppSettings:
+    settings = AppSettings()
+    settings.floating = {
+        "wm_class": [f"app-{i}" for i in range(rules)],
+        "title": [f"Dialog {i}" for i in range(rules)],
+    }
+    settings.window_rules = [
+        AppSettingsWindowRule(title=f"^Tool {i} - .*$", floating="yes")
+        for i in range(rules)
+    ]
+    return settings
+
+
+def _build_windows(count: int, rules: int) -> list[SyntheticWindow]:
+    random.seed(42)
+    windows = []
+
+    for i in range(count):
+        kind = i % 4
+
+        if kind == 0:
+            windows.append(SyntheticWindow(f"app-{random.randrange(rules)}", "main"))
+        elif kind == 1:
+            windows.append(
+                SyntheticWindow("dialog", f"Dialog {random.randrange(rules)}")
+            )
+        elif kind == 2:
+            windows.append(
+                SyntheticWindow("tool", f"Tool {random.randrange(rules)} - untitled")
+            )
+        else:
+            windows.append(SyntheticWindow("kitty", f"zsh {i}"))
+
+    return windows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, default=5000)
+    parser.add_argument("--rules", type=int, default=100)
+    args = parser.parse_args()
+
+    settings = _build_settings(args.rules)
+    windows = _build_windows(args.windows, args.rules)
+
+    start_time = time.perf_counter()
+    engine = build_window_rules(settings)
+    compile_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    compiled_matches = sum(1 for w in windows if engine.match_window(w) is not None)
+    compiled_time = time.perf_counter() - start_time
+
+    matches = [
+        *[Match(wm_class=f) for f in settings.floating["wm_class"]],
+        *[Match(title=f) for f in settings.floating["title"]],
+        *[Match(title=re.compile(r.title)) for r in settings.window_rules],
+    ]
+
+    start_time = time.perf_counter()
+    linear_matches = sum(1 for w in windows if any(w.match(m) for m in matches))
+    linear_time = time.perf_counter() - start_time
+
+    print(f"windows: {args.windows}, rules: {args.rules * 3}")
+    print(f"compile:         {compile_time * 1000:8.3f} ms")
+    print(
+        f"compiled rules:  {compiled_time * 1000:8.3f} ms "
+        f"({compiled_time / args.windows * 1e6:.2f} us/window, {compiled_matches} matched)"
+    )
+    print(
+        f"linear Match:    {linear_time * 1000:8.3f} ms "
+        f"({linear_time / args.windows * 1e6:.2f} us/window, {linear_matches} matched)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,10 @@ import importlib
 import click
 
 from ebenezer.commands.backlight import cli as backlight_cli
+from ebenezer.commands.config import cli as config_cli
 from ebenezer.commands.keyboard import cli as keyboard_cli
+from ebenezer.commands.startup import cli as startup_cli
+from ebenezer.commands.theme import cli as theme_cli
 from ebenezer.commands.ui import cli as ui_cli
 from ebenezer.commands.volume import cli as volume_cli
 from ebenezer.commands.wallpaper import cli as wallpaper_cli
@@ -25,6 +28,9 @@ cli.add_command(wallpaper_cli, name="wallpaper")
 cli.add_command(volume_cli, name="volume")
 cli.add_command(ui_cli, name="ui")
 cli.add_command(keyboard_cli, name="keyboard")
+cli.add_command(config_cli, name="config")
+cli.add_command(startup_cli, name="startup")
+cli.add_command(theme_cli, name="theme")
 
 if __name__ == "__main__":
     cli()
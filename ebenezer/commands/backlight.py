@@ -2,6 +2,8 @@ import click
 
 from ebenezer.commands.helpers import run_command
 
+BACKLIGHT_STEP = 10
+
 
 @click.group()
 def cli():
@@ -39,12 +41,15 @@ def backlight_level() -> str:
 
 
 def backlight_up():
-    command = "brightnessctl set 10%+"
-    run_command(command)
+    backlight_change(BACKLIGHT_STEP)
 
 
 def backlight_down():
-    command = "brightnessctl set 10%-"
+    backlight_change(-BACKLIGHT_STEP)
+
+
+def backlight_change(delta: int):
+    command = f"brightnessctl set {abs(delta)}%{'+' if delta > 0 else '-'}"
     run_command(command)
 
 
@@ -0,0 +1,56 @@
+import time
+from pathlib import Path
+
+import click
+
+from ebenezer.config.settings import compile_settings_by_files
+from ebenezer.core.cache import clear_compiled
+from ebenezer.core.files import resolve_file_path
+from ebenezer.core.http_cache import get_response_cache
+from ebenezer.core.palette import get_palette_cache
+from ebenezer.core.theme import compile_theme_config
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command(name="compile")
+def compile_settings():
+    start_time = time.perf_counter()
+
+    settings = compile_settings_by_files()
+
+    theme_filepath = resolve_file_path(settings.colors.theme or "")
+
+    if theme_filepath and Path(theme_filepath).exists():
+        compile_theme_config(theme_filepath)
+
+    elapsed_time = (time.perf_counter() - start_time) * 1000
+    click.echo(f"Settings compiled in {elapsed_time:.1f}ms")
+
+
+@cli.group()
+def cache():
+    pass
+
+
+@cache.command()
+def clear():
+    removed = clear_compiled()
+
+    for file in removed:
+        click.echo(f"Removed {file}")
+
+    click.echo(f"{len(removed)} compiled file(s) removed")
+
+    responses = get_response_cache().clear()
+    click.echo(f"{len(responses)} cached response(s) removed")
+
+    palettes = get_palette_cache().clear()
+    click.echo(f"{len(palettes)} cached palette(s) removed")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,39 @@
+import click
+
+from ebenezer.core.startup import load_startup_report
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+def report():
+    startup_report = load_startup_report()
+
+    if startup_report is None:
+        click.echo("No startup report found")
+        return
+
+    click.echo(
+        f"Startup at {startup_report['created_at']} "
+        f"took {startup_report['duration'] * 1000:.0f}ms"
+    )
+
+    for entry in startup_report["entries"]:
+        returncode = "-" if entry["returncode"] is None else entry["returncode"]
+        line = (
+            f"{entry['name']:<24} {entry['status']:<8} exit={returncode:<4} "
+            f"start={entry['started_at'] * 1000:>6.0f}ms "
+            f"wall={entry['duration'] * 1000:>6.0f}ms"
+        )
+
+        if entry.get("error"):
+            line += f" ({entry['error']})"
+
+        click.echo(line)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,67 @@
+import os
+import time
+
+import click
+
+from ebenezer.core.files import resolve_file_path
+from ebenezer.core.palette import DEFAULT_PALETTE_SIZE, wallpaper_theme
+from ebenezer.core.wallpaper_daemon import NO_DAEMON_ERRORS, send_command
+from ebenezer.core.yaml import write_yaml_file
+
+DEFAULT_THEME_FILE = "$qtile_home/conf/themes/wallpaper.yml"
+
+
+def _current_wallpaper() -> str:
+    try:
+        answer = send_command("status")
+    except NO_DAEMON_ERRORS:
+        raise click.ClickException(
+            "No wallpaper given and the wallpaper daemon is not running"
+        )
+    except OSError as e:
+        raise click.ClickException(f"The wallpaper daemon did not answer: {e}")
+
+    if not answer.get("wallpaper"):
+        raise click.ClickException("The wallpaper daemon shows no wallpaper")
+
+    return answer["wallpaper"]
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command(name="from-wallpaper")
+@click.argument(
+    "wallpaper", required=False, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--output",
+    default=DEFAULT_THEME_FILE,
+    help="Theme file to write, selectable in the settings",
+)
+@click.option(
+    "--colors",
+    default=DEFAULT_PALETTE_SIZE,
+    type=click.IntRange(2, 64),
+    help="Number of colors of the palette",
+)
+def from_wallpaper(wallpaper: str | None, output: str, colors: int):
+    start_time = time.perf_counter()
+
+    # the wallpaper shown by the daemon by default
+    wallpaper = wallpaper or _current_wallpaper()
+    theme_file = resolve_file_path(output)
+
+    os.makedirs(os.path.dirname(os.path.abspath(theme_file)), exist_ok=True)
+    write_yaml_file(theme_file, wallpaper_theme(wallpaper, colors))
+
+    elapsed_time = (time.perf_counter() - start_time) * 1000
+    click.echo(
+        f'Theme of "{wallpaper}" written to {theme_file} in {elapsed_time:.1f}ms'
+    )
+
+
+if __name__ == "__main__":
+    cli()
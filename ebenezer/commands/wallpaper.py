@@ -1,28 +1,103 @@
-import random
+import asyncio
+import os
 import time
 from pathlib import Path
-from subprocess import run
 
 import click
+from click.core import ParameterSource
 
+from ebenezer.core.wallpaper_cache import (
+    DEFAULT_MAX_BYTES,
+    WallpaperCache,
+    screen_resolutions,
+)
+from ebenezer.core.wallpaper_daemon import (
+    NO_DAEMON_ERRORS,
+    WallpaperDaemon,
+    image_setter,
+    send_command,
+)
+from ebenezer.core.wallpaper_index import WallpaperIndex, get_wallpaper_index
+from ebenezer.core.wallpaper_setter import (
+    SETTER_AUTO,
+    SETTERS,
+    RootPixmapError,
+    set_wallpaper_images,
+)
+
+# the wallpapers scaled ahead of the rotation
+PREFETCH_COUNT = 2
+
+
+def _apply_wallpaper(
+    wallpaper: str, cache: WallpaperCache | None = None, setter: str = SETTER_AUTO
+):
+    images = [wallpaper]
+
+    if cache is not None:
+        images = cache.images(wallpaper, screen_resolutions())
 
-def _set_wallpaper(wallpaper_path: str) -> str:
+    try:
+        set_wallpaper_images(images, setter)
+    except RootPixmapError as e:
+        raise click.ClickException(f"Error while setting the root pixmap: {e}")
+
+
+def _set_wallpaper(
+    wallpaper_path: str,
+    index: WallpaperIndex | None = None,
+    cache: WallpaperCache | None = None,
+    setter: str = SETTER_AUTO,
+) -> str:
     if Path(wallpaper_path).is_dir():
-        wallpapers = list(Path(wallpaper_path).glob("*"))
+        index = index or get_wallpaper_index()
+        index.refresh(wallpaper_path)
+        wallpaper = index.draw(wallpaper_path)
 
-        if wallpapers:
-            wallpaper = random.choice(wallpapers)
-            run(f'feh --bg-scale "{wallpaper}"', shell=True)
-            return f'Wallpaper set to: "{wallpaper}"'
+        if wallpaper is not None:
+            _apply_wallpaper(wallpaper.path, cache, setter)
+            return f'Wallpaper set to: "{wallpaper.path}"'
         else:
             click.echo("No wallpapers found in the directory")
     elif Path(wallpaper_path).is_file():
-        run(f'feh --bg-scale "{wallpaper_path}"', shell=True)
+        _apply_wallpaper(wallpaper_path, cache, setter)
         return f'Wallpaper set to: "{wallpaper_path}"'
     else:
         return "No wallpaper file is found"
 
 
+def _send_to_daemon(command: str, argument: str | None = None) -> dict:
+    try:
+        answer = send_command(command, argument)
+    except NO_DAEMON_ERRORS:
+        raise click.ClickException("The wallpaper daemon is not running")
+    except OSError as e:
+        raise click.ClickException(f"The wallpaper daemon did not answer: {e}")
+
+    if not answer.get("ok"):
+        raise click.ClickException(answer.get("error", "Unknown error"))
+
+    return answer
+
+
+def _build_cache(cache_size: int) -> WallpaperCache:
+    return WallpaperCache(max_bytes=cache_size * 1024 * 1024)
+
+
+cache_size_option = click.option(
+    "--cache-size",
+    default=DEFAULT_MAX_BYTES // (1024 * 1024),
+    help="Size cap of the pre-scaled wallpapers in megabytes",
+)
+
+setter_option = click.option(
+    "--setter",
+    type=click.Choice(SETTERS),
+    default=SETTER_AUTO,
+    help="Wallpaper setter, auto sets the root pixmap and falls back to feh",
+)
+
+
 @click.group()
 def cli():
     pass
@@ -30,8 +105,41 @@ def cli():
 
 @cli.command()
 @click.argument("wallpaper_path", type=click.Path(exists=True))
-def set(wallpaper_path: str):
-    output = _set_wallpaper(wallpaper_path)
+@cache_size_option
+@setter_option
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    help="Set the wallpaper without going through the running daemon",
+)
+def set(wallpaper_path: str, cache_size: int, setter: str, no_daemon: bool):
+    context = click.get_current_context()
+    # the daemon uses its own setter and cache, explicit ones are honored without it
+    no_daemon = no_daemon or any(
+        context.get_parameter_source(name) is not ParameterSource.DEFAULT
+        for name in ("cache_size", "setter")
+    )
+    answer = None
+
+    if not no_daemon:
+        try:
+            # the running daemon sets it without scanning the directory again
+            answer = send_command("set", os.path.abspath(wallpaper_path))
+        except NO_DAEMON_ERRORS:
+            pass
+        except OSError as e:
+            # the daemon may still set it, setting another one would race it
+            raise click.ClickException(f"The wallpaper daemon did not answer: {e}")
+
+    if answer is None:
+        output = _set_wallpaper(
+            wallpaper_path, cache=_build_cache(cache_size), setter=setter
+        )
+    elif answer.get("ok"):
+        output = f'Wallpaper set to: "{answer.get("wallpaper")}"'
+    else:
+        raise click.ClickException(answer.get("error", "Unknown error"))
+
     click.echo(output)
 
 
@@ -45,17 +153,88 @@ def set(wallpaper_path: str):
     default=0,
     help="Maximum number of wallpaper changes (0 for infinite)",
 )
-def random_wallpaper(wallpaper_dir: str, timeout: int, max_changes: int):
+@cache_size_option
+@setter_option
+def random_wallpaper(
+    wallpaper_dir: str, timeout: int, max_changes: int, cache_size: int, setter: str
+):
+    # the index is kept open across iterations, a refresh costs a stat of the directory
+    index = get_wallpaper_index()
+    cache = _build_cache(cache_size)
+
     def _change_wallpaper():
-        _set_wallpaper(wallpaper_dir)
+        _set_wallpaper(wallpaper_dir, index, cache, setter)
+
+        # the next wallpapers are scaled while this one is shown
+        upcoming = index.upcoming(wallpaper_dir, PREFETCH_COUNT)
+        cache.prefetch([wallpaper.path for wallpaper in upcoming], screen_resolutions())
+
         time.sleep(timeout)
 
-    if max_changes == 0:
-        while True:
-            _change_wallpaper()
-    else:
-        for _ in range(max_changes):
-            _change_wallpaper()
+    try:
+        if max_changes == 0:
+            while True:
+                _change_wallpaper()
+        else:
+            for _ in range(max_changes):
+                _change_wallpaper()
+    finally:
+        cache.shutdown(wait=False)
+
+
+@cli.command()
+@click.argument("wallpaper_dir", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--timeout", default=1800, help="Timeout between wallpaper changes in seconds"
+)
+@cache_size_option
+@setter_option
+def daemon(wallpaper_dir: str, timeout: int, cache_size: int, setter: str):
+    wallpaper_daemon = WallpaperDaemon(
+        os.path.abspath(wallpaper_dir),
+        timeout,
+        cache=_build_cache(cache_size),
+        setter=image_setter(setter),
+    )
+
+    try:
+        asyncio.run(wallpaper_daemon.serve())
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command(name="next")
+def next_wallpaper():
+    answer = _send_to_daemon("next")
+    click.echo(f'Wallpaper set to: "{answer.get("wallpaper")}"')
+
+
+@cli.command(name="prev")
+def prev_wallpaper():
+    answer = _send_to_daemon("prev")
+    click.echo(f'Wallpaper set to: "{answer.get("wallpaper")}"')
+
+
+@cli.command()
+def pause():
+    _send_to_daemon("pause")
+    click.echo("Wallpaper rotation paused")
+
+
+@cli.command()
+def resume():
+    _send_to_daemon("resume")
+    click.echo("Wallpaper rotation resumed")
+
+
+@cli.command()
+def status():
+    answer = _send_to_daemon("status")
+    click.echo(f'Wallpaper: "{answer.get("wallpaper")}"')
+    click.echo(f'Directory: "{answer.get("directory")}"')
+    click.echo(f"Paused: {answer.get("paused")}")
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ This module provides a class to manage lock screen settings for Qtile.
 
 Classes:
     AppSettingsLockScreen:
-        Manages lock screen settings including command, timeout, font, joke settings, and blur type.
+        Manages lock screen settings including command, timeout, font, joke settings, joke timeout, blur type and image format.
 """
 
 
@@ -22,7 +22,10 @@ class AppSettingsLockScreen:
     quote_text_color = "#000"
     icanhazdad_joke_url = ""
     reddit_joke_url = "https://www.reddit.com/r/ProgrammerDadJokes.json"
+    joke_timeout = 2.0
     blurtype = "0x5"
+    blur_quality = "balanced"
+    image_format = "raw"
 
     def __init__(self, **kwargs):
         """
@@ -50,4 +53,7 @@ class AppSettingsLockScreen:
             "icanhazdad_joke_url", self.icanhazdad_joke_url
         )
         self.reddit_joke_url = kwargs.get("reddit_joke_url", self.reddit_joke_url)
+        self.joke_timeout = float(kwargs.get("joke_timeout", str(self.joke_timeout)))
         self.blurtype = kwargs.get("blurtype", self.blurtype)
+        self.blur_quality = kwargs.get("blur_quality", self.blur_quality).lower()
+        self.image_format = kwargs.get("image_format", self.image_format).lower()
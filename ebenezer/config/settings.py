@@ -6,11 +6,14 @@ This module provides a class to manage application settings and functions to loa
 
 Classes:
     AppSettings:
-        Manages application settings including applications, bar, colors, commands, environment, floating, fonts, groups, groups_layout, keybindings, lock_screen, monitoring, and startup.
+        Manages application settings including applications, bar, colors, commands, environment, floating, fonts, groups, groups_layout, keybindings, lock_screen, monitoring, startup, and window_rules.
 
 Functions:
-    load_settings_by_files(config_filepath=None, colors_filepath=None, applications_filepath=None) -> AppSettings:
-        Loads settings from the specified files.
+    load_settings_by_files(config_filepath=None, colors_filepath=None, applications_filepath=None, use_cache=True) -> AppSettings:
+        Loads settings from the specified files, reusing the compiled settings when they are fresh.
+
+    compile_settings_by_files(config_filepath=None, colors_filepath=None, applications_filepath=None) -> AppSettings:
+        Parses the specified files and stores the compiled settings in the cache.
 
     load_settings(raw_settings: dict) -> AppSettings:
         Loads settings from a dictionary of raw settings.
@@ -31,8 +34,12 @@ from ebenezer.config.loader import load_raw_settings
 from ebenezer.config.lock_screen import AppSettingsLockScreen
 from ebenezer.config.monitoring import AppSettingsMonitoring
 from ebenezer.config.scratchpads import AppSettingsScratchpads
+from ebenezer.config.window_rules import AppSettingsWindowRule, build_window_rules
+from ebenezer.core.cache import load_compiled, store_compiled
 from ebenezer.core.files import qtile_home
 
+SETTINGS_ARTIFACT = "settings"
+
 
 def _load_config_file(name: str) -> str | None:
     default_file = Path.joinpath(Path(qtile_home), f"{name}_default.yml")
@@ -66,6 +73,7 @@ class AppSettings:
     monitoring: AppSettingsMonitoring = AppSettingsMonitoring(*{})
     scratchpads: AppSettingsScratchpads = AppSettingsScratchpads(*{})
     startup: dict[str, str] = {}
+    window_rules: List[AppSettingsWindowRule] = []
 
     def __init__(self, **kwargs):
         """
@@ -89,33 +97,91 @@ class AppSettings:
         self.monitoring = kwargs.get("monitoring", self.monitoring)
         self.scratchpads = kwargs.get("scratchpads", self.scratchpads)
         self.startup = kwargs.get("startup", self.startup)
+        self.window_rules = kwargs.get("window_rules", self.window_rules)
+
+
+def _resolve_settings_files(
+    config_filepath=None,
+    colors_filepath=None,
+    applications_filepath=None,
+) -> list[str | None]:
+    if config_filepath is None:
+        config_filepath = _load_config_file("config")
+
+    if colors_filepath is None:
+        colors_filepath = _load_config_file("colors")
+
+    if applications_filepath is None:
+        applications_filepath = _load_config_file("applications")
+
+    return [config_filepath, colors_filepath, applications_filepath]
 
 
 def load_settings_by_files(
     config_filepath=None,
     colors_filepath=None,
     applications_filepath=None,
+    use_cache=True,
 ) -> AppSettings:
     """
     Loads settings from the specified files.
 
+    When the compiled settings in the cache were built from the same files (path, mtime
+    and size), they are returned without parsing any YAML.
+
     Args:
         config_filepath (str, optional): The path to the config file. Defaults to None.
         colors_filepath (str, optional): The path to the colors file. Defaults to None.
         applications_filepath (str, optional): The path to the applications file. Defaults to None.
+        use_cache (bool, optional): Whether to reuse and refresh the compiled settings. Defaults to True.
 
     Returns:
         AppSettings: The loaded application settings.
     """
-    if config_filepath is None:
-        config_filepath = _load_config_file("config")
+    files = _resolve_settings_files(
+        config_filepath, colors_filepath, applications_filepath
+    )
 
-    if colors_filepath is None:
-        colors_filepath = _load_config_file("colors")
+    if use_cache:
+        settings = load_compiled(SETTINGS_ARTIFACT, files)
 
-    if applications_filepath is None:
-        applications_filepath = _load_config_file("applications")
+        if settings is not None:
+            return settings
 
+        return compile_settings_by_files(*files)
+
+    return _parse_settings_files(*files)
+
+
+def compile_settings_by_files(
+    config_filepath=None,
+    colors_filepath=None,
+    applications_filepath=None,
+) -> AppSettings:
+    """
+    Parses the specified files and stores the compiled settings in the cache.
+
+    Args:
+        config_filepath (str, optional): The path to the config file. Defaults to None.
+        colors_filepath (str, optional): The path to the colors file. Defaults to None.
+        applications_filepath (str, optional): The path to the applications file. Defaults to None.
+
+    Returns:
+        AppSettings: The parsed application settings.
+    """
+    files = _resolve_settings_files(
+        config_filepath, colors_filepath, applications_filepath
+    )
+    settings = _parse_settings_files(*files)
+
+    store_compiled(SETTINGS_ARTIFACT, files, settings)
+
+    return settings
+
+
+def _parse_settings_files(
+    config_filepath, colors_filepath, applications_filepath
+) -> AppSettings:
     raw_settings = load_raw_settings(
         config_filepath=config_filepath,
         colors_filepath=colors_filepath,
@@ -147,6 +213,7 @@ def load_settings(raw_settings: dict) -> AppSettings:
     lock_screen = raw_settings.get("lock_screen")
     monitoring = raw_settings.get("monitoring")
     scratchpads = raw_settings.get("scratchpads")
+    window_rules = raw_settings.get("window_rules")
 
     if applications:
         args["applications"] = AppSettingsApplications(**applications)
@@ -175,4 +242,7 @@ def load_settings(raw_settings: dict) -> AppSettings:
     if scratchpads:
         args["scratchpads"] = AppSettingsScratchpads(**scratchpads)
 
+    if window_rules:
+        args["window_rules"] = build_window_rules(window_rules)
+
     return AppSettings(**args)
@@ -0,0 +1,76 @@
+"""
+window_rules.py
+---------------
+
+This module provides classes and functions to manage window rules for Qtile.
+
+Classes:
+    AppSettingsWindowRule:
+        Manages an individual window rule, matching a window by class or title and describing what to do with it.
+
+Functions:
+    build_window_rules(items: List[dict]) -> List[AppSettingsWindowRule]:
+        Builds a list of window rules from a list of dictionaries.
+"""
+
+from typing import List
+
+from libqtile.log_utils import logger
+
+
+def _parse_flag(value) -> bool:
+    return value is True or str(value).lower() in ("yes", "true")
+
+
+class AppSettingsWindowRule:
+    wm_class: str = ""
+    title: str = ""
+    floating: bool = False
+    center: bool = False
+    group: str = ""
+    size: List[float] = []
+
+    def __init__(self, **kwargs):
+        """
+        Initializes the AppSettingsWindowRule with optional keyword arguments.
+
+        Args:
+            **kwargs: Arbitrary keyword arguments to initialize the window rule settings.
+                - wm_class (str): The exact window class to match.
+                - title (str): A regular expression searched in the window title.
+                - floating (str): Whether the window should float ("yes" or "no").
+                - center (str): Whether the window should be centered ("yes" or "no").
+                - group (str): The group name the window should be moved to.
+                - size (str): The window width and height as screen fractions, e.g. "0.6,0.6".
+        """
+        self.wm_class = str(kwargs.get("wm_class", self.wm_class))
+        self.title = str(kwargs.get("title", self.title))
+        self.floating = _parse_flag(kwargs.get("floating", self.floating))
+        self.center = _parse_flag(kwargs.get("center", self.center))
+        self.group = str(kwargs.get("group", self.group))
+
+        size = kwargs.get("size")
+
+        if size:
+            self.size = [float(i) for i in str(size).split(",")]
+
+
+def build_window_rules(items: List[dict]) -> List[AppSettingsWindowRule]:
+    """
+    Builds a list of window rules from a list of dictionaries.
+
+    Args:
+        items (List[dict]): A list of dictionaries containing window rule configurations.
+
+    Returns:
+        List[AppSettingsWindowRule]: A list of configured window rules.
+    """
+    try:
+        return [AppSettingsWindowRule(**i) for i in items]
+    except Exception as error:
+        logger.warning(
+            "An exception occurred while trying to build window rules.",
+            error,
+            exc_info=True,
+        )
+        return []
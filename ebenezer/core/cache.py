@@ -0,0 +1,200 @@
+"""
+cache.py
+--------
+
+This module provides functions to store compiled artifacts under the ebenezer cache directory.
+
+An artifact is a pickled value keyed on the path, modification time and size of the
+files it was built from, so it is reused only while those files remain unchanged. It is
+also keyed on the installed ebenezer version and the source of the configuration classes,
+since an unpickled object skips `__init__` and would miss the attributes added by an upgrade.
+
+Functions:
+    code_version() -> str:
+        Returns the version of the ebenezer code the artifacts are built by.
+
+    file_fingerprint(filepaths: Iterable[str | None]) -> tuple:
+        Builds a fingerprint from the path, mtime and size of each file.
+
+    load_compiled(name: str, filepaths: Iterable[str | None]) -> Any | None:
+        Loads a compiled artifact if it is still fresh for the given files.
+
+    store_compiled(name: str, filepaths: Iterable[str | None], value: Any):
+        Stores a compiled artifact keyed on the given files.
+
+    clear_compiled(name: str | None = None) -> list[str]:
+        Removes one or all compiled artifacts.
+"""
+
+import functools
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable
+
+from libqtile.log_utils import logger
+
+from ebenezer.core.files import cache_home
+
+CACHE_FORMAT_VERSION = 1
+ARTIFACT_SUFFIX = ".pickle"
+PACKAGE_NAME = "qtile-ebenezer"
+CONFIG_PACKAGE_DIR = Path(__file__).parent.parent.joinpath("config")
+
+
+def _artifact_path(name: str) -> Path:
+    return Path(cache_home).joinpath(f"{name}{ARTIFACT_SUFFIX}")
+
+
+@functools.cache
+def code_version() -> str:
+    """
+    Returns the version of the ebenezer code the artifacts are built by.
+
+    The source of the configuration modules is hashed along with the package version, so
+    an editable install is covered as well.
+
+    Returns:
+        str: A hex digest of the package version and the configuration modules.
+    """
+    try:
+        version = importlib.metadata.version(PACKAGE_NAME)
+    except importlib.metadata.PackageNotFoundError:
+        version = "dev"
+
+    digest = hashlib.sha256(version.encode("utf-8"))
+
+    for module in sorted(CONFIG_PACKAGE_DIR.glob("*.py")):
+        digest.update(module.name.encode("utf-8"))
+        digest.update(module.read_bytes())
+
+    return digest.hexdigest()
+
+
+def file_fingerprint(filepaths: Iterable[str | None]) -> tuple:
+    """
+    Builds a fingerprint from the path, mtime and size of each file.
+
+    Args:
+        filepaths (Iterable[str | None]): The files to fingerprint, empty entries are ignored.
+
+    Returns:
+        tuple: A tuple of (path, mtime_ns, size) entries, missing files use None values.
+    """
+    fingerprint = []
+
+    for filepath in filepaths:
+        if not filepath:
+            continue
+
+        path = str(Path(filepath).expanduser().absolute())
+
+        try:
+            stat = os.stat(path)
+            fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append((path, None, None))
+
+    return tuple(fingerprint)
+
+
+def load_compiled(name: str, filepaths: Iterable[str | None]) -> Any | None:
+    """
+    Loads a compiled artifact if it is still fresh for the given files.
+
+    Args:
+        name (str): The artifact name.
+        filepaths (Iterable[str | None]): The source files the artifact was built from.
+
+    Returns:
+        Any | None: The compiled value, or None when it is missing or stale.
+    """
+    artifact_file = _artifact_path(name)
+
+    if not artifact_file.exists():
+        return None
+
+    try:
+        with open(artifact_file, "rb") as f:
+            artifact = pickle.load(f)
+
+        if artifact.get("format") != CACHE_FORMAT_VERSION:
+            return None
+
+        if artifact.get("code") != code_version():
+            return None
+
+        if artifact.get("sources") != file_fingerprint(filepaths):
+            return None
+
+        return artifact.get("value")
+    except Exception as e:
+        logger.warning(f"error while trying to load compiled {name}: {e}")
+        return None
+
+
+def store_compiled(name: str, filepaths: Iterable[str | None], value: Any):
+    """
+    Stores a compiled artifact keyed on the given files.
+
+    The artifact is written to a temporary file and then renamed, so concurrent
+    readers never observe a partially written artifact.
+
+    Args:
+        name (str): The artifact name.
+        filepaths (Iterable[str | None]): The source files the artifact was built from.
+        value (Any): The value to store, it must be picklable.
+    """
+    artifact_file = _artifact_path(name)
+    artifact = {
+        "format": CACHE_FORMAT_VERSION,
+        "code": code_version(),
+        "sources": file_fingerprint(filepaths),
+        "value": value,
+    }
+
+    try:
+        artifact_file.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_file = tempfile.mkstemp(
+            dir=artifact_file.parent, prefix=f".{name}", suffix=ARTIFACT_SUFFIX
+        )
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(tmp_file, artifact_file)
+        except Exception:
+            os.unlink(tmp_file)
+            raise
+    except Exception as e:
+        logger.warning(f"error while trying to store compiled {name}: {e}")
+
+
+def clear_compiled(name: str | None = None) -> list[str]:
+    """
+    Removes one or all compiled artifacts.
+
+    Args:
+        name (str | None): The artifact name, or None to remove every artifact.
+
+    Returns:
+        list[str]: The removed files.
+    """
+    if name is not None:
+        artifact_files = [_artifact_path(name)]
+    else:
+        artifact_files = list(Path(cache_home).glob(f"*{ARTIFACT_SUFFIX}"))
+
+    removed = []
+
+    for artifact_file in artifact_files:
+        if artifact_file.exists():
+            artifact_file.unlink()
+            removed.append(str(artifact_file))
+
+    return removed
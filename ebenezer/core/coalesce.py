@@ -0,0 +1,231 @@
+"""
+coalesce.py
+-----------
+
+This module provides a controller folding repeated level changes (e.g. the autorepeat of a
+volume or brightness hotkey) into a single change.
+
+The first change of a burst schedules a flush after a short window; every change arriving
+in the meantime only updates an optimistic cached level and the pending delta. The flush
+applies the net delta once, in a worker thread so the event loop never waits for the
+command, and reports the resulting level once per burst. When the cached level expired,
+it is read in the same worker thread and the changes arriving meanwhile are queued.
+
+Classes:
+    LevelController:
+        Coalesces relative level changes and keeps an optimistic cached level.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from libqtile.log_utils import logger
+
+DEFAULT_WINDOW = 0.15
+DEFAULT_LEVEL_TTL = 2.0
+
+
+class LevelController:
+    """
+    Coalesces relative level changes and keeps an optimistic cached level.
+
+    Attributes:
+        min_level (int): The lowest level a change can reach.
+        max_level (int): The highest level a change can reach.
+        window (float): How long changes are folded together in seconds.
+        level_ttl (float): How long the cached level is trusted after the last change in seconds.
+    """
+
+    def __init__(
+        self,
+        read_level: Callable[[], int],
+        apply_delta: Callable[[int], None],
+        on_applied: Callable[[int, int], None] | None = None,
+        min_level: int = 0,
+        max_level: int = 100,
+        window: float = DEFAULT_WINDOW,
+        level_ttl: float = DEFAULT_LEVEL_TTL,
+    ):
+        """
+        Initializes the controller.
+
+        Args:
+            read_level (Callable[[], int]): Reads the current level, called only when the cached level expired.
+            apply_delta (Callable[[int], None]): Applies a relative change.
+            on_applied (Callable[[int, int], None] | None): Called with the applied delta and the resulting level.
+            min_level (int): The lowest level a change can reach. Defaults to 0.
+            max_level (int): The highest level a change can reach. Defaults to 100.
+            window (float): How long changes are folded together in seconds. Defaults to 0.15.
+            level_ttl (float): How long the cached level is trusted in seconds. Defaults to 2.
+        """
+        self.min_level = min_level
+        self.max_level = max_level
+        self.window = window
+        self.level_ttl = level_ttl
+        self._read_level = read_level
+        self._apply_delta = apply_delta
+        self._on_applied = on_applied
+        self._level: int | None = None
+        self._changed_at = 0.0
+        self._pending = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._reading: asyncio.Future | None = None
+        self._queued: list[int] = []
+
+    @property
+    def level(self) -> int:
+        """
+        Returns the optimistic level, reading it when the cached one expired.
+
+        The read blocks, on the event loop `change` reads the level in the worker thread.
+        """
+        if self._expired():
+            self._level = self._read_level()
+
+        return self._level
+
+    def invalidate(self):
+        """
+        Drops the cached level, e.g. after the level was changed by other means.
+        """
+        if self._timer is None:
+            self._level = None
+
+    def change(self, delta: int) -> int | None:
+        """
+        Changes the level by a relative amount, within the level limits.
+
+        Without a running event loop the change is applied right away. On the event loop,
+        a change arriving while the level is read is queued until the read finishes.
+
+        Args:
+            delta (int): The amount to add, negative values lower the level.
+
+        Returns:
+            int | None: The optimistic level after the change, or None while the level is read.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            new_level = self._change(delta, self.level)
+            self.flush()
+            self._level = None
+            return new_level
+
+        if self._reading is not None or self._expired():
+            self._queued.append(delta)
+
+            if self._reading is None:
+                self._reading = loop.run_in_executor(
+                    self._get_executor(), self._read_level
+                )
+                self._reading.add_done_callback(self._on_level_read)
+
+            return None
+
+        new_level = self._change(delta, self._level)
+
+        if self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+
+        return new_level
+
+    def flush(self):
+        """
+        Applies the pending delta and reports the resulting level.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        delta, self._pending = self._pending, 0
+
+        if delta == 0:
+            return
+
+        level = self._level
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._apply(delta, level)
+            return
+
+        self._get_executor().submit(self._apply, delta, level, loop)
+
+    def _expired(self) -> bool:
+        return self._level is None or (
+            self._timer is None and time.monotonic() - self._changed_at > self.level_ttl
+        )
+
+    def _change(self, delta: int, level: int) -> int:
+        new_level = max(self.min_level, min(self.max_level, level + delta))
+
+        self._level = new_level
+        self._changed_at = time.monotonic()
+        self._pending += new_level - level
+
+        return new_level
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        return self._executor
+
+    def _on_level_read(self, future: asyncio.Future):
+        self._reading = None
+        queued, self._queued = self._queued, []
+
+        if future.cancelled():
+            return
+
+        if (error := future.exception()) is not None:
+            logger.warning(f"error while reading the level: {error}")
+            return
+
+        self._level = future.result()
+        self._changed_at = time.monotonic()
+
+        for delta in queued:
+            self.change(delta)
+
+    def _apply(
+        self,
+        delta: int,
+        level: int,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ):
+        try:
+            self._apply_delta(delta)
+        except Exception as e:
+            logger.warning(f"error while applying the level change {delta}: {e}")
+            self._call_on_loop(loop, self._reset_level)
+            return
+
+        self._call_on_loop(loop, self._report, delta, level)
+
+    def _call_on_loop(self, loop: asyncio.AbstractEventLoop | None, callback, *args):
+        if loop is None:
+            callback(*args)
+            return
+
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError as e:
+            logger.debug(f"error while reporting the level change: {e}")
+
+    def _reset_level(self):
+        self._level = None
+
+    def _report(self, delta: int, level: int):
+        if self._on_applied is None:
+            return
+
+        try:
+            self._on_applied(delta, level)
+        except Exception as e:
+            logger.warning(f"error while reporting the level change {delta}: {e}")
@@ -4,6 +4,14 @@ command.py
 
 This module provides functions to build and run shell commands with optional timeout, and to create lazy commands for Qtile.
 
+Commands started from Qtile (key bindings, mouse callbacks) run through `spawn_command`,
+which awaits the child process on Qtile's event loop instead of blocking it, so the
+window manager keeps redrawing and handling input while a rofi menu is open.
+
+Classes:
+    CommandResult:
+        The exit status and captured output of a finished command.
+
 Functions:
     build_shell_command(raw_cmd: str, **kwargs: object) -> str:
         Builds a shell command by resolving file paths and substituting variables.
@@ -14,22 +22,41 @@ Functions:
     run_shell_command_stdout(raw_cmd: str, **kwargs: object) -> subprocess.CompletedProcess:
         Runs a shell command and captures the standard output.
 
+    run_command_async(cmd: str | List[str], timeout: Optional[float] = None, capture_output: bool = False, input: str | None = None, kill_on_timeout: bool = True, **kwargs: object) -> CommandResult:
+        Runs a command as an asyncio subprocess and returns its result.
+
+    spawn_command(cmd: str | List[str], on_complete: Callable[[CommandResult], None] | None = None, **kwargs: object) -> asyncio.Task | None:
+        Schedules a command on the running event loop and calls back when it finishes.
+
     lazy_command(cmd: str | None, **kwargs: object):
-        Creates a lazy command for Qtile that runs a shell command.
+        Creates a lazy command for Qtile that runs a shell command without blocking the event loop.
 
     lazy_spawn(cmd: str, **kwargs: object):
         Creates a lazy spawn command for Qtile that runs a shell command.
 """
 
+import asyncio
+import os
+import signal
 import subprocess
 from string import Template
-from typing import Optional
+from typing import Callable, List, NamedTuple, Optional
 
 from libqtile.lazy import lazy
+from libqtile.log_utils import logger
+from libqtile.utils import create_task
 
 from ebenezer.core.files import resolve_file_path
 
 DEFAULT_TIMEOUT = 10
+SHELL = "/bin/sh"
+
+
+class CommandResult(NamedTuple):
+    returncode: int | None
+    stdout: str = ""
+    stderr: str = ""
+    timed_out: bool = False
 
 
 def build_shell_command(raw_cmd: str, **kwargs: object) -> str:
@@ -93,16 +120,150 @@ def run_shell_command_stdout(
     )
 
 
+def _build_argv(cmd: str | List[str], **kwargs: object) -> List[str]:
+    if isinstance(cmd, str):
+        return [SHELL, "-c", build_shell_command(cmd, **kwargs)]
+
+    return [str(arg) for arg in cmd]
+
+
+def _kill_process_group(process: asyncio.subprocess.Process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def run_command_async(
+    cmd: str | List[str],
+    timeout: Optional[float] = None,
+    capture_output: bool = False,
+    input: str | None = None,
+    kill_on_timeout: bool = True,
+    **kwargs: object,
+) -> CommandResult:
+    """
+    Runs a command as an asyncio subprocess and returns its result.
+
+    A string is run through the shell after resolving its template, while a list is
+    executed directly. The command runs in its own session, so a timeout or a
+    cancellation kills the whole process group, unless `kill_on_timeout` is disabled, in
+    which case a command outliving its timeout is left running in the background.
+
+    Args:
+        cmd (str | List[str]): The shell command template or the argument list.
+        timeout (Optional[float]): The timeout in seconds, None waits until the command exits. Defaults to None.
+        capture_output (bool): Whether to capture the standard output and error. Defaults to False.
+        input (str | None): The text written to the standard input. Defaults to None.
+        kill_on_timeout (bool): Whether to kill the command when it times out. Defaults to True.
+        **kwargs (object): Additional keyword arguments to substitute in the command template.
+
+    Returns:
+        CommandResult: The exit status and the captured output of the command.
+
+    Raises:
+        asyncio.CancelledError: If the task running the command is cancelled.
+    """
+    pipe = asyncio.subprocess.PIPE if capture_output else None
+
+    process = await asyncio.create_subprocess_exec(
+        *_build_argv(cmd, **kwargs),
+        stdin=asyncio.subprocess.PIPE if input is not None else None,
+        stdout=pipe,
+        stderr=pipe,
+        start_new_session=True,
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(input.encode() if input is not None else None),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        if not kill_on_timeout:
+            return CommandResult(None, timed_out=True)
+
+        _kill_process_group(process)
+        await process.wait()
+        return CommandResult(process.returncode, timed_out=True)
+    except asyncio.CancelledError:
+        _kill_process_group(process)
+        raise
+
+    return CommandResult(
+        process.returncode,
+        (stdout or b"").decode("utf-8", errors="replace"),
+        (stderr or b"").decode("utf-8", errors="replace"),
+    )
+
+
+def spawn_command(
+    cmd: str | List[str],
+    on_complete: Callable[[CommandResult], None] | None = None,
+    timeout: Optional[float] = None,
+    capture_output: bool = False,
+    input: str | None = None,
+    **kwargs: object,
+) -> asyncio.Task | None:
+    """
+    Schedules a command on the running event loop and calls back when it finishes.
+
+    Inside Qtile this never blocks the event loop; the returned task can be cancelled to
+    kill the command. Without a running event loop (e.g. from the CLI) the command runs
+    to completion before returning.
+
+    Args:
+        cmd (str | List[str]): The shell command template or the argument list.
+        on_complete (Callable[[CommandResult], None] | None): Called with the result once the command finishes.
+        timeout (Optional[float]): The timeout in seconds, None waits until the command exits. Defaults to None.
+        capture_output (bool): Whether to capture the standard output and error. Defaults to False.
+        input (str | None): The text written to the standard input. Defaults to None.
+        **kwargs (object): Additional keyword arguments to substitute in the command template.
+
+    Returns:
+        asyncio.Task | None: The task running the command, or None when it already ran.
+    """
+
+    async def _run():
+        try:
+            result = await run_command_async(
+                cmd,
+                timeout=timeout,
+                capture_output=capture_output,
+                input=input,
+                **kwargs,
+            )
+        except asyncio.CancelledError:
+            logger.info(f"the command {cmd} was cancelled")
+            raise
+        except Exception as e:
+            logger.warning(f"error while trying to run command {cmd}: {e}")
+            result = CommandResult(None, stderr=str(e))
+
+        if on_complete is not None:
+            on_complete(result)
+
+        return result
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(_run())
+        return None
+
+    return create_task(_run())
+
+
 def lazy_command(cmd: str | None, **kwargs: object):
     """
-    Creates a lazy command for Qtile that runs a shell command.
+    Creates a lazy command for Qtile that runs a shell command without blocking the event loop.
 
     Args:
         cmd (str | None): The shell command to run.
         **kwargs (object): Additional keyword arguments to substitute in the command template.
 
     Returns:
-        function: A lazy function that runs the shell command.
+        function: A lazy function that spawns the shell command.
     """
 
     @lazy.function
@@ -110,7 +271,7 @@ def lazy_command(cmd: str | None, **kwargs: object):
         if cmd is None:
             return
 
-        return run_shell_command(build_shell_command(cmd, **kwargs))
+        return spawn_command(cmd, **kwargs)
 
     return _inner
 
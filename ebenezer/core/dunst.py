@@ -0,0 +1,328 @@
+"""
+dunst.py
+--------
+
+This module provides the notification counts of the dunst notification daemon.
+
+Instead of running `dunstctl count` every few seconds, the counts are read from dunst's
+`org.dunstproject.cmd0` D-Bus properties and refreshed when dunst signals a change, so the
+subscribers are only called when a count actually changes. When the session bus or the
+dunst interface is not available, `dunstctl count` is polled slowly and the bus is tried
+again on every poll.
+
+Classes:
+    DunstCounts:
+        The waiting, displayed and history notification counts.
+
+    DunstEvents:
+        Watches dunst over D-Bus and publishes the counts when they change.
+
+Functions:
+    parse_dunstctl_count(output: str) -> DunstCounts:
+        Parses the output of `dunstctl count`.
+
+    read_dunstctl_count() -> DunstCounts:
+        Reads the counts running `dunstctl count`.
+
+    get_dunst_events() -> DunstEvents:
+        Returns the dunst watcher shared by every widget.
+"""
+
+import asyncio
+import os
+import subprocess
+from typing import Callable, Dict, NamedTuple
+
+from libqtile.log_utils import logger
+from libqtile.utils import create_task
+
+try:
+    from dbus_fast import Message, MessageType
+    from dbus_fast.aio import MessageBus
+
+    has_dbus = True
+except ImportError:
+    has_dbus = False
+
+DUNST_SERVICE = "org.freedesktop.Notifications"
+DUNST_PATH = "/org/freedesktop/Notifications"
+DUNST_INTERFACE = "org.dunstproject.cmd0"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+
+DEFAULT_POLL_INTERVAL = 60.0
+EVENTS_DEBOUNCE = 0.05
+
+MATCH_RULES = (
+    f"type='signal',interface='{PROPERTIES_INTERFACE}',member='PropertiesChanged',"
+    f"path='{DUNST_PATH}',arg0='{DUNST_INTERFACE}'",
+    f"type='signal',interface='{DUNST_SERVICE}',path='{DUNST_PATH}'",
+    "type='signal',interface='org.freedesktop.DBus',member='NameOwnerChanged',"
+    f"arg0='{DUNST_SERVICE}'",
+)
+
+
+class DunstCounts(NamedTuple):
+    waiting: int = 0
+    displayed: int = 0
+    history: int = 0
+
+
+def parse_dunstctl_count(output: str) -> DunstCounts:
+    """
+    Parses the output of `dunstctl count`.
+
+    Args:
+        output (str): The output, e.g. "Waiting: 0\\nCurrently displayed: 1\\nHistory: 5".
+
+    Returns:
+        DunstCounts: The parsed counts, missing lines count as zero.
+    """
+    values = {}
+
+    for line in output.splitlines():
+        key, _, value = line.partition(":")
+
+        try:
+            values[key.strip().lower()] = int(value.strip())
+        except ValueError:
+            continue
+
+    return DunstCounts(
+        waiting=values.get("waiting", 0),
+        displayed=values.get("currently displayed", 0),
+        history=values.get("history", 0),
+    )
+
+
+def read_dunstctl_count() -> DunstCounts:
+    """
+    Reads the counts running `dunstctl count`.
+
+    Returns:
+        DunstCounts: The counts, all zero when `dunstctl` fails.
+    """
+    try:
+        output = subprocess.check_output(["dunstctl", "count"]).decode("utf-8")
+        return parse_dunstctl_count(output)
+    except Exception:
+        return DunstCounts()
+
+
+class DunstEvents:
+    """
+    Watches dunst over D-Bus and publishes the counts when they change.
+
+    The counts are read from the `org.dunstproject.cmd0` properties once, then again a
+    few milliseconds after dunst emits `PropertiesChanged`, a notification signal or
+    restarts. Without a usable bus, `dunstctl count` is polled every `poll_interval`
+    seconds instead, and the bus is tried again before every poll.
+
+    Attributes:
+        latest (DunstCounts | None): The last published counts.
+        bus_address (str | None): The bus address, the session bus when None.
+        poll_interval (float): The interval of the fallback polling in seconds.
+    """
+
+    def __init__(
+        self,
+        bus_address: str | None = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        debounce: float = EVENTS_DEBOUNCE,
+        read_fallback: Callable[[], DunstCounts] = read_dunstctl_count,
+    ):
+        self.latest: DunstCounts | None = None
+        self.bus_address = bus_address
+        self.poll_interval = poll_interval
+        self._debounce = debounce
+        self._read_fallback = read_fallback
+        self._subscribers: Dict[Callable[[DunstCounts], None], None] = {}
+        self._changed: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def subscribe(self, callback: Callable[[DunstCounts], None]):
+        """
+        Subscribes a callback to the count changes, starting the watcher when needed.
+
+        The callback receives the latest counts right away when there are some.
+
+        Args:
+            callback (Callable[[DunstCounts], None]): Called with every changed counts.
+        """
+        self._subscribers[callback] = None
+
+        if self.latest is not None:
+            callback(self.latest)
+
+        if not self.running:
+            self.start()
+
+    def unsubscribe(self, callback: Callable[[DunstCounts], None]):
+        """
+        Unsubscribes a callback, stopping the watcher when no subscriber remains.
+
+        Args:
+            callback (Callable[[DunstCounts], None]): The subscribed callback.
+        """
+        self._subscribers.pop(callback, None)
+
+        if not self._subscribers:
+            self.stop()
+
+    def start(self):
+        """
+        Starts watching dunst on the running event loop.
+        """
+        if self.running:
+            return
+
+        self._changed = asyncio.Event()
+        self._task = create_task(self._run())
+
+    def stop(self):
+        """
+        Stops watching dunst, the bus connection is closed once the task is cancelled.
+        """
+        if not self.running:
+            return
+
+        self._task.cancel()
+        self._task = None
+        self.latest = None
+
+    def publish(self, counts: DunstCounts):
+        """
+        Publishes counts to every subscriber when they differ from the latest ones.
+
+        Args:
+            counts (DunstCounts): The counts to publish.
+        """
+        if counts == self.latest:
+            return
+
+        self.latest = counts
+
+        for callback in list(self._subscribers):
+            try:
+                callback(counts)
+            except Exception as e:
+                logger.warning(
+                    f"error while publishing dunst counts to {callback}: {e}"
+                )
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                await self._watch_bus()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"dunst is not reachable over D-Bus, polling it: {e}")
+
+            try:
+                self.publish(await loop.run_in_executor(None, self._read_fallback))
+            except Exception as e:
+                logger.warning(f"error while reading the dunst counts: {e}")
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def _connect(self):
+        if not has_dbus:
+            raise RuntimeError("dbus-fast is not installed")
+
+        if self.bus_address:
+            return await MessageBus(bus_address=self.bus_address).connect()
+
+        if not os.environ.get("DBUS_SESSION_BUS_ADDRESS"):
+            raise RuntimeError("there is no session bus")
+
+        return await MessageBus().connect()
+
+    async def _watch_bus(self):
+        bus = await self._connect()
+
+        try:
+            for rule in MATCH_RULES:
+                await _call(
+                    bus,
+                    destination="org.freedesktop.DBus",
+                    path="/org/freedesktop/DBus",
+                    interface="org.freedesktop.DBus",
+                    member="AddMatch",
+                    signature="s",
+                    body=[rule],
+                )
+
+            bus.add_message_handler(self._on_message)
+
+            while True:
+                self.publish(await self._get_counts(bus))
+
+                try:
+                    # the timeout doubles as a check that dunst is still there
+                    await asyncio.wait_for(self._changed.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    continue
+
+                await asyncio.sleep(self._debounce)
+                self._changed.clear()
+        finally:
+            bus.disconnect()
+
+    def _on_message(self, message):
+        if message.message_type == MessageType.SIGNAL:
+            self._changed.set()
+
+    async def _get_counts(self, bus) -> DunstCounts:
+        reply = await _call(
+            bus,
+            destination=DUNST_SERVICE,
+            path=DUNST_PATH,
+            interface=PROPERTIES_INTERFACE,
+            member="GetAll",
+            signature="s",
+            body=[DUNST_INTERFACE],
+        )
+        properties = reply.body[0]
+
+        def _value(name: str) -> int:
+            variant = properties.get(name)
+            return int(variant.value) if variant is not None else 0
+
+        return DunstCounts(
+            waiting=_value("waitingLength"),
+            displayed=_value("displayedLength"),
+            history=_value("historyLength"),
+        )
+
+
+async def _call(bus, **kwargs):
+    reply = await bus.call(Message(**kwargs))
+
+    if reply.message_type == MessageType.ERROR:
+        raise RuntimeError(f"{reply.error_name}: {' '.join(map(str, reply.body))}")
+
+    return reply
+
+
+_events: DunstEvents | None = None
+
+
+def get_dunst_events() -> DunstEvents:
+    """
+    Returns the dunst watcher shared by every widget.
+
+    Returns:
+        DunstEvents: The shared dunst watcher.
+    """
+    global _events
+
+    if _events is None:
+        _events = DunstEvents()
+
+    return _events
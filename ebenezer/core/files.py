@@ -18,6 +18,7 @@ theme_home: str = str(Path.joinpath(Path(qtile_home), "themes"))
 
 rofi_home: str = str(Path.joinpath(Path(qtile_home), "rofi"))
 scripts = str(Path.joinpath(Path(qtile_home), "scripts"))
+cache_home: str = str(Path.joinpath(Path(home), ".cache/ebenezer"))
 
 
 def resolve_file_path(raw_path: str, **kwargs: dict) -> str:
@@ -38,6 +39,7 @@ def resolve_file_path(raw_path: str, **kwargs: dict) -> str:
         "theme_home": theme_home,
         "rofi_home": rofi_home,
         "scripts": scripts,
+        "cache_home": cache_home,
         **kwargs,
     }
     return cmd_template.safe_substitute(template_args).strip()
@@ -0,0 +1,257 @@
+"""
+github.py
+---------
+
+This module provides a client counting the unread GitHub notifications.
+
+The client goes through the shared asynchronous HTTP client, which keeps the connection
+to GitHub alive between polls, and polls conditionally: the `ETag` and `Last-Modified`
+headers of the last answer are sent back as `If-None-Match` and `If-Modified-Since`, so
+an unchanged notification list costs a `304 Not Modified` without a body. The
+notifications are counted while the pages are streamed, without building the JSON
+documents, and the `X-Poll-Interval` advertised by GitHub is exposed to the caller.
+
+The last count is kept in the persistent response cache along with its validators, so a
+restarted Qtile shows it right away and its first poll is conditional as well.
+
+Classes:
+    JsonArrayCounter:
+        Counts the objects of a JSON array fed chunk by chunk, without parsing it.
+
+    GitHubNotificationsClient:
+        Counts the unread GitHub notifications with conditional requests.
+
+Functions:
+    count_json_array(chunks: Iterable[bytes]) -> int:
+        Counts the objects of a JSON array without parsing it.
+"""
+
+import re
+from http import HTTPStatus
+from typing import Iterable
+
+from ebenezer.core.http import AsyncHttpClient, HttpResponse, get_http_client
+from ebenezer.core.http_cache import ResponseCache
+
+GITHUB_NOTIFICATIONS_URL = "https://api.github.com/notifications"
+DEFAULT_POLL_INTERVAL = 60
+DEFAULT_PER_PAGE = 50
+DEFAULT_TIMEOUT = 10
+
+_JSON_STRUCTURE = re.compile(rb'[\\"\[\]{}]')
+
+
+class JsonArrayCounter:
+    """
+    Counts the objects of a JSON array fed chunk by chunk, without parsing it.
+
+    Only the structural characters are scanned, skipping the content of strings, so a
+    page of notifications is counted as it is downloaded.
+
+    Attributes:
+        count (int): The number of objects at the top level of the array so far.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape_at = -1
+        self._offset = 0
+
+    def feed(self, chunk: bytes):
+        for match in _JSON_STRUCTURE.finditer(chunk):
+            position = self._offset + match.start()
+            char = match.group()
+
+            if self._in_string:
+                if position == self._escape_at:
+                    continue
+
+                if char == b"\\":
+                    self._escape_at = position + 1
+                elif char == b'"':
+                    self._in_string = False
+            elif char == b'"':
+                self._in_string = True
+            elif char in b"[{":
+                if self._depth == 1 and char == b"{":
+                    self.count += 1
+
+                self._depth += 1
+            elif char in b"]}":
+                self._depth -= 1
+
+        self._offset += len(chunk)
+
+
+def count_json_array(chunks: Iterable[bytes]) -> int:
+    """
+    Counts the objects of a JSON array without parsing it.
+
+    Args:
+        chunks (Iterable[bytes]): The chunks of a JSON array of objects.
+
+    Returns:
+        int: The number of objects at the top level of the array.
+    """
+    counter = JsonArrayCounter()
+
+    for chunk in chunks:
+        counter.feed(chunk)
+
+    return counter.count
+
+
+class GitHubNotificationsClient:
+    """
+    Counts the unread GitHub notifications with conditional requests.
+
+    Attributes:
+        token (str): The GitHub personal access token.
+        url (str): The notifications endpoint.
+        count (int | None): The last known count of notifications.
+        status_code (int | None): The status code of the last answer.
+        poll_interval (int): The poll interval advertised by GitHub in seconds.
+        http (AsyncHttpClient | None): The HTTP client, the shared one when None.
+        cache (ResponseCache | None): The cache keeping the last count, none when None.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        url: str = GITHUB_NOTIFICATIONS_URL,
+        per_page: int = DEFAULT_PER_PAGE,
+        timeout: float = DEFAULT_TIMEOUT,
+        http: AsyncHttpClient | None = None,
+        cache: ResponseCache | None = None,
+    ):
+        self.token = token
+        self.url = url
+        self.per_page = per_page
+        self.timeout = timeout
+        self.count: int | None = None
+        self.status_code: int | None = None
+        self.poll_interval = DEFAULT_POLL_INTERVAL
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self.http = http
+        self.cache = cache
+
+    def restore(self) -> int | None:
+        """
+        Restores the last count and its validators from the cache.
+
+        Returns:
+            int | None: The last known count, None when there is none.
+        """
+        if self.count is not None or self.cache is None:
+            return self.count
+
+        cached = self.cache.load(self.url, self._cache_params())
+
+        if cached is None:
+            return None
+
+        try:
+            self.count = int(cached.body)
+        except ValueError:
+            return None
+
+        self._etag = cached.headers.get("etag")
+        self._last_modified = cached.headers.get("last-modified")
+        self._read_poll_interval(cached)
+
+        return self.count
+
+    async def fetch_count(self) -> int | None:
+        """
+        Returns the count of unread notifications.
+
+        Only the first page is requested conditionally: when GitHub answers
+        `304 Not Modified`, the last count is returned without reading any page.
+
+        Returns:
+            int | None: The count of unread notifications, None when GitHub answers with an error status.
+
+        Raises:
+            OSError: When GitHub cannot be reached.
+            TimeoutError: When GitHub does not answer in time.
+        """
+        http = self.http or get_http_client()
+        headers = {
+            "Authorization": f"token {self.token}",
+            "Accept": "application/vnd.github.v3+json",
+        }
+        conditional_headers = {}
+
+        if self.count is not None:
+            if self._etag:
+                conditional_headers["If-None-Match"] = self._etag
+
+            if self._last_modified:
+                conditional_headers["If-Modified-Since"] = self._last_modified
+
+        counter = JsonArrayCounter()
+        response = await http.get(
+            self.url,
+            params={"per_page": self.per_page},
+            headers=headers | conditional_headers,
+            timeout=self.timeout,
+            on_chunk=counter.feed,
+        )
+        self.status_code = response.status
+        self._read_poll_interval(response)
+
+        if response.status == HTTPStatus.NOT_MODIFIED:
+            return self.count
+
+        if response.status != HTTPStatus.OK:
+            return None
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        next_url = response.links.get("next", {}).get("url")
+
+        while next_url:
+            page = await http.get(
+                next_url, headers=headers, timeout=self.timeout, on_chunk=counter.feed
+            )
+            self.status_code = page.status
+
+            if page.status != HTTPStatus.OK:
+                return None
+
+            next_url = page.links.get("next", {}).get("url")
+
+        self.count = counter.count
+        self._etag = etag
+        self._last_modified = last_modified
+        self._store()
+
+        return self.count
+
+    def _cache_params(self) -> dict:
+        # the token is hashed into the cache key, so accounts do not share a count
+        return {"per_page": self.per_page, "token": self.token}
+
+    def _store(self):
+        if self.cache is None:
+            return
+
+        validators = {
+            "etag": self._etag,
+            "last-modified": self._last_modified,
+            "x-poll-interval": str(self.poll_interval),
+        }
+        headers = {k: v for k, v in validators.items() if v}
+        response = HttpResponse(
+            self.url, HTTPStatus.OK, headers, str(self.count).encode("utf-8")
+        )
+        self.cache.store(self.url, self._cache_params(), response)
+
+    def _read_poll_interval(self, response: HttpResponse):
+        try:
+            self.poll_interval = int(response.headers["x-poll-interval"])
+        except (KeyError, ValueError):
+            pass
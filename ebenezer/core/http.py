@@ -0,0 +1,491 @@
+"""
+http.py
+-------
+
+This module provides a small asynchronous HTTP/1.1 client for the network widgets.
+
+The client runs on the current event loop (Qtile's loop inside Qtile) with asyncio
+streams, so a widget waiting for an answer awaits instead of holding an executor thread,
+and any number of network widgets share a constant number of threads. Connections are
+kept alive and reused per host, the number of concurrent requests per host is limited,
+and every request has an overall timeout. The credentials of a request are not forwarded
+to another origin on a redirect. When a proxy is configured in the environment for a
+URL (`HTTPS_PROXY`, `HTTP_PROXY` or `ALL_PROXY`, unless `NO_PROXY` excludes it), the
+request is sent with `requests` in an executor thread instead, which tunnels through it.
+
+Classes:
+    HttpResponse:
+        The status, headers and body of an answer.
+
+    AsyncHttpClient:
+        Sends GET requests over pooled keep-alive connections.
+
+Functions:
+    get_http_client() -> AsyncHttpClient:
+        Returns the client shared by every fetch running on the current event loop.
+"""
+
+import asyncio
+import json
+import re
+import ssl
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import requests
+from libqtile.log_utils import logger
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_IDLE_TIMEOUT = 30.0
+DEFAULT_MAX_REDIRECTS = 5
+USER_AGENT = "ebenezer"
+READ_SIZE = 64 * 1024
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# the request line and the headers are written by hand, a line break would inject headers
+INVALID_URL_CHARS = re.compile(r"[\x00-\x20\x7f]")
+VALID_HEADER_NAME = re.compile(r"[^:\s]+")
+INVALID_HEADER_VALUE = re.compile(r"[\r\n\x00]")
+# the headers dropped when a redirect leaves the origin of the request
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+HostKey = Tuple[str, str, int]
+
+
+class HttpResponse:
+    """
+    The status, headers and body of an answer.
+
+    Attributes:
+        url (str): The URL that answered, after redirects.
+        status (int): The status code.
+        headers (Dict[str, str]): The headers, keyed by lowercase name.
+        body (bytes): The body, empty when it was handed to a chunk handler.
+    """
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    @property
+    def links(self) -> Dict[str, Dict[str, str]]:
+        """
+        Returns the parsed `Link` header keyed by relation, as `requests` does.
+        """
+        links = {}
+
+        for value in self.headers.get("link", "").split(","):
+            url, _, params = value.partition(";")
+            url = url.strip().strip("<>")
+
+            if not url:
+                continue
+
+            link = {"url": url}
+
+            for param in params.split(";"):
+                key, _, param_value = param.partition("=")
+
+                if key.strip():
+                    link[key.strip()] = param_value.strip().strip('"')
+
+            links[link.get("rel", url)] = link
+
+        return links
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.released_at = time.monotonic()
+
+    def usable(self, idle_timeout: float) -> bool:
+        return (
+            not self.writer.is_closing()
+            and not self.reader.at_eof()
+            and time.monotonic() - self.released_at < idle_timeout
+        )
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHttpClient:
+    """
+    Sends GET requests over pooled keep-alive connections.
+
+    Attributes:
+        timeout (float): The default overall timeout of a request in seconds.
+        max_per_host (int): The maximum concurrent requests to a host.
+        idle_timeout (float): How long an idle connection is kept in seconds.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_redirects: int = DEFAULT_MAX_REDIRECTS,
+    ):
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.max_redirects = max_redirects
+        self.connections_opened = 0
+        self._idle: Dict[HostKey, List[_Connection]] = {}
+        self._limits: Dict[HostKey, asyncio.Semaphore] = {}
+        self._ssl_context: ssl.SSLContext | None = None
+
+    async def get(
+        self,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        headers: Dict[str, str] | None = None,
+        timeout: float | None = None,
+        on_chunk: Callable[[bytes], None] | None = None,
+    ) -> HttpResponse:
+        """
+        Sends a GET request, following redirects.
+
+        Args:
+            url (str): The URL.
+            params (Dict[str, Any] | None): The query parameters to append to the URL.
+            headers (Dict[str, str] | None): Extra request headers.
+            timeout (float | None): The overall timeout in seconds, the client default when None.
+            on_chunk (Callable[[bytes], None] | None): Receives the body as it is read, instead of buffering it.
+
+        Returns:
+            HttpResponse: The answer, whatever its status.
+
+        Raises:
+            ValueError: If the URL or a header holds a line break or another control character.
+            TimeoutError: If the request does not complete within the timeout.
+            OSError: If the host cannot be reached.
+        """
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+
+        headers = headers or {}
+        _check_request(url, headers)
+        timeout = timeout or self.timeout
+
+        async with asyncio.timeout(timeout):
+            for _ in range(self.max_redirects + 1):
+                if _uses_proxy(url):
+                    return await self._request_proxied(url, headers, timeout, on_chunk)
+
+                response = await self._request(url, headers, on_chunk)
+                location = response.headers.get("location")
+
+                if response.status not in REDIRECT_STATUSES or not location:
+                    return response
+
+                next_url = urljoin(url, location)
+
+                if _origin(next_url) != _origin(url):
+                    headers = {
+                        k: v
+                        for k, v in headers.items()
+                        if k.lower() not in CREDENTIAL_HEADERS
+                    }
+
+                url = next_url
+
+        raise OSError(f"too many redirects for {url}")
+
+    async def close(self):
+        """
+        Closes every idle connection.
+        """
+        idle, self._idle = self._idle, {}
+
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _limit(self, key: HostKey) -> asyncio.Semaphore:
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self.max_per_host)
+
+        return self._limits[key]
+
+    async def _open(self, key: HostKey) -> _Connection:
+        scheme, host, port = key
+
+        if scheme == "https" and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self._ssl_context if scheme == "https" else None
+        )
+        self.connections_opened += 1
+
+        return _Connection(reader, writer)
+
+    def _acquire_idle(self, key: HostKey) -> _Connection | None:
+        connections = self._idle.get(key, [])
+
+        while connections:
+            connection = connections.pop()
+
+            if connection.usable(self.idle_timeout):
+                return connection
+
+            connection.close()
+
+        return None
+
+    def _release(self, key: HostKey, connection: _Connection):
+        connection.released_at = time.monotonic()
+        self._idle.setdefault(key, []).append(connection)
+
+    async def _request(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        on_chunk: Callable[[bytes], None] | None,
+    ) -> HttpResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+
+        if scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        target = parts.path or "/"
+
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{port}"
+        request_headers = {
+            "Host": host,
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "identity",
+            "Connection": "keep-alive",
+            **headers,
+        }
+        head = f"GET {target} HTTP/1.1\r\n" + "".join(
+            f"{k}: {v}\r\n" for k, v in request_headers.items()
+        )
+        request = f"{head}\r\n".encode("latin-1")
+
+        async with self._limit(key):
+            connection = self._acquire_idle(key)
+
+            if connection is not None:
+                try:
+                    status, response_headers = await self._send(connection, request)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    # the server closed the idle connection meanwhile
+                    logger.debug(f"stale connection to {host}, reconnecting: {e}")
+                    connection.close()
+                    connection = None
+
+            if connection is None:
+                connection = await self._open(key)
+                status, response_headers = await self._send(connection, request)
+
+            try:
+                body, reusable = await self._read_body(
+                    connection.reader, status, response_headers, on_chunk
+                )
+            except BaseException:
+                connection.close()
+                raise
+
+            if reusable and response_headers.get("connection", "").lower() != "close":
+                self._release(key, connection)
+            else:
+                connection.close()
+
+        return HttpResponse(url, status, response_headers, body)
+
+    async def _request_proxied(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        timeout: float,
+        on_chunk: Callable[[bytes], None] | None,
+    ) -> HttpResponse:
+        def _get() -> HttpResponse:
+            with requests.get(
+                url,
+                headers={
+                    "User-Agent": USER_AGENT,
+                    "Accept-Encoding": "identity",
+                    **headers,
+                },
+                timeout=timeout,
+                stream=on_chunk is not None,
+            ) as response:
+                if on_chunk is None:
+                    body = response.content
+                else:
+                    body = b""
+
+                    for chunk in response.iter_content(READ_SIZE):
+                        on_chunk(chunk)
+
+                return HttpResponse(
+                    response.url,
+                    response.status_code,
+                    {k.lower(): v for k, v in response.headers.items()},
+                    body,
+                )
+
+        return await asyncio.get_running_loop().run_in_executor(None, _get)
+
+    async def _send(
+        self, connection: _Connection, request: bytes
+    ) -> Tuple[int, Dict[str, str]]:
+        try:
+            connection.writer.write(request)
+            await connection.writer.drain()
+
+            status_line = await connection.reader.readline()
+
+            if not status_line:
+                raise ConnectionResetError("the connection was closed")
+
+            _, status, *_ = status_line.decode("latin-1").split(" ", 2)
+            headers: Dict[str, str] = {}
+
+            while line := await connection.reader.readline():
+                line = line.decode("latin-1").rstrip("\r\n")
+
+                if not line:
+                    break
+
+                name, _, value = line.partition(":")
+                name = name.strip().lower()
+                value = value.strip()
+                headers[name] = (
+                    f"{headers[name]}, {value}" if name in headers else value
+                )
+
+            return int(status), headers
+        except BaseException:
+            connection.close()
+            raise
+
+    async def _read_body(
+        self,
+        reader: asyncio.StreamReader,
+        status: int,
+        headers: Dict[str, str],
+        on_chunk: Callable[[bytes], None] | None,
+    ) -> Tuple[bytes, bool]:
+        chunks: List[bytes] = []
+        consume = on_chunk or chunks.append
+
+        if status in (204, 304) or 100 <= status < 200:
+            return b"", True
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";")[0].strip(), 16)
+
+                if size == 0:
+                    # skip the trailer
+                    while (await reader.readline()).strip():
+                        pass
+
+                    break
+
+                consume(await reader.readexactly(size))
+                await reader.readexactly(2)
+
+            return b"".join(chunks), True
+
+        if "content-length" in headers:
+            remaining = int(headers["content-length"])
+
+            while remaining > 0:
+                chunk = await reader.read(min(remaining, READ_SIZE))
+
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+
+                consume(chunk)
+                remaining -= len(chunk)
+
+            return b"".join(chunks), True
+
+        while chunk := await reader.read(READ_SIZE):
+            consume(chunk)
+
+        return b"".join(chunks), False
+
+
+def _check_request(url: str, headers: Dict[str, str]):
+    if INVALID_URL_CHARS.search(url):
+        raise ValueError(f"invalid URL {url!r}: control characters are not allowed")
+
+    for name, value in headers.items():
+        if not VALID_HEADER_NAME.fullmatch(name):
+            raise ValueError(f"invalid header name {name!r}")
+
+        if INVALID_HEADER_VALUE.search(str(value)):
+            raise ValueError(f"invalid value of the header {name}: {value!r}")
+
+
+def _origin(url: str) -> HostKey:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    return scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80)
+
+
+def _uses_proxy(url: str) -> bool:
+    proxies = urllib.request.getproxies_environment()
+    parts = urlsplit(url)
+
+    if parts.scheme.lower() not in proxies and "all" not in proxies:
+        return False
+
+    return not urllib.request.proxy_bypass_environment(parts.netloc, proxies)
+
+
+_client: AsyncHttpClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> AsyncHttpClient:
+    """
+    Returns the client shared by every fetch running on the current event loop.
+
+    Connections belong to an event loop, so a new client is created when the running
+    loop changes, e.g. between two `asyncio.run` calls of a command.
+
+    Returns:
+        AsyncHttpClient: The shared HTTP client.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+
+    if _client is None or _client_loop is not loop:
+        _client = AsyncHttpClient()
+        _client_loop = loop
+
+    return _client
@@ -0,0 +1,367 @@
+"""
+http_cache.py
+-------------
+
+This module provides a persistent cache of HTTP responses under the ebenezer cache directory.
+
+Responses are keyed on their URL and query parameters and kept in memory and on disk, so
+a restarted or reloaded Qtile renders the last known values before the network answers.
+A response younger than its TTL is served as is. An older one is still served within the
+stale window, while it is revalidated in the background with a conditional request, and
+the caller is notified when the revalidation brings a different response.
+
+Classes:
+    CachedResponse:
+        A response stored in the cache, with the time it was stored at.
+
+    ResponseCache:
+        Serves HTTP responses from memory and disk, revalidating them in the background.
+
+Functions:
+    cache_key(url: str, params: Dict[str, Any] | None = None) -> str:
+        Returns the cache key of a URL and its query parameters.
+
+    get_response_cache() -> ResponseCache:
+        Returns the response cache shared by every widget.
+"""
+
+import asyncio
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Callable, Dict
+from urllib.parse import urlencode
+
+from libqtile.log_utils import logger
+from libqtile.utils import create_task
+
+from ebenezer.core.files import cache_home
+from ebenezer.core.http import AsyncHttpClient, HttpResponse, get_http_client
+from ebenezer.core.requests import endpoint_of
+
+CACHE_FORMAT_VERSION = 1
+RESPONSE_SUFFIX = ".pickle"
+HTTP_CACHE_DIR = "http"
+
+DEFAULT_TTL = 300.0
+DEFAULT_STALE_TTL = 7 * 24 * 3600.0
+
+
+class CachedResponse(HttpResponse):
+    """
+    A response stored in the cache, with the time it was stored at.
+
+    Attributes:
+        stored_at (float): The wall clock time the response was stored or revalidated at.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        headers: Dict[str, str],
+        body: bytes,
+        stored_at: float,
+    ):
+        super().__init__(url, status, headers, body)
+        self.stored_at = stored_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+def cache_key(url: str, params: Dict[str, Any] | None = None) -> str:
+    """
+    Returns the cache key of a URL and its query parameters.
+
+    Args:
+        url (str): The URL.
+        params (Dict[str, Any] | None): The query parameters, in any order.
+
+    Returns:
+        str: A hex digest, so secrets in the URL never show up in file names.
+    """
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(params.items()))}"
+
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Serves HTTP responses from memory and disk, revalidating them in the background.
+
+    Attributes:
+        directory (Path): The directory the responses are stored in.
+        ttl (float): How long a response is served without revalidation in seconds.
+        stale_ttl (float): How long after its TTL a response is still served while it is revalidated.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        ttl: float = DEFAULT_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+    ):
+        self.directory = Path(directory or Path(cache_home).joinpath(HTTP_CACHE_DIR))
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[str, CachedResponse] = {}
+        self._revalidations: Dict[str, asyncio.Task] = {}
+
+    def load(
+        self, url: str, params: Dict[str, Any] | None = None
+    ) -> CachedResponse | None:
+        """
+        Loads a stored response, whatever its age.
+
+        Args:
+            url (str): The URL.
+            params (Dict[str, Any] | None): The query parameters.
+
+        Returns:
+            CachedResponse | None: The stored response, or None when there is none.
+        """
+        key = cache_key(url, params)
+
+        if key in self._entries:
+            return self._entries[key]
+
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"error while trying to load the cached response {key}: {e}")
+            return None
+
+        if entry.get("format") != CACHE_FORMAT_VERSION:
+            return None
+
+        response = CachedResponse(
+            entry["url"],
+            entry["status"],
+            entry["headers"],
+            entry["body"],
+            entry["stored_at"],
+        )
+        self._entries[key] = response
+
+        return response
+
+    def store(
+        self, url: str, params: Dict[str, Any] | None, response: HttpResponse
+    ) -> CachedResponse:
+        """
+        Stores a response as of now.
+
+        The response is written to a temporary file and then renamed, so concurrent
+        readers never observe a partially written response.
+
+        Args:
+            url (str): The URL.
+            params (Dict[str, Any] | None): The query parameters.
+            response (HttpResponse): The response to store.
+
+        Returns:
+            CachedResponse: The stored response.
+        """
+        key = cache_key(url, params)
+        cached = CachedResponse(
+            response.url,
+            response.status,
+            dict(response.headers),
+            response.body,
+            time.time(),
+        )
+        self._entries[key] = cached
+        entry = {
+            "format": CACHE_FORMAT_VERSION,
+            "url": cached.url,
+            "status": cached.status,
+            "headers": cached.headers,
+            "body": cached.body,
+            "stored_at": cached.stored_at,
+        }
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            fd, tmp_file = tempfile.mkstemp(
+                dir=self.directory, prefix=f".{key}", suffix=RESPONSE_SUFFIX
+            )
+
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+                os.replace(tmp_file, self._path(key))
+            except Exception:
+                os.unlink(tmp_file)
+                raise
+        except Exception as e:
+            logger.warning(
+                f"error while trying to store the cached response {key}: {e}"
+            )
+
+        return cached
+
+    def clear(self) -> list[str]:
+        """
+        Removes every stored response.
+
+        Returns:
+            list[str]: The removed files.
+        """
+        self._entries.clear()
+        removed = []
+
+        for response_file in self.directory.glob(f"*{RESPONSE_SUFFIX}"):
+            response_file.unlink()
+            removed.append(str(response_file))
+
+        return removed
+
+    async def get(
+        self,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        headers: Dict[str, str] | None = None,
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+        http: AsyncHttpClient | None = None,
+        on_revalidated: Callable[[HttpResponse], None] | None = None,
+    ) -> HttpResponse:
+        """
+        Returns a response from the cache, or from the network when there is none.
+
+        A stale response is returned right away while it is revalidated in the background,
+        `on_revalidated` is then called when the revalidation brings a different response.
+        Only `200 OK` responses are stored.
+
+        Args:
+            url (str): The URL.
+            params (Dict[str, Any] | None): The query parameters.
+            headers (Dict[str, str] | None): Extra request headers.
+            ttl (float | None): The TTL in seconds, the cache default when None.
+            stale_ttl (float | None): The stale window in seconds, the cache default when None.
+            http (AsyncHttpClient | None): The HTTP client, the shared one when None.
+            on_revalidated (Callable[[HttpResponse], None] | None): Receives the response of a background revalidation.
+
+        Returns:
+            HttpResponse: The cached or fetched response.
+
+        Raises:
+            OSError: When there is no usable cached response and the host cannot be reached.
+            TimeoutError: When there is no usable cached response and the host does not answer in time.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        cached = self.load(url, params)
+
+        if cached is not None and cached.age < ttl:
+            return cached
+
+        if cached is not None and cached.age < ttl + stale_ttl:
+            self._revalidate(url, params, headers, http, cached, on_revalidated)
+            return cached
+
+        return await self._fetch(url, params, headers, http, cached)
+
+    async def join(self):
+        """
+        Waits for the running background revalidations.
+        """
+        while self._revalidations:
+            await asyncio.gather(*self._revalidations.values(), return_exceptions=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory.joinpath(f"{key}{RESPONSE_SUFFIX}")
+
+    async def _fetch(
+        self,
+        url: str,
+        params: Dict[str, Any] | None,
+        headers: Dict[str, str] | None,
+        http: AsyncHttpClient | None,
+        cached: CachedResponse | None,
+    ) -> HttpResponse:
+        request_headers = dict(headers or {})
+
+        if cached is not None:
+            if etag := cached.headers.get("etag"):
+                request_headers["If-None-Match"] = etag
+
+            if last_modified := cached.headers.get("last-modified"):
+                request_headers["If-Modified-Since"] = last_modified
+
+        response = await (http or get_http_client()).get(
+            url, params=params, headers=request_headers
+        )
+
+        if response.status == HTTPStatus.NOT_MODIFIED and cached is not None:
+            return self.store(url, params, cached)
+
+        if response.status == HTTPStatus.OK:
+            return self.store(url, params, response)
+
+        return response
+
+    def _revalidate(
+        self,
+        url: str,
+        params: Dict[str, Any] | None,
+        headers: Dict[str, str] | None,
+        http: AsyncHttpClient | None,
+        cached: CachedResponse,
+        on_revalidated: Callable[[HttpResponse], None] | None,
+    ):
+        key = cache_key(url, params)
+
+        if key in self._revalidations:
+            return
+
+        async def _run():
+            try:
+                response = await self._fetch(url, params, headers, http, cached)
+            except Exception as e:
+                logger.debug(f"error while revalidating {endpoint_of(url)}: {e}")
+                return
+            finally:
+                self._revalidations.pop(key, None)
+
+            changed = response.status != cached.status or response.body != cached.body
+
+            if on_revalidated is None or not response.ok or not changed:
+                return
+
+            try:
+                on_revalidated(response)
+            except Exception as e:
+                logger.warning(f"error while publishing a revalidated response: {e}")
+
+        self._revalidations[key] = create_task(_run())
+
+
+_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Returns the response cache shared by every widget.
+
+    Returns:
+        ResponseCache: The shared response cache.
+    """
+    global _cache
+
+    if _cache is None:
+        _cache = ResponseCache()
+
+    return _cache
@@ -0,0 +1,244 @@
+"""
+jokes.py
+--------
+
+This module provides the local store of the jokes shown on the lock screen.
+
+Jokes are fetched ahead of time and kept in a SQLite database under the ebenezer cache
+directory, deduplicated by a hash of their content. Picking a joke is an indexed query
+over the jokes not shown yet, so locking the screen neither touches the network nor
+parses an API response. Once every joke was shown the rotation starts over, and the
+store tells when few unseen jokes remain so it can be refilled in the background.
+
+Classes:
+    JokeStore:
+        Stores jokes and picks them in a no-repeat rotation.
+
+Functions:
+    joke_hash(text: str) -> str:
+        Returns the content hash a joke is deduplicated by.
+
+    get_joke_store() -> JokeStore:
+        Returns the joke store shared by the lock screen.
+"""
+
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Tuple
+
+from libqtile.log_utils import logger
+
+from ebenezer.core.files import cache_home
+
+JOKES_DB = "jokes.sqlite3"
+DEFAULT_LOW_WATERMARK = 10
+DEFAULT_MAX_JOKES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jokes (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    provider TEXT NOT NULL,
+    content TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    shown_at REAL
+);
+CREATE INDEX IF NOT EXISTS jokes_unseen ON jokes (id) WHERE shown_at IS NULL;
+CREATE INDEX IF NOT EXISTS jokes_shown_at ON jokes (shown_at);
+"""
+
+
+def joke_hash(text: str) -> str:
+    """
+    Returns the content hash a joke is deduplicated by.
+
+    Args:
+        text (str): The joke.
+
+    Returns:
+        str: A hex digest of the joke, ignoring case and whitespace changes.
+    """
+    normalized = " ".join(text.split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class JokeStore:
+    """
+    Stores jokes and picks them in a no-repeat rotation.
+
+    Attributes:
+        path (Path): The SQLite database.
+        low_watermark (int): The unseen jokes below which the store needs a refill.
+        max_jokes (int): The jokes kept, the least recently shown ones are removed beyond it.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        low_watermark: int = DEFAULT_LOW_WATERMARK,
+        max_jokes: int = DEFAULT_MAX_JOKES,
+    ):
+        self.path = Path(path or Path(cache_home).joinpath(JOKES_DB))
+        self.low_watermark = low_watermark
+        self.max_jokes = max_jokes
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def add(self, provider: str, jokes: Iterable[str]) -> int:
+        """
+        Adds jokes, skipping the ones already stored.
+
+        Args:
+            provider (str): The provider the jokes come from.
+            jokes (Iterable[str]): The jokes.
+
+        Returns:
+            int: The number of new jokes.
+        """
+        now = time.time()
+        rows = [
+            (joke_hash(joke), provider, joke, now) for joke in jokes if joke.strip()
+        ]
+
+        with self._lock:
+            connection = self._connect()
+
+            with connection:
+                before = connection.total_changes
+                connection.executemany(
+                    "INSERT OR IGNORE INTO jokes (hash, provider, content, added_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                added = connection.total_changes - before
+                self._prune(connection)
+
+        return added
+
+    def next(self) -> str | None:
+        """
+        Picks a random joke among the ones not shown yet and marks it as shown.
+
+        When every joke was shown, the rotation starts over without the last one.
+
+        Returns:
+            str | None: The joke, or None when the store is empty.
+        """
+        with self._lock:
+            connection = self._connect()
+
+            with connection:
+                row = self._pick_unseen(connection)
+
+                if row is None:
+                    connection.execute(
+                        "UPDATE jokes SET shown_at = NULL "
+                        "WHERE shown_at < (SELECT MAX(shown_at) FROM jokes)"
+                    )
+                    row = self._pick_unseen(connection)
+
+                if row is None:
+                    # a single joke is left, it is shown again
+                    row = connection.execute(
+                        "SELECT id, content FROM jokes LIMIT 1"
+                    ).fetchone()
+
+                if row is None:
+                    return None
+
+                joke_id, content = row
+                connection.execute(
+                    "UPDATE jokes SET shown_at = ? WHERE id = ?", (time.time(), joke_id)
+                )
+
+        return content
+
+    def unseen(self) -> int:
+        """
+        Returns the number of jokes not shown yet in the current rotation.
+        """
+        with self._lock:
+            return self._count_unseen(self._connect())
+
+    def needs_refill(self) -> bool:
+        """
+        Returns whether the unseen jokes fell below the low watermark.
+        """
+        return self.unseen() < self.low_watermark
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            # the store is refilled from a background thread, calls are serialized by the lock
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+            except sqlite3.DatabaseError as e:
+                connection.close()
+                logger.warning(f"error while opening the joke store {self.path}: {e}")
+                raise
+
+            self._connection = connection
+
+        return self._connection
+
+    def _count_unseen(self, connection: sqlite3.Connection) -> int:
+        return connection.execute(
+            "SELECT COUNT(*) FROM jokes WHERE shown_at IS NULL"
+        ).fetchone()[0]
+
+    def _pick_unseen(self, connection: sqlite3.Connection) -> Tuple[int, str] | None:
+        count = self._count_unseen(connection)
+
+        if count == 0:
+            return None
+
+        return connection.execute(
+            "SELECT id, content FROM jokes WHERE shown_at IS NULL "
+            "ORDER BY id LIMIT 1 OFFSET ?",
+            (random.randrange(count),),
+        ).fetchone()
+
+    def _prune(self, connection: sqlite3.Connection):
+        excess = (
+            connection.execute("SELECT COUNT(*) FROM jokes").fetchone()[0]
+            - self.max_jokes
+        )
+
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM jokes WHERE id IN (SELECT id FROM jokes "
+                "WHERE shown_at IS NOT NULL ORDER BY shown_at LIMIT ?)",
+                (excess,),
+            )
+
+
+_store: JokeStore | None = None
+
+
+def get_joke_store() -> JokeStore:
+    """
+    Returns the joke store shared by the lock screen.
+
+    Returns:
+        JokeStore: The shared joke store.
+    """
+    global _store
+
+    if _store is None:
+        _store = JokeStore()
+
+    return _store
@@ -9,6 +9,7 @@ Functions:
         Builds groups and key bindings for Qtile based on the provided settings.
 """
 
+import re
 from typing import Any, Callable, Dict
 
 from libqtile import layout, qtile
@@ -17,6 +18,7 @@ from libqtile.layout.base import Layout as BaseLayout
 from libqtile.log_utils import logger
 
 from ebenezer.config.settings import AppSettings, load_settings_by_files
+from ebenezer.core.window_rules import WindowRules, build_window_rules
 
 """
 CENTER_WINDOWS_TITLES
@@ -32,6 +34,11 @@ Example:
     CENTER_WINDOWS_TITLES = ["ebenezer - configuration manager"]
 """
 CENTER_WINDOWS_TITLES = ["ebenezer - configuration manager"]
+CENTER_WINDOWS_PATTERN = re.compile(
+    "|".join(re.escape(title) for title in CENTER_WINDOWS_TITLES), re.IGNORECASE
+)
+
+_window_rules: WindowRules | None = None
 
 """
 LAYOUTS
@@ -145,37 +152,62 @@ def build_layouts(settings: AppSettings):
     return layouts
 
 
+def setup_window_rules(settings: AppSettings) -> WindowRules:
+    """
+    Compiles the window rules once, so new windows are evaluated without reloading settings.
+
+    It should be called while loading the Qtile config; the compiled rules are used by
+    `set_floating_window` and `apply_window_rules`.
+
+    Args:
+        settings (AppSettings): An instance of AppSettings containing the window rules.
+
+    Returns:
+        WindowRules: The compiled window rules.
+    """
+    global _window_rules
+
+    _window_rules = build_window_rules(settings, CENTER_WINDOWS_TITLES)
+
+    return _window_rules
+
+
+def _get_window_rules() -> WindowRules:
+    return _window_rules or setup_window_rules(load_settings_by_files())
+
+
 def set_floating_window(window):
     """
     Sets the given window to floating mode if it matches any of the predefined rules.
 
-    The function retrieves floating window rules from the settings and checks if the
-    provided window matches any of these rules. If a match is found, the window is
-    set to floating mode.
+    The function checks the provided window against the compiled window rules. If a
+    floating rule matches, the window is set to floating mode.
 
     Args:
         window: The window object to be checked and potentially set to floating mode.
 
     Rules:
         - Matches are determined based on `wm_class` and `title` attributes of the window.
-        - The rules are loaded from the `floating` section of the settings, which
-          contains lists of `wm_class` and `title` values to match against.
+        - The rules are compiled from the `floating` and `window_rules` sections of the
+          settings by `setup_window_rules`, or on the first call when it was not called.
+    """
+    actions = _get_window_rules().match_window(window)
 
-    Note:
-        This function assumes the existence of a `load_settings_by_files` function
-        to retrieve settings and a `Match` class to define matching rules.
+    if actions is not None and actions.floating:
+        window.floating = True
+
+
+def apply_window_rules(window):
     """
-    """"""
-    settings = load_settings_by_files()
+    Applies every matching window rule action (float, center, group and size) to the window.
 
-    rules = [
-        *[Match(wm_class=f) for f in settings.floating.get("wm_class", [])],
-        *[Match(title=f) for f in settings.floating.get("title", [])],
-    ]
+    Args:
+        window: The window object to be checked and updated.
 
-    for rule in rules:
-        if window.match(rule):
-            window.floating = True
+    Returns:
+        WindowActions | None: The applied actions, or None when no rule matches.
+    """
+    return _get_window_rules().apply(window)
 
 
 def centralize_window(settings: AppSettings, window):
@@ -219,4 +251,4 @@ def is_ebenezer_window(window):
         bool: True if the window's name contains any of the titles in CENTER_WINDOWS_TITLES (case-insensitive),
         otherwise False.
     """
-    return any(title.lower() in window.name.lower() for title in CENTER_WINDOWS_TITLES)
+    return CENTER_WINDOWS_PATTERN.search(window.name or "") is not None
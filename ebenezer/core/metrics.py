@@ -0,0 +1,242 @@
+"""
+metrics.py
+----------
+
+This module provides a system metrics sampler shared by the monitoring widgets.
+
+A single sampler reads CPU, memory and temperature metrics once per tick and publishes
+the numeric snapshot to every subscriber, so several bars showing the same widgets do
+not multiply the psutil calls, and widgets format numbers instead of parsing text.
+
+Classes:
+    MemorySnapshot:
+        Memory and swap usage in bytes and percentages.
+
+    MetricsSnapshot:
+        CPU, memory and temperature metrics sampled at the same time.
+
+    MetricsSampler:
+        Samples the system metrics periodically and fans them out to subscribers.
+
+Functions:
+    sample_metrics() -> MetricsSnapshot:
+        Reads the current system metrics.
+
+    get_metrics_sampler() -> MetricsSampler:
+        Returns the sampler shared by every widget.
+"""
+
+import time
+from typing import Callable, Dict, NamedTuple, Tuple
+
+import psutil
+from libqtile import qtile
+from libqtile.log_utils import logger
+
+DEFAULT_INTERVAL = 1.0
+
+
+class MemorySnapshot(NamedTuple):
+    total: int = 0
+    used: int = 0
+    free: int = 0
+    available: int = 0
+    percent: float = 0.0
+    buffers: int = 0
+    active: int = 0
+    inactive: int = 0
+    shared: int = 0
+    swap_total: int = 0
+    swap_used: int = 0
+    swap_free: int = 0
+    swap_percent: float = 0.0
+
+
+class MetricsSnapshot(NamedTuple):
+    cpu_percent: float = 0.0
+    cpu_freq: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    memory: MemorySnapshot = MemorySnapshot()
+    temperatures: Dict[str, float] = {}
+    timestamp: float = 0.0
+
+
+def _sample_temperatures() -> Dict[str, float]:
+    temperatures = {}
+    empty_index = 0
+
+    for kernel_module, sensors in psutil.sensors_temperatures().items():
+        for sensor in sensors:
+            label = sensor.label
+
+            if not label:
+                label = f"{kernel_module or 'UNKNOWN'}-{empty_index}"
+                empty_index += 1
+
+            temperatures[label] = float(sensor.current)
+
+    return temperatures
+
+
+def sample_metrics() -> MetricsSnapshot:
+    """
+    Reads the current system metrics.
+
+    The CPU usage is measured since the previous call, which is why a single sampler
+    should own the calls instead of every widget reading it on its own.
+
+    Returns:
+        MetricsSnapshot: The CPU usage (%), CPU frequency (current, min and max in MHz),
+            memory usage and temperatures in Celsius keyed by sensor label.
+    """
+    mem = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    freq = psutil.cpu_freq()
+
+    return MetricsSnapshot(
+        cpu_percent=psutil.cpu_percent(),
+        cpu_freq=(freq.current, freq.min, freq.max) if freq else (0.0, 0.0, 0.0),
+        memory=MemorySnapshot(
+            total=mem.total,
+            used=mem.used,
+            free=mem.free,
+            available=mem.available,
+            percent=mem.percent,
+            buffers=getattr(mem, "buffers", 0),
+            active=getattr(mem, "active", 0),
+            inactive=getattr(mem, "inactive", 0),
+            shared=getattr(mem, "shared", 0),
+            swap_total=swap.total,
+            swap_used=swap.used,
+            swap_free=swap.free,
+            swap_percent=swap.percent,
+        ),
+        temperatures=_sample_temperatures(),
+        timestamp=time.time(),
+    )
+
+
+class MetricsSampler:
+    """
+    Samples the system metrics periodically and fans them out to subscribers.
+
+    The sampler ticks at the shortest interval requested by its subscribers, reads the
+    metrics in Qtile's executor and calls every subscriber on the event loop. It stops
+    ticking when the last subscriber leaves.
+
+    Attributes:
+        latest (MetricsSnapshot | None): The last sampled snapshot.
+    """
+
+    def __init__(self, sample_fn: Callable[[], MetricsSnapshot] = sample_metrics):
+        self.latest: MetricsSnapshot | None = None
+        self._sample_fn = sample_fn
+        self._subscribers: Dict[Callable[[MetricsSnapshot], None], float] = {}
+        self._timer = None
+        self._future = None
+
+    @property
+    def interval(self) -> float:
+        """
+        Returns the shortest interval requested by the subscribers.
+        """
+        return min(self._subscribers.values(), default=DEFAULT_INTERVAL)
+
+    def subscribe(
+        self,
+        callback: Callable[[MetricsSnapshot], None],
+        interval: float | None = DEFAULT_INTERVAL,
+    ):
+        """
+        Subscribes a callback to the metrics snapshots.
+
+        The callback receives the latest snapshot right away when there is one, and
+        then every snapshot sampled afterwards.
+
+        Args:
+            callback (Callable[[MetricsSnapshot], None]): Called with every snapshot.
+            interval (float | None): The longest acceptable interval between snapshots in seconds.
+        """
+        self._subscribers[callback] = interval or DEFAULT_INTERVAL
+
+        if self.latest is not None:
+            callback(self.latest)
+
+        if self._timer is None and self._future is None:
+            self._schedule(0)
+
+    def unsubscribe(self, callback: Callable[[MetricsSnapshot], None]):
+        """
+        Unsubscribes a callback, stopping the sampler when no subscriber remains.
+
+        Args:
+            callback (Callable[[MetricsSnapshot], None]): The subscribed callback.
+        """
+        self._subscribers.pop(callback, None)
+
+        if not self._subscribers and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def sample(self) -> MetricsSnapshot:
+        """
+        Samples the metrics right away and publishes the snapshot.
+
+        Returns:
+            MetricsSnapshot: The sampled snapshot.
+        """
+        self.publish(self._sample_fn())
+        return self.latest
+
+    def publish(self, snapshot: MetricsSnapshot):
+        """
+        Stores a snapshot and fans it out to every subscriber.
+
+        Args:
+            snapshot (MetricsSnapshot): The snapshot to publish.
+        """
+        self.latest = snapshot
+
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.warning(f"error while publishing metrics to {callback}: {e}")
+
+    def _schedule(self, delay: float):
+        if not self._subscribers or not hasattr(qtile, "call_later"):
+            return
+
+        self._timer = qtile.call_later(delay, self._tick)
+
+    def _tick(self):
+        self._timer = None
+        self._future = qtile.run_in_executor(self._sample_fn)
+        self._future.add_done_callback(self._on_sampled)
+
+    def _on_sampled(self, future):
+        self._future = None
+
+        try:
+            self.publish(future.result())
+        except Exception as e:
+            logger.warning(f"error while sampling metrics: {e}")
+
+        self._schedule(self.interval)
+
+
+_sampler: MetricsSampler | None = None
+
+
+def get_metrics_sampler() -> MetricsSampler:
+    """
+    Returns the sampler shared by every widget.
+
+    Returns:
+        MetricsSampler: The shared metrics sampler.
+    """
+    global _sampler
+
+    if _sampler is None:
+        _sampler = MetricsSampler()
+
+    return _sampler
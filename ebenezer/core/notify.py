@@ -2,9 +2,22 @@
 notify.py
 ---------
 
-This module provides functions to send desktop notifications using `notify-send`.
+This module provides functions to send desktop notifications.
+
+Notifications are sent in-process to the `org.freedesktop.Notifications` service through
+one session bus connection, owned by a background thread, so showing an OSD update does
+not fork a shell and `notify-send`. The client remembers the id returned for every
+notification tag and replaces it on the next update. When the session bus or `dbus-fast`
+is not available the notifications fall back to `notify-send`.
+
+Classes:
+    NotificationClient:
+        Sends notifications to the notification server over the session bus.
 
 Functions:
+    get_notification_client() -> NotificationClient:
+        Returns the notification client shared by every notification.
+
     push_notification(title: str, message: str):
         Sends a notification with a title and message.
 
@@ -15,12 +28,278 @@ Functions:
         Sends a notification with a title and message without adding it to the notification history.
 """
 
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict
+
+from libqtile.log_utils import logger
+
 from ebenezer.core.command import run_shell_command
 
+try:
+    from dbus_fast import Message, MessageType, Variant
+    from dbus_fast.aio import MessageBus
+
+    has_dbus = True
+except ImportError:
+    has_dbus = False
+
 TEMPLATE_NOTIFY = 'notify-send -r 999 --urgency=low  "$message"'
 TEMPLATE_WITH_TITLE = 'notify-send -r 999 --urgency=low  "$title" "$message"'
 TEMPLATE_NO_HISTORY = 'notify-send --urgency=low "$title" "$message"'
 
+NOTIFICATIONS_SERVICE = "org.freedesktop.Notifications"
+NOTIFICATIONS_PATH = "/org/freedesktop/Notifications"
+NOTIFICATIONS_INTERFACE = "org.freedesktop.Notifications"
+
+APP_NAME = "ebenezer"
+OSD_TAG = "osd"
+URGENCY_LOW = 0
+DEFAULT_RETRY_DELAY = 30.0
+
+
+class NotificationClient:
+    """
+    Sends notifications to the notification server over the session bus.
+
+    The connection and the calls live on an event loop running in a daemon thread, so
+    notifications can be sent from Qtile's event loop, from worker threads or from the
+    command line without blocking on the bus. When the bus cannot be reached the client
+    reports itself unavailable for `retry_delay` seconds.
+
+    Attributes:
+        bus_address (str | None): The bus address, the session bus when None.
+        app_name (str): The application name sent with every notification.
+        retry_delay (float): How long the client stays unavailable after a failure in seconds.
+    """
+
+    def __init__(
+        self,
+        bus_address: str | None = None,
+        app_name: str = APP_NAME,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ):
+        self.bus_address = bus_address
+        self.app_name = app_name
+        self.retry_delay = retry_delay
+        self._ids: Dict[str, int] = {}
+        self._tag_locks: Dict[str, asyncio.Lock] = {}
+        self._connect_lock = asyncio.Lock()
+        self._bus = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._failed_at: float | None = None
+
+    @property
+    def available(self) -> bool:
+        """
+        Returns whether notifications can be sent over the bus.
+        """
+        if not has_dbus:
+            return False
+
+        if not self.bus_address and not os.environ.get("DBUS_SESSION_BUS_ADDRESS"):
+            return False
+
+        if self._failed_at is not None:
+            if time.monotonic() - self._failed_at < self.retry_delay:
+                return False
+
+            self._failed_at = None
+
+        return True
+
+    def notify(
+        self,
+        summary: str,
+        body: str = "",
+        tag: str | None = None,
+        hints: dict | None = None,
+        urgency: int = URGENCY_LOW,
+        expire_timeout: int = -1,
+    ) -> Future:
+        """
+        Sends a notification without waiting for the notification server.
+
+        Args:
+            summary (str): The summary (title) of the notification.
+            body (str): The body of the notification.
+            tag (str | None): Notifications sharing a tag replace each other.
+            hints (dict | None): Extra hints, either `Variant` values or integers, booleans and strings.
+            urgency (int): The urgency level, 0 (low) to 2 (critical). Defaults to 0.
+            expire_timeout (int): The timeout in milliseconds, -1 for the server default.
+
+        Returns:
+            Future: Resolves to the notification id given by the server.
+        """
+        hints = {"urgency": Variant("y", urgency), **_build_hints(hints or {})}
+
+        return asyncio.run_coroutine_threadsafe(
+            self._notify(summary, body, tag, hints, expire_timeout), self._get_loop()
+        )
+
+    def close(self):
+        """
+        Closes the bus connection and stops the background thread.
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+
+        if loop is None:
+            return
+
+        async def _close():
+            if self._bus is not None:
+                self._bus.disconnect()
+                self._bus = None
+
+        asyncio.run_coroutine_threadsafe(_close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="ebenezer-notify", daemon=True
+                )
+                self._thread.start()
+
+            return self._loop
+
+    async def _connect(self):
+        async with self._connect_lock:
+            if self._bus is None or not self._bus.connected:
+                if self.bus_address:
+                    bus = MessageBus(bus_address=self.bus_address)
+                else:
+                    bus = MessageBus()
+
+                self._bus = await bus.connect()
+
+        return self._bus
+
+    async def _notify(
+        self, summary: str, body: str, tag: str | None, hints: dict, expire_timeout: int
+    ) -> int:
+        if not tag:
+            return await self._call_notify(summary, body, tag, hints, expire_timeout)
+
+        # updates of the same tag wait for the previous id, or they would open new popups
+        lock = self._tag_locks.setdefault(tag, asyncio.Lock())
+
+        async with lock:
+            return await self._call_notify(summary, body, tag, hints, expire_timeout)
+
+    async def _call_notify(
+        self, summary: str, body: str, tag: str | None, hints: dict, expire_timeout: int
+    ) -> int:
+        try:
+            bus = await self._connect()
+            reply = await bus.call(
+                Message(
+                    destination=NOTIFICATIONS_SERVICE,
+                    path=NOTIFICATIONS_PATH,
+                    interface=NOTIFICATIONS_INTERFACE,
+                    member="Notify",
+                    signature="susssasa{sv}i",
+                    body=[
+                        self.app_name,
+                        self._ids.get(tag, 0) if tag else 0,
+                        "",
+                        summary,
+                        body,
+                        [],
+                        hints,
+                        expire_timeout,
+                    ],
+                )
+            )
+        except Exception:
+            self._failed_at = time.monotonic()
+            raise
+
+        if reply.message_type == MessageType.ERROR:
+            self._failed_at = time.monotonic()
+            raise RuntimeError(f"{reply.error_name}: {' '.join(map(str, reply.body))}")
+
+        notification_id = reply.body[0]
+
+        if tag:
+            self._ids[tag] = notification_id
+
+        return notification_id
+
+
+def _build_hints(hints: dict) -> dict:
+    variants = {}
+
+    for key, value in hints.items():
+        if isinstance(value, Variant):
+            variants[key] = value
+        elif isinstance(value, bool):
+            variants[key] = Variant("b", value)
+        elif isinstance(value, int):
+            variants[key] = Variant("i", value)
+        else:
+            variants[key] = Variant("s", str(value))
+
+    return variants
+
+
+_client: NotificationClient | None = None
+
+
+def get_notification_client() -> NotificationClient:
+    """
+    Returns the notification client shared by every notification.
+
+    Returns:
+        NotificationClient: The shared notification client.
+    """
+    global _client
+
+    if _client is None:
+        _client = NotificationClient()
+
+    return _client
+
+
+def _send(
+    summary: str,
+    body: str,
+    fallback: str,
+    substitutions: dict,
+    tag: str | None = None,
+    hints: dict | None = None,
+):
+    """
+    Sends a notification over the bus, or runs the `notify-send` fallback template.
+    """
+    client = get_notification_client()
+
+    if not client.available:
+        return run_shell_command(fallback, **substitutions)
+
+    def _on_done(future: Future):
+        if future.exception() is not None:
+            logger.warning(
+                f"error while sending the notification: {future.exception()}"
+            )
+            run_shell_command(fallback, **substitutions)
+
+    future = client.notify(summary, body, tag=tag, hints=hints)
+    future.add_done_callback(_on_done)
+
+    return future
+
 
 def push_notification(title: str, message: str):
     """
@@ -31,9 +310,15 @@ def push_notification(title: str, message: str):
         message (str): The message of the notification.
 
     Returns:
-        subprocess.CompletedProcess: The completed process after running the command.
+        Future | subprocess.CompletedProcess: The pending notification, or the completed `notify-send` process.
     """
-    return run_shell_command(TEMPLATE_WITH_TITLE, title=title, message=message)
+    return _send(
+        title,
+        message,
+        TEMPLATE_WITH_TITLE,
+        {"title": title, "message": message},
+        tag=OSD_TAG,
+    )
 
 
 def push_notification_progress(message: str, progress: int):
@@ -45,12 +330,15 @@ def push_notification_progress(message: str, progress: int):
         progress (int): The progress value to be displayed.
 
     Returns:
-        subprocess.CompletedProcess: The completed process after running the command.
+        Future | subprocess.CompletedProcess: The pending notification, or the completed `notify-send` process.
     """
-    return run_shell_command(
+    return _send(
+        message,
+        "",
         f"{TEMPLATE_NOTIFY} -h int:value:$progress",
-        message=message,
-        progress=str(progress),
+        {"message": message, "progress": str(progress)},
+        tag=OSD_TAG,
+        hints={"value": int(progress)},
     )
 
 
@@ -63,10 +351,12 @@ def push_notification_no_history(title: str, message: str):
         message (str): The message of the notification.
 
     Returns:
-        subprocess.CompletedProcess: The completed process after running the command.
+        Future | subprocess.CompletedProcess: The pending notification, or the completed `notify-send` process.
     """
-    return run_shell_command(
-        f"{TEMPLATE_NO_HISTORY}",
-        title=title,
-        message=message,
+    return _send(
+        title,
+        message,
+        TEMPLATE_NO_HISTORY,
+        {"title": title, "message": message},
+        hints={"transient": True},
     )
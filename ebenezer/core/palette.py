@@ -0,0 +1,386 @@
+"""
+palette.py
+----------
+
+This module provides the extraction of a color palette from a wallpaper and the theme built from it.
+
+The wallpaper is downsampled and its colors are clustered by the median cut of Pillow,
+which runs in C over a few thousand pixels. A JPEG is decoded at a reduced size, so its
+palette costs tens of milliseconds even at 4K, a PNG is decoded in full first. Palettes
+are cached under the ebenezer cache directory by the content hash of the image, so a
+wallpaper shown again, renamed or copied is themed in a few milliseconds, the time to
+hash it.
+
+The clusters are mapped onto the color keys of `AppSettingsColors`: the dominant color gives
+the backgrounds and the foreground tint, the most vivid ones the selection and border
+accents, and the named colors (`fg_red`, `fg_blue`, ...) are taken from the palette when it
+holds a close hue, or built on the palette saturation otherwise.
+
+Classes:
+    PaletteColor:
+        A cluster of the palette, its color and its share of the image.
+
+    PaletteCache:
+        Stores the palettes of images by their content hash.
+
+Functions:
+    image_hash(path: str) -> str:
+        Returns the content hash of an image.
+
+    extract_palette(path: str, count: int = DEFAULT_PALETTE_SIZE) -> List[PaletteColor]:
+        Clusters the colors of an image into a palette.
+
+    palette_colors(palette: List[PaletteColor]) -> Dict[str, str]:
+        Maps a palette onto the theme color keys.
+
+    wallpaper_theme(path: str, count: int = DEFAULT_PALETTE_SIZE) -> dict:
+        Returns the theme of a wallpaper, from its cached palette.
+
+    get_palette_cache() -> PaletteCache:
+        Returns the palette cache shared by the theme commands.
+"""
+
+import colorsys
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from libqtile.log_utils import logger
+from PIL import Image
+
+from ebenezer.core.files import cache_home
+
+CACHE_FORMAT_VERSION = 1
+PALETTE_CACHE_DIR = "palettes"
+PALETTE_SUFFIX = ".pickle"
+
+DEFAULT_PALETTE_SIZE = 8
+# the image is clustered at this size at most, the palette barely changes above it
+SAMPLE_SIZE = (128, 128)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# a palette color of a close hue replaces the canonical one
+HUE_TOLERANCE = 20
+NAMED_HUES = {
+    "fg_red": 0,
+    "fg_orange": 30,
+    "fg_yellow": 50,
+    "fg_green": 140,
+    "fg_light_blue": 195,
+    "fg_blue": 215,
+    "fg_purple": 275,
+}
+
+RGB = Tuple[int, int, int]
+
+
+class PaletteColor(NamedTuple):
+    rgb: RGB
+    share: float
+
+    @property
+    def hex(self) -> str:
+        return "#{:02x}{:02x}{:02x}".format(*self.rgb)
+
+
+def image_hash(path: str) -> str:
+    """
+    Returns the content hash of an image.
+
+    Args:
+        path (str): The image.
+
+    Returns:
+        str: A hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def extract_palette(path: str, count: int = DEFAULT_PALETTE_SIZE) -> List[PaletteColor]:
+    """
+    Clusters the colors of an image into a palette.
+
+    Args:
+        path (str): The image.
+        count (int): The maximum number of clusters.
+
+    Returns:
+        List[PaletteColor]: The clusters, the most frequent first.
+    """
+    with Image.open(path) as image:
+        image.draft("RGB", SAMPLE_SIZE)
+        sample = image.convert("RGB")
+
+    sample.thumbnail(SAMPLE_SIZE, Image.Resampling.BOX)
+    quantized = sample.quantize(colors=count, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    pixels = sample.width * sample.height
+
+    return [
+        PaletteColor(tuple(palette[index * 3 : index * 3 + 3]), population / pixels)
+        for population, index in sorted(quantized.getcolors(), reverse=True)
+    ]
+
+
+def _to_hls(rgb: RGB) -> Tuple[float, float, float]:
+    return colorsys.rgb_to_hls(*(c / 255 for c in rgb))
+
+
+def _hue_distance(a: float, b: float) -> float:
+    distance = abs(a - b) % 360
+    return min(distance, 360 - distance)
+
+
+def _shade(
+    rgb: RGB,
+    lightness: float,
+    min_saturation: float = 0.0,
+    max_saturation: float = 1.0,
+    hue: float | None = None,
+) -> str:
+    """
+    Returns a color of the hue of another one, at a lightness and within a saturation range.
+    """
+    h, _, s = _to_hls(rgb)
+
+    if hue is not None:
+        h = hue / 360
+
+    s = min(max(s, min_saturation), max_saturation)
+    r, g, b = colorsys.hls_to_rgb(h, lightness, s)
+
+    return "#{:02x}{:02x}{:02x}".format(*(round(c * 255) for c in (r, g, b)))
+
+
+def _vividness(color: PaletteColor) -> float:
+    _, lightness, saturation = _to_hls(color.rgb)
+    # a saturated color is vivid in the mid tones only, a rare one is a poor accent
+    return saturation * (1 - abs(lightness - 0.5) * 2) * color.share**0.5
+
+
+def palette_colors(palette: List[PaletteColor]) -> Dict[str, str]:
+    """
+    Maps a palette onto the theme color keys.
+
+    The colors are kept dark with a light foreground, as the bundled themes are. The
+    transparent lock screen colors are not themed.
+
+    Args:
+        palette (List[PaletteColor]): The palette, the most frequent color first.
+
+    Returns:
+        Dict[str, str]: The colors of the theme, keyed as in `AppSettingsColors`.
+    """
+    base = palette[0].rgb
+    vivid = sorted(palette, key=_vividness, reverse=True)
+    accent = vivid[0].rgb
+    accent_hue = _to_hls(accent)[0] * 360
+    secondary = next(
+        (
+            color.rgb
+            for color in vivid[1:]
+            if _hue_distance(_to_hls(color.rgb)[0] * 360, accent_hue) > HUE_TOLERANCE
+        ),
+        accent,
+    )
+
+    # a grayscale wallpaper gives a grayscale theme
+    accent_saturation = 0.5 if _to_hls(accent)[2] > 0.1 else 0.0
+    named_saturation = min(max(_to_hls(accent)[2], 0.45), 0.85)
+
+    colors = {}
+
+    for key, hue in NAMED_HUES.items():
+        match = next(
+            (
+                _to_hls(color.rgb)[0] * 360
+                for color in vivid
+                if _to_hls(color.rgb)[2] > 0.2
+                and _hue_distance(_to_hls(color.rgb)[0] * 360, hue) <= HUE_TOLERANCE
+            ),
+            hue,
+        )
+        colors[key] = _shade(base, 0.62, named_saturation, named_saturation, hue=match)
+
+    fg_normal = _shade(base, 0.88, max_saturation=0.2)
+    fg_focus = _shade(base, 0.96, max_saturation=0.2)
+    fg_gray = _shade(base, 0.62, max_saturation=0.12)
+    bg_normal = _shade(base, 0.12, max_saturation=0.35)
+    bg_focus = _shade(base, 0.08, max_saturation=0.35)
+    bg_topbar = _shade(base, 0.1, max_saturation=0.35)
+    bg_selected = _shade(accent, 0.3, accent_saturation)
+    highlight = _shade(accent, 0.6, accent_saturation)
+    highlight_alt = _shade(secondary, 0.55, accent_saturation)
+
+    colors.update(
+        {
+            "fg_normal": fg_normal,
+            "fg_focus": fg_focus,
+            "fg_urgent": colors["fg_red"],
+            "bg_normal": bg_normal,
+            "bg_focus": bg_focus,
+            "bg_urgent": _shade(base, 0.3, named_saturation, hue=NAMED_HUES["fg_red"]),
+            "bg_systray": bg_topbar,
+            "bg_selected": bg_selected,
+            "fg_gray": fg_gray,
+            "fg_black": "#000000",
+            "fg_white": "#ffffff",
+            "fg_selected": highlight,
+            "bg_topbar": bg_topbar,
+            "bg_topbar_selected": highlight,
+            "bg_topbar_arrow": bg_selected,
+            "border_color_normal": bg_selected,
+            "border_color_active": highlight,
+            "border_color_marked": highlight_alt,
+            "titlebar_bg_focus": bg_normal,
+            "titlebar_bg_normal": bg_focus,
+            "taglist_bg_focus": bg_selected,
+            "group_focus": fg_focus,
+            "group_normal": fg_gray,
+            "lock_screen_default_color": highlight,
+            "lock_screen_text_color": fg_focus,
+            "lock_screen_wrong_color": colors["fg_red"],
+            "lock_screen_quote_foreground_color": bg_selected,
+            "lock_screen_quote_text_color": fg_focus,
+            "rofi_background": bg_normal,
+            "rofi_background_alt": bg_selected,
+            "rofi_foreground": fg_normal,
+            "rofi_selected": highlight,
+            "rofi_active": highlight_alt,
+            "rofi_urgent": colors["fg_red"],
+            "rofi_border": highlight,
+            "rofi_border_alt": bg_selected,
+        }
+    )
+
+    return colors
+
+
+class PaletteCache:
+    """
+    Stores the palettes of images by their content hash.
+
+    Attributes:
+        directory (Path): The directory the palettes are stored in.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = Path(directory or Path(cache_home).joinpath(PALETTE_CACHE_DIR))
+
+    def get(self, path: str, count: int = DEFAULT_PALETTE_SIZE) -> List[PaletteColor]:
+        """
+        Returns the palette of an image, extracting and storing it when it is not cached.
+
+        Args:
+            path (str): The image.
+            count (int): The maximum number of clusters.
+
+        Returns:
+            List[PaletteColor]: The palette, the most frequent color first.
+        """
+        key = f"{image_hash(path)}-{count}"
+        palette = self._load(key)
+
+        if palette is None:
+            palette = extract_palette(path, count)
+            self._store(key, palette)
+
+        return palette
+
+    def clear(self) -> list[str]:
+        """
+        Removes every stored palette.
+
+        Returns:
+            list[str]: The removed files.
+        """
+        removed = []
+
+        for palette_file in self.directory.glob(f"*{PALETTE_SUFFIX}"):
+            palette_file.unlink()
+            removed.append(str(palette_file))
+
+        return removed
+
+    def _path(self, key: str) -> Path:
+        return self.directory.joinpath(f"{key}{PALETTE_SUFFIX}")
+
+    def _load(self, key: str) -> List[PaletteColor] | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"error while trying to load the palette {key}: {e}")
+            return None
+
+        if entry.get("format") != CACHE_FORMAT_VERSION:
+            return None
+
+        return [PaletteColor(tuple(rgb), share) for rgb, share in entry["palette"]]
+
+    def _store(self, key: str, palette: List[PaletteColor]):
+        entry = {
+            "format": CACHE_FORMAT_VERSION,
+            "palette": [(color.rgb, color.share) for color in palette],
+        }
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            fd, tmp_file = tempfile.mkstemp(
+                dir=self.directory, prefix=f".{key}", suffix=PALETTE_SUFFIX
+            )
+
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+                os.replace(tmp_file, self._path(key))
+            except Exception:
+                os.unlink(tmp_file)
+                raise
+        except Exception as e:
+            logger.warning(f"error while trying to store the palette {key}: {e}")
+
+
+def wallpaper_theme(path: str, count: int = DEFAULT_PALETTE_SIZE) -> dict:
+    """
+    Returns the theme of a wallpaper, from its cached palette.
+
+    Args:
+        path (str): The wallpaper.
+        count (int): The maximum number of clusters.
+
+    Returns:
+        dict: The theme, with its colors under the `colors` key as in a theme file.
+    """
+    return {"colors": palette_colors(get_palette_cache().get(path, count))}
+
+
+_cache: PaletteCache | None = None
+
+
+def get_palette_cache() -> PaletteCache:
+    """
+    Returns the palette cache shared by the theme commands.
+
+    Returns:
+        PaletteCache: The shared palette cache.
+    """
+    global _cache
+
+    if _cache is None:
+        _cache = PaletteCache()
+
+    return _cache
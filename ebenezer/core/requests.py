@@ -1,31 +1,325 @@
+"""
+requests.py
+-----------
+
+This module provides the retry policy shared by the HTTP fetches.
+
+Failed attempts are retried with an exponential backoff plus jitter, within an overall
+deadline. When an endpoint is given, a circuit breaker counts its consecutive failures
+and, once the endpoint is known to be down, calls fail right away with
+`CircuitOpenError` instead of retrying, until a probe call is let through after the
+reset timeout. An offline laptop therefore pays for a few quick attempts once, and then
+nothing, instead of seconds of retries per poll and per widget.
+
+Classes:
+    RetryPolicy:
+        The backoff parameters of a retried operation.
+
+    CircuitBreaker:
+        Tracks the consecutive failures of every endpoint.
+
+    CircuitOpenError:
+        Raised when a call is short-circuited because its endpoint is down.
+
+Functions:
+    request_retry(operation, retries=None, delay=None, policy=DEFAULT_RETRY_POLICY, endpoint=None, breaker=None):
+        Retries the given operation following a retry policy.
+
+    request_retry_async(operation, retries=None, delay=None, policy=DEFAULT_RETRY_POLICY, endpoint=None, breaker=None):
+        Retries the given coroutine function following a retry policy.
+
+    endpoint_of(url: str) -> str:
+        Returns the endpoint (scheme and host) of a URL.
+"""
+
+import asyncio
+import random
+import threading
 import time
+from typing import Awaitable, Callable, Dict, Iterator, NamedTuple, TypeVar
+from urllib.parse import urlsplit
 
 import requests
 from libqtile.log_utils import logger
 
+T = TypeVar("T")
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised when a call is short-circuited because its endpoint is down.
+    """
+
+
+class RetryPolicy(NamedTuple):
+    retries: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    deadline: float | None = 15.0
+
+    def delays(self) -> Iterator[float]:
+        """
+        Yields the delay before every retry, with up to `jitter` of it randomized.
+        """
+        delay = self.base_delay
+
+        for _ in range(self.retries - 1):
+            capped = min(delay, self.max_delay)
+            yield capped * (1 - self.jitter * random.random())
+            delay *= self.multiplier
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """
+    Tracks the consecutive failures of every endpoint.
+
+    After `failure_threshold` consecutive failures an endpoint is open: calls to it are
+    refused for `reset_timeout` seconds, after which a single probe call is allowed. A
+    success closes the endpoint again, a failure keeps it open for another timeout.
+
+    Attributes:
+        failure_threshold (int): The consecutive failures opening an endpoint.
+        reset_timeout (float): How long an endpoint stays open in seconds.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, endpoint: str) -> bool:
+        """
+        Returns whether the calls to an endpoint are refused.
+
+        Args:
+            endpoint (str): The endpoint.
+
+        Returns:
+            bool: True while the endpoint is down and its reset timeout is running.
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(endpoint)
+
+            if opened_at is None:
+                return False
+
+            if time.monotonic() - opened_at < self.reset_timeout:
+                return True
+
+            # let a single probe through, the others are refused until it succeeds
+            self._opened_at[endpoint] = time.monotonic()
+            return False
+
+    def record_success(self, endpoint: str):
+        with self._lock:
+            self._failures.pop(endpoint, None)
+            self._opened_at.pop(endpoint, None)
+
+    def record_failure(self, endpoint: str):
+        with self._lock:
+            failures = self._failures.get(endpoint, 0) + 1
+            self._failures[endpoint] = failures
+
+            if failures >= self.failure_threshold:
+                self._opened_at[endpoint] = time.monotonic()
+
+    def reset(self):
+        """
+        Closes every endpoint.
+        """
+        with self._lock:
+            self._failures.clear()
+            self._opened_at.clear()
+
+
+_breaker = CircuitBreaker()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """
+    Returns the circuit breaker shared by every fetch.
+
+    Returns:
+        CircuitBreaker: The shared circuit breaker.
+    """
+    return _breaker
+
+
+def endpoint_of(url: str) -> str:
+    """
+    Returns the endpoint (scheme and host) of a URL.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The endpoint, e.g. "https://api.github.com".
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
 
-def request_retry(operation, retries=5, delay=2) -> requests.Response:
+
+class _Attempts:
+    """
+    Walks the attempts of a retried operation, shared by the sync and async variants.
     """
-    Retries the given operation a specified number of times with a delay between attempts.
+
+    def __init__(
+        self,
+        retries: int | None,
+        delay: float | None,
+        policy: RetryPolicy,
+        endpoint: str | None,
+        breaker: CircuitBreaker | None,
+    ):
+        if retries is not None:
+            policy = policy._replace(retries=retries)
+
+        if delay is not None:
+            policy = policy._replace(base_delay=delay)
+
+        self.policy = policy
+        self.endpoint = endpoint
+        self.breaker = breaker or _breaker
+        self.started_at = time.monotonic()
+        self.delays = policy.delays()
+        self.attempt = 0
+
+    def check(self):
+        self.attempt += 1
+
+        if self.endpoint and self.breaker.is_open(self.endpoint):
+            raise CircuitOpenError(f"{self.endpoint} is down, skipping the request")
+
+    def succeeded(self):
+        if self.endpoint:
+            self.breaker.record_success(self.endpoint)
+
+    def failed(self, error: Exception) -> float | None:
+        """
+        Records a failure and returns the delay before the next attempt, or None to give up.
+        """
+        if self.endpoint:
+            self.breaker.record_failure(self.endpoint)
+
+        delay = next(self.delays, None)
+        deadline = self.policy.deadline
+
+        if (
+            delay is not None
+            and deadline is not None
+            and time.monotonic() - self.started_at + delay > deadline
+        ):
+            delay = None
+
+        if delay is None:
+            logger.warning(f"Attempt {self.attempt} failed, giving up: {error}")
+        else:
+            logger.debug(
+                f"Attempt {self.attempt} failed, retrying in {delay:.2f}s: {error}"
+            )
+
+        return delay
+
+
+def request_retry(
+    operation: Callable[[], T],
+    retries: int | None = None,
+    delay: float | None = None,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    endpoint: str | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> T:
+    """
+    Retries the given operation following a retry policy.
 
     Args:
         operation (callable): The operation to be retried.
-        retries (int): The number of retry attempts. Defaults to 5.
-        delay (int): The delay between attempts in seconds. Defaults to 2 seconds.
+        retries (int | None): The number of attempts, overriding the policy.
+        delay (float | None): The delay before the first retry in seconds, overriding the policy.
+        policy (RetryPolicy): The backoff parameters. Defaults to `DEFAULT_RETRY_POLICY`.
+        endpoint (str | None): The endpoint guarded by the circuit breaker, none when None.
+        breaker (CircuitBreaker | None): The circuit breaker, the shared one when None.
+
+    Returns:
+        Any: The result of the operation if successful.
+
+    Raises:
+        CircuitOpenError: If the endpoint is known to be down.
+        Exception: If all retry attempts fail or the deadline is reached.
+    """
+    attempts = _Attempts(retries, delay, policy, endpoint, breaker)
+
+    while True:
+        attempts.check()
+
+        try:
+            result = operation()
+        except Exception as e:
+            wait = attempts.failed(e)
+
+            if wait is None:
+                raise
+
+            time.sleep(wait)
+            continue
+
+        attempts.succeeded()
+        return result
+
+
+async def request_retry_async(
+    operation: Callable[[], Awaitable[T]],
+    retries: int | None = None,
+    delay: float | None = None,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    endpoint: str | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> T:
+    """
+    Retries the given coroutine function following a retry policy.
+
+    The backoff waits on the event loop, so no thread is held between attempts.
+
+    Args:
+        operation (callable): The coroutine function to be retried.
+        retries (int | None): The number of attempts, overriding the policy.
+        delay (float | None): The delay before the first retry in seconds, overriding the policy.
+        policy (RetryPolicy): The backoff parameters. Defaults to `DEFAULT_RETRY_POLICY`.
+        endpoint (str | None): The endpoint guarded by the circuit breaker, none when None.
+        breaker (CircuitBreaker | None): The circuit breaker, the shared one when None.
 
     Returns:
         Any: The result of the operation if successful.
 
     Raises:
-        Exception: If all retry attempts fail.
+        CircuitOpenError: If the endpoint is known to be down.
+        Exception: If all retry attempts fail or the deadline is reached.
     """
-    for attempt in range(retries):
+    attempts = _Attempts(retries, delay, policy, endpoint, breaker)
+
+    while True:
+        attempts.check()
+
         try:
-            return operation()
+            result = await operation()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.warning(f"Attempt {attempt + 1} failed: {e}", exc_info=True)
+            wait = attempts.failed(e)
 
-            if attempt < retries - 1:
-                time.sleep(delay)
-            else:
+            if wait is None:
                 raise
+
+            await asyncio.sleep(wait)
+            continue
+
+        attempts.succeeded()
+        return result
@@ -4,43 +4,344 @@ startup.py
 
 This module provides functions to run startup commands for Qtile.
 
+Startup entries run concurrently on a bounded pool of workers. An entry can declare the
+entries it must start `after`, in which case it waits for them to finish (or to reach
+their timeout) before it starts:
+
+    startup:
+      keyboard_layout: setxkbmap -layout br
+      dunst:
+        cmd: pkill dunst; dunst &
+      notify:
+        cmd: notify-send "Welcome"
+        after: dunst
+        timeout: 5
+
+The wall time and exit status of every entry are recorded in a startup report stored
+under the ebenezer cache directory.
+
+Classes:
+    StartupEntry:
+        A startup command with its dependencies and timeout.
+
+    StartupResult:
+        The outcome of a startup entry.
+
 Functions:
-    run_startup_once(settings: AppSettings):
-        Runs startup commands defined in the settings.
+    build_startup_entries(raw_startup: dict) -> List[StartupEntry]:
+        Builds the startup entries from the startup settings.
+
+    run_startup(entries: List[StartupEntry], max_workers: int = DEFAULT_MAX_WORKERS, **kwargs: object) -> List[StartupResult]:
+        Runs the startup entries concurrently, respecting their dependencies.
+
+    run_startup_once(settings: AppSettings, max_workers: int = DEFAULT_MAX_WORKERS) -> asyncio.Task | None:
+        Runs startup commands defined in the settings and stores the startup report.
+
+    load_startup_report() -> dict | None:
+        Loads the last startup report.
 
     _env_substitutions(settings: AppSettings) -> dict[str, Any]:
         Returns a dictionary of environment substitutions based on the settings.
 """
 
-from typing import Any
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
 
 from libqtile.log_utils import logger
+from libqtile.utils import create_task
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.core.command import run_shell_command
+from ebenezer.core.command import SHELL, build_shell_command, run_command_async
+from ebenezer.core.files import cache_home
 
 DEFAULT_TIMEOUT = 3
+DEFAULT_MAX_WORKERS = 4
+STARTUP_REPORT_FILE = "startup.json"
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+STATUS_SKIPPED = "skipped"
+
+
+class StartupEntry(NamedTuple):
+    name: str
+    cmd: str
+    after: tuple = ()
+    timeout: float = DEFAULT_TIMEOUT
 
 
-def run_startup_once(settings: AppSettings):
+class StartupResult(NamedTuple):
+    name: str
+    cmd: str
+    status: str
+    returncode: int | None = None
+    started_at: float = 0.0
+    duration: float = 0.0
+    error: str = ""
+
+
+def _parse_after(value) -> tuple:
+    if not value:
+        return ()
+
+    if isinstance(value, str):
+        return tuple(i.strip() for i in value.split(",") if i.strip())
+
+    return tuple(str(i) for i in value)
+
+
+def build_startup_entries(raw_startup: dict) -> List[StartupEntry]:
     """
-    Runs startup commands defined in the settings.
+    Builds the startup entries from the startup settings.
+
+    An entry is either a command string or a mapping with `cmd` and the optional
+    `after` (a name or a list of names) and `timeout` (in seconds) keys.
 
     Args:
-        settings (AppSettings): The application settings containing startup commands.
+        raw_startup (dict): The startup settings, keyed by entry name.
+
+    Returns:
+        List[StartupEntry]: The startup entries, in the declared order.
+    """
+    entries = []
+
+    for name, value in (raw_startup or {}).items():
+        if isinstance(value, dict):
+            cmd = value.get("cmd")
+
+            if not cmd:
+                logger.warning(f"the startup entry {name} has no cmd")
+                continue
+
+            entries.append(
+                StartupEntry(
+                    name=str(name),
+                    cmd=str(cmd),
+                    after=_parse_after(value.get("after")),
+                    timeout=float(value.get("timeout", DEFAULT_TIMEOUT)),
+                )
+            )
+        else:
+            entries.append(StartupEntry(name=str(name), cmd=str(value)))
+
+    return entries
+
+
+def _find_unresolved(entries: List[StartupEntry]) -> set[str]:
+    """
+    Finds the entries which can never start because of a dependency cycle.
     """
-    for raw_cmd in settings.startup:
+    names = {e.name for e in entries}
+    pending = {e.name: {a for a in e.after if a in names} for e in entries}
+    resolved = True
+
+    while resolved:
+        resolved = False
+
+        for name, after in list(pending.items()):
+            if not after & pending.keys():
+                del pending[name]
+                resolved = True
+
+    return set(pending)
+
+
+async def _run_entry(
+    entry: StartupEntry, semaphore: asyncio.Semaphore, start_time: float, **kwargs
+) -> StartupResult:
+    async with semaphore:
+        started_at = time.perf_counter()
+
         try:
-            cmd = settings.startup[raw_cmd]
-            run_shell_command(
-                cmd, timeout=DEFAULT_TIMEOUT, **_env_substitutions(settings)
+            cmd = build_shell_command(entry.cmd, timeout=f"{entry.timeout:g}", **kwargs)
+            # the built command is run as is, a template would be substituted again
+            result = await run_command_async(
+                [SHELL, "-c", cmd], timeout=entry.timeout, kill_on_timeout=False
             )
-            logger.info(f"the script {cmd} was loaded")
         except Exception as e:
-            logger.warning(
-                f"error while trying to run command {raw_cmd}", e, exc_info=True
+            logger.warning(f"error while trying to run command {entry.name}: {e}")
+            return StartupResult(
+                entry.name,
+                entry.cmd,
+                STATUS_ERROR,
+                started_at=started_at - start_time,
+                duration=time.perf_counter() - started_at,
+                error=str(e),
             )
 
+        if result.timed_out:
+            status = STATUS_TIMEOUT
+        elif result.returncode == 0:
+            status = STATUS_OK
+        else:
+            status = STATUS_FAILED
+
+        logger.info(f"the script {entry.cmd} was loaded ({status})")
+
+        return StartupResult(
+            entry.name,
+            entry.cmd,
+            status,
+            returncode=result.returncode,
+            started_at=started_at - start_time,
+            duration=time.perf_counter() - started_at,
+        )
+
+
+async def run_startup(
+    entries: List[StartupEntry],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    **kwargs: object,
+) -> List[StartupResult]:
+    """
+    Runs the startup entries concurrently, respecting their dependencies.
+
+    At most `max_workers` commands run at the same time. An entry starts once every
+    entry listed in its `after` has finished or timed out, whatever its exit status.
+    Commands outliving their timeout are left running in the background, and `$timeout`
+    in a command is substituted with the entry timeout. Unknown dependencies are
+    ignored and entries in a dependency cycle are skipped.
+
+    Args:
+        entries (List[StartupEntry]): The startup entries.
+        max_workers (int): The maximum number of commands running at once. Defaults to 4.
+        **kwargs (object): Additional keyword arguments to substitute in the command templates.
+
+    Returns:
+        List[StartupResult]: The results, in the order of the entries.
+    """
+    start_time = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    names = {e.name for e in entries}
+    unresolved = _find_unresolved(entries)
+    tasks: Dict[str, asyncio.Future] = {}
+
+    for entry in entries:
+        for after in entry.after:
+            if after not in names:
+                logger.warning(
+                    f"the startup entry {entry.name} depends on unknown entry {after}"
+                )
+
+    async def _run(entry: StartupEntry) -> StartupResult:
+        dependencies = [tasks[a] for a in entry.after if a in tasks]
+
+        if dependencies:
+            await asyncio.wait(dependencies)
+
+        return await _run_entry(entry, semaphore, start_time, **kwargs)
+
+    for entry in entries:
+        if entry.name in unresolved:
+            logger.warning(f"the startup entry {entry.name} has a dependency cycle")
+            continue
+
+        tasks[entry.name] = asyncio.ensure_future(_run(entry))
+
+    await asyncio.gather(*tasks.values())
+
+    return [
+        (
+            tasks[e.name].result()
+            if e.name in tasks
+            else StartupResult(e.name, e.cmd, STATUS_SKIPPED, error="dependency cycle")
+        )
+        for e in entries
+    ]
+
+
+def _report_path() -> Path:
+    return Path(cache_home).joinpath(STARTUP_REPORT_FILE)
+
+
+def _store_startup_report(results: List[StartupResult], duration: float):
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "duration": duration,
+        "entries": [r._asdict() for r in results],
+    }
+    report_file = _report_path()
+
+    try:
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_file = tempfile.mkstemp(
+            dir=report_file.parent, prefix=".startup", suffix=".json"
+        )
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(report, f, indent=2)
+
+            os.replace(tmp_file, report_file)
+        except Exception:
+            os.unlink(tmp_file)
+            raise
+    except Exception as e:
+        logger.warning(f"error while trying to store the startup report: {e}")
+
+
+def load_startup_report() -> dict | None:
+    """
+    Loads the last startup report.
+
+    Returns:
+        dict | None: The report with `created_at`, `duration` and `entries`, or None when missing.
+    """
+    report_file = _report_path()
+
+    if not report_file.exists():
+        return None
+
+    try:
+        with open(report_file) as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"error while trying to load the startup report: {e}")
+        return None
+
+
+def run_startup_once(
+    settings: AppSettings, max_workers: int = DEFAULT_MAX_WORKERS
+) -> asyncio.Task | None:
+    """
+    Runs startup commands defined in the settings and stores the startup report.
+
+    Inside Qtile the commands are scheduled on the event loop and this returns
+    immediately; without a running event loop they run to completion first.
+
+    Args:
+        settings (AppSettings): The application settings containing startup commands.
+        max_workers (int): The maximum number of commands running at once. Defaults to 4.
+
+    Returns:
+        asyncio.Task | None: The task running the commands, or None when they already ran.
+    """
+    entries = build_startup_entries(settings.startup)
+    substitutions = _env_substitutions(settings)
+
+    async def _run():
+        start_time = time.perf_counter()
+        results = await run_startup(entries, max_workers=max_workers, **substitutions)
+        _store_startup_report(results, time.perf_counter() - start_time)
+        return results
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(_run())
+        return None
+
+    return create_task(_run())
+
 
 def _env_substitutions(settings: AppSettings) -> dict[str, Any]:
     """
@@ -11,6 +11,12 @@ Functions:
     _apply_theme_color(theme_filepath: str, settings: AppSettings) -> AppSettings:
         Applies theme colors from a YAML file.
 
+    load_theme_config(theme_filepath: str, use_cache: bool = True) -> dict:
+        Loads a theme file, reusing the compiled theme when it is fresh.
+
+    compile_theme_config(theme_filepath: str) -> dict:
+        Parses a theme file and stores the compiled theme in the cache.
+
     _apply_rofi_style(settings: AppSettings):
         Applies the Rofi style based on the provided settings.
 
@@ -28,6 +34,7 @@ from typing import NamedTuple
 from libqtile.log_utils import logger
 
 from ebenezer.config.settings import AppSettings, AppSettingsColors
+from ebenezer.core.cache import load_compiled, store_compiled
 from ebenezer.core.dict import merge_dicts_recursive
 from ebenezer.core.files import resolve_file_path
 from ebenezer.core.yaml import read_yaml_file
@@ -47,6 +54,7 @@ ROFI_TEMPLATES: list[RofiTemplate] = [
 DUNSTRC_HOME_PATH = "$home/.config/dunst"
 
 DUNSTRC_HOME_PATH = "$home/.config/dunst"
+THEME_ARTIFACT = "theme"
 
 
 def preload_colors(settings: AppSettings, complete=False) -> AppSettings:
@@ -105,7 +113,7 @@ def _apply_theme_color(raw_theme_filepath: str, settings: AppSettings) -> AppSet
             logger.warning(f"Not found the selected theme {theme_filepath}.")
             return settings
 
-        theme_config = read_yaml_file(resolve_file_path(theme_filepath))
+        theme_config = load_theme_config(theme_filepath)
 
         args = merge_dicts_recursive(
             settings.colors.raw, theme_config.get("colors", {})
@@ -120,6 +128,45 @@ def _apply_theme_color(raw_theme_filepath: str, settings: AppSettings) -> AppSet
         return settings
 
 
+def load_theme_config(theme_filepath: str, use_cache: bool = True) -> dict:
+    """
+    Loads a theme file, reusing the compiled theme when it is fresh.
+
+    Args:
+        theme_filepath (str): The resolved path to the theme YAML file.
+        use_cache (bool): Whether to reuse and refresh the compiled theme.
+
+    Returns:
+        dict: The theme configuration.
+    """
+    if use_cache:
+        theme_config = load_compiled(THEME_ARTIFACT, [theme_filepath])
+
+        if theme_config is not None:
+            return theme_config
+
+        return compile_theme_config(theme_filepath)
+
+    return read_yaml_file(theme_filepath)
+
+
+def compile_theme_config(theme_filepath: str) -> dict:
+    """
+    Parses a theme file and stores the compiled theme in the cache.
+
+    Args:
+        theme_filepath (str): The resolved path to the theme YAML file.
+
+    Returns:
+        dict: The theme configuration.
+    """
+    theme_config = read_yaml_file(theme_filepath)
+
+    store_compiled(THEME_ARTIFACT, [theme_filepath], theme_config)
+
+    return theme_config
+
+
 def _apply_rofi_style(settings: AppSettings):
     """
     Applies the Rofi style based on the provided settings.
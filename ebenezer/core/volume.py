@@ -0,0 +1,598 @@
+"""
+volume.py
+---------
+
+This module provides a volume backend for PulseAudio and PipeWire sound servers.
+
+The backend reads every sink with a single `pactl -f json list sinks` call and keeps the
+parsed snapshot for a short while, or until a change is made through it, so reading the
+level, the mute state and the plugged devices costs one process instead of a shell
+pipeline per sink.
+
+Classes:
+    SinkState:
+        The numeric state of an audio sink.
+
+    VolumeSnapshot:
+        The state of every sink, read at once.
+
+    VolumeBackend:
+        The interface shared by the volume backends, caching the last snapshot.
+
+    PactlVolumeBackend:
+        A volume backend driving the sound server through `pactl`.
+
+    FakeVolumeBackend:
+        An in-memory volume backend, for tests and machines without a sound server.
+
+    VolumeEvents:
+        Watches the sound server events and publishes the volume snapshot when it changes.
+
+Functions:
+    parse_pactl_event(line: str) -> Tuple[str, str, int] | None:
+        Parses a line of `pactl subscribe`.
+
+    get_volume_backend() -> VolumeBackend:
+        Returns the volume backend shared by the CLI and the widgets.
+
+    set_volume_backend(backend: VolumeBackend | None):
+        Replaces the shared volume backend.
+
+    get_volume_events() -> VolumeEvents:
+        Returns the volume event stream shared by the widgets.
+"""
+
+import asyncio
+import json
+import re
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from libqtile.log_utils import logger
+from libqtile.utils import create_task
+
+DEFAULT_SINK = "@DEFAULT_SINK@"
+DEFAULT_SOURCE = "@DEFAULT_SOURCE@"
+PACTL_TIMEOUT = 5
+SNAPSHOT_MAX_AGE = 1.0
+
+PACTL_SUBSCRIBE = ("pactl", "subscribe")
+PACTL_EVENT_PATTERN = re.compile(
+    r"Event '(?P<event>[\w-]+)' on (?P<facility>[\w-]+) #(?P<index>-?\d+)"
+)
+VOLUME_EVENT_FACILITIES = ("sink", "server")
+EVENTS_DEBOUNCE = 0.05
+EVENTS_RESTART_DELAY = 5.0
+
+SINK_PHONE = "phone"
+SINK_SPEAKER = "speaker"
+
+
+def _sink_kind(sink_name: str) -> str | None:
+    sink_name = sink_name.lower()
+
+    if "bluez_output" in sink_name or "headset" in sink_name:
+        return SINK_PHONE
+
+    if "alsa_output" in sink_name or "analog" in sink_name:
+        return SINK_SPEAKER
+
+    return None
+
+
+class SinkState(NamedTuple):
+    index: int
+    name: str
+    description: str = ""
+    volume: int = 0
+    muted: bool = False
+    state: str = ""
+
+    @property
+    def kind(self) -> str | None:
+        """
+        Returns the kind of device behind the sink, `phone`, `speaker` or None.
+        """
+        return _sink_kind(self.name)
+
+
+class VolumeSnapshot(NamedTuple):
+    sinks: Tuple[SinkState, ...] = ()
+
+    @property
+    def levels(self) -> dict[str, int]:
+        """
+        Returns the volume level of the phone and speaker sinks, keyed by kind.
+        """
+        return {s.kind: s.volume for s in self.sinks if s.kind is not None}
+
+    @property
+    def active(self) -> SinkState | None:
+        """
+        Returns the sink whose level is reported: a phone sink, else a speaker sink, else the first sink.
+        """
+        for kind in (SINK_PHONE, SINK_SPEAKER):
+            for sink in reversed(self.sinks):
+                if sink.kind == kind:
+                    return sink
+
+        return self.sinks[0] if self.sinks else None
+
+    @property
+    def level(self) -> int | None:
+        """
+        Returns the volume level of the active sink, or None without sinks.
+        """
+        return self.active.volume if self.active else None
+
+    @property
+    def muted(self) -> bool:
+        """
+        Returns whether the active sink is muted.
+        """
+        return self.active.muted if self.active else False
+
+    @property
+    def phone_plugged(self) -> bool:
+        """
+        Returns whether a headset sink is plugged.
+        """
+        return any("headset" in s.name.lower() for s in self.sinks)
+
+
+def _parse_volume(volume: dict) -> int:
+    percents = [
+        int(str(channel.get("value_percent", "0")).rstrip("%") or 0)
+        for channel in volume.values()
+        if isinstance(channel, dict)
+    ]
+
+    return percents[0] if percents else 0
+
+
+def parse_pactl_sinks(output: str) -> VolumeSnapshot:
+    """
+    Parses the output of `pactl -f json list sinks`.
+
+    The level of a sink is the level of its first channel, as displayed by `pactl list sinks`.
+
+    Args:
+        output (str): The JSON output.
+
+    Returns:
+        VolumeSnapshot: The parsed sinks.
+    """
+    sinks = []
+
+    for sink in json.loads(output or "[]"):
+        sinks.append(
+            SinkState(
+                index=int(sink.get("index", len(sinks))),
+                name=str(sink.get("name", "")),
+                description=str(sink.get("description", "")),
+                volume=_parse_volume(sink.get("volume", {})),
+                muted=bool(sink.get("mute", False)),
+                state=str(sink.get("state", "")),
+            )
+        )
+
+    return VolumeSnapshot(tuple(sinks))
+
+
+class VolumeBackend(ABC):
+    """
+    The interface shared by the volume backends, caching the last snapshot.
+
+    Backends implement `read_snapshot`, `change_volume`, `set_mute` and
+    `toggle_source_mute`. Every change made through the backend invalidates the cached
+    snapshot.
+
+    Attributes:
+        max_age (float | None): How long a snapshot is reused in seconds, None keeps it until invalidated.
+    """
+
+    def __init__(self, max_age: float | None = SNAPSHOT_MAX_AGE):
+        self.max_age = max_age
+        self._snapshot: VolumeSnapshot | None = None
+        self._read_at = 0.0
+
+    def snapshot(self, refresh: bool = False) -> VolumeSnapshot:
+        """
+        Returns the cached snapshot, reading it when missing, expired or when a refresh is requested.
+
+        Args:
+            refresh (bool): Whether to read a new snapshot. Defaults to False.
+
+        Returns:
+            VolumeSnapshot: The state of every sink.
+        """
+        expired = (
+            self.max_age is not None and time.monotonic() - self._read_at > self.max_age
+        )
+
+        if refresh or expired or self._snapshot is None:
+            self._snapshot = self.read_snapshot()
+            self._read_at = time.monotonic()
+
+        return self._snapshot
+
+    def invalidate(self):
+        """
+        Drops the cached snapshot, so the next read asks the sound server again.
+        """
+        self._snapshot = None
+
+    @abstractmethod
+    def read_snapshot(self) -> VolumeSnapshot:
+        """
+        Reads the sinks from the sound server.
+
+        Returns:
+            VolumeSnapshot: The current sinks.
+        """
+
+    @abstractmethod
+    def change_volume(self, delta: int, sink: str = DEFAULT_SINK):
+        """
+        Changes the volume of a sink by a relative amount.
+
+        Args:
+            delta (int): The percentage to add, negative values lower the volume.
+            sink (str): The sink name. Defaults to the default sink.
+        """
+
+    @abstractmethod
+    def set_mute(self, muted: bool | None, sink: str = DEFAULT_SINK):
+        """
+        Mutes, unmutes or toggles a sink.
+
+        Args:
+            muted (bool | None): The mute state, None toggles it.
+            sink (str): The sink name. Defaults to the default sink.
+        """
+
+    @abstractmethod
+    def toggle_source_mute(self, source: str = DEFAULT_SOURCE):
+        """
+        Toggles the mute state of a source (microphone).
+
+        Args:
+            source (str): The source name. Defaults to the default source.
+        """
+
+
+class PactlVolumeBackend(VolumeBackend):
+    """
+    A volume backend driving the sound server through `pactl`.
+    """
+
+    def _pactl(self, *args: str) -> str:
+        try:
+            return subprocess.run(
+                ["pactl", *args],
+                capture_output=True,
+                text=True,
+                timeout=PACTL_TIMEOUT,
+            ).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"error while trying to run pactl {' '.join(args)}: {e}")
+            return ""
+
+    def read_snapshot(self) -> VolumeSnapshot:
+        try:
+            return parse_pactl_sinks(self._pactl("-f", "json", "list", "sinks"))
+        except ValueError as e:
+            logger.warning(f"error while trying to parse pactl sinks: {e}")
+            return VolumeSnapshot()
+
+    def change_volume(self, delta: int, sink: str = DEFAULT_SINK):
+        self._pactl("set-sink-volume", sink, f"{delta:+d}%")
+        self.invalidate()
+
+    def set_mute(self, muted: bool | None, sink: str = DEFAULT_SINK):
+        self._pactl(
+            "set-sink-mute", sink, "toggle" if muted is None else str(int(muted))
+        )
+        self.invalidate()
+
+    def toggle_source_mute(self, source: str = DEFAULT_SOURCE):
+        self._pactl("set-source-mute", source, "toggle")
+
+
+class FakeVolumeBackend(VolumeBackend):
+    """
+    An in-memory volume backend, for tests and machines without a sound server.
+
+    The default sink is the active sink of the snapshot.
+
+    Attributes:
+        sinks (List[SinkState]): The current sinks.
+        source_muted (bool): Whether the default source is muted.
+        reads (int): How many snapshots were read.
+    """
+
+    def __init__(
+        self,
+        sinks: List[SinkState] | None = None,
+        max_age: float | None = SNAPSHOT_MAX_AGE,
+    ):
+        super().__init__(max_age)
+        self.sinks = list(sinks or [])
+        self.source_muted = False
+        self.reads = 0
+
+    def read_snapshot(self) -> VolumeSnapshot:
+        self.reads += 1
+        return VolumeSnapshot(tuple(self.sinks))
+
+    def _find(self, sink: str) -> int | None:
+        if sink == DEFAULT_SINK:
+            active = VolumeSnapshot(tuple(self.sinks)).active
+            return self.sinks.index(active) if active else None
+
+        return next((i for i, s in enumerate(self.sinks) if s.name == sink), None)
+
+    def change_volume(self, delta: int, sink: str = DEFAULT_SINK):
+        i = self._find(sink)
+
+        if i is not None:
+            volume = max(0, self.sinks[i].volume + delta)
+            self.sinks[i] = self.sinks[i]._replace(volume=volume)
+
+        self.invalidate()
+
+    def set_mute(self, muted: bool | None, sink: str = DEFAULT_SINK):
+        i = self._find(sink)
+
+        if i is not None:
+            muted = not self.sinks[i].muted if muted is None else muted
+            self.sinks[i] = self.sinks[i]._replace(muted=muted)
+
+        self.invalidate()
+
+    def toggle_source_mute(self, source: str = DEFAULT_SOURCE):
+        self.source_muted = not self.source_muted
+
+
+def parse_pactl_event(line: str) -> Tuple[str, str, int] | None:
+    """
+    Parses a line of `pactl subscribe`, e.g. `Event 'change' on sink #55`.
+
+    Args:
+        line (str): The event line.
+
+    Returns:
+        Tuple[str, str, int] | None: The event, the facility and the index, or None when the line is not an event.
+    """
+    found = PACTL_EVENT_PATTERN.search(line)
+
+    if found is None:
+        return None
+
+    return found["event"], found["facility"], int(found["index"])
+
+
+class VolumeEvents:
+    """
+    Watches the sound server events and publishes the volume snapshot when it changes.
+
+    A long-lived `pactl subscribe` process is read on the event loop. Sink and server
+    events are coalesced for a few milliseconds, then the backend snapshot is read once
+    and published only when it differs from the previous one. While the stream runs, the
+    backend keeps its snapshot until an event or a change invalidates it, so reading the
+    volume spawns no process. The stream is restarted when `pactl` exits.
+
+    Attributes:
+        latest (VolumeSnapshot | None): The last published snapshot.
+    """
+
+    def __init__(
+        self,
+        backend: VolumeBackend | None = None,
+        command: Sequence[str] = PACTL_SUBSCRIBE,
+        debounce: float = EVENTS_DEBOUNCE,
+        restart_delay: float = EVENTS_RESTART_DELAY,
+    ):
+        self.latest: VolumeSnapshot | None = None
+        self._backend = backend
+        self._command = list(command)
+        self._debounce = debounce
+        self._restart_delay = restart_delay
+        self._subscribers: Dict[Callable[[VolumeSnapshot], None], None] = {}
+        self._changed: asyncio.Event | None = None
+        self._tasks: List[asyncio.Task] = []
+        self._process: asyncio.subprocess.Process | None = None
+        self._backend_max_age: float | None = None
+
+    @property
+    def backend(self) -> VolumeBackend:
+        return self._backend or get_volume_backend()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def subscribe(self, callback: Callable[[VolumeSnapshot], None]):
+        """
+        Subscribes a callback to the volume changes, starting the stream when needed.
+
+        The callback receives the latest snapshot right away when there is one.
+
+        Args:
+            callback (Callable[[VolumeSnapshot], None]): Called with every changed snapshot.
+        """
+        self._subscribers[callback] = None
+
+        if self.latest is not None:
+            callback(self.latest)
+
+        if not self.running:
+            self.start()
+
+    def unsubscribe(self, callback: Callable[[VolumeSnapshot], None]):
+        """
+        Unsubscribes a callback, stopping the stream when no subscriber remains.
+
+        Args:
+            callback (Callable[[VolumeSnapshot], None]): The subscribed callback.
+        """
+        self._subscribers.pop(callback, None)
+
+        if not self._subscribers:
+            self.stop()
+
+    def start(self):
+        """
+        Starts reading the event stream on the running event loop.
+        """
+        if self.running:
+            return
+
+        backend = self.backend
+        self._backend_max_age = backend.max_age
+        backend.max_age = None
+
+        self._changed = asyncio.Event()
+        self._changed.set()
+        self._tasks = [create_task(self._read_events()), create_task(self._refresh())]
+
+    def stop(self):
+        """
+        Stops the event stream, the `pactl` process is killed once the reading task is cancelled.
+        """
+        if not self.running:
+            return
+
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks = []
+        self.backend.max_age = self._backend_max_age
+        self.latest = None
+
+    def publish(self, snapshot: VolumeSnapshot):
+        """
+        Publishes a snapshot to every subscriber when it differs from the latest one.
+
+        Args:
+            snapshot (VolumeSnapshot): The snapshot to publish.
+        """
+        if snapshot == self.latest:
+            return
+
+        self.latest = snapshot
+
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.warning(f"error while publishing volume to {callback}: {e}")
+
+    async def _kill(self):
+        process, self._process = self._process, None
+
+        if process is None or process.returncode is not None:
+            return
+
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+        await process.wait()
+
+    async def _read_events(self):
+        while True:
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self._command,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+
+                # events may have been missed while the stream was down
+                self._changed.set()
+
+                while line := await self._process.stdout.readline():
+                    event = parse_pactl_event(line.decode(errors="replace"))
+
+                    if event is not None and event[1] in VOLUME_EVENT_FACILITIES:
+                        self._changed.set()
+
+                await self._process.wait()
+                logger.warning("the volume event stream has exited, restarting it")
+            except asyncio.CancelledError:
+                await self._kill()
+                raise
+            except Exception as e:
+                logger.warning(f"error while reading the volume event stream: {e}")
+
+            self._process = None
+            await asyncio.sleep(self._restart_delay)
+
+    async def _refresh(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._changed.wait()
+            await asyncio.sleep(self._debounce)
+            self._changed.clear()
+
+            try:
+                snapshot = await loop.run_in_executor(
+                    None, lambda: self.backend.snapshot(refresh=True)
+                )
+            except Exception as e:
+                logger.warning(f"error while reading the volume snapshot: {e}")
+                continue
+
+            self.publish(snapshot)
+
+
+_backend: VolumeBackend | None = None
+_events: VolumeEvents | None = None
+
+
+def get_volume_backend() -> VolumeBackend:
+    """
+    Returns the volume backend shared by the CLI and the widgets.
+
+    Returns:
+        VolumeBackend: The shared volume backend, `pactl` by default.
+    """
+    global _backend
+
+    if _backend is None:
+        _backend = PactlVolumeBackend()
+
+    return _backend
+
+
+def set_volume_backend(backend: VolumeBackend | None):
+    """
+    Replaces the shared volume backend.
+
+    Args:
+        backend (VolumeBackend | None): The new backend, None restores the default one.
+    """
+    global _backend
+
+    _backend = backend
+
+
+def get_volume_events() -> VolumeEvents:
+    """
+    Returns the volume event stream shared by the widgets.
+
+    Returns:
+        VolumeEvents: The shared volume event stream.
+    """
+    global _events
+
+    if _events is None:
+        _events = VolumeEvents()
+
+    return _events
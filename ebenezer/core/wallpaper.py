@@ -12,17 +12,34 @@ Functions:
 import subprocess
 from string import Template
 
+from libqtile.log_utils import logger
+
 from ebenezer.config.settings import AppSettings
 from ebenezer.core.files import resolve_file_path
+from ebenezer.core.wallpaper_daemon import NO_DAEMON_ERRORS, send_command
 
 
 def change_wallpaper(settings: AppSettings):
     """
     Changes the wallpaper based on the provided settings.
 
+    The running wallpaper daemon shows its next wallpaper, the `change_wallpaper` command is
+    spawned otherwise.
+
     Args:
         settings (AppSettings): The application settings containing wallpaper configurations.
     """
+    try:
+        # the running daemon changes it without starting a process
+        if send_command("next").get("ok"):
+            return
+    except NO_DAEMON_ERRORS:
+        pass
+    except OSError as e:
+        # the daemon may still change it, changing it again would race it
+        logger.warning(f"the wallpaper daemon did not answer: {e}")
+        return
+
     change_wallpaper_cmd = settings.commands.get("change_wallpaper")
 
     if change_wallpaper_cmd is None:
@@ -0,0 +1,337 @@
+"""
+wallpaper_cache.py
+------------------
+
+This module provides a cache of wallpapers pre-scaled to the screen resolutions.
+
+`feh --bg-scale` decodes and rescales the original image on every change, which takes
+seconds and hundreds of megabytes for an 8K photo. Variants scaled to each screen
+resolution are built ahead of time by a process pool, so a rotation hands feh an image
+it only has to copy. The cache lives under the ebenezer cache directory and is bounded
+in size, the least recently used variants are removed first.
+
+Classes:
+    WallpaperCache:
+        Builds and serves the pre-scaled variants of wallpapers.
+
+Functions:
+    screen_resolutions() -> List[Tuple[int, int]]:
+        Returns the resolution of every screen, in the order feh sets them.
+
+    scale_image(source: str, resolution: Tuple[int, int]) -> Image.Image:
+        Decodes an image scaled to a resolution, as `feh --bg-scale` does.
+
+    scale_wallpaper(source: str, target: str, resolution: Tuple[int, int]) -> str:
+        Scales a wallpaper to a resolution and writes the variant.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+import xcffib
+import xcffib.xinerama
+from libqtile.log_utils import logger
+from PIL import Image
+
+from ebenezer.core.files import cache_home
+
+WALLPAPER_CACHE_DIR = "wallpapers"
+VARIANT_SUFFIX = ".jpg"
+VARIANT_QUALITY = 92
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_WORKERS = max((os.cpu_count() or 2) // 2, 1)
+
+
+def screen_resolutions() -> List[Tuple[int, int]]:
+    """
+    Returns the resolution of every screen, in the order feh sets them.
+
+    Returns:
+        List[Tuple[int, int]]: The Xinerama screens, the root window when Xinerama is
+        inactive, or an empty list when there is no X display.
+    """
+    try:
+        connection = xcffib.connect()
+    except Exception as e:
+        logger.debug(f"error while connecting to the X display: {e}")
+        return []
+
+    try:
+        try:
+            xinerama = connection(xcffib.xinerama.key)
+            screens = xinerama.QueryScreens().reply().screen_info
+            resolutions = [(screen.width, screen.height) for screen in screens]
+        except Exception as e:
+            logger.debug(f"error while querying the Xinerama screens: {e}")
+            resolutions = []
+
+        if not resolutions:
+            root = connection.get_setup().roots[connection.pref_screen]
+            resolutions = [(root.width_in_pixels, root.height_in_pixels)]
+
+        return resolutions
+    finally:
+        connection.disconnect()
+
+
+def scale_image(source: str, resolution: Tuple[int, int]) -> Image.Image:
+    """
+    Decodes an image scaled to a resolution, as `feh --bg-scale` does.
+
+    JPEG images are decoded at a reduced size when they are much larger than the
+    resolution. An image already at the resolution is only decoded.
+
+    Args:
+        source (str): The image.
+        resolution (Tuple[int, int]): The width and height of the screen.
+
+    Returns:
+        Image.Image: The RGB image.
+    """
+    with Image.open(source) as image:
+        image.draft("RGB", resolution)
+        image = image.convert("RGB")
+
+    if image.size == tuple(resolution):
+        return image
+
+    return image.resize(resolution, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def scale_wallpaper(source: str, target: str, resolution: Tuple[int, int]) -> str:
+    """
+    Scales a wallpaper to a resolution and writes the variant.
+
+    The variant is written to a temporary file and then renamed, so a rotation never
+    reads a partially written variant.
+
+    Args:
+        source (str): The original wallpaper.
+        target (str): The variant to write.
+        resolution (Tuple[int, int]): The width and height of the screen.
+
+    Returns:
+        str: The variant.
+    """
+    scaled = scale_image(source, resolution)
+
+    fd, tmp_file = tempfile.mkstemp(
+        dir=os.path.dirname(target), prefix=".", suffix=VARIANT_SUFFIX
+    )
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            scaled.save(f, "JPEG", quality=VARIANT_QUALITY)
+
+        os.replace(tmp_file, target)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+
+    return target
+
+
+class WallpaperCache:
+    """
+    Builds and serves the pre-scaled variants of wallpapers.
+
+    Attributes:
+        directory (Path): The directory the variants are stored in, one subdirectory per resolution.
+        max_bytes (int): The size cap of the cache in bytes.
+        workers (int): The processes scaling the wallpapers.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        self.directory = Path(
+            directory or Path(cache_home).joinpath(WALLPAPER_CACHE_DIR)
+        )
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def variant_path(self, wallpaper: str, resolution: Tuple[int, int]) -> Path:
+        """
+        Returns the path of the variant of a wallpaper for a resolution.
+
+        The path changes when the wallpaper is modified, so a stale variant is never used.
+
+        Args:
+            wallpaper (str): The original wallpaper.
+            resolution (Tuple[int, int]): The width and height of the screen.
+
+        Returns:
+            Path: The variant, which may not exist yet.
+        """
+        stat = os.stat(wallpaper)
+        key = f"{os.path.abspath(wallpaper)}:{stat.st_mtime_ns}:{stat.st_size}"
+        width, height = resolution
+
+        return self.directory.joinpath(
+            f"{width}x{height}",
+            hashlib.sha256(key.encode("utf-8")).hexdigest() + VARIANT_SUFFIX,
+        )
+
+    def get(self, wallpaper: str, resolution: Tuple[int, int]) -> str | None:
+        """
+        Returns the variant of a wallpaper for a resolution, when it was built.
+
+        Args:
+            wallpaper (str): The original wallpaper.
+            resolution (Tuple[int, int]): The width and height of the screen.
+
+        Returns:
+            str | None: The variant, or None when it is not ready.
+        """
+        try:
+            variant = self.variant_path(wallpaper, resolution)
+            # the modification time orders the variants for eviction
+            os.utime(variant)
+        except OSError:
+            return None
+
+        return str(variant)
+
+    def images(
+        self, wallpaper: str, resolutions: Iterable[Tuple[int, int]]
+    ) -> List[str]:
+        """
+        Returns the image to set on every screen, as given to `feh --bg-scale`.
+
+        Args:
+            wallpaper (str): The original wallpaper.
+            resolutions (Iterable[Tuple[int, int]]): The screen resolutions.
+
+        Returns:
+            List[str]: The variant of every screen, the original while a variant is not ready.
+        """
+        return [
+            self.get(wallpaper, resolution) or wallpaper for resolution in resolutions
+        ] or [wallpaper]
+
+    def prefetch(
+        self, wallpapers: Iterable[str], resolutions: Iterable[Tuple[int, int]]
+    ) -> List[Future]:
+        """
+        Builds the missing variants of wallpapers in the process pool.
+
+        Args:
+            wallpapers (Iterable[str]): The original wallpapers.
+            resolutions (Iterable[Tuple[int, int]]): The screen resolutions.
+
+        Returns:
+            List[Future]: The builds started or already running, each one resolving to its variant.
+        """
+        resolutions = list(dict.fromkeys(resolutions))
+        futures = []
+
+        for wallpaper in wallpapers:
+            for resolution in resolutions:
+                try:
+                    variant = self.variant_path(wallpaper, resolution)
+                except OSError as e:
+                    logger.warning(
+                        f"error while reading the wallpaper {wallpaper}: {e}"
+                    )
+                    continue
+
+                if variant.exists():
+                    continue
+
+                with self._lock:
+                    future = self._pending.get(str(variant))
+
+                    if future is None:
+                        variant.parent.mkdir(parents=True, exist_ok=True)
+                        future = self._executor().submit(
+                            scale_wallpaper, wallpaper, str(variant), resolution
+                        )
+                        self._pending[str(variant)] = future
+
+                # the callback runs right away when the build already finished
+                future.add_done_callback(self._on_built)
+                futures.append(future)
+
+        return futures
+
+    def evict(self) -> List[str]:
+        """
+        Removes the least recently used variants until the cache fits its size cap.
+
+        Returns:
+            List[str]: The removed variants.
+        """
+        variants = []
+        total = 0
+
+        for variant in self.directory.glob(f"*/*{VARIANT_SUFFIX}"):
+            if variant.name.startswith("."):
+                continue
+
+            try:
+                stat = variant.stat()
+            except OSError:
+                continue
+
+            variants.append((stat.st_mtime_ns, stat.st_size, variant))
+            total += stat.st_size
+
+        removed = []
+
+        for _, size, variant in sorted(variants):
+            if total <= self.max_bytes:
+                break
+
+            variant.unlink(missing_ok=True)
+            total -= size
+            removed.append(str(variant))
+
+        return removed
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the process pool, waiting for the running builds by default.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        return self._pool
+
+    def _on_built(self, future: Future):
+        with self._lock:
+            built = [
+                variant
+                for variant, pending in self._pending.items()
+                if pending is future
+            ]
+
+            if not built:
+                return
+
+            for variant in built:
+                del self._pending[variant]
+
+        if future.cancelled():
+            return
+
+        if (error := future.exception()) is not None:
+            logger.warning(f"error while scaling a wallpaper: {error}")
+            return
+
+        self.evict()
@@ -0,0 +1,381 @@
+"""
+wallpaper_daemon.py
+-------------------
+
+This module provides a resident wallpaper daemon controlled over a unix socket.
+
+The daemon rotates the wallpapers of a directory, holding the wallpaper index and the
+pre-scaled cache for its whole life, and answers `next`, `prev`, `pause`, `resume`,
+`set` and `status` commands right away. The rofi menu, the settings UI and key bindings
+send a line to the socket instead of starting Python and scanning the directory again.
+
+A request is a single line, the command and its optional argument separated by a space,
+e.g. `set /home/foo/wallpapers`. The answer is a single JSON line with an `ok` flag and
+the state of the daemon, or an `error` message. A command is answered once it is accepted,
+the wallpaper is uploaded in the background afterwards, and a burst of commands uploads
+only the last wallpaper.
+
+Classes:
+    WallpaperDaemon:
+        Rotates wallpapers and serves the control commands.
+
+Functions:
+    socket_path() -> str:
+        Returns the path of the control socket of the current user.
+
+    send_command(command: str, argument: str | None = None, path: str | None = None, timeout: float = DEFAULT_CLIENT_TIMEOUT) -> dict:
+        Sends a command to the running daemon and returns its answer.
+
+    image_setter(setter: str = SETTER_AUTO) -> ImageSetter:
+        Returns an image setter running a wallpaper setter off the event loop.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+from libqtile.log_utils import logger
+
+from ebenezer.core.wallpaper_cache import WallpaperCache, screen_resolutions
+from ebenezer.core.wallpaper_index import WallpaperIndex, get_wallpaper_index
+from ebenezer.core.wallpaper_setter import SETTER_AUTO, set_wallpaper_images
+
+SOCKET_NAME = "ebenezer-wallpaper.sock"
+DEFAULT_CLIENT_TIMEOUT = 2.0
+DEFAULT_HISTORY_SIZE = 50
+PREFETCH_COUNT = 2
+
+COMMANDS = ("next", "prev", "pause", "resume", "set", "status")
+# the errors of a client when no daemon listens on the socket
+NO_DAEMON_ERRORS = (FileNotFoundError, ConnectionRefusedError)
+
+ImageSetter = Callable[[List[str]], Awaitable[None]]
+
+
+def socket_path() -> str:
+    """
+    Returns the path of the control socket of the current user.
+
+    Returns:
+        str: The socket in `$XDG_RUNTIME_DIR`, or in the temporary directory when it is unset.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+
+    return os.path.join(tempfile.gettempdir(), f"{os.getuid()}-{SOCKET_NAME}")
+
+
+def send_command(
+    command: str,
+    argument: str | None = None,
+    path: str | None = None,
+    timeout: float = DEFAULT_CLIENT_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Sends a command to the running daemon and returns its answer.
+
+    Args:
+        command (str): The command, one of `COMMANDS`.
+        argument (str | None): The argument of the command, e.g. the path given to `set`.
+        path (str | None): The control socket, `socket_path()` when None.
+        timeout (float): The timeout of the whole exchange in seconds.
+
+    Returns:
+        Dict[str, Any]: The answer, with an `ok` flag.
+
+    Raises:
+        FileNotFoundError | ConnectionRefusedError: If no daemon listens on the socket.
+        OSError: If the daemon does not answer in time, e.g. `TimeoutError`.
+    """
+    request = command if argument is None else f"{command} {argument}"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path or socket_path())
+        client.sendall(f"{request}\n".encode("utf-8"))
+
+        with client.makefile("rb") as reader:
+            answer = reader.readline()
+
+    if not answer:
+        raise ConnectionResetError("the wallpaper daemon closed the connection")
+
+    return json.loads(answer)
+
+
+def image_setter(setter: str = SETTER_AUTO) -> ImageSetter:
+    """
+    Returns an image setter running a wallpaper setter off the event loop.
+
+    Args:
+        setter (str): The wallpaper setter, `auto`, `native` or `feh`.
+
+    Returns:
+        ImageSetter: The image setter of the daemon.
+    """
+
+    async def _set_images(images: List[str]):
+        await asyncio.get_running_loop().run_in_executor(
+            None, set_wallpaper_images, images, setter
+        )
+
+    return _set_images
+
+
+class WallpaperDaemon:
+    """
+    Rotates wallpapers and serves the control commands.
+
+    Attributes:
+        directory (str): The wallpaper directory.
+        timeout (float): The time between two rotations in seconds, no rotation when zero.
+        paused (bool): Whether the rotation is paused.
+        history (List[str]): The wallpapers shown, the oldest first.
+        position (int): The index of the current wallpaper in the history.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        timeout: float,
+        index: WallpaperIndex | None = None,
+        cache: WallpaperCache | None = None,
+        setter: ImageSetter | None = None,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ):
+        self.directory = directory
+        self.timeout = timeout
+        self.index = index or get_wallpaper_index()
+        self.cache = cache or WallpaperCache()
+        self.paused = False
+        self.history: List[str] = []
+        self.position = -1
+        self._setter = setter or image_setter()
+        self._history_size = history_size
+        self._rearm: asyncio.Event | None = None
+        self._upload: asyncio.Task | None = None
+        # every show request increments it, the upload catches up with the last one
+        self._requested = 0
+        self._uploaded = 0
+        # commands and rotations are applied one at a time
+        self._lock = asyncio.Lock()
+
+    @property
+    def current(self) -> str | None:
+        return self.history[self.position] if self.history else None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "wallpaper": self.current,
+            "directory": self.directory,
+            "paused": self.paused,
+        }
+
+    async def serve(self, path: str | None = None):
+        """
+        Shows a first wallpaper, then rotates them and serves the control socket until cancelled.
+
+        Args:
+            path (str | None): The control socket, `socket_path()` when None.
+
+        Raises:
+            RuntimeError: If another daemon already listens on the socket.
+        """
+        path = path or socket_path()
+        self._rearm = asyncio.Event()
+        await _remove_stale_socket(path)
+
+        server = await asyncio.start_unix_server(self._handle, path)
+        os.chmod(path, 0o600)
+        logger.info(f"the wallpaper daemon listens on {path}")
+
+        try:
+            async with server:
+                await self.execute("next")
+                await self._rotate()
+        finally:
+            Path(path).unlink(missing_ok=True)
+
+            if self._upload is not None:
+                self._upload.cancel()
+
+            self.cache.shutdown(wait=False)
+
+    async def execute(
+        self, command: str, argument: str | None = None
+    ) -> Dict[str, Any]:
+        """
+        Executes a control command.
+
+        Args:
+            command (str): The command, one of `COMMANDS`.
+            argument (str | None): The argument of the command.
+
+        Returns:
+            Dict[str, Any]: The state of the daemon, or an error.
+        """
+        async with self._lock:
+            return await self._execute(command, argument)
+
+    async def _execute(self, command: str, argument: str | None) -> Dict[str, Any]:
+        if command == "next":
+            await self.next()
+        elif command == "prev":
+            await self.prev()
+        elif command == "pause":
+            self.paused = True
+            self._rearm_timer()
+        elif command == "resume":
+            self.paused = False
+            self._rearm_timer()
+        elif command == "set":
+            if not argument:
+                return {"ok": False, "error": "set needs a wallpaper or a directory"}
+
+            if not os.path.exists(argument):
+                return {"ok": False, "error": f"{argument} does not exist"}
+
+            await self.set(argument)
+        elif command != "status":
+            return {"ok": False, "error": f"unknown command {command}"}
+
+        return self.status()
+
+    async def next(self):
+        """
+        Shows the next wallpaper of the history, or draws a new one from the directory.
+        """
+        if self.position < len(self.history) - 1:
+            self.position += 1
+        else:
+            wallpaper = await asyncio.get_running_loop().run_in_executor(
+                None, self._draw
+            )
+
+            if wallpaper is None:
+                logger.warning(f"no wallpapers found in {self.directory}")
+                return
+
+            self._push(wallpaper)
+
+        self._show()
+
+    async def prev(self):
+        """
+        Shows the previous wallpaper of the history.
+        """
+        if self.position > 0:
+            self.position -= 1
+            self._show()
+
+    async def set(self, path: str):
+        """
+        Shows a wallpaper, or switches to a wallpaper directory.
+
+        Args:
+            path (str): A wallpaper or a wallpaper directory.
+        """
+        # the wallpapers after the current one are forgotten, as in a browser history
+        del self.history[self.position + 1 :]
+
+        if os.path.isdir(path):
+            self.directory = path
+            await self.next()
+        else:
+            self._push(path)
+            self._show()
+
+    def _draw(self) -> str | None:
+        self.index.refresh(self.directory)
+        wallpaper = self.index.draw(self.directory)
+
+        return wallpaper.path if wallpaper is not None else None
+
+    def _push(self, wallpaper: str):
+        self.history.append(wallpaper)
+        del self.history[: -self._history_size]
+        self.position = len(self.history) - 1
+
+    def _show(self):
+        self._requested += 1
+
+        if self._upload is None or self._upload.done():
+            self._upload = asyncio.create_task(self._upload_wallpapers())
+
+        self._rearm_timer()
+
+    async def _upload_wallpapers(self):
+        while self._uploaded != self._requested:
+            self._uploaded = self._requested
+            wallpaper = self.current
+            resolutions = screen_resolutions()
+
+            try:
+                await self._setter(self.cache.images(wallpaper, resolutions))
+            except Exception:
+                logger.exception(f"error while setting the wallpaper {wallpaper}")
+                continue
+
+            logger.info(f"wallpaper set to {wallpaper}")
+
+            upcoming = self.index.upcoming(self.directory, PREFETCH_COUNT)
+            self.cache.prefetch([w.path for w in upcoming], resolutions)
+
+    def _rearm_timer(self):
+        if self._rearm is not None:
+            self._rearm.set()
+
+    async def _rotate(self):
+        while True:
+            self._rearm.clear()
+            timeout = None if self.paused or not self.timeout else self.timeout
+
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._rearm.wait()
+            except TimeoutError:
+                try:
+                    await self.execute("next")
+                except Exception:
+                    logger.exception("error while rotating the wallpaper")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            command, _, argument = request.decode("utf-8").strip().partition(" ")
+
+            try:
+                answer = await self.execute(command, argument or None)
+            except Exception as e:
+                logger.exception(f"error while executing the command {command}")
+                answer = {"ok": False, "error": str(e)}
+
+            writer.write(f"{json.dumps(answer)}\n".encode("utf-8"))
+            await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"error while serving a wallpaper client: {e}")
+        finally:
+            writer.close()
+
+
+async def _remove_stale_socket(path: str):
+    if not os.path.exists(path):
+        return
+
+    try:
+        async with asyncio.timeout(DEFAULT_CLIENT_TIMEOUT):
+            _, writer = await asyncio.open_unix_connection(path)
+    except (OSError, TimeoutError):
+        # a previous daemon died without removing its socket
+        os.unlink(path)
+        return
+
+    writer.close()
+    raise RuntimeError(f"a wallpaper daemon already listens on {path}")
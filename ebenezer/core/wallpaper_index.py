@@ -0,0 +1,394 @@
+"""
+wallpaper_index.py
+------------------
+
+This module provides a persistent index of the wallpapers of a directory.
+
+The index is kept in a SQLite database under the ebenezer cache directory and holds
+only image files, with their dimensions. It is refreshed incrementally: while the
+modification time of a directory is unchanged it is not listed again, only its indexed
+files are checked, since modifying a file in place leaves the directory untouched, and
+in both cases only new or modified files are opened to read their dimensions. Wallpapers are
+drawn from a shuffle bag, every wallpaper of a directory is drawn once before the bag
+is refilled, so a rotation never repeats an image before the whole collection was shown.
+The bag is shuffled when it is filled, so the next wallpapers are known ahead of time.
+
+Classes:
+    Wallpaper:
+        An indexed wallpaper and its dimensions.
+
+    WallpaperIndex:
+        Indexes the wallpapers of directories and draws them from a shuffle bag.
+
+Functions:
+    is_image_file(path: str) -> bool:
+        Returns whether a path has the extension of a supported image type.
+
+    get_wallpaper_index() -> WallpaperIndex:
+        Returns the wallpaper index shared by the wallpaper commands.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+
+from libqtile.log_utils import logger
+from PIL import Image, UnidentifiedImageError
+
+from ebenezer.core.files import cache_home
+
+WALLPAPERS_DB = "wallpapers.sqlite3"
+SCHEMA_VERSION = 1
+IMAGE_SUFFIXES = frozenset(
+    (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+)
+
+_SCHEMA = """
+DROP TABLE IF EXISTS directories;
+DROP TABLE IF EXISTS wallpapers;
+CREATE TABLE directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE wallpapers (
+    id INTEGER PRIMARY KEY,
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    drawn_at REAL,
+    UNIQUE (directory, name)
+);
+CREATE INDEX wallpapers_bag ON wallpapers (directory, position)
+    WHERE drawn_at IS NULL;
+"""
+
+
+class Wallpaper(NamedTuple):
+    path: str
+    width: int
+    height: int
+
+
+def is_image_file(path: str) -> bool:
+    """
+    Returns whether a path has the extension of a supported image type.
+
+    Args:
+        path (str): The path.
+
+    Returns:
+        bool: True for the extensions of `IMAGE_SUFFIXES`, whatever their case.
+    """
+    return Path(path).suffix.lower() in IMAGE_SUFFIXES
+
+
+def _read_dimensions(path: str) -> Tuple[int, int] | None:
+    try:
+        # only the header is read
+        with Image.open(path) as image:
+            return image.size
+    except (OSError, UnidentifiedImageError) as e:
+        logger.debug(f"skipping the wallpaper {path}: {e}")
+        return None
+
+
+class WallpaperIndex:
+    """
+    Indexes the wallpapers of directories and draws them from a shuffle bag.
+
+    Attributes:
+        path (Path): The SQLite database.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = Path(path or Path(cache_home).joinpath(WALLPAPERS_DB))
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self, directory: str) -> bool:
+        """
+        Updates the wallpapers of a directory when it changed since the last refresh.
+
+        The directory is listed again only when its modification time changed, otherwise
+        the modification time and size of its indexed files are checked.
+
+        Args:
+            directory (str): The wallpaper directory.
+
+        Returns:
+            bool: True when the directory was listed again.
+        """
+        directory = str(Path(directory).expanduser().absolute())
+        mtime_ns = os.stat(directory).st_mtime_ns
+
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT mtime_ns FROM directories WHERE path = ?", (directory,)
+            ).fetchone()
+
+            listed = row is None or row[0] != mtime_ns
+            indexed = {
+                name: (file_mtime_ns, size)
+                for name, file_mtime_ns, size in connection.execute(
+                    "SELECT name, mtime_ns, size FROM wallpapers WHERE directory = ?",
+                    (directory,),
+                )
+            }
+
+        if listed:
+            entries = self._scan(directory, indexed)
+        else:
+            entries = self._check(directory, indexed)
+
+            # every indexed file is unchanged
+            if entries == dict.fromkeys(indexed):
+                return False
+
+        with self._lock:
+            connection = self._connect()
+
+            with connection:
+                for name in set(indexed) - set(entries):
+                    connection.execute(
+                        "DELETE FROM wallpapers WHERE directory = ? AND name = ?",
+                        (directory, name),
+                    )
+
+                connection.executemany(
+                    "INSERT INTO wallpapers "
+                    "(directory, name, mtime_ns, size, width, height, position) "
+                    "VALUES (?, ?, ?, ?, ?, ?, random()) "
+                    "ON CONFLICT (directory, name) DO UPDATE SET "
+                    "mtime_ns = excluded.mtime_ns, size = excluded.size, "
+                    "width = excluded.width, height = excluded.height",
+                    [
+                        (directory, name, *entry)
+                        for name, entry in entries.items()
+                        if entry is not None
+                    ],
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)",
+                    (directory, mtime_ns),
+                )
+
+        return listed
+
+    def wallpapers(self, directory: str) -> List[Wallpaper]:
+        """
+        Returns the indexed wallpapers of a directory, sorted by name.
+
+        Args:
+            directory (str): The wallpaper directory.
+
+        Returns:
+            List[Wallpaper]: The wallpapers.
+        """
+        directory = str(Path(directory).expanduser().absolute())
+
+        with self._lock:
+            return [
+                Wallpaper(os.path.join(directory, name), width, height)
+                for name, width, height in self._connect().execute(
+                    "SELECT name, width, height FROM wallpapers "
+                    "WHERE directory = ? ORDER BY name",
+                    (directory,),
+                )
+            ]
+
+    def draw(self, directory: str) -> Wallpaper | None:
+        """
+        Draws the next wallpaper of a directory from its shuffle bag.
+
+        When every wallpaper was drawn, the bag is refilled and shuffled without the last one.
+
+        Args:
+            directory (str): The wallpaper directory, refreshed beforehand.
+
+        Returns:
+            Wallpaper | None: The wallpaper, or None when the directory has no wallpaper.
+        """
+        directory = str(Path(directory).expanduser().absolute())
+
+        with self._lock:
+            connection = self._connect()
+
+            with connection:
+                rows = self._next_undrawn(connection, directory, 1)
+
+                if not rows:
+                    connection.execute(
+                        "UPDATE wallpapers SET drawn_at = NULL, position = random() "
+                        "WHERE directory = ? AND drawn_at < "
+                        "(SELECT MAX(drawn_at) FROM wallpapers WHERE directory = ?)",
+                        (directory, directory),
+                    )
+                    rows = self._next_undrawn(connection, directory, 1)
+
+                if not rows:
+                    # a single wallpaper is left, it is drawn again
+                    rows = connection.execute(
+                        "SELECT id, name, width, height FROM wallpapers "
+                        "WHERE directory = ? LIMIT 1",
+                        (directory,),
+                    ).fetchall()
+
+                if not rows:
+                    return None
+
+                wallpaper_id, name, width, height = rows[0]
+                connection.execute(
+                    "UPDATE wallpapers SET drawn_at = ? WHERE id = ?",
+                    (time.time(), wallpaper_id),
+                )
+
+        return Wallpaper(os.path.join(directory, name), width, height)
+
+    def upcoming(self, directory: str, count: int) -> List[Wallpaper]:
+        """
+        Returns the next wallpapers the shuffle bag of a directory will draw.
+
+        Args:
+            directory (str): The wallpaper directory.
+            count (int): The maximum number of wallpapers.
+
+        Returns:
+            List[Wallpaper]: The wallpapers, in the order they will be drawn.
+        """
+        directory = str(Path(directory).expanduser().absolute())
+
+        with self._lock:
+            return [
+                Wallpaper(os.path.join(directory, name), width, height)
+                for _, name, width, height in self._next_undrawn(
+                    self._connect(), directory, count
+                )
+            ]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                (version,) = connection.execute("PRAGMA user_version").fetchone()
+
+                if version != SCHEMA_VERSION:
+                    # the index is rebuilt from the directories, it is never migrated
+                    connection.executescript(_SCHEMA)
+                    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            except sqlite3.DatabaseError as e:
+                connection.close()
+                logger.warning(
+                    f"error while opening the wallpaper index {self.path}: {e}"
+                )
+                raise
+
+            self._connection = connection
+
+        return self._connection
+
+    def _scan(
+        self, directory: str, indexed: dict[str, Tuple[int, int]]
+    ) -> dict[str, Tuple[int, int, int, int] | None]:
+        """
+        Lists the image files of a directory, opening only the new or modified ones.
+
+        Unchanged files map to None, they are kept as indexed.
+        """
+        entries: dict[str, Tuple[int, int, int, int] | None] = {}
+
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not is_image_file(entry.name):
+                    continue
+
+                try:
+                    if not entry.is_file():
+                        continue
+
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                if indexed.get(entry.name) == (stat.st_mtime_ns, stat.st_size):
+                    entries[entry.name] = None
+                    continue
+
+                dimensions = _read_dimensions(entry.path)
+
+                if dimensions is not None:
+                    entries[entry.name] = (stat.st_mtime_ns, stat.st_size, *dimensions)
+
+        return entries
+
+    def _check(
+        self, directory: str, indexed: dict[str, Tuple[int, int]]
+    ) -> dict[str, Tuple[int, int, int, int] | None]:
+        """
+        Checks the indexed files of a directory, opening only the modified ones.
+
+        Unchanged files map to None, they are kept as indexed, and missing files are left out.
+        """
+        entries: dict[str, Tuple[int, int, int, int] | None] = {}
+
+        for name, file in indexed.items():
+            path = os.path.join(directory, name)
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            if file == (stat.st_mtime_ns, stat.st_size):
+                entries[name] = None
+                continue
+
+            dimensions = _read_dimensions(path)
+
+            if dimensions is not None:
+                entries[name] = (stat.st_mtime_ns, stat.st_size, *dimensions)
+
+        return entries
+
+    def _next_undrawn(
+        self, connection: sqlite3.Connection, directory: str, count: int
+    ) -> List[Tuple[int, str, int, int]]:
+        return connection.execute(
+            "SELECT id, name, width, height FROM wallpapers "
+            "WHERE directory = ? AND drawn_at IS NULL ORDER BY position LIMIT ?",
+            (directory, count),
+        ).fetchall()
+
+
+_index: WallpaperIndex | None = None
+
+
+def get_wallpaper_index() -> WallpaperIndex:
+    """
+    Returns the wallpaper index shared by the wallpaper commands.
+
+    Returns:
+        WallpaperIndex: The shared wallpaper index.
+    """
+    global _index
+
+    if _index is None:
+        _index = WallpaperIndex()
+
+    return _index
@@ -0,0 +1,408 @@
+"""
+wallpaper_setter.py
+-------------------
+
+This module provides the wallpaper setters, an in-process X11 root pixmap and feh.
+
+Setting a wallpaper with feh costs a process, which decodes the image again. The native
+setter composes the pre-scaled images of the screens in memory, uploads them to a pixmap
+of the root window and publishes it in the `_XROOTPMAP_ID` and `ESETROOT_PMAP_ID`
+properties, the way feh and hsetroot do, so compositors and pseudo-transparent programs
+keep finding it. The pixels go through MIT-SHM when the X server shares memory with us,
+in `PutImage` requests otherwise. feh remains the fallback, e.g. on an unusual visual.
+
+Classes:
+    RootPixmapError:
+        Raised when the root pixmap cannot be set natively.
+
+Functions:
+    compose_screens(images: Sequence[str], geometries: Sequence[Geometry], size: Tuple[int, int]) -> Image.Image:
+        Composes one image per screen into an image of the root window.
+
+    set_root_pixmap(images: Sequence[str], use_shm: bool = True) -> str:
+        Sets the images as the root pixmap of the X display.
+
+    set_feh_images(images: Sequence[str]):
+        Sets one image per screen with `feh --bg-scale`.
+
+    set_wallpaper_images(images: Sequence[str], setter: str = SETTER_AUTO) -> str:
+        Sets one image per screen with a setter.
+"""
+
+import ctypes
+import io
+import struct
+import subprocess
+from typing import List, NamedTuple, Sequence, Tuple
+
+import xcffib
+import xcffib.shm
+import xcffib.xinerama
+import xcffib.xproto
+from libqtile.log_utils import logger
+from PIL import Image
+
+from ebenezer.core.wallpaper_cache import scale_image
+
+SETTER_AUTO = "auto"
+SETTER_NATIVE = "native"
+SETTER_FEH = "feh"
+SETTERS = (SETTER_AUTO, SETTER_NATIVE, SETTER_FEH)
+
+UPLOAD_SHM = "shm"
+UPLOAD_CORE = "core"
+
+ROOT_PIXMAP_PROPERTIES = ("_XROOTPMAP_ID", "ESETROOT_PMAP_ID")
+
+# the opcode of PutImage, sent by hand so the pixels are not packed byte by byte
+PUT_IMAGE_OPCODE = 72
+PUT_IMAGE_HEADER = struct.Struct("=xB2xIIHHhhBB2x")
+
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+
+class RootPixmapError(Exception):
+    """
+    Raised when the root pixmap cannot be set natively.
+    """
+
+
+class Geometry(NamedTuple):
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def compose_screens(
+    images: Sequence[str], geometries: Sequence[Geometry], size: Tuple[int, int]
+) -> Image.Image:
+    """
+    Composes one image per screen into an image of the root window.
+
+    Every image is scaled to its screen, the images are reused in turn when there are
+    more screens than images, as feh does.
+
+    Args:
+        images (Sequence[str]): The image of every screen.
+        geometries (Sequence[Geometry]): The position and size of every screen.
+        size (Tuple[int, int]): The width and height of the root window.
+
+    Returns:
+        Image.Image: The RGB image of the root window.
+    """
+    if len(geometries) == 1 and geometries[0] == Geometry(0, 0, *size):
+        return scale_image(images[0], size)
+
+    root = Image.new("RGB", size)
+
+    for i, geometry in enumerate(geometries):
+        screen = scale_image(images[i % len(images)], (geometry.width, geometry.height))
+        root.paste(screen, (geometry.x, geometry.y))
+
+    return root
+
+
+def _screen_geometries(
+    connection: xcffib.Connection, root: xcffib.xproto.SCREEN
+) -> List[Geometry]:
+    try:
+        xinerama = connection(xcffib.xinerama.key)
+        screens = xinerama.QueryScreens().reply().screen_info
+        geometries = [
+            Geometry(screen.x_org, screen.y_org, screen.width, screen.height)
+            for screen in screens
+        ]
+    except Exception as e:
+        logger.debug(f"error while querying the Xinerama screens: {e}")
+        geometries = []
+
+    return geometries or [Geometry(0, 0, root.width_in_pixels, root.height_in_pixels)]
+
+
+def _check_pixel_format(connection: xcffib.Connection, root: xcffib.xproto.SCREEN):
+    """
+    Checks the root window stores pixels as the BGRX bytes the image is converted to.
+    """
+    setup = connection.get_setup()
+    bits_per_pixel = next(
+        (f.bits_per_pixel for f in setup.pixmap_formats if f.depth == root.root_depth),
+        None,
+    )
+    visual = next(
+        (
+            visual
+            for depth in root.allowed_depths
+            for visual in depth.visuals
+            if visual.visual_id == root.root_visual
+        ),
+        None,
+    )
+
+    if (
+        root.root_depth not in (24, 32)
+        or bits_per_pixel != 32
+        or setup.image_byte_order != xcffib.xproto.ImageOrder.LSBFirst
+        or visual is None
+        or (visual.red_mask, visual.green_mask, visual.blue_mask)
+        != (0xFF0000, 0xFF00, 0xFF)
+    ):
+        raise RootPixmapError(
+            f"unsupported root visual, depth {root.root_depth} "
+            f"with {bits_per_pixel} bits per pixel"
+        )
+
+
+def _put_image_core(
+    connection: xcffib.Connection,
+    pixmap: int,
+    gc: int,
+    depth: int,
+    size: Tuple[int, int],
+    data: bytes,
+):
+    width, height = size
+    stride = width * 4
+    max_bytes = connection.get_maximum_request_length() * 4 - PUT_IMAGE_HEADER.size
+    rows = max(min(max_bytes // stride, height), 1)
+
+    for y in range(0, height, rows):
+        strip = min(rows, height - y)
+        buf = io.BytesIO()
+        buf.write(
+            PUT_IMAGE_HEADER.pack(
+                xcffib.xproto.ImageFormat.ZPixmap,
+                pixmap,
+                gc,
+                width,
+                strip,
+                0,
+                y,
+                0,
+                depth,
+            )
+        )
+        buf.write(data[y * stride : (y + strip) * stride])
+        connection.core.send_request(PUT_IMAGE_OPCODE, buf)
+
+
+def _put_image_shm(
+    connection: xcffib.Connection,
+    pixmap: int,
+    gc: int,
+    depth: int,
+    size: Tuple[int, int],
+    data: bytes,
+):
+    """
+    Uploads the pixels through a System V shared memory segment attached by the server.
+
+    Raises:
+        RootPixmapError: If the server does not support MIT-SHM or cannot attach the segment,
+        e.g. on a remote display.
+    """
+    try:
+        shm = connection(xcffib.shm.key)
+        shm.QueryVersion().reply()
+    except Exception as e:
+        raise RootPixmapError(f"MIT-SHM is not available: {e}") from e
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.shmget.argtypes = (ctypes.c_int, ctypes.c_size_t, ctypes.c_int)
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmat.argtypes = (ctypes.c_int, ctypes.c_void_p, ctypes.c_int)
+    libc.shmdt.argtypes = (ctypes.c_void_p,)
+    libc.shmctl.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_void_p)
+
+    shmid = libc.shmget(IPC_PRIVATE, len(data), IPC_CREAT | 0o600)
+
+    if shmid < 0:
+        raise RootPixmapError(f"shmget failed with errno {ctypes.get_errno()}")
+
+    address = None
+    shmseg = None
+
+    try:
+        address = libc.shmat(shmid, None, 0)
+
+        if address in (None, ctypes.c_void_p(-1).value):
+            address = None
+            raise RootPixmapError(f"shmat failed with errno {ctypes.get_errno()}")
+
+        ctypes.memmove(address, data, len(data))
+
+        shmseg = connection.generate_id()
+
+        try:
+            shm.AttachChecked(shmseg, shmid, True).check()
+        except xcffib.ProtocolException as e:
+            shmseg = None
+            raise RootPixmapError(f"the X server cannot attach the segment: {e}") from e
+
+        width, height = size
+        shm.PutImage(
+            pixmap,
+            gc,
+            width,
+            height,
+            0,
+            0,
+            width,
+            height,
+            0,
+            0,
+            depth,
+            xcffib.xproto.ImageFormat.ZPixmap,
+            0,
+            shmseg,
+            0,
+        )
+        # a round trip, the segment is detached once the server copied it
+        connection.core.GetInputFocus().reply()
+    finally:
+        if shmseg is not None:
+            shm.Detach(shmseg)
+            connection.flush()
+
+        if address is not None:
+            libc.shmdt(address)
+
+        libc.shmctl(shmid, IPC_RMID, None)
+
+
+def _intern_atom(connection: xcffib.Connection, name: str) -> int:
+    return connection.core.InternAtom(False, len(name), name).reply().atom
+
+
+def _get_pixmap_property(connection: xcffib.Connection, window: int, atom: int) -> int:
+    reply = connection.core.GetProperty(
+        False, window, atom, xcffib.xproto.Atom.PIXMAP, 0, 1
+    ).reply()
+
+    if reply.format != 32 or reply.value_len != 1:
+        return 0
+
+    return reply.value.to_atoms()[0]
+
+
+def set_root_pixmap(images: Sequence[str], use_shm: bool = True) -> str:
+    """
+    Sets the images as the root pixmap of the X display.
+
+    The image of every screen is placed at the position of the screen. The pixmap of the
+    previous wallpaper is freed when it was set the same way, the new one is kept after
+    disconnecting so it outlives this process.
+
+    Args:
+        images (Sequence[str]): The image of every screen, reused in turn when there are more screens.
+        use_shm (bool): Whether to upload the pixels through MIT-SHM when the server supports it.
+
+    Returns:
+        str: How the pixels were uploaded, `shm` or `core`.
+
+    Raises:
+        RootPixmapError: If there is no X display or its pixel format is not supported.
+    """
+    if not images:
+        raise RootPixmapError("no image to set")
+
+    try:
+        connection = xcffib.connect()
+    except Exception as e:
+        raise RootPixmapError(f"error while connecting to the X display: {e}") from e
+
+    try:
+        root = connection.get_setup().roots[connection.pref_screen]
+        _check_pixel_format(connection, root)
+
+        size = (root.width_in_pixels, root.height_in_pixels)
+        image = compose_screens(images, _screen_geometries(connection, root), size)
+        data = image.tobytes("raw", "BGRX")
+
+        core = connection.core
+        pixmap = connection.generate_id()
+        core.CreatePixmap(root.root_depth, pixmap, root.root, *size)
+        gc = connection.generate_id()
+        core.CreateGC(gc, pixmap, 0, [])
+
+        upload = UPLOAD_CORE
+
+        if use_shm:
+            try:
+                _put_image_shm(connection, pixmap, gc, root.root_depth, size, data)
+                upload = UPLOAD_SHM
+            except (RootPixmapError, OSError) as e:
+                logger.debug(f"uploading the wallpaper without MIT-SHM: {e}")
+
+        if upload == UPLOAD_CORE:
+            _put_image_core(connection, pixmap, gc, root.root_depth, size, data)
+
+        core.FreeGC(gc)
+
+        atoms = [_intern_atom(connection, name) for name in ROOT_PIXMAP_PROPERTIES]
+        previous = [_get_pixmap_property(connection, root.root, a) for a in atoms]
+
+        if previous[0] and previous[0] == previous[1]:
+            # the previous setter kept its pixmap alive with RetainPermanent
+            core.KillClient(previous[0])
+
+        for atom in atoms:
+            core.ChangeProperty(
+                xcffib.xproto.PropMode.Replace,
+                root.root,
+                atom,
+                xcffib.xproto.Atom.PIXMAP,
+                32,
+                1,
+                struct.pack("=I", pixmap),
+            )
+
+        core.ChangeWindowAttributes(root.root, xcffib.xproto.CW.BackPixmap, [pixmap])
+        core.ClearArea(False, root.root, 0, 0, 0, 0)
+        core.SetCloseDownMode(xcffib.xproto.CloseDown.RetainPermanent)
+        # the requests are sent before leaving, their errors would only arrive afterwards
+        core.GetInputFocus().reply()
+
+        return upload
+    except xcffib.XcffibException as e:
+        raise RootPixmapError(f"error while setting the root pixmap: {e}") from e
+    finally:
+        connection.disconnect()
+
+
+def set_feh_images(images: Sequence[str]):
+    """
+    Sets one image per screen with `feh --bg-scale`.
+    """
+    subprocess.run(["feh", "--bg-scale", *images])
+
+
+def set_wallpaper_images(images: Sequence[str], setter: str = SETTER_AUTO) -> str:
+    """
+    Sets one image per screen with a setter.
+
+    Args:
+        images (Sequence[str]): The image of every screen, as given to `feh --bg-scale`.
+        setter (str): `native`, `feh`, or `auto` to try the native setter and fall back to feh.
+
+    Returns:
+        str: The setter used, `native` or `feh`.
+
+    Raises:
+        RootPixmapError: If the native setter was chosen and failed.
+    """
+    if setter != SETTER_FEH:
+        try:
+            upload = set_root_pixmap(images)
+            logger.debug(f"root pixmap set through {upload}")
+            return SETTER_NATIVE
+        except RootPixmapError as e:
+            if setter == SETTER_NATIVE:
+                raise
+
+            logger.debug(f"error while setting the root pixmap, using feh: {e}")
+
+    set_feh_images(images)
+    return SETTER_FEH
@@ -0,0 +1,240 @@
+"""
+window_rules.py
+---------------
+
+This module provides a window rule engine compiled once from the settings.
+
+Rules matching an exact `wm_class` are kept in a hash index, while every title rule is
+combined into a single regular expression, so evaluating a new window costs one
+dictionary lookup per class name plus one regex search. Only a title matching that
+expression is checked against each title rule, so overlapping rules combine their actions.
+
+Classes:
+    WindowActions:
+        Declarative actions applied to a matching window (float, center, group and size).
+
+    WindowRules:
+        The compiled rule engine.
+
+Functions:
+    build_window_rules(settings: AppSettings, center_titles: List[str] = []) -> WindowRules:
+        Compiles the window rules from the settings.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+from libqtile import qtile
+from libqtile.log_utils import logger
+
+from ebenezer.config.settings import AppSettings
+
+DEFAULT_CENTER_SIZE = (0.8, 0.8)
+
+
+class WindowActions(NamedTuple):
+    floating: bool = False
+    center: bool = False
+    group: str | None = None
+    size: Tuple[float, float] | None = None
+
+    def merge(self, other: "WindowActions | None") -> "WindowActions":
+        """
+        Combines two actions, values set in the other actions take precedence.
+
+        Args:
+            other (WindowActions | None): The actions to merge into these ones.
+
+        Returns:
+            WindowActions: The combined actions.
+        """
+        if other is None:
+            return self
+
+        return WindowActions(
+            floating=self.floating or other.floating,
+            center=self.center or other.center,
+            group=other.group or self.group,
+            size=other.size or self.size,
+        )
+
+
+class WindowRules:
+    """
+    A compiled window rule engine.
+
+    Attributes:
+        class_index (Dict[str, WindowActions]): Actions indexed by exact window class.
+        title_pattern (re.Pattern | None): The combined title rules, matching a title when any rule does.
+        title_rules (List[Tuple[re.Pattern, WindowActions]]): The title rules, in declaration order.
+        border_color (str): The border color applied to placed windows.
+    """
+
+    def __init__(
+        self,
+        class_index: Dict[str, WindowActions],
+        title_pattern: re.Pattern | None,
+        title_rules: List[Tuple[re.Pattern, WindowActions]],
+        border_color: str,
+    ):
+        self.class_index = class_index
+        self.title_pattern = title_pattern
+        self.title_rules = title_rules
+        self.border_color = border_color
+
+    def match(
+        self, wm_class: List[str] | None, title: str | None
+    ) -> WindowActions | None:
+        """
+        Finds the actions for a window class and title.
+
+        Args:
+            wm_class (List[str] | None): The window instance and class names.
+            title (str | None): The window title.
+
+        Returns:
+            WindowActions | None: The combined actions, or None when no rule matches.
+        """
+        actions = None
+
+        for name in wm_class or []:
+            class_actions = self.class_index.get(name)
+
+            if class_actions is not None:
+                actions = class_actions.merge(actions)
+
+        if (
+            self.title_pattern is not None
+            and title
+            and self.title_pattern.search(title) is not None
+        ):
+            for pattern, title_actions in self.title_rules:
+                if pattern.search(title) is not None:
+                    actions = (
+                        title_actions
+                        if actions is None
+                        else actions.merge(title_actions)
+                    )
+
+        return actions
+
+    def match_window(self, window) -> WindowActions | None:
+        """
+        Finds the actions for a Qtile window.
+
+        Args:
+            window: The window object, providing `get_wm_class()` and `name`.
+
+        Returns:
+            WindowActions | None: The combined actions, or None when no rule matches.
+        """
+        return self.match(window.get_wm_class(), window.name)
+
+    def apply(self, window) -> WindowActions | None:
+        """
+        Applies the matching actions to a Qtile window.
+
+        Args:
+            window: The window object to be checked and updated.
+
+        Returns:
+            WindowActions | None: The applied actions, or None when no rule matches.
+        """
+        actions = self.match_window(window)
+
+        if actions is None:
+            return None
+
+        if actions.floating or actions.center or actions.size:
+            window.floating = True
+
+        if actions.group:
+            window.togroup(actions.group)
+
+        if actions.center or actions.size:
+            width, height = actions.size or DEFAULT_CENTER_SIZE
+
+            window.place(
+                x=0,
+                y=0,
+                width=int(qtile.current_screen.width * width),
+                height=int(qtile.current_screen.height * height),
+                borderwidth=1,
+                bordercolor=self.border_color,
+            )
+            window.center()
+
+        return actions
+
+
+def build_window_rules(
+    settings: AppSettings, center_titles: List[str] = []
+) -> WindowRules:
+    """
+    Compiles the window rules from the settings.
+
+    The `floating` section is compiled into float actions (exact class and exact title),
+    `center_titles` into case-insensitive title searches that float and center the window,
+    and the `window_rules` section into its declared actions. A rule declaring both
+    `wm_class` and `title` matches windows satisfying either of them.
+
+    Args:
+        settings (AppSettings): The application settings containing the rules.
+        center_titles (List[str]): Window titles that should be floated and centered.
+
+    Returns:
+        WindowRules: The compiled rule engine.
+    """
+    class_index: Dict[str, WindowActions] = {}
+    title_rules: List[Tuple[str, WindowActions]] = []
+
+    def _add_class(wm_class: str, actions: WindowActions):
+        class_index[wm_class] = class_index.get(wm_class, WindowActions()).merge(
+            actions
+        )
+
+    for wm_class in settings.floating.get("wm_class", []):
+        _add_class(wm_class, WindowActions(floating=True))
+
+    for title in settings.floating.get("title", []):
+        title_rules.append((f"^{re.escape(title)}$", WindowActions(floating=True)))
+
+    for title in center_titles:
+        title_rules.append(
+            (f"(?i:{re.escape(title)})", WindowActions(floating=True, center=True))
+        )
+
+    for rule in settings.window_rules:
+        actions = WindowActions(
+            floating=rule.floating,
+            center=rule.center,
+            group=rule.group or None,
+            size=tuple(rule.size[:2]) if len(rule.size) >= 2 else None,
+        )
+
+        if rule.wm_class:
+            _add_class(rule.wm_class, actions)
+
+        if rule.title:
+            try:
+                re.compile(rule.title)
+            except re.error as e:
+                logger.warning(f"Invalid window rule title {rule.title}: {e}")
+                continue
+
+            title_rules.append((f"(?:{rule.title})", actions))
+
+    title_pattern = (
+        re.compile("|".join(pattern for pattern, _ in title_rules))
+        if title_rules
+        else None
+    )
+
+    return WindowRules(
+        class_index=class_index,
+        title_pattern=title_pattern,
+        title_rules=[
+            (re.compile(pattern), actions) for pattern, actions in title_rules
+        ],
+        border_color=settings.colors.border_color_active,
+    )
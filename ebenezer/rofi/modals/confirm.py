@@ -7,9 +7,13 @@ YES_LABEL = "󰩐"
 NO_LABEL = ""
 
 
-def confirm_cmd(title, question) -> bool:
+CONFIRM_OPTIONS = f"{YES_LABEL}\n{NO_LABEL}"
+
+
+def build_confirm_cmd(title, question) -> list[str]:
     theme = pkg_resources.files("ebenezer.rofi.modals").joinpath("confirm.rasi")
-    command = [
+
+    return [
         "rofi",
         "-dmenu",
         "-p",
@@ -17,18 +21,22 @@ def confirm_cmd(title, question) -> bool:
         "-mesg",
         question,
         "-theme",
-        theme,
+        str(theme),
     ]
 
-    result = (
-        subprocess.run(
-            command, input=f"{YES_LABEL}\n{NO_LABEL}".encode(), stdout=subprocess.PIPE
-        )
-        .stdout.decode("utf-8")
-        .strip()
-    )
 
-    return result == YES_LABEL
+def is_confirmed(output: str) -> bool:
+    return output.strip() == YES_LABEL
+
+
+def confirm_cmd(title, question) -> bool:
+    result = subprocess.run(
+        build_confirm_cmd(title, question),
+        input=CONFIRM_OPTIONS.encode(),
+        stdout=subprocess.PIPE,
+    ).stdout.decode("utf-8")
+
+    return is_confirmed(result)
 
 
 def main(title: str = "Confirmations", question: str = "Are you sure?"):
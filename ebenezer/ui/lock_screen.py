@@ -1,26 +1,42 @@
-import json
-import random
+import asyncio
 import re
+import sqlite3
 import subprocess
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from pathlib import Path
 from string import Template
-from typing import Callable, List
+from typing import Awaitable, Callable, List
 
-import requests
 from libqtile.log_utils import logger
-from PIL import Image, ImageDraw, ImageFont
 
 from ebenezer.config.settings import AppSettings, load_settings_by_files
+from ebenezer.core.cache import load_compiled, store_compiled
+from ebenezer.core.http import HttpResponse, get_http_client
+from ebenezer.core.jokes import JokeStore, get_joke_store
+from ebenezer.core.lock_image import (
+    IMAGE_FORMAT_RAW,
+    StageTimer,
+    TextOverlay,
+    blur_image,
+    compose_overlay,
+    grab_screen,
+    render_text_overlay,
+    resolve_blur,
+    screen_size,
+    write_image,
+    write_raw_image,
+)
 from ebenezer.core.notify import push_notification_no_history
-from ebenezer.core.requests import request_retry
+from ebenezer.core.requests import endpoint_of, request_retry_async
 from ebenezer.core.theme import preload_colors
 
 OUTPUT_FILE = "/tmp/i3lock.png"
-QUOTE_OUTPUT_FILE = "/tmp/quote.png"
-JOKE_CACHE_FILE = "/tmp/jokes_cache_from"
+RAW_OUTPUT_FILE = "/dev/shm/i3lock.raw"
+RAW_OUTPUT_FILE_FALLBACK = "/tmp/i3lock.raw"
 NO_JOKES = "No jokes!"
-CACHE_FILE_LIMIT = 8 * 3600  # 8 hours
+JOKE_OVERLAY_ARTIFACT = "lock_joke_overlay"
 
 
 def _is_i3lock_running():
@@ -34,18 +50,18 @@ def _is_i3lock_running():
 def _remove_emojis(text):
     emoji_pattern = re.compile(
         "["  # Start of character class
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F700-\U0001F77F"  # alchemical symbols
-        "\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
-        "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-        "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-        "\U0001FA00-\U0001FA6F"  # Chess Symbols
-        "\U00002700-\U000027BF"  # Dingbats
-        "\u2600-\u26FF"  # Misc symbols
-        "\u2700-\u27BF"  # Dingbats
-        "\u2B50"  # Star
+        "\U0001f600-\U0001f64f"  # emoticons
+        "\U0001f300-\U0001f5ff"  # symbols & pictographs
+        "\U0001f680-\U0001f6ff"  # transport & map symbols
+        "\U0001f700-\U0001f77f"  # alchemical symbols
+        "\U0001f780-\U0001f7ff"  # Geometric Shapes Extended
+        "\U0001f800-\U0001f8ff"  # Supplemental Arrows-C
+        "\U0001f900-\U0001f9ff"  # Supplemental Symbols and Pictographs
+        "\U0001fa00-\U0001fa6f"  # Chess Symbols
+        "\U00002700-\U000027bf"  # Dingbats
+        "\u2600-\u26ff"  # Misc symbols
+        "\u2700-\u27bf"  # Dingbats
+        "\u2b50"  # Star
         "]+",
         flags=re.UNICODE,
     )
@@ -53,155 +69,290 @@ def _remove_emojis(text):
     return emoji_pattern.sub(r"", text)
 
 
-def _maybe_fetch_cached_response(
-    file: Path, do_request: Callable[[], requests.Response]
-) -> tuple[dict, int]:
-    data: dict = {}
-    status_code = 404
-
-    if (
-        file.exists()
-        and file.stat().st_size > 0
-        and (time.time() - file.stat().st_mtime) < CACHE_FILE_LIMIT
-    ):
-        logger.warning("🔥 uses cache for lock_screen")
-        with open(file, "r") as f:
-            status_code = 200
-            data = json.loads(f.read())
-    else:
-        logger.warning("❄️ uses request for lock_screen")
-        response = request_retry(do_request)
-        status_code = response.status_code
-
-        if status_code == requests.codes.ok:
-            _write_response_cache(file, response.text)
-            data = response.json()
+def _fetch_jokes_from_icanhazdadjoke(
+    settings: AppSettings,
+) -> Callable[[], Awaitable[List[str]]]:
+    url = settings.lock_screen.icanhazdad_joke_url
 
-    return data, status_code
+    async def _inner():
+        data = await _fetch_json(url)
+        joke_content = data.get("joke")
 
+        if joke_content is None:
+            raise RuntimeError(f"no joke in the answer of {url}")
 
-def _write_response_cache(file: Path, content: str):
-    with open(file, "w") as f:
-        f.write(content)
-        logger.warning(f"the cache was written for {file}")
+        return [_remove_emojis(joke_content)]
 
+    return _inner
 
-def _get_joke_from_icanhazdadjoke(settings: AppSettings) -> Callable[[], str]:
-    file = Path(JOKE_CACHE_FILE + "_icanhazdadjoke.json")
 
-    def _do_request() -> requests.Response:
-        headers = {"Accept": "application/json"}
-        return requests.get(settings.lock_screen.icanhazdad_joke_url, headers=headers)
+def _fetch_jokes_from_reddit(
+    settings: AppSettings,
+) -> Callable[[], Awaitable[List[str]]]:
+    url = settings.lock_screen.reddit_joke_url
 
-    def _inner():
-        data, status_code = _maybe_fetch_cached_response(file, _do_request)
-        joke_content = data.get("joke")
+    async def _inner():
+        data = await _fetch_json(url)
+        jokes = []
 
-        if joke_content is None:
-            raise "Something went wrong: {}".format(status_code)
+        for joke in data.get("data").get("children") or []:
+            joke_content = joke.get("data")
+            punchline = re.sub(
+                "&amp;#x200B;", "", _remove_emojis(joke_content.get("selftext"))
+            )
+            jokes.append(f"{_remove_emojis(joke_content.get("title"))}\n{punchline}")
 
-        return _remove_emojis(joke_content)
+        return jokes
 
     return _inner
 
 
-def _get_joke_from_reddit(settings: AppSettings) -> Callable[[], str]:
-    file = Path(JOKE_CACHE_FILE + "_reddit.json")
-
-    def _do_request():
+async def _fetch_json(url: str) -> dict:
+    async def _do_request() -> HttpResponse:
         headers = {"Accept": "application/json"}
-        return requests.get(settings.lock_screen.reddit_joke_url, headers=headers)
+        return await get_http_client().get(url, headers=headers)
 
-    def _inner():
-        data, status_code = _maybe_fetch_cached_response(file, _do_request)
+    response = await request_retry_async(_do_request, endpoint=endpoint_of(url))
 
-        if status_code != requests.codes.ok:
-            raise "Something went wrong: {}".format(status_code)
+    if response.status != HTTPStatus.OK:
+        raise RuntimeError("Something went wrong: {}".format(response.status))
 
-        jokes = data.get("data").get("children") or []
-        joke = random.choice(jokes)
-        joke_content = joke.get("data")
+    return response.json()
 
-        punchline = re.sub(
-            "&amp;#x200B;", "", _remove_emojis(joke_content.get("selftext"))
-        )
 
-        return f"{_remove_emojis(joke_content.get("title"))}\n{punchline}"
+def _load_joke_providers(settings: AppSettings):
+    return {
+        "reddit": _fetch_jokes_from_reddit(settings),
+        "icanhazdad": _fetch_jokes_from_icanhazdadjoke(settings),
+    }
 
-    return _inner
 
+def _select_joke_providers(
+    settings: AppSettings,
+) -> dict[str, Callable[[], Awaitable[List[str]]]]:
+    joke_providers = _load_joke_providers(settings)
 
-def _load_joke_providers(settings: AppSettings):
     return {
-        "reddit": _get_joke_from_reddit(settings),
-        "icanhazdad": _get_joke_from_icanhazdadjoke(settings),
+        key: joke_providers[key]
+        for key in settings.lock_screen.joke_providers
+        if key in joke_providers
+    }
+
+
+async def _race_jokes_async(
+    settings: AppSettings, store: JokeStore, timeout: float
+) -> str | None:
+    """
+    Queries every selected provider at once and stores the first answer with jokes.
+
+    The other providers are cancelled as soon as one answers, and all of them when none
+    answers within the timeout, so a dead provider never delays locking the screen.
+    """
+    tasks = {
+        asyncio.ensure_future(provider()): key
+        for key, provider in _select_joke_providers(settings).items()
     }
+    pending = set(tasks)
+
+    try:
+        async with asyncio.timeout(timeout):
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    if task.exception() is not None:
+                        logger.warning(
+                            f"error while fetching jokes from {tasks[task]}: {task.exception()}"
+                        )
+                    elif task.result():
+                        store.add(tasks[task], task.result())
+                        return store.next()
+    except TimeoutError:
+        logger.warning(f"no joke provider answered within {timeout}s")
+    finally:
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return None
+
+
+async def _refill_jokes_async(settings: AppSettings, store: JokeStore) -> int:
+    joke_providers = _select_joke_providers(settings)
+    joke_providers_selected = list(joke_providers)
+
+    results = await asyncio.gather(
+        *[joke_providers[key]() for key in joke_providers_selected],
+        return_exceptions=True,
+    )
+    added = 0
+
+    for key, result in zip(joke_providers_selected, results):
+        if isinstance(result, Exception):
+            logger.warning(f"error while fetching jokes from {key}: {result}")
+            continue
+
+        added += store.add(key, result)
+
+    return added
+
+
+def _refill_jokes(settings: AppSettings, store: JokeStore | None = None) -> int:
+    """
+    Fetches jokes from every selected provider into the joke store.
+    """
+    store = store or get_joke_store()
+    added = asyncio.run(_refill_jokes_async(settings, store))
+    logger.info(f"{added} new joke(s) stored, {store.unseen()} unseen")
+
+    return added
+
+
+def _refill_jokes_in_background(settings: AppSettings) -> threading.Thread | None:
+    """
+    Refills the joke store in a thread when it runs low, e.g. while the screen is locked.
+    """
+    store = get_joke_store()
+
+    try:
+        if not store.needs_refill():
+            return None
+    except sqlite3.Error as e:
+        logger.warning(f"error while reading the joke store: {e}")
+        return None
+
+    thread = threading.Thread(
+        target=_refill_jokes, args=(settings, store), name="jokes", daemon=True
+    )
+    thread.start()
+
+    return thread
 
 
 def _get_joke(settings: AppSettings) -> str:
-    joke_providers = _load_joke_providers(settings)
-    joke_providers_selected = [
-        key for key in settings.lock_screen.joke_providers if key in joke_providers
-    ]
-    random.shuffle(joke_providers_selected)
+    store = get_joke_store()
+
+    try:
+        joke = store.next()
 
-    for joke_provider_key in joke_providers_selected:
-        try:
-            return joke_providers[joke_provider_key]()
-        except:
-            next
+        if joke is None:
+            # the store is empty, e.g. on the first lock after the installation
+            joke = asyncio.run(
+                _race_jokes_async(settings, store, settings.lock_screen.joke_timeout)
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"error while reading the joke store: {e}")
+        return NO_JOKES
 
-    return NO_JOKES
+    return joke or NO_JOKES
 
 
-def _remove_output_files():
-    for raw_filepath in [OUTPUT_FILE, QUOTE_OUTPUT_FILE]:
-        file_path = Path(raw_filepath)
+def _build_joke_image(
+    settings: AppSettings, joke: str, width: int, height: int
+) -> TextOverlay:
+    return render_text_overlay(
+        (width, height),
+        joke,
+        font_path=settings.lock_screen.quote_font_path,
+        font_size=settings.lock_screen.quote_font_size,
+        background=settings.colors.lock_screen_quote_foreground_color,
+        foreground=settings.colors.lock_screen_quote_text_color,
+    )
+
 
-        if file_path.exists():
-            file_path.unlink()
+def _joke_overlay_artifact(size: tuple[int, int]) -> str:
+    width, height = size
+    return f"{JOKE_OVERLAY_ARTIFACT}_{width}x{height}"
 
 
-def _build_joke_image(settings: AppSettings, joke: str, width: int, height: int):
-    img = Image.new(
-        "RGB", (width, height), color=settings.colors.lock_screen_quote_foreground_color
+def _joke_overlay_style(settings: AppSettings) -> tuple:
+    return (
+        settings.lock_screen.quote_font_size,
+        settings.colors.lock_screen_quote_foreground_color,
+        settings.colors.lock_screen_quote_text_color,
     )
-    draw = ImageDraw.Draw(img)
 
-    font = ImageFont.truetype(
-        settings.lock_screen.quote_font_path, settings.lock_screen.quote_font_size
+
+def _load_joke_overlay(
+    settings: AppSettings, size: tuple[int, int]
+) -> TextOverlay | None:
+    cached = load_compiled(
+        _joke_overlay_artifact(size), [settings.lock_screen.quote_font_path]
     )
 
-    bbox = draw.textbbox((0, 0), joke, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
+    if cached is None or cached.get("style") != _joke_overlay_style(settings):
+        return None
 
-    position = ((width - text_width) // 2, ((height - text_height) // 2) * 0.2)
+    return cached.get("overlay")
 
-    draw.text(
-        position,
-        joke,
-        font=font,
-        fill=settings.colors.lock_screen_quote_text_color,
+
+def _prepare_joke_overlay(settings: AppSettings, size: tuple[int, int] | None = None):
+    """
+    Renders the joke overlay of the next lock for the screen size and caches it.
+    """
+    size = size or screen_size()
+
+    if size is None:
+        logger.warning("the screen size is unknown, skipping the joke overlay")
+        return
+
+    overlay = _build_joke_image(settings, _get_joke(settings), *size)
+    store_compiled(
+        _joke_overlay_artifact(size),
+        [settings.lock_screen.quote_font_path],
+        {"style": _joke_overlay_style(settings), "overlay": overlay},
     )
 
-    img.save(QUOTE_OUTPUT_FILE)
 
+def _build_background(
+    settings: AppSettings, output_file: str, timer: StageTimer | None = None
+) -> str | None:
+    timer = timer or StageTimer()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with timer.stage("grab"):
+            screenshot = grab_screen()
+
+        overlay = _load_joke_overlay(settings, screenshot.size)
+        joke_future = None
+
+        if overlay is None:
+            # the joke is fetched while the screen is blurred
+            joke_future = executor.submit(_get_joke, settings)
 
-def _build_background(settings: AppSettings, output_file: str):
-    background = Image.open(output_file)
-    width, height = background.size
+        with timer.stage("blur"):
+            sigma, quality = resolve_blur(
+                settings.lock_screen.blurtype, settings.lock_screen.blur_quality
+            )
+            background = blur_image(screenshot, sigma, quality)
 
-    joke = _get_joke(settings)
-    _build_joke_image(settings, joke=joke, width=width, height=height)
+        if joke_future is not None:
+            with timer.stage("joke"):
+                joke = joke_future.result()
+                overlay = _build_joke_image(settings, joke, *background.size)
 
-    overlay = Image.open(QUOTE_OUTPUT_FILE)
+    with timer.stage("overlay"):
+        image = compose_overlay(background, overlay)
 
-    background = background.convert("RGBA")
-    overlay = overlay.convert("RGBA")
+    with timer.stage("write"):
+        if settings.lock_screen.image_format == IMAGE_FORMAT_RAW:
+            return write_raw_image(image, output_file)
 
-    new_img = Image.blend(background, overlay, 0.5)
-    new_img.save(OUTPUT_FILE, "PNG")
+        write_image(image, output_file)
+        return None
+
+
+def _output_file(settings: AppSettings) -> str:
+    if settings.lock_screen.image_format != IMAGE_FORMAT_RAW:
+        return OUTPUT_FILE
+
+    if Path(RAW_OUTPUT_FILE).parent.is_dir():
+        return RAW_OUTPUT_FILE
+
+    return RAW_OUTPUT_FILE_FALLBACK
 
 
 def _run_command(commands: List[List[str]]):
@@ -211,41 +362,21 @@ def _run_command(commands: List[List[str]]):
 
 
 def _prepare_joke_cache(settings: AppSettings):
-    joke_providers = _load_joke_providers(settings)
-    joke_providers_selected = [
-        key for key in settings.lock_screen.joke_providers if key in joke_providers
-    ]
-
-    for joke_provider_key in joke_providers_selected:
-        try:
-            joke_providers[joke_provider_key]()
-        except Exception as e:
-            logger.exception("Error while trying to prepare jokes caches: %s", e)
-            next
-
-
-def _prepare_lock_screen(settings: AppSettings):
-    start_time = time.time()
-
-    _remove_output_files()
-
-    _run_command(
-        [
-            [
-                "scrot",
-                "-o",
-                "-e",
-                f"magick convert $f -blur {settings.lock_screen.blurtype} {OUTPUT_FILE}",
-                OUTPUT_FILE,
-            ]
-        ]
-    )
+    if get_joke_store().needs_refill():
+        _refill_jokes(settings)
+
+
+def _prepare_lock_screen(settings: AppSettings) -> tuple[str, str | None]:
+    timer = StageTimer()
+    output_file = _output_file(settings)
+
+    raw = _build_background(settings, output_file, timer)
 
-    _build_background(settings, OUTPUT_FILE)
+    logger.warning(
+        f"Time taken to prepare lock the screen: {timer.total:.2f} seconds ({timer})"
+    )
 
-    end_time = time.time()
-    elapsed_time = end_time - start_time
-    logger.warning(f"Time taken to prepare lock the screen: {elapsed_time:.2f} seconds")
+    return output_file, raw
 
 
 def _lock_screen_i3(settings: AppSettings):
@@ -254,11 +385,25 @@ def _lock_screen_i3(settings: AppSettings):
         return
 
     push_notification_no_history("󰌾 Locking screen in seconds...", "")
-    _prepare_lock_screen(settings)
-    _run_i3_lock(settings)
+    image, raw = _prepare_lock_screen(settings)
+    refill = _refill_jokes_in_background(settings)
+
+    try:
+        _run_i3_lock(settings, image=image, raw=raw)
+    finally:
+        if raw is not None:
+            # a raw frame takes tens of megabytes of tmpfs
+            Path(image).unlink(missing_ok=True)
+
+    if refill is not None:
+        refill.join()
+
+    _prepare_joke_overlay(settings)
 
 
-def _run_i3_lock(settings: AppSettings):
+def _run_i3_lock(
+    settings: AppSettings, image: str = OUTPUT_FILE, raw: str | None = None
+):
     """
     Executes the i3lock command with the specified settings.
     This function constructs a command to run i3lock with various options
@@ -267,6 +412,9 @@ def _run_i3_lock(settings: AppSettings):
     Args:
         settings (AppSettings): An instance of AppSettings containing the
                                 configuration for the lock screen.
+        image (str): The path of the lock screen image.
+        raw (str | None): The `--raw` geometry and pixel format when the image
+                          holds raw pixels, e.g. "3840x2160:rgbx".
     Raises:
         KeyError: If any required setting is missing from the settings object.
         subprocess.CalledProcessError: If the i3lock command fails to execute.
@@ -287,8 +435,7 @@ def _run_i3_lock(settings: AppSettings):
                 lock_screen_verifying_color="0000ff"
         run_i3_lock(settings)
     """
-    cmd_template = Template(
-        """
+    cmd_template = Template("""
     i3lock
     --nofork
     -i
@@ -323,11 +470,10 @@ def _run_i3_lock(settings: AppSettings):
     --indicator
     --clock
     --time-str=%H:%M
-    """
-    )
+    """)
 
     cmd_options = cmd_template.substitute(
-        image=OUTPUT_FILE,
+        image=image,
         font=settings.lock_screen.font,
         font_size=settings.lock_screen.font_size,
         font_size_medium=int(settings.lock_screen.font_size / 1.8),
@@ -342,12 +488,17 @@ def _run_i3_lock(settings: AppSettings):
     ).strip()
 
     cmd_options = re.sub(r"\s+", " ", cmd_options)
+    cmd = cmd_options.split(" ")
+
+    if raw is not None:
+        cmd.append(f"--raw={raw}")
 
-    _run_command([cmd_options.split(" ")])
+    _run_command([cmd])
 
 
 def _startup(settings: AppSettings):
     _prepare_joke_cache(settings)
+    _prepare_joke_overlay(settings)
 
 
 def main(
@@ -1,4 +1,5 @@
 import os
+import shlex
 
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
@@ -6,6 +7,7 @@ from ttkbootstrap.constants import *
 from ebenezer.commands.helpers import run_command
 from ebenezer.config.settings import AppSettings
 from ebenezer.core.files import resolve_file_path
+from ebenezer.core.wallpaper_daemon import NO_DAEMON_ERRORS, send_command
 from ebenezer.core.yaml import update_yaml_property
 from ebenezer.ui.settings.helpers import restart_qtile
 from ebenezer.ui.settings.styles import build_fonts
@@ -77,7 +79,18 @@ class WallpaperFrame(ttk.Frame):
         if not wallpaper_dir:
             return
 
-        run_command(f"ebenezer wallpaper set {wallpaper_dir}")
+        # the daemon does not share the working directory nor expand the home
+        wallpaper_dir = os.path.abspath(os.path.expanduser(wallpaper_dir))
+
+        try:
+            answer = send_command("set", wallpaper_dir)
+        except NO_DAEMON_ERRORS:
+            answer = {"ok": False}
+
+        if not answer.get("ok"):
+            run_command(
+                f"ebenezer wallpaper set --no-daemon {shlex.quote(wallpaper_dir)}"
+            )
 
     def _load_themes(self):
         themes = [""]
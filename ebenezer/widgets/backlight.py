@@ -4,6 +4,7 @@ from libqtile.lazy import lazy
 
 import ebenezer.commands.backlight as backlight_cmd
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.coalesce import LevelController
 from ebenezer.core.notify import push_notification_progress
 from ebenezer.widgets.helpers.args import build_widget_args
 
@@ -48,13 +49,7 @@ def _get_backlight_level() -> int:
 def _backlight_up():
     @lazy.function
     def _inner(_):
-        level = _get_backlight_level()
-
-        if level >= 100:
-            return
-
-        backlight_cmd.backlight_up()
-        _push_backlight_notification(NOTIFICATION_TITLE)
+        _backlight_controller.change(backlight_cmd.BACKLIGHT_STEP)
 
     return _inner
 
@@ -62,8 +57,7 @@ def _backlight_up():
 def __backlight_down():
     @lazy.function
     def _inner(_):
-        backlight_cmd.backlight_down()
-        _push_backlight_notification(NOTIFICATION_TITLE)
+        _backlight_controller.change(-backlight_cmd.BACKLIGHT_STEP)
 
     return _inner
 
@@ -82,6 +76,17 @@ def _push_backlight_notification(message: str):
     push_notification_progress(message=message, progress=level)
 
 
+def _on_backlight_applied(_: int, level: int):
+    push_notification_progress(message=f"{NOTIFICATION_TITLE} {level}%", progress=level)
+
+
+_backlight_controller = LevelController(
+    read_level=_get_backlight_level,
+    apply_delta=backlight_cmd.backlight_change,
+    on_applied=_on_backlight_applied,
+)
+
+
 def setup_backlight_keys():
     """
     Sets up key bindings for adjusting the backlight brightness.
@@ -1,12 +1,14 @@
+import psutil
 from libqtile import widget
 from libqtile.widget import CPU
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.widgets.formatter import burn_text
+from ebenezer.core.metrics import MetricsSnapshot
 from ebenezer.widgets.helpers.args import build_widget_args
+from ebenezer.widgets.helpers.metrics import MetricsWidgetMixin
 
 
-class ColorizedCPUWidget(CPU):
+class ColorizedCPUWidget(MetricsWidgetMixin, CPU):
     """
     A widget that enhances the user experience by displaying CPU usage using color and icons.
 
@@ -21,8 +23,8 @@ class ColorizedCPUWidget(CPU):
         __init__(**config):
             Initializes the ColorizedCPUWidget with the given configuration.
 
-        poll():
-            Polls the current CPU usage and updates the widget's display color based on the usage thresholds.
+        format_metrics(snapshot: MetricsSnapshot) -> str:
+            Formats the CPU usage of a metrics snapshot and updates the widget's display color based on the usage thresholds.
     """
 
     def __init__(self, **config):
@@ -41,19 +43,18 @@ class ColorizedCPUWidget(CPU):
             "threshold_high", settings.monitoring.threshold_high
         )
 
-    def poll(self):
-        text = CPU.poll(self)
-        cpu = float(text.replace("%", ""))
+    def format_metrics(self, snapshot: MetricsSnapshot) -> str:
+        current, freq_min, freq_max = snapshot.cpu_freq
+        freq_unit = 1 if psutil.__version__ == "5.9.0" else 1000
 
-        if cpu > self.threshold_high:
-            self.foreground = self.high_color
-            text = burn_text(text)
-        elif cpu > self.threshold_medium:
-            self.foreground = self.medium_color
-        else:
-            self.foreground = self.default_color
+        text = self.format.format(
+            load_percent=round(snapshot.cpu_percent, 1),
+            freq_current=round(current / freq_unit, 1),
+            freq_max=round(freq_max / 1000, 1),
+            freq_min=round(freq_min / 1000, 1),
+        )
 
-        return text
+        return self.colorize(snapshot.cpu_percent, text)
 
 
 def build_cpu_widget(settings: AppSettings, kwargs: dict):
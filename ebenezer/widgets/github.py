@@ -1,4 +1,3 @@
-import requests
 from libqtile import widget
 from libqtile.lazy import lazy
 from libqtile.log_utils import logger
@@ -6,14 +5,22 @@ from libqtile.widget import base
 
 from ebenezer.config.settings import AppSettings
 from ebenezer.core.command import build_shell_command
-from ebenezer.core.requests import request_retry
+from ebenezer.core.github import GitHubNotificationsClient
+from ebenezer.core.http_cache import get_response_cache
+from ebenezer.core.requests import CircuitOpenError, endpoint_of, request_retry_async
 from ebenezer.widgets.helpers.args import build_widget_args
+from ebenezer.widgets.helpers.poll import AsyncPollText
 
 
-class GitHubNotifications(base.ThreadPoolText):
+class GitHubNotifications(AsyncPollText):
     """
     A widget that fetches GitHub notifications.
 
+    The widget polls on Qtile's event loop through a `GitHubNotificationsClient`, which
+    shares the pooled HTTP client and asks GitHub only for changes, and never polls more
+    often than the interval advertised by GitHub. The last known count is shown from the
+    response cache before the first poll answers.
+
     Attributes:
         orientations (str): The orientation of the widget, set to horizontal.
         defaults (list): Default configuration options for the widget.
@@ -25,7 +32,7 @@ class GitHubNotifications(base.ThreadPoolText):
         __init__(**config):
             Initializes the GitHubNotifications widget with the given configuration.
 
-        poll():
+        apoll():
             Fetches the latest GitHub notifications and updates the widget display.
             Returns a string representing the number of notifications or an error message.
     """
@@ -46,45 +53,54 @@ class GitHubNotifications(base.ThreadPoolText):
             "token", self.settings.environment.github_notifications_token
         )
         self.add_defaults(GitHubNotifications.defaults)
+        self.client = (
+            GitHubNotificationsClient(self.token, cache=get_response_cache())
+            if self.token
+            else None
+        )
+        self.min_update_interval = self.update_interval
 
-    def poll(self):
-        if self.token is None:
+    async def apoll(self):
+        if self.client is None:
             return "No github token"
 
+        if self.client.count is None:
+            restored = self.client.restore()
+
+            if restored is not None:
+                self.update(self._format_count(restored))
+
         try:
+            count = await request_retry_async(
+                self.client.fetch_count, endpoint=endpoint_of(self.client.url)
+            )
 
-            def _do_request():
-                headers = {
-                    "Authorization": f"token {self.token}",
-                    "Accept": "application/vnd.github.v3+json",
-                }
-
-                return requests.get(
-                    "https://api.github.com/notifications", headers=headers
-                )
-
-            response = request_retry(_do_request)
-            status_code = response.status_code
-
-            if status_code == 200:
-                notifications = response.json()
-                count = len(notifications)
-
-                if count == 0:
-                    self.icon.foreground = self.icon.foreground_normal
-                    self.icon.text = ""
-                    return ""
-                else:
-                    self.icon.text = self.icon.base_text
-                    self.icon.foreground = self.icon.foreground_alert
-                    return f"{count}+"
+            self.update_interval = max(
+                self.min_update_interval or 0, self.client.poll_interval
+            )
+
+            if count is not None:
+                return self._format_count(count)
             else:
-                logger.warning("GitHub API Error... {status_code}")
+                logger.warning(f"GitHub API Error... {self.client.status_code}")
                 return " "
+        except CircuitOpenError as e:
+            logger.debug(f"GitHub Notifications skipped: {e}")
+            return " "
         except Exception as e:
-            logger.warning(f"GitHub Notifications Error: {e}", exc_info=True)
+            logger.warning(f"GitHub Notifications Error: {e}")
             return " "
 
+    def _format_count(self, count: int) -> str:
+        if count == 0:
+            self.icon.foreground = self.icon.foreground_normal
+            self.icon.text = ""
+            return ""
+
+        self.icon.text = self.icon.base_text
+        self.icon.foreground = self.icon.foreground_alert
+        return f"{count}+"
+
 
 def build_github_widget(settings: AppSettings, kwargs: dict):
     """
@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+
+from ebenezer.core.metrics import MetricsSnapshot, get_metrics_sampler
+from ebenezer.widgets.formatter import burn_text
+
+
+class MetricsWidgetMixin(ABC):
+    """
+    A mixin for text widgets fed by the shared metrics sampler instead of polling on their own.
+
+    Widgets must define `high_color`, `medium_color`, `default_color`, `threshold_medium`
+    and `threshold_high`, and implement `format_metrics(snapshot)`.
+
+    Methods:
+        timer_setup():
+            Subscribes the widget to the shared metrics sampler.
+
+        finalize():
+            Unsubscribes the widget from the shared metrics sampler.
+
+        poll() -> str:
+            Formats the latest snapshot, sampling one when there is none yet.
+
+        update_metrics(snapshot: MetricsSnapshot):
+            Updates the widget text from a snapshot.
+
+        colorize(value: float, text: str) -> str:
+            Updates the widget color for a value and burns the text above the high threshold.
+    """
+
+    def timer_setup(self):
+        get_metrics_sampler().subscribe(self.update_metrics, self.update_interval)
+
+    def finalize(self):
+        get_metrics_sampler().unsubscribe(self.update_metrics)
+        super().finalize()
+
+    def poll(self):
+        sampler = get_metrics_sampler()
+        return self.format_metrics(sampler.latest or sampler.sample())
+
+    def update_metrics(self, snapshot: MetricsSnapshot):
+        self.update(self.format_metrics(snapshot))
+
+    @abstractmethod
+    def format_metrics(self, snapshot: MetricsSnapshot) -> str:
+        """
+        Formats the widget text from a snapshot.
+        """
+
+    def colorize(self, value: float, text: str) -> str:
+        if value > self.threshold_high:
+            self.foreground = self.high_color
+            return burn_text(text)
+
+        if value > self.threshold_medium:
+            self.foreground = self.medium_color
+        else:
+            self.foreground = self.default_color
+
+        return text
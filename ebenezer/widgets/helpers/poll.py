@@ -0,0 +1,70 @@
+from libqtile.log_utils import logger
+from libqtile.utils import create_task
+from libqtile.widget import base
+
+
+class AsyncPollMixin:
+    """
+    A mixin for text widgets polled by a coroutine on Qtile's event loop instead of an executor thread.
+
+    Widgets implement `apoll()`, which awaits its I/O (e.g. the shared HTTP client) and
+    returns the new text, or None to keep the current one. Mixed before a
+    `base.ThreadPoolText` subclass, it replaces the thread polling of that widget.
+
+    Methods:
+        timer_setup():
+            Schedules a poll on the event loop.
+
+        finalize():
+            Cancels the running poll.
+
+        apoll() -> str | None:
+            Returns the new widget text.
+    """
+
+    _poll_task = None
+
+    def timer_setup(self):
+        self._poll_task = create_task(self._tick())
+
+    def finalize(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+
+        super().finalize()
+
+    async def apoll(self) -> str | None:
+        return "N/A"
+
+    async def _tick(self):
+        try:
+            text = await self.apoll()
+
+            if text is not None:
+                self.update(text)
+        except Exception:
+            logger.exception("apoll() raised exceptions")
+
+        self._poll_task = None
+
+        if self.update_interval is not None:
+            self.timeout_add(self.update_interval, self.timer_setup)
+
+
+class AsyncPollText(AsyncPollMixin, base._TextBox):
+    """
+    A text widget polled by a coroutine on Qtile's event loop instead of an executor thread.
+    """
+
+    defaults = [
+        (
+            "update_interval",
+            600,
+            "Update interval in seconds, if none, the widget updates only once.",
+        ),
+    ]
+
+    def __init__(self, default_text="N/A", **config):
+        super().__init__(default_text, **config)
+        self.add_defaults(AsyncPollText.defaults)
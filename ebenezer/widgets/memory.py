@@ -1,13 +1,13 @@
-import psutil
 from libqtile import widget
 from libqtile.widget import Memory
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.widgets.formatter import burn_text
+from ebenezer.core.metrics import MetricsSnapshot
 from ebenezer.widgets.helpers.args import build_widget_args
+from ebenezer.widgets.helpers.metrics import MetricsWidgetMixin
 
 
-class ColorizedMemoryWidget(Memory):
+class ColorizedMemoryWidget(MetricsWidgetMixin, Memory):
     """
     A widget that displays memory usage with color-coded thresholds.
 
@@ -21,8 +21,8 @@ class ColorizedMemoryWidget(Memory):
     Methods:
         __init__(**config):
             Initializes the ColorizedMemoryWidget with the given configuration.
-        poll():
-            Polls the current memory usage and updates the widget's display color based on the usage thresholds.
+        format_metrics(snapshot: MetricsSnapshot) -> str:
+            Formats the memory usage of a metrics snapshot and updates the widget's display color based on the usage thresholds.
     """
 
     def __init__(self, **config):
@@ -41,19 +41,28 @@ class ColorizedMemoryWidget(Memory):
             "threshold_high", settings.monitoring.threshold_high
         )
 
-    def poll(self):
-        mem = psutil.virtual_memory()
-        text = Memory.poll(self).lstrip()
-
-        if mem.percent > self.threshold_high:
-            self.foreground = self.high_color
-            text = burn_text(text)
-        elif mem.percent > self.threshold_medium:
-            self.foreground = self.medium_color
-        else:
-            self.foreground = self.default_color
+    def format_metrics(self, snapshot: MetricsSnapshot) -> str:
+        mem = snapshot.memory
+        text = self.format.format(
+            MemUsed=mem.used / self.calc_mem,
+            MemTotal=mem.total / self.calc_mem,
+            MemFree=mem.free / self.calc_mem,
+            Available=mem.available / self.calc_mem,
+            NotAvailable=(mem.total - mem.available) / self.calc_mem,
+            MemPercent=mem.percent,
+            Buffers=mem.buffers / self.calc_mem,
+            Active=mem.active / self.calc_mem,
+            Inactive=mem.inactive / self.calc_mem,
+            Shmem=mem.shared / self.calc_mem,
+            SwapTotal=mem.swap_total / self.calc_swap,
+            SwapFree=mem.swap_free / self.calc_swap,
+            SwapUsed=mem.swap_used / self.calc_swap,
+            SwapPercent=mem.swap_percent,
+            mm=self.measure_mem,
+            ms=self.measure_swap,
+        )
 
-        return text.strip()
+        return self.colorize(mem.percent, text.strip()).strip()
 
 
 def build_memory_widget(settings: AppSettings, kwargs: dict):
@@ -1,29 +1,40 @@
-import subprocess
-
 from libqtile.widget import base
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.core.command import run_shell_command
-from ebenezer.rofi.modals.confirm import confirm_cmd
+from ebenezer.core.command import CommandResult, spawn_command
+from ebenezer.core.dunst import DunstCounts, get_dunst_events, read_dunstctl_count
+from ebenezer.rofi.modals.confirm import (
+    CONFIRM_OPTIONS,
+    build_confirm_cmd,
+    is_confirmed,
+)
 from ebenezer.widgets.helpers.args import build_widget_args
 
 
+def _on_notifications_confirm(result: CommandResult):
+    if is_confirmed(result.stdout):
+        spawn_command(["dunstctl", "history-clear"])
+    else:
+        spawn_command(["dunstctl", "close-all"])
+
+
 def _notifications_actions():
-    confirmed = confirm_cmd(
-        "Confirm",
-        "Would you like to clear notifications?",
+    return spawn_command(
+        build_confirm_cmd("Confirm", "Would you like to clear notifications?"),
+        on_complete=_on_notifications_confirm,
+        capture_output=True,
+        input=CONFIRM_OPTIONS,
     )
 
-    if confirmed:
-        run_shell_command("dunstctl history-clear")
-    else:
-        run_shell_command("dunstctl close-all")
-
 
 class DunstWidget(base.ThreadPoolText):
     """
     A widget to display the count of notifications using dunst.
 
+    The count comes from the shared dunst watcher, which listens to dunst over D-Bus
+    (or polls `dunstctl` slowly without it), and the widget redraws only when the count
+    changes. The update interval is only used to animate the bell.
+
     Attributes:
         defaults (list): Default configuration options for the widget.
         count (int): The current count of notifications.
@@ -34,6 +45,9 @@ class DunstWidget(base.ThreadPoolText):
         foreground_count (str): Foreground color when there are notifications.
 
     Methods:
+        timer_setup(): Subscribes the widget to the dunst counts.
+        finalize(): Unsubscribes the widget from the dunst counts.
+        update_counts(counts): Updates the widget with the history count.
         poll(): Updates the widget with the current notification count.
         get_bell_icon(): Returns the current bell icon based on the animation setting.
         get_notification_count(): Retrieves the current notification count from dunst.
@@ -42,7 +56,7 @@ class DunstWidget(base.ThreadPoolText):
     """
 
     defaults = [
-        ("update_interval", 3, "Interval to update the notification count"),
+        ("update_interval", 3, "Interval to animate the bell"),
     ]
 
     def __init__(self, **config):
@@ -67,9 +81,25 @@ class DunstWidget(base.ThreadPoolText):
             }
         )
 
+    def timer_setup(self):
+        get_dunst_events().subscribe(self.update_counts)
+
+        if self.animated:
+            super().timer_setup()
+
+    def finalize(self):
+        get_dunst_events().unsubscribe(self.update_counts)
+        super().finalize()
+
+    def update_counts(self, counts: DunstCounts):
+        self.count = counts.history
+        self.update(self._format_count())
+
     def poll(self):
         self.count = self.get_notification_count()
+        return self._format_count()
 
+    def _format_count(self):
         if self.count == 0:
             self.foreground = self.foreground_zero
             return ""
@@ -86,27 +116,21 @@ class DunstWidget(base.ThreadPoolText):
         return self.bells[self.bells_index]
 
     def get_notification_count(self):
-        try:
-            output = (
-                subprocess.check_output(["dunstctl", "count"]).decode("utf-8").strip()
-            )
-
-            lines = output.splitlines()
+        counts = get_dunst_events().latest
 
-            history_count = int(lines[2].split(":")[1].strip())
+        if counts is None:
+            counts = read_dunstctl_count()
 
-            return history_count
-        except Exception:
-            return 0
+        return counts.history
 
     def show_notifications(self):
-        subprocess.Popen(["dunstctl", "history-pop"])
+        spawn_command(["dunstctl", "history-pop"])
 
     def clear_notifications(self):
         if self.count == 0:
             return
 
-        _notifications_actions()
+        return _notifications_actions()
 
 
 def build_notification_widget(settings: AppSettings, kwargs: dict):
@@ -1,13 +1,13 @@
 from libqtile import widget
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.core.command import run_shell_command
+from ebenezer.core.command import spawn_command
 from ebenezer.widgets.helpers.args import build_widget_args
 
 
 def _powermenu_modal():
     def _inner():
-        return run_shell_command("ebenezer ui powermenu")
+        return spawn_command("ebenezer ui powermenu")
 
     return _inner
 
@@ -1,15 +1,14 @@
-import re
-
 import psutil
 from libqtile import widget
 from libqtile.widget import ThermalSensor
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.widgets.formatter import burn_text
+from ebenezer.core.metrics import MetricsSnapshot, get_metrics_sampler
 from ebenezer.widgets.helpers.args import build_widget_args
+from ebenezer.widgets.helpers.metrics import MetricsWidgetMixin
 
 
-class ColorizedThermalWidget(ThermalSensor):
+class ColorizedThermalWidget(MetricsWidgetMixin, ThermalSensor):
     """
     A widget that enhances the user experience by displaying thermal sensors using color and icons.
 
@@ -21,8 +20,11 @@ class ColorizedThermalWidget(ThermalSensor):
         threshold_high (float): The temperature threshold for high level.
 
     Methods:
-        poll() -> str:
-            Retrieves the current temperature, updates the foreground color based on the temperature thresholds,
+        get_temp_sensors() -> dict:
+            Returns the temperatures of the latest metrics snapshot in the configured unit.
+
+        format_metrics(snapshot: MetricsSnapshot) -> str:
+            Retrieves the temperature from a metrics snapshot, updates the foreground color based on the temperature thresholds,
             and returns the temperature text, potentially modified with an icon.
     """
 
@@ -42,19 +44,29 @@ class ColorizedThermalWidget(ThermalSensor):
             "threshold_high", settings.monitoring.threshold_high
         )
 
-    def poll(self):
-        text = ThermalSensor.poll(self)
-        temperature = float(re.sub(r"\D", "", text))
+    def get_temp_sensors(self):
+        sampler = get_metrics_sampler()
+        return self._convert_temperatures(sampler.latest or sampler.sample())
 
-        if temperature > self.threshold_high:
-            self.foreground = self.high_color
-            text = burn_text(text)
-        elif temperature > self.threshold_medium:
-            self.foreground = self.medium_color
-        else:
-            self.foreground = self.default_color
+    def _convert_temperatures(self, snapshot: MetricsSnapshot) -> dict:
+        if self.metric:
+            return snapshot.temperatures
+
+        return {k: v * 9 / 5 + 32 for k, v in snapshot.temperatures.items()}
+
+    def format_metrics(self, snapshot: MetricsSnapshot) -> str:
+        temperature = self._convert_temperatures(snapshot).get(self.tag_sensor)
+
+        if temperature is None:
+            return "N/A"
+
+        text = self.format.format(
+            temp=temperature,
+            tag=self.tag_sensor,
+            unit="°C" if self.metric else "°F",
+        )
 
-        return text
+        return self.colorize(temperature, text)
 
 
 def build_thermal_widget(settings: AppSettings, kwargs: dict):
@@ -1,12 +1,126 @@
+import asyncio
+from concurrent.futures import Future
+from typing import Callable
+
 from libqtile import widget
+from libqtile.command.base import expose_command
 from libqtile.config import Key
 from libqtile.lazy import lazy
+from libqtile.log_utils import logger
 
 import ebenezer.commands.volume as volume_cmd
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.coalesce import LevelController
+from ebenezer.core.command import spawn_command
 from ebenezer.core.notify import push_notification, push_notification_progress
+from ebenezer.core.volume import VolumeSnapshot, get_volume_backend, get_volume_events
 from ebenezer.widgets.helpers.args import build_widget_args
 
+MAX_VOLUME = 120
+
+
+def _run_off_loop(function: Callable[..., None], *args: object):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        function(*args)
+        return
+
+    loop.run_in_executor(None, function, *args).add_done_callback(_log_error)
+
+
+def _log_error(future: Future):
+    if not future.cancelled() and (error := future.exception()) is not None:
+        logger.warning(f"error while changing the volume: {error}")
+
+
+def _snapshot_volume(snapshot: VolumeSnapshot) -> tuple[int, bool]:
+    if snapshot.level is None:
+        return -1, False
+
+    return snapshot.level, snapshot.muted
+
+
+class VolumeWidget(widget.Volume):
+    """
+    A volume widget reading and changing the volume through the shared volume backend.
+
+    Instead of polling, the widget subscribes to the sound server events and redraws only
+    when the level or the mute state changes, including changes made outside Qtile.
+
+    The commands run off the event loop: `volume_up_command`, `volume_down_command` and
+    `mute_command` are spawned when they are set, the volume backend is called in an
+    executor otherwise. `get_volume_command` and `check_mute_command` are ignored, the
+    level and the mute state come from the volume backend.
+
+    Methods:
+        timer_setup():
+            Subscribes the widget to the volume events.
+
+        finalize():
+            Unsubscribes the widget from the volume events.
+
+        update_volume(snapshot: VolumeSnapshot):
+            Redraws the widget when the level or the mute state of a snapshot differs.
+
+        get_volume() -> tuple[int, bool]:
+            Returns the volume level and the mute state of the active sink.
+
+        increase_vol():
+            Increases the volume of the default sink by `step`, or runs `volume_up_command`.
+
+        decrease_vol():
+            Decreases the volume of the default sink by `step`, or runs `volume_down_command`.
+
+        mute():
+            Toggles the mute state of the default sink, or runs `mute_command`.
+    """
+
+    def timer_setup(self):
+        get_volume_events().subscribe(self.update_volume)
+
+        if self.theme_path:
+            self.setup_images()
+
+    def finalize(self):
+        get_volume_events().unsubscribe(self.update_volume)
+        super().finalize()
+
+    def update_volume(self, snapshot: VolumeSnapshot):
+        volume, muted = _snapshot_volume(snapshot)
+
+        if volume == self.volume and muted == self.is_mute:
+            return
+
+        self.volume = volume
+        self.is_mute = muted
+        self._update_drawer()
+        self.bar.draw()
+
+    def get_volume(self):
+        return _snapshot_volume(get_volume_backend().snapshot())
+
+    @expose_command()
+    def increase_vol(self):
+        if self.volume_up_command is not None:
+            spawn_command(self.volume_up_command)
+        else:
+            _run_off_loop(volume_cmd.volume_change, self.step)
+
+    @expose_command()
+    def decrease_vol(self):
+        if self.volume_down_command is not None:
+            spawn_command(self.volume_down_command)
+        else:
+            _run_off_loop(volume_cmd.volume_change, -self.step)
+
+    @expose_command()
+    def mute(self):
+        if self.mute_command is not None:
+            spawn_command(self.mute_command)
+        else:
+            _run_off_loop(volume_cmd.volume_mute_toggle)
+
 
 def build_volume_widget(settings: AppSettings, kwargs: dict):
     """
@@ -17,7 +131,7 @@ def build_volume_widget(settings: AppSettings, kwargs: dict):
         kwargs (dict): Additional arguments to customize the widget.
 
     Returns:
-        widget.Volume: A configured volume widget instance.
+        VolumeWidget: A configured volume widget instance.
     """
     default_args = {
         "font": settings.fonts.font_icon,
@@ -34,19 +148,15 @@ def build_volume_widget(settings: AppSettings, kwargs: dict):
 
     args = build_widget_args(settings, default_args, kwargs)
 
-    return widget.Volume(**args)
+    return VolumeWidget(**args)
 
 
 def _get_current_volume() -> int:
-    output = volume_cmd.get_volume_level()
-
-    return int(output.replace("%", "").replace("\n", "") or "0")
+    return get_volume_backend().snapshot().level or 0
 
 
 def _is_muted() -> bool:
-    output = volume_cmd.volume_mute_status().strip()
-
-    return output == "yes"
+    return get_volume_backend().snapshot().muted
 
 
 def _push_volume_notification(message: str):
@@ -64,16 +174,7 @@ def _volume_up():
 
 
 def _do_volume_up():
-    level = _get_current_volume()
-
-    if level > 115:
-        return
-
-    _unmute()
-
-    volume_cmd.volume_up()
-
-    _push_volume_notification("󰝝 Volume")
+    _volume_controller.change(volume_cmd.VOLUME_STEP)
 
 
 def _volume_down():
@@ -85,9 +186,27 @@ def _volume_down():
 
 
 def _do_volume_down():
-    volume_cmd.volume_down()
+    _volume_controller.change(-volume_cmd.VOLUME_STEP)
+
+
+def _apply_volume_delta(delta: int):
+    if delta > 0:
+        _unmute()
+
+    volume_cmd.volume_change(delta)
+
+
+def _on_volume_applied(delta: int, level: int):
+    icon = "󰝝" if delta > 0 else "󰝞"
+    push_notification_progress(message=f"{icon} Volume {level}%", progress=level)
+
 
-    _push_volume_notification("󰝞 Volume")
+_volume_controller = LevelController(
+    read_level=_get_current_volume,
+    apply_delta=_apply_volume_delta,
+    on_applied=_on_volume_applied,
+    max_level=MAX_VOLUME,
+)
 
 
 def _lazy_unmute():
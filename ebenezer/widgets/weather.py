@@ -1,6 +1,66 @@
+import json
+
 from libqtile import widget
+from libqtile.log_utils import logger
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.http import HttpResponse
+from ebenezer.core.http_cache import DEFAULT_STALE_TTL, get_response_cache
+from ebenezer.widgets.helpers.poll import AsyncPollMixin
+
+
+class OpenWeather(AsyncPollMixin, widget.OpenWeather):
+    """
+    The OpenWeather widget, fetched on Qtile's event loop through the persistent response cache.
+
+    After a restart or a config reload, the last known weather is rendered from the cache
+    right away and, when it is older than half the update interval, refreshed in the
+    background.
+
+    Methods:
+        apoll() -> str:
+            Returns the weather, from the cache when it is recent enough.
+    """
+
+    defaults = [
+        (
+            "stale_ttl",
+            DEFAULT_STALE_TTL,
+            "How long an outdated weather is still shown while it is refreshed, in seconds.",
+        ),
+    ]
+
+    def __init__(self, **config):
+        super().__init__(**config)
+        self.add_defaults(OpenWeather.defaults)
+        self.cache = get_response_cache()
+
+    async def apoll(self) -> str:
+        try:
+            response = await self.cache.get(
+                self.url,
+                headers={"Accept": "application/json"},
+                ttl=self.update_interval / 2,
+                stale_ttl=self.stale_ttl,
+                on_revalidated=self._on_revalidated,
+            )
+        except (OSError, TimeoutError) as e:
+            logger.warning(f"error while fetching the weather: {e}")
+            return "No network"
+
+        return self._parse_response(response)
+
+    def _on_revalidated(self, response: HttpResponse):
+        self.update(self._parse_response(response))
+
+    def _parse_response(self, response: HttpResponse) -> str:
+        try:
+            return self.parse(response.json())
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return "Request failed"
+        except Exception:
+            logger.exception("got exception polling widget")
+            return "Can't parse"
 
 
 def build_weather_widget(settings: AppSettings, kwargs: dict):
@@ -12,7 +72,7 @@ def build_weather_widget(settings: AppSettings, kwargs: dict):
         kwargs (dict): Additional keyword arguments to override the default widget settings.
 
     Returns:
-        widget.OpenWeather: An instance of the OpenWeather widget configured with the specified settings.
+        OpenWeather: An instance of the OpenWeather widget configured with the specified settings.
     """
     default_args = {
         "font": settings.fonts.font_icon,
@@ -27,4 +87,4 @@ def build_weather_widget(settings: AppSettings, kwargs: dict):
 
     args = default_args | kwargs
 
-    return widget.OpenWeather(**args)
+    return OpenWeather(**args)
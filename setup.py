@@ -9,7 +9,7 @@ setup(
     author="William Sena",
     author_email="me@willsena.dev",
     url="https://github.com/williampsena/qtile-ebenezer",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     include_package_data=True,
     package_data={"ebenezer": ["py.typed"]},
     install_requires=[
@@ -22,6 +22,9 @@ setup(
         "click>=8.0.0",
         "colorama>=0.4.6",
     ],
+    extras_require={
+        "dbus": ["dbus-fast>=2.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "ebenezer=ebenezer.commands.app:cli",
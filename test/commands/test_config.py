@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from ebenezer.commands.config import cli
+from ebenezer.config.loader import TEST_COLOR_CONFIG, TEST_CONFIG
+from ebenezer.config.settings import SETTINGS_ARTIFACT, _resolve_settings_files
+from ebenezer.core.cache import load_compiled
+from ebenezer.core.http import HttpResponse
+from ebenezer.core.http_cache import ResponseCache
+from ebenezer.core.palette import PaletteCache, PaletteColor
+
+
+class TestConfigCommands(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner()
+        self.cache_dir = tempfile.mkdtemp()
+        self.patcher = patch("ebenezer.core.cache.cache_home", self.cache_dir)
+        self.patcher.start()
+        self.response_cache = ResponseCache(str(Path(self.cache_dir).joinpath("http")))
+        self.cache_patcher = patch(
+            "ebenezer.commands.config.get_response_cache",
+            return_value=self.response_cache,
+        )
+        self.cache_patcher.start()
+        self.palette_cache = PaletteCache(
+            str(Path(self.cache_dir).joinpath("palettes"))
+        )
+        self.palette_patcher = patch(
+            "ebenezer.commands.config.get_palette_cache",
+            return_value=self.palette_cache,
+        )
+        self.palette_patcher.start()
+
+    def tearDown(self):
+        self.palette_patcher.stop()
+        self.cache_patcher.stop()
+        self.patcher.stop()
+        shutil.rmtree(self.cache_dir)
+
+    @patch("ebenezer.config.settings._load_config_file")
+    def test_compile(self, mock_load_config_file):
+        mock_load_config_file.side_effect = lambda name: {
+            "config": TEST_CONFIG,
+            "colors": TEST_COLOR_CONFIG,
+        }.get(name)
+
+        result = self.runner.invoke(cli, ["compile"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Settings compiled in", result.output)
+        self.assertIsNotNone(
+            load_compiled(SETTINGS_ARTIFACT, _resolve_settings_files())
+        )
+
+    def test_cache_clear(self):
+        Path(self.cache_dir).joinpath("settings.pickle").write_bytes(b"")
+        self.response_cache.store(
+            "https://example.com",
+            None,
+            HttpResponse("https://example.com", 200, {}, b""),
+        )
+        self.palette_cache._store("abc-8", [PaletteColor((0, 0, 0), 1.0)])
+
+        result = self.runner.invoke(cli, ["cache", "clear"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("1 compiled file(s) removed", result.output)
+        self.assertIn("1 cached response(s) removed", result.output)
+        self.assertIn("1 cached palette(s) removed", result.output)
+        self.assertFalse(Path(self.cache_dir).joinpath("settings.pickle").exists())
+        self.assertIsNone(self.response_cache.load("https://example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from ebenezer.commands.startup import cli
+
+
+class TestStartupCommands(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner()
+        self.cache_dir = tempfile.mkdtemp()
+        self.patcher = patch("ebenezer.core.startup.cache_home", self.cache_dir)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.cache_dir)
+
+    def test_report(self):
+        report = {
+            "created_at": "2024-01-01T10:00:00",
+            "duration": 0.5,
+            "entries": [
+                {
+                    "name": "dunst",
+                    "cmd": "dunst &",
+                    "status": "ok",
+                    "returncode": 0,
+                    "started_at": 0.0,
+                    "duration": 0.012,
+                    "error": "",
+                },
+                {
+                    "name": "picom",
+                    "cmd": "picom",
+                    "status": "timeout",
+                    "returncode": None,
+                    "started_at": 0.001,
+                    "duration": 3.0,
+                    "error": "",
+                },
+            ],
+        }
+        Path(self.cache_dir).joinpath("startup.json").write_text(json.dumps(report))
+
+        result = self.runner.invoke(cli, ["report"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("took 500ms", result.output)
+        self.assertRegex(result.output, r"dunst\s+ok\s+exit=0")
+        self.assertRegex(result.output, r"picom\s+timeout\s+exit=-")
+
+    def test_report_missing(self):
+        result = self.runner.invoke(cli, ["report"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("No startup report found", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from click.testing import CliRunner
+from PIL import Image
+
+from ebenezer.commands.theme import cli
+from ebenezer.config.settings import AppSettings, AppSettingsColors
+from ebenezer.core.palette import PaletteCache
+from ebenezer.core.theme import _apply_theme_color
+
+
+class TestThemeCommands(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.runner = CliRunner()
+        self.wallpaper = os.path.join(self.tmp_dir, "wallpaper.png")
+        Image.new("RGB", (64, 48), "#336699").save(self.wallpaper)
+        self.theme_file = os.path.join(self.tmp_dir, "themes", "wallpaper.yml")
+
+        compiled_patcher = patch("ebenezer.core.cache.cache_home", self.tmp_dir)
+        compiled_patcher.start()
+        self.addCleanup(compiled_patcher.stop)
+
+        cache_patcher = patch(
+            "ebenezer.core.palette.get_palette_cache",
+            return_value=PaletteCache(os.path.join(self.tmp_dir, "palettes")),
+        )
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+        daemon_patcher = patch(
+            "ebenezer.commands.theme.send_command", side_effect=FileNotFoundError
+        )
+        self.mock_send_command = daemon_patcher.start()
+        self.addCleanup(daemon_patcher.stop)
+
+    def test_from_wallpaper(self):
+        result = self.runner.invoke(
+            cli, ["from-wallpaper", self.wallpaper, "--output", self.theme_file]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(f"written to {self.theme_file}", result.output)
+
+        settings = AppSettings()
+        settings.colors = AppSettingsColors()
+        settings = _apply_theme_color(self.theme_file, settings)
+
+        self.assertEqual(settings.colors.theme, self.theme_file)
+        self.assertEqual(settings.colors.bg_normal, "#141f29")
+
+    def test_from_current_wallpaper(self):
+        self.mock_send_command.side_effect = None
+        self.mock_send_command.return_value = {"ok": True, "wallpaper": self.wallpaper}
+
+        result = self.runner.invoke(
+            cli, ["from-wallpaper", "--output", self.theme_file]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.mock_send_command.assert_called_once_with("status")
+        self.assertTrue(os.path.exists(self.theme_file))
+
+    def test_from_wallpaper_without_daemon(self):
+        result = self.runner.invoke(
+            cli, ["from-wallpaper", "--output", self.theme_file]
+        )
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("the wallpaper daemon is not running", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
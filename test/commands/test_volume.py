@@ -4,134 +4,130 @@ from unittest.mock import patch
 from click.testing import CliRunner
 
 from ebenezer.commands.volume import cli
+from ebenezer.core.volume import FakeVolumeBackend, SinkState, set_volume_backend
 
-PACTL_SHORT_SINKS = (
-    "0\talsa_output.pci-0000_00_1f.3.analog-stereo module-alsa-card.c\t"
-    "s16le 2ch\t44100Hz\tSUSPENDED\n"
+SPEAKER_SINK = SinkState(
+    index=0,
+    name="alsa_output.pci-0000_00_1f.3.analog-stereo",
+    volume=40,
+    state="SUSPENDED",
 )
 
-PACTL_SHORT_SINKS_PHONE = PACTL_SHORT_SINKS + (
-    "1\talsa_output.usb-Logitech_Logitech_USB_Headset-00.analog-stereo module-alsa-card.c\t"
-    "s16le 2ch\t44100Hz\tRUNNING\n"
+PHONE_SINK = SinkState(
+    index=1,
+    name="alsa_output.usb-Logitech_Logitech_USB_Headset-00.analog-stereo",
+    volume=50,
+    state="RUNNING",
 )
 
 
 class TestVolumeCommands(unittest.TestCase):
     def setUp(self):
         self.runner = CliRunner()
+        self.backend = FakeVolumeBackend([SPEAKER_SINK, PHONE_SINK])
+        set_volume_backend(self.backend)
 
-    @patch("ebenezer.commands.volume.run_command")
-    @patch("ebenezer.commands.volume.click.echo")
-    def test_volume_level(self, mock_click_echo, mock_run_command):
-        mock_run_command.side_effect = lambda cmd: (
-            PACTL_SHORT_SINKS_PHONE if "pactl list short sinks" in cmd else "50%"
-        )
+    def tearDown(self):
+        set_volume_backend(None)
 
+    @patch("ebenezer.commands.volume.click.echo")
+    def test_volume_level(self, mock_click_echo):
         result = self.runner.invoke(cli, ["level"])
 
-        mock_run_command.assert_has_calls(
-            [
-                unittest.mock.call("pactl list short sinks"),
-                unittest.mock.call(
-                    "pactl list sinks | grep -A 15 'Name: alsa_output.pci-0000_00_1f.3.analog-stereo module-alsa-card.c' | grep 'Volume:' | head -n 1 | awk '{print $5}' | grep -o '[0-9]\\+'"
-                ),
-                unittest.mock.call(
-                    "pactl list sinks | grep -A 15 'Name: alsa_output.usb-logitech_logitech_usb_headset-00.analog-stereo module-alsa-card.c' | grep 'Volume:' | head -n 1 | awk '{print $5}' | grep -o '[0-9]\\+'"
-                ),
-            ]
-        )
-
-        mock_click_echo.assert_called_once_with("50%")
+        mock_click_echo.assert_called_once_with("50")
+        self.assertEqual(self.backend.reads, 1)
         assert result.exit_code == 0
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def xtest_volume_levels(self, mock_click_echo, mock_run_command):
-        mock_run_command.return_value = "speaker: 50%\nbluetooth: 80%"
+    def test_volume_level_speaker(self, mock_click_echo):
+        self.backend.sinks = [SPEAKER_SINK]
+
+        self.runner.invoke(cli, ["level"])
+
+        mock_click_echo.assert_called_once_with("40")
+
+    @patch("ebenezer.commands.volume.click.echo")
+    def test_volume_level_without_sinks(self, mock_click_echo):
+        self.backend.sinks = []
+
+        self.runner.invoke(cli, ["level"])
+
+        mock_click_echo.assert_called_once_with("")
 
+    @patch("ebenezer.commands.volume.click.echo")
+    def test_volume_levels(self, mock_click_echo):
         self.runner.invoke(cli, ["levels"])
 
-        mock_run_command.assert_called_once_with(
-            "pactl list sinks | grep 'Volume:' | head -n 1 | awk '{print $5}' | tail -n 1 | grep -o '[0-9]\\+'"
-        )
-        mock_click_echo.assert_called_once_with("50%")
+        mock_click_echo.assert_called_once_with("speaker: 40\nphone: 50")
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_volume_up(self, mock_click_echo, mock_run_command):
+    def test_volume_up(self, mock_click_echo):
         result = self.runner.invoke(cli, ["up"])
 
-        mock_run_command.assert_called_once_with(
-            "pactl set-sink-volume @DEFAULT_SINK@ +5%"
-        )
+        self.assertEqual(self.backend.sinks[1].volume, 55)
         mock_click_echo.assert_called_once_with("Volume increased by 5%")
         assert result.exit_code == 0
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_volume_down(self, mock_click_echo, mock_run_command):
+    def test_volume_down(self, mock_click_echo):
         result = self.runner.invoke(cli, ["down"])
 
-        mock_run_command.assert_called_once_with(
-            "pactl set-sink-volume @DEFAULT_SINK@ -5%"
-        )
+        self.assertEqual(self.backend.sinks[1].volume, 45)
         mock_click_echo.assert_called_once_with("Volume decreased by 5%")
         assert result.exit_code == 0
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_mute_on(self, mock_click_echo, mock_run_command):
+    def test_mute_on(self, mock_click_echo):
         result = self.runner.invoke(cli, ["mute-on"])
 
-        mock_run_command.assert_called_once_with("pactl set-sink-mute @DEFAULT_SINK@ 1")
+        self.assertTrue(self.backend.sinks[1].muted)
         mock_click_echo.assert_called_once_with("Mute on")
         assert result.exit_code == 0
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_mute_off(self, mock_click_echo, mock_run_command):
+    def test_mute_off(self, mock_click_echo):
+        self.backend.sinks[1] = PHONE_SINK._replace(muted=True)
+
         result = self.runner.invoke(cli, ["mute-off"])
 
-        mock_run_command.assert_called_once_with("pactl set-sink-mute @DEFAULT_SINK@ 0")
+        self.assertFalse(self.backend.sinks[1].muted)
         mock_click_echo.assert_called_once_with("Mute off")
         assert result.exit_code == 0
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_mute_toggle(self, mock_click_echo, mock_run_command):
+    def test_mute_toggle(self, mock_click_echo):
         result = self.runner.invoke(cli, ["mute-toggle"])
 
-        mock_run_command.assert_called_once_with(
-            "pactl set-sink-mute @DEFAULT_SINK@ toggle"
-        )
+        self.assertTrue(self.backend.sinks[1].muted)
         mock_click_echo.assert_called_once_with("Mute toggled")
         assert result.exit_code == 0
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_mute_mic(self, mock_click_echo, mock_run_command):
+    def test_mute_status(self, mock_click_echo):
+        self.backend.sinks[1] = PHONE_SINK._replace(muted=True)
+
+        self.runner.invoke(cli, ["mute-status"])
+
+        mock_click_echo.assert_called_once_with("yes")
+
+    @patch("ebenezer.commands.volume.click.echo")
+    def test_mute_mic(self, mock_click_echo):
         result = self.runner.invoke(cli, ["mute-mic"])
 
-        mock_run_command.assert_called_once_with(
-            "pactl set-source-mute @DEFAULT_SOURCE@ toggle"
-        )
+        self.assertTrue(self.backend.source_muted)
         mock_click_echo.assert_called_once_with("Microphone mute toggled")
         assert result.exit_code == 0
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_phone_plugged(self, mock_click_echo, mock_run_command):
-        mock_run_command.return_value = PACTL_SHORT_SINKS_PHONE
-
+    def test_phone_plugged(self, mock_click_echo):
         result = self.runner.invoke(cli, ["phone-plugged"])
 
         mock_click_echo.assert_called_once_with(True)
         self.assertEqual(result.exit_code, 0)
 
-    @patch("ebenezer.commands.volume.run_command")
     @patch("ebenezer.commands.volume.click.echo")
-    def test_phone_not_plugged(self, mock_click_echo, mock_run_command):
-        mock_run_command.return_value = PACTL_SHORT_SINKS
+    def test_phone_not_plugged(self, mock_click_echo):
+        self.backend.sinks = [SPEAKER_SINK]
 
         result = self.runner.invoke(cli, ["phone-plugged"])
 
@@ -1,11 +1,17 @@
+import os
 import shutil
 import tempfile
 import unittest
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from unittest.mock import ANY, MagicMock, patch
 
 from click.testing import CliRunner
+from PIL import Image
 
 from ebenezer.commands.wallpaper import cli
+from ebenezer.core.wallpaper_cache import WallpaperCache
+from ebenezer.core.wallpaper_index import WallpaperIndex
+from ebenezer.core.wallpaper_setter import RootPixmapError
 
 
 class TestWallpaperCommands(unittest.TestCase):
@@ -16,38 +22,75 @@ class TestWallpaperCommands(unittest.TestCase):
         ).name
         self.runner = CliRunner()
 
+        self.index = WallpaperIndex(Path(self.tmp_dir).joinpath(".index.sqlite3"))
+        index_patcher = patch(
+            "ebenezer.commands.wallpaper.get_wallpaper_index", return_value=self.index
+        )
+        index_patcher.start()
+        self.addCleanup(index_patcher.stop)
+
+        daemon_patcher = patch(
+            "ebenezer.commands.wallpaper.send_command", side_effect=FileNotFoundError
+        )
+        self.mock_send_command = daemon_patcher.start()
+        self.addCleanup(daemon_patcher.stop)
+
     def tearDown(self):
+        self.index.close()
         shutil.rmtree(self.tmp_dir)
 
-    @patch("ebenezer.commands.wallpaper.run")
-    @patch("ebenezer.commands.wallpaper.click.echo")
-    @patch("ebenezer.commands.wallpaper.Path")
-    @patch("ebenezer.commands.wallpaper.random.choice")
-    def test_set_wallpaper_with_directory(
-        self, mock_random_choice, mock_path, mock_click_echo, mock_run
-    ):
-        mock_path_obj = MagicMock()
-        mock_path.return_value = mock_path_obj
-        mock_path_obj.is_dir.return_value = True
-        mock_wallpaper = MagicMock()
-        mock_path_obj.glob.return_value = [mock_wallpaper]
-        mock_random_choice.return_value = mock_wallpaper
+    @patch("ebenezer.commands.wallpaper.set_wallpaper_images")
+    def test_set_wallpaper_with_directory(self, mock_set_images):
+        Image.new("RGB", (16, 9)).save(Path(self.tmp_dir).joinpath("a.png"))
+        Image.new("RGB", (16, 9)).save(Path(self.tmp_dir).joinpath("b.png"))
+        Path(self.tmp_dir).joinpath("notes.txt").write_text("")
+        Path(self.tmp_dir).joinpath("subdir.png").mkdir()
+
+        outputs = [
+            self.runner.invoke(cli, ["set", self.tmp_dir]).output for _ in range(2)
+        ]
+        wallpapers = [call[0][0] for call in mock_set_images.call_args_list]
+
+        self.assertCountEqual(
+            wallpapers,
+            [
+                [str(Path(self.tmp_dir).joinpath("a.png"))],
+                [str(Path(self.tmp_dir).joinpath("b.png"))],
+            ],
+        )
+        self.assertIn("Wallpaper set to:", outputs[0])
+
+    @patch("ebenezer.commands.wallpaper.set_wallpaper_images")
+    @patch(
+        "ebenezer.commands.wallpaper.screen_resolutions",
+        return_value=[(16, 9), (8, 8)],
+    )
+    def test_set_wallpaper_with_scaled_variant(self, _, mock_set_images):
+        wallpaper = str(Path(self.tmp_dir).joinpath("a.png"))
+        Image.new("RGB", (64, 36)).save(wallpaper)
+        cache = WallpaperCache(Path(self.tmp_dir).joinpath("cache"))
+        cache.prefetch([wallpaper], [(16, 9)])
+        cache.shutdown()
+
+        with patch("ebenezer.commands.wallpaper._build_cache", return_value=cache):
+            self.runner.invoke(cli, ["set", wallpaper])
+
+        variant = cache.variant_path(wallpaper, (16, 9))
+        mock_set_images.assert_called_once_with([str(variant), wallpaper], "auto")
+
+    @patch("ebenezer.commands.wallpaper.set_wallpaper_images")
+    def test_set_wallpaper_with_empty_directory(self, mock_set_images):
+        os.remove(self.tmp_file)
 
         result = self.runner.invoke(cli, ["set", self.tmp_dir])
 
-        mock_path.assert_called_with(self.tmp_dir)
-        mock_path_obj.is_dir.assert_called_once()
-        mock_path_obj.glob.assert_called_once_with("*")
-        mock_random_choice.assert_called_once_with([mock_wallpaper])
-        mock_run.assert_called_once_with(
-            f'feh --bg-scale "{mock_wallpaper}"', shell=True
-        )
-        mock_click_echo.assert_called_once_with(f'Wallpaper set to: "{mock_wallpaper}"')
+        self.assertIn("No wallpapers found in the directory", result.output)
+        mock_set_images.assert_not_called()
 
-    @patch("ebenezer.commands.wallpaper.run")
+    @patch("ebenezer.commands.wallpaper.set_wallpaper_images")
     @patch("ebenezer.commands.wallpaper.click.echo")
     @patch("ebenezer.commands.wallpaper.Path")
-    def test_set_wallpaper_with_file(self, mock_path, mock_click_echo, mock_run):
+    def test_set_wallpaper_with_file(self, mock_path, mock_click_echo, mock_set_images):
         mock_path_obj = MagicMock()
         mock_path.return_value = mock_path_obj
         mock_path_obj.is_file.return_value = True
@@ -57,11 +100,90 @@ class TestWallpaperCommands(unittest.TestCase):
 
         mock_path.assert_called_with(self.tmp_file)
         mock_path_obj.is_file.assert_called_once()
-        mock_run.assert_called_once_with(
-            f'feh --bg-scale "{self.tmp_file}"', shell=True
-        )
+        mock_set_images.assert_called_once_with([self.tmp_file], "auto")
         mock_click_echo.assert_called_once_with(f'Wallpaper set to: "{self.tmp_file}"')
 
+    @patch("ebenezer.commands.wallpaper.set_wallpaper_images")
+    def test_set_wallpaper_with_daemon(self, mock_set_images):
+        self.mock_send_command.side_effect = None
+        self.mock_send_command.return_value = {"ok": True, "wallpaper": self.tmp_file}
+
+        result = self.runner.invoke(cli, ["set", self.tmp_dir])
+
+        self.mock_send_command.assert_called_once_with("set", self.tmp_dir)
+        self.assertEqual(result.output, f'Wallpaper set to: "{self.tmp_file}"\n')
+        mock_set_images.assert_not_called()
+
+    @patch("ebenezer.commands.wallpaper.set_wallpaper_images")
+    def test_set_wallpaper_with_daemon_timeout(self, mock_set_images):
+        self.mock_send_command.side_effect = TimeoutError("timed out")
+
+        result = self.runner.invoke(cli, ["set", self.tmp_file])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("The wallpaper daemon did not answer", result.output)
+        mock_set_images.assert_not_called()
+
+    @patch("ebenezer.commands.wallpaper.set_wallpaper_images")
+    def test_set_wallpaper_without_daemon(self, mock_set_images):
+        self.mock_send_command.side_effect = None
+        self.mock_send_command.return_value = {"ok": True, "wallpaper": self.tmp_file}
+
+        for args in (["--setter", "feh"], ["--cache-size", "64"], ["--no-daemon"]):
+            self.runner.invoke(cli, ["set", self.tmp_file, *args])
+
+        self.mock_send_command.assert_not_called()
+        self.assertEqual(mock_set_images.call_count, 3)
+        mock_set_images.assert_any_call([self.tmp_file], "feh")
+
+    @patch(
+        "ebenezer.commands.wallpaper.set_wallpaper_images",
+        side_effect=RootPixmapError("unsupported root visual"),
+    )
+    def test_set_wallpaper_with_native_setter_error(self, mock_set_images):
+        result = self.runner.invoke(cli, ["set", self.tmp_file, "--setter", "native"])
+
+        mock_set_images.assert_called_once_with([self.tmp_file], "native")
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("unsupported root visual", result.output)
+
+    def test_daemon_commands(self):
+        self.mock_send_command.side_effect = None
+        self.mock_send_command.return_value = {
+            "ok": True,
+            "wallpaper": self.tmp_file,
+            "directory": self.tmp_dir,
+            "paused": True,
+        }
+
+        self.assertEqual(
+            self.runner.invoke(cli, ["next"]).output,
+            f'Wallpaper set to: "{self.tmp_file}"\n',
+        )
+        self.assertEqual(
+            self.runner.invoke(cli, ["pause"]).output, "Wallpaper rotation paused\n"
+        )
+        self.assertIn("Paused: True", self.runner.invoke(cli, ["status"]).output)
+        self.assertEqual(
+            [call[0][0] for call in self.mock_send_command.call_args_list],
+            ["next", "pause", "status"],
+        )
+
+    def test_daemon_commands_without_daemon(self):
+        result = self.runner.invoke(cli, ["prev"])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("The wallpaper daemon is not running", result.output)
+
+    def test_daemon_command_error(self):
+        self.mock_send_command.side_effect = None
+        self.mock_send_command.return_value = {"ok": False, "error": "Oops"}
+
+        result = self.runner.invoke(cli, ["resume"])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Oops", result.output)
+
     def test_set_wallpaper_with_invalid_path(self):
         result = self.runner.invoke(cli, ["set", "/invalid/path"])
         self.assertEqual(result.exit_code, 2)
@@ -76,7 +198,7 @@ class TestWallpaperCommands(unittest.TestCase):
         )
         mock_sleep.assert_called_with(1)
 
-        mock_set_wallpaper.assert_called_with("/tmp")
+        mock_set_wallpaper.assert_called_with("/tmp", self.index, ANY, "auto")
         mock_sleep.assert_called_with(1)
 
 
@@ -15,7 +15,10 @@ def test_parse_lock_screen():
         joke_providers="reddit,icanhazdad",
         icanhazdad_joke_url="https://icanhazdadjoke.com/",
         reddit_joke_url="https://www.reddit.com/r/ProgrammerDadJokes.json",
+        joke_timeout=2,
         blurtype="0x7",
+        blur_quality="balanced",
+        image_format="raw",
     )
 
     assert lock_screen.__dict__ == expected.__dict__
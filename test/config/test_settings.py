@@ -115,7 +115,10 @@ def test_parse_settings():
             joke_providers="reddit,icanhazdad",
             icanhazdad_joke_url="https://icanhazdadjoke.com/",
             reddit_joke_url="https://www.reddit.com/r/ProgrammerDadJokes.json",
+            joke_timeout=2,
             blurtype="0x7",
+            blur_quality="balanced",
+            image_format="raw",
         ),
         monitoring=AppSettingsMonitoring(
             default_color="fg_normal",
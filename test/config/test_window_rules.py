@@ -0,0 +1,50 @@
+import unittest
+
+from ebenezer.config.loader import load_raw_test_settings
+from ebenezer.config.window_rules import AppSettingsWindowRule, build_window_rules
+
+
+class TestAppSettingsWindowRule(unittest.TestCase):
+    def test_init_with_all_arguments(self):
+        rule = AppSettingsWindowRule(
+            wm_class="pavucontrol",
+            title="^Mixer$",
+            floating="yes",
+            center="no",
+            group="3",
+            size="0.5,0.6",
+        )
+
+        self.assertEqual(rule.wm_class, "pavucontrol")
+        self.assertEqual(rule.title, "^Mixer$")
+        self.assertTrue(rule.floating)
+        self.assertFalse(rule.center)
+        self.assertEqual(rule.group, "3")
+        self.assertEqual(rule.size, [0.5, 0.6])
+
+    def test_init_with_no_arguments(self):
+        rule = AppSettingsWindowRule()
+
+        self.assertEqual(rule.wm_class, "")
+        self.assertEqual(rule.title, "")
+        self.assertFalse(rule.floating)
+        self.assertFalse(rule.center)
+        self.assertEqual(rule.group, "")
+        self.assertEqual(rule.size, [])
+
+    def test_build_window_rules_from_settings(self):
+        settings = load_raw_test_settings()
+
+        rules = build_window_rules(settings["window_rules"])
+
+        self.assertEqual(len(rules), 2)
+        self.assertEqual(rules[0].wm_class, "pavucontrol")
+        self.assertTrue(rules[0].center)
+        self.assertEqual(rules[0].size, [0.5, 0.6])
+        self.assertEqual(rules[1].title, "^Picture-in-Picture$")
+        self.assertTrue(rules[1].floating)
+        self.assertEqual(rules[1].group, "5")
+
+
+if __name__ == "__main__":
+    unittest.main()
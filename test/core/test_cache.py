@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ebenezer.config.loader import TEST_COLOR_CONFIG, TEST_CONFIG, load_raw_settings
+from ebenezer.config.settings import load_settings_by_files
+from ebenezer.core.cache import (
+    clear_compiled,
+    code_version,
+    file_fingerprint,
+    load_compiled,
+    store_compiled,
+)
+
+
+class TestCompiledCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.source_file = os.path.join(self.cache_dir, "source.yml")
+
+        with open(self.source_file, "w") as f:
+            f.write("foo: bar\n")
+
+        self.patcher = patch("ebenezer.core.cache.cache_home", self.cache_dir)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.cache_dir)
+
+    def test_store_and_load_compiled(self):
+        store_compiled("foo", [self.source_file], {"foo": "bar"})
+
+        self.assertEqual(load_compiled("foo", [self.source_file]), {"foo": "bar"})
+
+    def test_load_compiled_missing(self):
+        self.assertIsNone(load_compiled("foo", [self.source_file]))
+
+    def test_load_compiled_stale_after_change(self):
+        store_compiled("foo", [self.source_file], {"foo": "bar"})
+
+        with open(self.source_file, "a") as f:
+            f.write("baz: qux\n")
+
+        self.assertIsNone(load_compiled("foo", [self.source_file]))
+
+    def test_load_compiled_stale_after_upgrade(self):
+        store_compiled("foo", [self.source_file], {"foo": "bar"})
+
+        with patch("ebenezer.core.cache.code_version", return_value="upgraded"):
+            self.assertIsNone(load_compiled("foo", [self.source_file]))
+
+    def test_code_version(self):
+        self.assertEqual(code_version(), code_version())
+        self.assertEqual(len(code_version()), 64)
+
+    def test_load_compiled_stale_other_files(self):
+        store_compiled("foo", [self.source_file], {"foo": "bar"})
+
+        self.assertIsNone(load_compiled("foo", [self.source_file, TEST_CONFIG]))
+
+    def test_file_fingerprint(self):
+        stat = os.stat(self.source_file)
+
+        self.assertEqual(
+            file_fingerprint([self.source_file, None, "/not/found.yml"]),
+            (
+                (self.source_file, stat.st_mtime_ns, stat.st_size),
+                ("/not/found.yml", None, None),
+            ),
+        )
+
+    def test_clear_compiled(self):
+        store_compiled("foo", [self.source_file], 1)
+        store_compiled("bar", [self.source_file], 2)
+
+        removed = clear_compiled()
+
+        self.assertEqual(len(removed), 2)
+        self.assertIsNone(load_compiled("foo", [self.source_file]))
+        self.assertIsNone(load_compiled("bar", [self.source_file]))
+
+    @patch("ebenezer.config.settings.load_raw_settings", wraps=load_raw_settings)
+    def test_load_settings_by_files_warm(self, mock_load_raw_settings):
+        cold = load_settings_by_files(
+            config_filepath=TEST_CONFIG, colors_filepath=TEST_COLOR_CONFIG
+        )
+        warm = load_settings_by_files(
+            config_filepath=TEST_CONFIG, colors_filepath=TEST_COLOR_CONFIG
+        )
+
+        mock_load_raw_settings.assert_called_once()
+        self.assertIsNot(cold, warm)
+        self.assertEqual(warm.colors.fg_normal, cold.colors.fg_normal)
+        self.assertEqual(warm.floating, cold.floating)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from ebenezer.core.coalesce import LevelController
+
+
+class TestLevelController(unittest.TestCase):
+    def setUp(self):
+        self.level = 50
+        self.reads = 0
+        self.applied = []
+        self.on_applied = MagicMock()
+
+    def _read_level(self):
+        self.reads += 1
+        return self.level
+
+    def _apply_delta(self, delta):
+        self.applied.append(delta)
+        self.level += delta
+
+    def _build(self, **kwargs):
+        return LevelController(
+            read_level=self._read_level,
+            apply_delta=self._apply_delta,
+            on_applied=self.on_applied,
+            **kwargs,
+        )
+
+    def test_change_without_loop(self):
+        controller = self._build()
+
+        self.assertEqual(controller.change(5), 55)
+        self.assertEqual(controller.change(-10), 45)
+
+        self.assertEqual(self.applied, [5, -10])
+        self.assertEqual(self.reads, 2)
+        self.on_applied.assert_called_with(-10, 45)
+
+    def test_change_clamps_level(self):
+        controller = self._build(max_level=52)
+
+        self.assertEqual(controller.change(5), 52)
+        self.assertEqual(self.applied, [2])
+
+        self.assertEqual(controller.change(5), 52)
+        self.assertEqual(self.applied, [2])
+        self.on_applied.assert_called_once_with(2, 52)
+
+    def test_change_folds_burst(self):
+        controller = self._build(window=0.05, max_level=70)
+
+        async def _burst():
+            levels = [controller.change(5) for _ in range(6)]
+            levels.append(controller.change(-5))
+            await asyncio.sleep(0.2)
+            return levels
+
+        levels = asyncio.run(_burst())
+
+        # the changes are queued while the level is read
+        self.assertEqual(levels, [None] * 7)
+        self.assertEqual(self.applied, [15])
+        self.assertEqual(self.reads, 1)
+        self.on_applied.assert_called_once_with(15, 65)
+
+    def test_change_with_cached_level(self):
+        controller = self._build(window=0.05, max_level=70)
+
+        async def _bursts():
+            controller.change(5)
+            await asyncio.sleep(0.1)
+            return [controller.change(5) for _ in range(3)]
+
+        levels = asyncio.run(_bursts())
+
+        self.assertEqual(levels, [60, 65, 70])
+        self.assertEqual(self.reads, 1)
+
+    def test_change_reads_off_the_loop(self):
+        threads = {}
+
+        def _read_level():
+            threads["read"] = threading.get_ident()
+            return self._read_level()
+
+        def _on_applied(delta, level):
+            threads["applied"] = threading.get_ident()
+
+        controller = LevelController(
+            read_level=_read_level,
+            apply_delta=self._apply_delta,
+            on_applied=_on_applied,
+            window=0.01,
+        )
+
+        async def _change():
+            controller.change(5)
+            await asyncio.sleep(0.1)
+
+        asyncio.run(_change())
+
+        self.assertNotEqual(threads["read"], threading.get_ident())
+        self.assertEqual(threads["applied"], threading.get_ident())
+        self.assertEqual(self.applied, [5])
+
+    def test_level_cached_until_ttl(self):
+        controller = self._build(window=0.01, level_ttl=0.05)
+
+        async def _changes():
+            controller.change(5)
+            await asyncio.sleep(0.03)
+            controller.change(5)
+            await asyncio.sleep(0.03)
+
+        asyncio.run(_changes())
+
+        self.assertEqual(self.reads, 1)
+        self.assertEqual(controller.level, 60)
+
+        self.level = 10
+        time.sleep(0.06)
+
+        self.assertEqual(controller.level, 10)
+        self.assertEqual(self.reads, 2)
+
+    def test_apply_error_resets_level(self):
+        controller = LevelController(
+            read_level=self._read_level,
+            apply_delta=MagicMock(side_effect=RuntimeError("boom")),
+            on_applied=self.on_applied,
+        )
+
+        controller.change(5)
+
+        self.on_applied.assert_not_called()
+        self.assertEqual(controller.level, 50)
+        self.assertEqual(self.reads, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import shutil
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 import ruamel.yaml
 
@@ -13,8 +14,11 @@ class TestApplyThemeColor(unittest.TestCase):
 
     def setUp(self):
         self.test_dir = tempfile.mkdtemp()
+        self.patcher = patch("ebenezer.core.cache.cache_home", self.test_dir)
+        self.patcher.start()
 
     def tearDown(self):
+        self.patcher.stop()
         shutil.rmtree(self.test_dir)
 
     def test_apply_theme_color_file_exists(self):
@@ -1,4 +1,13 @@
-from ebenezer.core.command import build_shell_command
+import asyncio
+from unittest.mock import patch
+
+from ebenezer.core.command import (
+    CommandResult,
+    build_shell_command,
+    lazy_command,
+    run_command_async,
+    spawn_command,
+)
 from ebenezer.core.files import qtile_home
 
 
@@ -23,3 +32,74 @@ def test_build_shell_command():
             **{"timeout": 10, "wallpaper_dir": "/wallpapers", "wallpaper_timeout": 30},
         )
         assert cmd == expectations[i]
+
+
+def test_run_command_async():
+    result = asyncio.run(
+        run_command_async("echo $greeting", capture_output=True, greeting="hello")
+    )
+
+    assert result == CommandResult(0, "hello\n", "")
+
+
+def test_run_command_async_argv_input():
+    result = asyncio.run(
+        run_command_async(["cat"], capture_output=True, input="ebenezer")
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == "ebenezer"
+
+
+def test_run_command_async_timeout():
+    result = asyncio.run(run_command_async("sleep 5", timeout=0.1))
+
+    assert result.timed_out
+    assert result.returncode != 0
+
+
+def test_spawn_command_on_complete():
+    results = []
+
+    async def _run():
+        task = spawn_command("exit 3", on_complete=results.append, capture_output=True)
+        await task
+
+    asyncio.run(_run())
+
+    assert results == [CommandResult(3)]
+
+
+def test_spawn_command_without_loop():
+    results = []
+
+    assert spawn_command(["true"], on_complete=results.append) is None
+    assert results == [CommandResult(0)]
+
+
+def test_spawn_command_error():
+    results = []
+
+    spawn_command(["/nonexistent/ebenezer"], on_complete=results.append)
+
+    assert results[0].returncode is None
+    assert results[0].stderr
+
+
+def test_lazy_command_substitutes_once():
+    results = []
+
+    async def _run():
+        with patch(
+            "ebenezer.core.command.spawn_command",
+            lambda cmd, **kwargs: results.append(
+                spawn_command(cmd, capture_output=True, **kwargs)
+            ),
+        ):
+            lazy_command("echo $value", value="'$home'").args[0](None)
+
+        return await results[0]
+
+    result = asyncio.run(_run())
+
+    assert result.stdout == "$home\n"
@@ -1,4 +1,7 @@
+import shutil
+import tempfile
 import unittest
+from unittest.mock import patch
 
 from ebenezer.config.loader import TEST_CONFIG
 from ebenezer.config.settings import load_settings_by_files
@@ -6,10 +9,38 @@ from ebenezer.core.wallpaper import change_wallpaper
 
 
 class TestCoreWallpaper(unittest.TestCase):
-    def test_change_wallpaper(self):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        cache_patcher = patch("ebenezer.core.cache.cache_home", self.cache_dir)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+    @patch("ebenezer.core.wallpaper.send_command", side_effect=FileNotFoundError)
+    @patch("ebenezer.core.wallpaper.subprocess.call")
+    def test_change_wallpaper(self, mock_call, _):
+        settings = load_settings_by_files(config_filepath=TEST_CONFIG)
+        change_wallpaper(settings)
+
+        mock_call.assert_called_once_with(["echo", "'change", "wallpaper'"])
+
+    @patch("ebenezer.core.wallpaper.send_command", return_value={"ok": True})
+    @patch("ebenezer.core.wallpaper.subprocess.call")
+    def test_change_wallpaper_with_daemon(self, mock_call, mock_send_command):
         settings = load_settings_by_files(config_filepath=TEST_CONFIG)
         change_wallpaper(settings)
 
+        mock_send_command.assert_called_once_with("next")
+        mock_call.assert_not_called()
+
+    @patch("ebenezer.core.wallpaper.send_command", side_effect=TimeoutError)
+    @patch("ebenezer.core.wallpaper.subprocess.call")
+    def test_change_wallpaper_with_daemon_timeout(self, mock_call, _):
+        settings = load_settings_by_files(config_filepath=TEST_CONFIG)
+        change_wallpaper(settings)
+
+        mock_call.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
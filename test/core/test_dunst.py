@@ -0,0 +1,155 @@
+import asyncio
+import shutil
+import subprocess
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ebenezer.core.dunst import (
+    DunstCounts,
+    DunstEvents,
+    has_dbus,
+    parse_dunstctl_count,
+    read_dunstctl_count,
+)
+
+if has_dbus:
+    from dbus_fast import PropertyAccess
+    from dbus_fast.aio import MessageBus
+    from dbus_fast.service import ServiceInterface, dbus_property
+
+    class StubDunst(ServiceInterface):
+        def __init__(self):
+            super().__init__("org.dunstproject.cmd0")
+            self.history = 0
+
+        @dbus_property(access=PropertyAccess.READ)
+        def waitingLength(self) -> "u":  # noqa: F821
+            return 0
+
+        @dbus_property(access=PropertyAccess.READ)
+        def displayedLength(self) -> "u":  # noqa: F821
+            return 1
+
+        @dbus_property(access=PropertyAccess.READ)
+        def historyLength(self) -> "u":  # noqa: F821
+            return self.history
+
+        def set_history(self, history: int):
+            self.history = history
+            self.emit_properties_changed({"historyLength": history})
+
+
+class TestParseDunstctlCount(unittest.TestCase):
+    def test_parse_dunstctl_count(self):
+        counts = parse_dunstctl_count("Waiting: 1\nCurrently displayed: 2\nHistory: 5")
+
+        self.assertEqual(counts, DunstCounts(waiting=1, displayed=2, history=5))
+
+    def test_parse_dunstctl_count_invalid(self):
+        self.assertEqual(parse_dunstctl_count("error"), DunstCounts())
+
+    @patch("ebenezer.core.dunst.subprocess.check_output")
+    def test_read_dunstctl_count_failure(self, mock_check_output):
+        mock_check_output.side_effect = FileNotFoundError("dunstctl")
+
+        self.assertEqual(read_dunstctl_count(), DunstCounts())
+
+
+class TestDunstEvents(unittest.TestCase):
+    def test_fallback_polling(self):
+        read_fallback = MagicMock(
+            side_effect=[DunstCounts(history=1), DunstCounts(history=1)]
+            + [DunstCounts(history=2)] * 10
+        )
+        events = DunstEvents(
+            bus_address="unix:path=/nonexistent/bus",
+            poll_interval=0.01,
+            read_fallback=read_fallback,
+        )
+        callback = MagicMock()
+
+        async def _run():
+            events.subscribe(callback)
+            await asyncio.sleep(0.2)
+            events.unsubscribe(callback)
+            await asyncio.sleep(0)
+
+        asyncio.run(_run())
+
+        self.assertGreaterEqual(read_fallback.call_count, 3)
+        self.assertEqual([c.args[0].history for c in callback.call_args_list], [1, 2])
+        self.assertFalse(events.running)
+
+
+@unittest.skipUnless(
+    has_dbus and shutil.which("dbus-daemon"), "dbus-fast and dbus-daemon required"
+)
+class TestDunstEventsBus(unittest.TestCase):
+    def setUp(self):
+        self.daemon = subprocess.Popen(
+            ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(self.daemon.wait)
+        self.addCleanup(self.daemon.terminate)
+        self.address = self.daemon.stdout.readline().strip()
+
+    def test_counts_follow_signals(self):
+        read_fallback = MagicMock(return_value=DunstCounts())
+        events = DunstEvents(
+            bus_address=self.address, debounce=0.01, read_fallback=read_fallback
+        )
+        callback = MagicMock()
+        dunst = StubDunst()
+
+        async def _run():
+            bus = await MessageBus(bus_address=self.address).connect()
+            bus.export("/org/freedesktop/Notifications", dunst)
+            await bus.request_name("org.freedesktop.Notifications")
+
+            events.subscribe(callback)
+            await asyncio.sleep(0.2)
+
+            dunst.set_history(3)
+            await asyncio.sleep(0.2)
+
+            dunst.set_history(3)
+            await asyncio.sleep(0.2)
+
+            events.unsubscribe(callback)
+            await asyncio.sleep(0)
+            bus.disconnect()
+
+        asyncio.run(_run())
+
+        read_fallback.assert_not_called()
+        self.assertEqual(
+            [c.args[0] for c in callback.call_args_list],
+            [
+                DunstCounts(waiting=0, displayed=1, history=0),
+                DunstCounts(waiting=0, displayed=1, history=3),
+            ],
+        )
+
+    def test_fallback_without_dunst_interface(self):
+        read_fallback = MagicMock(return_value=DunstCounts(history=4))
+        events = DunstEvents(
+            bus_address=self.address, poll_interval=10, read_fallback=read_fallback
+        )
+        callback = MagicMock()
+
+        async def _run():
+            events.subscribe(callback)
+            await asyncio.sleep(0.2)
+            events.unsubscribe(callback)
+            await asyncio.sleep(0)
+
+        asyncio.run(_run())
+
+        read_fallback.assert_called_once_with()
+        callback.assert_called_once_with(DunstCounts(history=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ebenezer.core.github import GitHubNotificationsClient, count_json_array
+from ebenezer.core.http import AsyncHttpClient
+from ebenezer.core.http_cache import ResponseCache
+
+ETAG = '"abc123"'
+LAST_MODIFIED = "Thu, 01 Jan 2026 00:00:00 GMT"
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+
+        if self.headers.get("Authorization") != "token fake_token":
+            return self._send(401, b'{"message": "Bad credentials"}')
+
+        if self.headers.get("If-None-Match") == ETAG:
+            return self._send(304, b"")
+
+        page = 2 if "page=2" in self.path else 1
+        body = json.dumps(server.pages[page - 1]).encode()
+        headers = {"ETag": ETAG, "Last-Modified": LAST_MODIFIED}
+
+        if page < len(server.pages):
+            port = server.server_address[1]
+            headers["Link"] = (
+                f'<http://127.0.0.1:{port}/notifications?page=2>; rel="next"'
+            )
+
+        self._send(200, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("X-Poll-Interval", "90")
+
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub_server(pages: list) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHubHandler)
+    server.pages = pages
+    server.requests = []
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    ).start()
+    return server
+
+
+class TestCountJsonArray(unittest.TestCase):
+    def test_count_json_array(self):
+        data = json.dumps(
+            [
+                {"id": 1, "subject": {"title": 'a "quoted" {title} [1]'}},
+                {"id": 2, "reasons": [{"a": "\\"}, {"b": "}"}]},
+                {"id": 3, "title": "back\\\\slash\\\\"},
+            ]
+        ).encode()
+
+        self.assertEqual(count_json_array([data]), 3)
+        self.assertEqual(count_json_array(data[i : i + 1] for i in range(len(data))), 3)
+
+    def test_count_json_array_empty(self):
+        self.assertEqual(count_json_array([b"[]"]), 0)
+        self.assertEqual(count_json_array([b"[", b" ", b"]"]), 0)
+
+
+class TestGitHubNotificationsClient(unittest.TestCase):
+    def setUp(self):
+        self.server = start_stub_server(
+            [[{"id": i} for i in range(50)], [{"id": i} for i in range(3)]]
+        )
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        port = self.server.server_address[1]
+        self.http = AsyncHttpClient()
+        self.client = GitHubNotificationsClient(
+            "fake_token", url=f"http://127.0.0.1:{port}/notifications", http=self.http
+        )
+
+    def _fetch_count(self, times: int = 1):
+        async def _fetch():
+            try:
+                return [await self.client.fetch_count() for _ in range(times)]
+            finally:
+                await self.http.close()
+
+        return asyncio.run(_fetch())[-1]
+
+    def test_fetch_count_pages(self):
+        self.assertEqual(self._fetch_count(), 53)
+        self.assertEqual(self.client.poll_interval, 90)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIn("per_page=50", self.server.requests[0][0])
+
+    def test_fetch_count_not_modified(self):
+        self.assertEqual(self._fetch_count(times=2), 53)
+
+        path, headers = self.server.requests[-1]
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(headers["If-None-Match"], ETAG)
+        self.assertEqual(self.http.connections_opened, 1)
+        self.assertEqual(headers["If-Modified-Since"], LAST_MODIFIED)
+        self.assertEqual(self.client.status_code, 304)
+
+    def test_fetch_count_error(self):
+        self.client.token = "wrong_token"
+
+        self.assertIsNone(self._fetch_count())
+        self.assertEqual(self.client.status_code, 401)
+
+    def test_fetch_count_restored_from_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.client.cache = ResponseCache(cache_dir)
+
+        self.assertEqual(self._fetch_count(), 53)
+
+        self.http = AsyncHttpClient()
+        restarted = GitHubNotificationsClient(
+            "fake_token",
+            url=self.client.url,
+            http=self.http,
+            cache=ResponseCache(cache_dir),
+        )
+        self.client = restarted
+
+        self.assertEqual(restarted.restore(), 53)
+        self.assertEqual(restarted.poll_interval, 90)
+        self.assertEqual(self._fetch_count(), 53)
+
+        path, headers = self.server.requests[-1]
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(headers["If-None-Match"], ETAG)
+
+    def test_restore_other_token(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.client.cache = ResponseCache(cache_dir)
+        self._fetch_count()
+
+        other = GitHubNotificationsClient(
+            "other_token", url=self.client.url, cache=ResponseCache(cache_dir)
+        )
+
+        self.assertIsNone(other.restore())
+
+
+if __name__ == "__main__":
+    unittest.main()
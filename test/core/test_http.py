@@ -0,0 +1,272 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from ebenezer.core.http import AsyncHttpClient, HttpResponse, get_http_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.1)
+
+            if self.path == "/chunked":
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                for chunk in (b'{"a": ', b"1}"):
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+
+                self.wfile.write(b"0\r\n\r\n")
+            elif self.path == "/redirect":
+                self._send(302, b"", {"Location": "/json?redirected=1"})
+            elif self.path.startswith("/redirect-to/"):
+                self._send(302, b"", {"Location": self.path[len("/redirect-to/") :]})
+            elif self.path == "/credentials":
+                body = json.dumps(
+                    [self.headers.get("Authorization"), self.headers.get("Cookie")]
+                )
+                self._send(200, body.encode(), {})
+            else:
+                body = b'{"path": "%s"}' % self.path.encode()
+                self._send(200, body, {"Link": '</next>; rel="next"'})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status: int, body: bytes, headers: dict):
+        self.send_response(status)
+
+        for key, value in headers.items():
+            self.send_header(key, value)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # the client hangs up on purpose in the timeout tests
+        pass
+
+
+class TestAsyncHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.server = self._serve()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _serve(self) -> StubServer:
+        server = StubServer(("127.0.0.1", 0), StubHandler)
+        server.lock = threading.Lock()
+        server.active = 0
+        server.max_active = 0
+        threading.Thread(
+            target=server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        ).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        return server
+
+    def _run(self, coroutine_fn, client: AsyncHttpClient):
+        async def _main():
+            try:
+                return await coroutine_fn()
+            finally:
+                await client.close()
+
+        return asyncio.run(_main())
+
+    def test_get_reuses_connection(self):
+        client = AsyncHttpClient()
+
+        async def _get():
+            return [
+                await client.get(f"{self.base_url}/json", params={"page": i})
+                for i in range(3)
+            ]
+
+        responses = self._run(_get, client)
+
+        self.assertEqual([r.status for r in responses], [200, 200, 200])
+        self.assertEqual(responses[2].json(), {"path": "/json?page=2"})
+        self.assertEqual(responses[0].links["next"]["url"], "/next")
+        self.assertEqual(client.connections_opened, 1)
+
+    def test_get_chunked(self):
+        client = AsyncHttpClient()
+        chunks = []
+
+        async def _get():
+            first = await client.get(f"{self.base_url}/chunked")
+            second = await client.get(
+                f"{self.base_url}/chunked", on_chunk=chunks.append
+            )
+            return first, second
+
+        first, second = self._run(_get, client)
+
+        self.assertEqual(first.json(), {"a": 1})
+        self.assertEqual(second.body, b"")
+        self.assertEqual(b"".join(chunks), b'{"a": 1}')
+        self.assertEqual(client.connections_opened, 1)
+
+    def test_get_follows_redirects(self):
+        client = AsyncHttpClient()
+
+        response = self._run(lambda: client.get(f"{self.base_url}/redirect"), client)
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.json(), {"path": "/json?redirected=1"})
+        self.assertTrue(response.url.endswith("/json?redirected=1"))
+
+    def test_get_redirect_keeps_credentials_on_origin(self):
+        client = AsyncHttpClient()
+        headers = {"Authorization": "token secret", "Cookie": "session=1"}
+
+        response = self._run(
+            lambda: client.get(
+                f"{self.base_url}/redirect-to/{self.base_url}/credentials",
+                headers=headers,
+            ),
+            client,
+        )
+
+        self.assertEqual(response.json(), ["token secret", "session=1"])
+
+    def test_get_redirect_drops_credentials_across_origins(self):
+        other_url = f"http://127.0.0.1:{self._serve().server_address[1]}"
+        client = AsyncHttpClient()
+        headers = {"Authorization": "token secret", "Cookie": "session=1"}
+
+        response = self._run(
+            lambda: client.get(
+                f"{self.base_url}/redirect-to/{other_url}/credentials",
+                headers=headers,
+            ),
+            client,
+        )
+
+        self.assertEqual(response.json(), [None, None])
+        self.assertEqual(headers["Authorization"], "token secret")
+
+    def test_get_through_proxy(self):
+        client = AsyncHttpClient()
+        environ = {
+            "http_proxy": self.base_url,
+            "HTTP_PROXY": self.base_url,
+            "no_proxy": "",
+            "NO_PROXY": "",
+        }
+
+        with patch.dict(os.environ, environ):
+            response = self._run(
+                lambda: client.get("http://ebenezer.invalid/json"), client
+            )
+
+        # a proxy receives the absolute URL of the request
+        self.assertEqual(response.json(), {"path": "http://ebenezer.invalid/json"})
+        self.assertEqual(client.connections_opened, 0)
+
+    def test_get_bypasses_proxy(self):
+        client = AsyncHttpClient()
+        environ = {
+            "http_proxy": "http://127.0.0.1:9",
+            "HTTP_PROXY": "http://127.0.0.1:9",
+            "no_proxy": "127.0.0.1",
+            "NO_PROXY": "127.0.0.1",
+        }
+
+        with patch.dict(os.environ, environ):
+            response = self._run(lambda: client.get(f"{self.base_url}/json"), client)
+
+        self.assertEqual(response.json(), {"path": "/json"})
+        self.assertEqual(client.connections_opened, 1)
+
+    def test_get_rejects_line_breaks(self):
+        client = AsyncHttpClient()
+
+        for url, headers in (
+            (f"{self.base_url}/json", {"Authorization": "token x\r\nX-Injected: 1"}),
+            (f"{self.base_url}/json", {"X-Injected: 1\r\nAuthorization": "token"}),
+            (f"{self.base_url}/json\r\nX-Injected: 1", {}),
+        ):
+            with self.assertRaises(ValueError):
+                self._run(lambda: client.get(url, headers=headers), client)
+
+        self.assertEqual(client.connections_opened, 0)
+
+    def test_get_limits_requests_per_host(self):
+        client = AsyncHttpClient(max_per_host=2)
+
+        async def _get():
+            return await asyncio.gather(
+                *[client.get(f"{self.base_url}/slow") for _ in range(6)]
+            )
+
+        responses = self._run(_get, client)
+
+        self.assertTrue(all(r.ok for r in responses))
+        self.assertEqual(self.server.max_active, 2)
+        self.assertEqual(client.connections_opened, 2)
+
+    def test_get_timeout(self):
+        client = AsyncHttpClient(timeout=0.02)
+
+        with self.assertRaises(TimeoutError):
+            self._run(lambda: client.get(f"{self.base_url}/slow"), client)
+
+    def test_get_http_client_per_loop(self):
+        async def _get_client():
+            return get_http_client(), get_http_client()
+
+        first, same = asyncio.run(_get_client())
+        second, _ = asyncio.run(_get_client())
+
+        self.assertIs(first, same)
+        self.assertIsNot(first, second)
+
+
+class TestHttpResponse(unittest.TestCase):
+    def test_links(self):
+        response = HttpResponse(
+            "https://api.github.com/notifications",
+            200,
+            {
+                "link": '<https://api.github.com/notifications?page=2>; rel="next", '
+                '<https://api.github.com/notifications?page=5>; rel="last"'
+            },
+            b"[]",
+        )
+
+        self.assertEqual(
+            response.links["next"]["url"],
+            "https://api.github.com/notifications?page=2",
+        )
+        self.assertEqual(response.links["last"]["rel"], "last")
+        self.assertEqual(response.json(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from ebenezer.core.http import AsyncHttpClient, HttpResponse
+from ebenezer.core.http_cache import ResponseCache, cache_key
+
+ETAG = '"v1"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = server.body
+        self.send_response(server.status)
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.requests = []
+        self.server.etag = ETAG
+        self.server.status = 200
+        self.server.body = b'{"temp": 20}'
+        threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        ).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/weather"
+        self.cache = ResponseCache(self.cache_dir, ttl=60, stale_ttl=3600)
+
+    def _get(self, cache: ResponseCache | None = None, **kwargs) -> HttpResponse:
+        cache = cache or self.cache
+
+        async def _main():
+            http = AsyncHttpClient()
+
+            try:
+                response = await cache.get(self.url, {"q": "x"}, http=http, **kwargs)
+                await cache.join()
+                return response
+            finally:
+                await http.close()
+
+        return asyncio.run(_main())
+
+    def _age(self, seconds: float):
+        self.cache.load(self.url, {"q": "x"}).stored_at -= seconds
+
+    def test_get_fetches_and_stores(self):
+        response = self._get()
+
+        self.assertEqual(response.json(), {"temp": 20})
+        self.assertEqual(len(self.server.requests), 1)
+
+        restarted = ResponseCache(self.cache_dir)
+        cached = restarted.load(self.url, {"q": "x"})
+
+        self.assertEqual(cached.json(), {"temp": 20})
+        self.assertEqual(cached.headers["etag"], ETAG)
+
+    def test_get_fresh_without_request(self):
+        self._get()
+        response = self._get(ResponseCache(self.cache_dir, ttl=60))
+
+        self.assertEqual(response.json(), {"temp": 20})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_get_stale_while_revalidate(self):
+        self._get()
+        self._age(120)
+        self.server.etag = '"v2"'
+        self.server.body = b'{"temp": 25}'
+        revalidated = []
+
+        response = self._get(on_revalidated=revalidated.append)
+
+        self.assertEqual(response.json(), {"temp": 20})
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1]["If-None-Match"], ETAG)
+        self.assertEqual([r.json() for r in revalidated], [{"temp": 25}])
+        self.assertEqual(self.cache.load(self.url, {"q": "x"}).json(), {"temp": 25})
+
+    def test_get_stale_not_modified(self):
+        self._get()
+        self._age(120)
+        revalidated = []
+
+        self._get(on_revalidated=revalidated.append)
+
+        self.assertEqual(revalidated, [])
+        self.assertLess(self.cache.load(self.url, {"q": "x"}).age, 60)
+
+    def test_get_expired_fetches(self):
+        self._get()
+        self._age(7200)
+        self.server.etag = '"v2"'
+        self.server.body = b'{"temp": 25}'
+
+        response = self._get()
+
+        self.assertEqual(response.json(), {"temp": 25})
+
+    def test_get_error_not_stored(self):
+        self.server.status = 500
+
+        response = self._get()
+
+        self.assertEqual(response.status, 500)
+        self.assertIsNone(self.cache.load(self.url, {"q": "x"}))
+
+    def test_get_stale_offline(self):
+        self._get()
+        self._age(120)
+        self.server.shutdown()
+        self.server.server_close()
+
+        with patch.object(AsyncHttpClient, "get", side_effect=OSError("offline")):
+            response = self._get()
+
+        self.assertEqual(response.json(), {"temp": 20})
+
+    def test_clear(self):
+        self._get()
+
+        self.assertEqual(len(self.cache.clear()), 1)
+        self.assertIsNone(self.cache.load(self.url, {"q": "x"}))
+
+    def test_cache_key(self):
+        self.assertEqual(
+            cache_key("https://example.com", {"a": 1, "b": 2}),
+            cache_key("https://example.com", {"b": 2, "a": 1}),
+        )
+        self.assertNotEqual(
+            cache_key("https://example.com", {"a": 1}),
+            cache_key("https://example.com", {"a": 2}),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
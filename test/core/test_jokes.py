@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from ebenezer.core.jokes import JokeStore, joke_hash
+
+
+class TestJokeStore(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.store = JokeStore(Path(self.cache_dir).joinpath("jokes.sqlite3"))
+        self.addCleanup(self.store.close)
+
+    def test_joke_hash(self):
+        self.assertEqual(joke_hash("A  joke\n"), joke_hash("a joke"))
+        self.assertNotEqual(joke_hash("a joke"), joke_hash("another joke"))
+
+    def test_add_deduplicates(self):
+        self.assertEqual(self.store.add("reddit", ["a", "b", "A ", ""]), 2)
+        self.assertEqual(self.store.add("icanhazdad", ["b", "c"]), 1)
+        self.assertEqual(self.store.unseen(), 3)
+
+    def test_next_empty(self):
+        self.assertIsNone(self.store.next())
+
+    def test_next_rotation(self):
+        jokes = [f"joke {i}" for i in range(5)]
+        self.store.add("reddit", jokes)
+
+        shown = [self.store.next() for _ in jokes]
+
+        self.assertCountEqual(shown, jokes)
+        self.assertEqual(self.store.unseen(), 0)
+
+        # the rotation starts over, without the last joke shown
+        self.assertNotEqual(self.store.next(), shown[-1])
+        self.assertEqual(self.store.unseen(), 3)
+
+    def test_next_single_joke(self):
+        self.store.add("reddit", ["joke"])
+
+        self.assertEqual(self.store.next(), "joke")
+        self.assertEqual(self.store.next(), "joke")
+
+    def test_needs_refill(self):
+        store = JokeStore(Path(self.cache_dir).joinpath("low.sqlite3"), low_watermark=2)
+        self.addCleanup(store.close)
+        store.add("reddit", ["a", "b"])
+
+        self.assertFalse(store.needs_refill())
+
+        store.next()
+
+        self.assertTrue(store.needs_refill())
+
+    def test_prune_shown_jokes(self):
+        store = JokeStore(Path(self.cache_dir).joinpath("small.sqlite3"), max_jokes=3)
+        self.addCleanup(store.close)
+        store.add("reddit", ["a", "b", "c"])
+        shown = store.next()
+
+        store.add("reddit", ["d"])
+
+        self.assertEqual(store.unseen(), 3)
+        self.assertEqual(store.add("reddit", [shown]), 1)
+
+    def test_persistence(self):
+        self.store.add("reddit", ["a", "b"])
+        shown = self.store.next()
+        self.store.close()
+
+        store = JokeStore(self.store.path)
+        self.addCleanup(store.close)
+
+        self.assertEqual(store.unseen(), 1)
+        self.assertNotEqual(store.next(), shown)
+
+    def test_concurrent_add(self):
+        threads = [
+            threading.Thread(
+                target=self.store.add,
+                args=("reddit", [f"joke {i}" for i in range(50)]),
+            )
+            for _ in range(4)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.store.unseen(), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from PIL import Image, ImageChops, ImageDraw, ImageStat
+
+from ebenezer.core.lock_image import (
+    BLUR_BALANCED,
+    BLUR_EXACT,
+    BLUR_FAST,
+    DEFAULT_BLUR_SIGMA,
+    StageTimer,
+    blur_image,
+    compose_overlay,
+    grab_screen,
+    parse_blur_sigma,
+    render_text_overlay,
+    resolve_blur,
+    write_image,
+    write_raw_image,
+)
+
+
+class TestLockImage(unittest.TestCase):
+    def setUp(self):
+        self.image = Image.new("RGB", (64, 64), "#000000")
+
+        for x in range(0, 64, 2):
+            for y in range(64):
+                self.image.putpixel((x, y), (255, 255, 255))
+
+    def test_parse_blur_sigma(self):
+        self.assertEqual(parse_blur_sigma("0x7"), 7.0)
+        self.assertEqual(parse_blur_sigma("5x2.5"), 2.5)
+        self.assertEqual(parse_blur_sigma("3"), 3.0)
+        self.assertEqual(parse_blur_sigma("wrong"), DEFAULT_BLUR_SIGMA)
+
+    def test_stage_timer(self):
+        timer = StageTimer()
+
+        with timer.stage("grab"):
+            pass
+
+        with self.assertRaises(ValueError):
+            with timer.stage("blur"):
+                raise ValueError()
+
+        self.assertEqual([name for name, _ in timer.stages], ["grab", "blur"])
+        self.assertRegex(str(timer), r"^grab \d+ms, blur \d+ms$")
+        self.assertGreaterEqual(timer.total, sum(d for _, d in timer.stages))
+
+    def test_blur_image(self):
+        blurred = blur_image(self.image, 3)
+
+        self.assertEqual(blurred.size, self.image.size)
+        self.assertLess(
+            ImageStat.Stat(blurred).stddev[0], ImageStat.Stat(self.image).stddev[0] / 4
+        )
+        self.assertIs(blur_image(self.image, 0), self.image)
+
+    def test_resolve_blur(self):
+        self.assertEqual(resolve_blur("0x7", BLUR_FAST), (7.0, BLUR_FAST))
+        self.assertEqual(
+            resolve_blur("Exact", BLUR_FAST), (DEFAULT_BLUR_SIGMA, BLUR_EXACT)
+        )
+
+    def test_blur_image_levels_visual_diff(self):
+        # a screen-like frame: flat panels, sharp edges and lines of text
+        screen = Image.new("RGB", (640, 360), "#1e1e2e")
+        draw = ImageDraw.Draw(screen)
+        draw.rectangle((0, 0, 640, 24), fill="#313244")
+        draw.rectangle((40, 60, 380, 320), fill="#f5f5f5")
+
+        for y in range(80, 300, 14):
+            draw.text((50, y), "def blur_image(image, sigma):" * 2, fill="#000000")
+
+        exact = blur_image(screen, 7, BLUR_EXACT)
+
+        for quality, max_mean, max_peak in (
+            (BLUR_BALANCED, 0.5, 4),
+            (BLUR_FAST, 1, 8),
+        ):
+            blurred = blur_image(screen, 7, quality)
+            diff = ImageChops.difference(blurred, exact)
+
+            self.assertEqual(blurred.size, screen.size)
+            self.assertLess(max(ImageStat.Stat(diff).mean), max_mean, quality)
+            self.assertLess(max(hi for _, hi in diff.getextrema()), max_peak, quality)
+
+    def test_blur_image_light_blur_exact(self):
+        self.assertEqual(
+            blur_image(self.image, 1, BLUR_FAST).tobytes(),
+            blur_image(self.image, 1, BLUR_EXACT).tobytes(),
+        )
+
+    def test_blur_image_unknown_quality(self):
+        self.assertEqual(
+            blur_image(self.image, 3, "wrong").tobytes(),
+            blur_image(self.image, 3, BLUR_EXACT).tobytes(),
+        )
+
+    def test_render_text_overlay(self):
+        overlay = render_text_overlay(
+            (200, 100), "joke", "/not/found.ttf", 12, "#ff0000", "#0000ff"
+        )
+        x, y = overlay.position
+
+        self.assertEqual(overlay.size, (200, 100))
+        self.assertEqual(overlay.text.mode, "RGBA")
+        self.assertLess(overlay.text.width, 100)
+        self.assertLess(overlay.text.height, 20)
+        self.assertAlmostEqual(x + overlay.text.width / 2, 100, delta=1)
+        self.assertGreater(overlay.text.getchannel("A").getextrema()[1], 200)
+        self.assertEqual(overlay.text.getpixel((0, 0))[:3], (0, 0, 255))
+
+    def test_compose_overlay(self):
+        background = Image.new("RGB", (200, 100), (200, 100, 0))
+        background.paste((0, 50, 250), (0, 0, 100, 100))
+        overlay = render_text_overlay(
+            (200, 100), "a joke", "/not/found.ttf", 24, "#ffffff", "#000000"
+        )
+
+        # the full screen overlay blended by the previous pipeline
+        full_overlay = Image.new("RGB", overlay.size, overlay.background)
+        full_overlay.paste(
+            overlay.text.convert("RGB"),
+            overlay.position,
+            overlay.text.getchannel("A"),
+        )
+        expected = Image.blend(background, full_overlay, 0.5)
+
+        image = compose_overlay(background, overlay)
+
+        self.assertEqual(image.mode, "RGB")
+        self.assertEqual(image.getpixel((0, 0)), (127, 152, 252))
+        self.assertLessEqual(
+            max(hi for _, hi in ImageChops.difference(image, expected).getextrema()),
+            1,
+        )
+
+    def test_compose_overlay_clipped(self):
+        overlay = render_text_overlay(
+            (40, 10), "a long joke", "/not/found.ttf", 24, "#ffffff", "#000000"
+        )
+
+        image = compose_overlay(Image.new("RGB", (40, 10), "#000000"), overlay)
+
+        self.assertEqual(image.size, (40, 10))
+
+    def test_write_image(self):
+        fd, output_file = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+        self.addCleanup(os.remove, output_file)
+
+        write_image(self.image, output_file)
+
+        with Image.open(output_file) as image:
+            self.assertEqual(image.format, "PNG")
+            self.assertEqual(image.tobytes(), self.image.tobytes())
+
+    def test_write_raw_image(self):
+        fd, output_file = tempfile.mkstemp(suffix=".raw")
+        os.close(fd)
+        self.addCleanup(os.remove, output_file)
+
+        raw = write_raw_image(self.image, output_file)
+
+        with open(output_file, "rb") as f:
+            data = f.read()
+
+        self.assertEqual(raw, "64x64:rgbx")
+        self.assertEqual(len(data), 64 * 64 * 4)
+        self.assertEqual(data[:8], b"\xff\xff\xff\xff\x00\x00\x00\xff")
+
+    @patch("ebenezer.core.lock_image.subprocess.run")
+    @patch("ebenezer.core.lock_image.ImageGrab.grab", side_effect=OSError("no xcb"))
+    def test_grab_screen_scrot(self, mock_grab, mock_run):
+        output = io.BytesIO()
+        self.image.save(output, "PNG")
+        mock_run.return_value = MagicMock(stdout=output.getvalue())
+
+        screenshot = grab_screen()
+
+        self.assertEqual(screenshot.size, (64, 64))
+        mock_run.assert_called_once_with(
+            ["scrot", "-o", "-"], capture_output=True, check=True
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
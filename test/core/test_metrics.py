@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ebenezer.core.metrics import (
+    DEFAULT_INTERVAL,
+    MetricsSampler,
+    MetricsSnapshot,
+    sample_metrics,
+)
+
+
+class TestSampleMetrics(unittest.TestCase):
+    @patch("ebenezer.core.metrics.psutil")
+    def test_sample_metrics(self, mock_psutil):
+        mock_psutil.cpu_percent.return_value = 42.5
+        mock_psutil.cpu_freq.return_value = MagicMock(
+            current=2400.0, min=800.0, max=4000.0
+        )
+        mock_psutil.virtual_memory.return_value = MagicMock(
+            total=8, used=4, free=2, available=3, percent=50.0
+        )
+        mock_psutil.swap_memory.return_value = MagicMock(
+            total=2, used=1, free=1, percent=50.0
+        )
+        mock_psutil.sensors_temperatures.return_value = {
+            "coretemp": [
+                MagicMock(label="Core 0", current=55.0),
+                MagicMock(label="", current=60.0),
+            ]
+        }
+
+        snapshot = sample_metrics()
+
+        self.assertEqual(snapshot.cpu_percent, 42.5)
+        self.assertEqual(snapshot.cpu_freq, (2400.0, 800.0, 4000.0))
+        self.assertEqual(snapshot.memory.used, 4)
+        self.assertEqual(snapshot.memory.swap_used, 1)
+        self.assertEqual(snapshot.temperatures, {"Core 0": 55.0, "coretemp-0": 60.0})
+        mock_psutil.cpu_percent.assert_called_once()
+
+
+class TestMetricsSampler(unittest.TestCase):
+    def setUp(self):
+        self.sample_fn = MagicMock(side_effect=lambda: MetricsSnapshot(cpu_percent=1))
+        self.sampler = MetricsSampler(sample_fn=self.sample_fn)
+
+    def test_sample_fans_out_one_snapshot(self):
+        first, second = MagicMock(), MagicMock()
+        self.sampler.subscribe(first)
+        self.sampler.subscribe(second)
+
+        snapshot = self.sampler.sample()
+
+        self.sample_fn.assert_called_once()
+        first.assert_called_once_with(snapshot)
+        second.assert_called_once_with(snapshot)
+        self.assertIs(self.sampler.latest, snapshot)
+
+    def test_subscribe_receives_latest(self):
+        snapshot = self.sampler.sample()
+        callback = MagicMock()
+
+        self.sampler.subscribe(callback)
+
+        callback.assert_called_once_with(snapshot)
+
+    def test_unsubscribe(self):
+        callback = MagicMock()
+        self.sampler.subscribe(callback)
+        self.sampler.unsubscribe(callback)
+
+        self.sampler.sample()
+
+        callback.assert_not_called()
+
+    def test_publish_error(self):
+        failing = MagicMock(side_effect=ValueError("boom"))
+        callback = MagicMock()
+        self.sampler.subscribe(failing)
+        self.sampler.subscribe(callback)
+
+        self.sampler.sample()
+
+        callback.assert_called_once()
+
+    def test_interval(self):
+        self.assertEqual(self.sampler.interval, DEFAULT_INTERVAL)
+
+        self.sampler.subscribe(MagicMock(), 2)
+        self.sampler.subscribe(MagicMock(), 0.5)
+        self.sampler.subscribe(MagicMock(), None)
+
+        self.assertEqual(self.sampler.interval, 0.5)
+
+    @patch("ebenezer.core.metrics.qtile")
+    def test_tick(self, mock_qtile):
+        future = MagicMock()
+        future.result.return_value = MetricsSnapshot(cpu_percent=10)
+        mock_qtile.run_in_executor.return_value = future
+        callback = MagicMock()
+
+        self.sampler.subscribe(callback, 2)
+        mock_qtile.call_later.assert_called_once_with(0, self.sampler._tick)
+
+        self.sampler._tick()
+        mock_qtile.run_in_executor.assert_called_once_with(self.sample_fn)
+
+        self.sampler._on_sampled(future)
+        callback.assert_called_once_with(future.result.return_value)
+        mock_qtile.call_later.assert_called_with(2, self.sampler._tick)
+
+
+if __name__ == "__main__":
+    unittest.main()
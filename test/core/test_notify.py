@@ -1,14 +1,30 @@
+import asyncio
+import shutil
+import subprocess
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from ebenezer.core.notify import (
+    NotificationClient,
+    has_dbus,
     push_notification,
     push_notification_no_history,
     push_notification_progress,
 )
 
+if has_dbus:
+    from dbus_fast.aio import MessageBus
+    from dbus_fast.service import ServiceInterface, method
+
 
 class TestNotify(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("ebenezer.core.notify.get_notification_client")
+        patcher.start().return_value = MagicMock(available=False)
+        self.addCleanup(patcher.stop)
+
     @patch("ebenezer.core.notify.run_shell_command")
     def test_push_notification(self, mock_run_shell_command):
         title = "Test Title"
@@ -43,5 +59,126 @@ class TestNotify(unittest.TestCase):
         )
 
 
+if has_dbus:
+
+    class StubNotificationServer(ServiceInterface):
+        def __init__(self):
+            super().__init__("org.freedesktop.Notifications")
+            self.calls = []
+            self.last_id = 0
+
+        @method()
+        def Notify(
+            self,
+            app_name: "s",  # noqa: F821
+            replaces_id: "u",  # noqa: F821
+            app_icon: "s",  # noqa: F821
+            summary: "s",  # noqa: F821
+            body: "s",  # noqa: F821
+            actions: "as",  # noqa: F821
+            hints: "a{sv}",  # noqa: F821
+            expire_timeout: "i",  # noqa: F821
+        ) -> "u":  # noqa: F821
+            self.calls.append((app_name, replaces_id, summary, body, hints))
+
+            if replaces_id:
+                return replaces_id
+
+            self.last_id += 1
+            return self.last_id
+
+
+@unittest.skipUnless(
+    has_dbus and shutil.which("dbus-daemon"), "dbus-fast and dbus-daemon required"
+)
+class TestNotificationClient(unittest.TestCase):
+    def setUp(self):
+        self.daemon = subprocess.Popen(
+            ["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(self.daemon.wait)
+        self.addCleanup(self.daemon.terminate)
+        self.address = self.daemon.stdout.readline().strip()
+
+        self.server = StubNotificationServer()
+        self.loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(self.loop.call_soon_threadsafe, self.loop.stop)
+
+        async def _serve():
+            bus = await MessageBus(bus_address=self.address).connect()
+            bus.export("/org/freedesktop/Notifications", self.server)
+            await bus.request_name("org.freedesktop.Notifications")
+            return bus
+
+        bus = asyncio.run_coroutine_threadsafe(_serve(), self.loop).result(5)
+        self.addCleanup(
+            lambda: asyncio.run_coroutine_threadsafe(
+                self._disconnect(bus), self.loop
+            ).result(5)
+        )
+
+        self.client = NotificationClient(bus_address=self.address)
+        self.addCleanup(self.client.close)
+
+    async def _disconnect(self, bus):
+        bus.disconnect()
+
+    def test_notify_replaces_by_tag(self):
+        first = self.client.notify("Volume 50%", tag="osd", hints={"value": 50})
+        second = self.client.notify("Volume 55%", tag="osd", hints={"value": 55})
+        other = self.client.notify("Locking", "soon", hints={"transient": True})
+
+        self.assertEqual(first.result(5), second.result(5))
+        self.assertNotEqual(first.result(5), other.result(5))
+
+        calls = {c[2]: c for c in self.server.calls}
+        self.assertEqual(calls["Volume 50%"][1], 0)
+        self.assertEqual(calls["Volume 55%"][1], first.result())
+        self.assertEqual(calls["Locking"][1], 0)
+
+        hints = calls["Volume 55%"][4]
+        self.assertEqual(hints["value"].value, 55)
+        self.assertEqual(hints["urgency"].value, 0)
+        self.assertTrue(calls["Locking"][4]["transient"].value)
+
+    @patch("ebenezer.core.notify.run_shell_command")
+    def test_push_notification_progress(self, mock_run_shell_command):
+        with patch("ebenezer.core.notify._client", self.client):
+            push_notification_progress("Volume 50%", 50).result(5)
+            push_notification("Volume", "Muted").result(5)
+
+        mock_run_shell_command.assert_not_called()
+        self.assertEqual([c[1] for c in self.server.calls], [0, 1])
+        self.assertEqual(self.server.calls[1][2:4], ("Volume", "Muted"))
+
+    @patch("ebenezer.core.notify.run_shell_command")
+    def test_push_notification_falls_back(self, mock_run_shell_command):
+        client = NotificationClient(bus_address="unix:path=/nonexistent/bus")
+        self.addCleanup(client.close)
+
+        with patch("ebenezer.core.notify._client", client):
+            future = push_notification("Volume", "Muted")
+
+            with self.assertRaises(Exception):
+                future.result(5)
+
+            self.assertFalse(client.available)
+            push_notification("Volume", "On")
+
+            for _ in range(50):
+                if mock_run_shell_command.call_count == 2:
+                    break
+
+                time.sleep(0.1)
+
+        self.assertEqual(mock_run_shell_command.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image, ImageColor, ImageDraw
+
+from ebenezer.config.colors import AppSettingsColors
+from ebenezer.core.palette import (
+    PaletteCache,
+    PaletteColor,
+    extract_palette,
+    image_hash,
+    palette_colors,
+)
+
+
+class TestPalette(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache = PaletteCache(os.path.join(self.tmp_dir, "palettes"))
+
+        self.wallpaper = os.path.join(self.tmp_dir, "wallpaper.png")
+        image = Image.new("RGB", (800, 600), "#103049")
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((0, 0, 199, 599), fill="#e0702a")
+        draw.rectangle((200, 0, 299, 599), fill="#40a060")
+        image.save(self.wallpaper)
+
+    def test_extract_palette(self):
+        palette = extract_palette(self.wallpaper, 4)
+
+        # the edges blended by the downsampling may form a cluster of their own
+        self.assertEqual(
+            [color.hex for color in palette[:3]], ["#103049", "#e0702a", "#40a060"]
+        )
+        self.assertAlmostEqual(palette[0].share, 0.625, places=2)
+        self.assertAlmostEqual(sum(color.share for color in palette), 1.0)
+
+    def test_palette_colors(self):
+        colors = palette_colors(extract_palette(self.wallpaper))
+
+        self.assertEqual(set(colors) - set(AppSettingsColors().__dict__), set())
+        self.assertIn("rofi_background", colors)
+        self.assertNotIn("lock_screen_blank_color", colors)
+        # dark backgrounds of the dominant hue, the vivid orange as the accent
+        self.assertEqual(colors["bg_normal"], "#142029")
+        self.assertEqual(colors["fg_selected"], colors["rofi_selected"])
+        red, green, blue = ImageColor.getrgb(colors["fg_selected"])
+        self.assertGreater(red, green)
+        self.assertGreater(green, blue)
+        # the green of the palette is reused
+        red, green, blue = ImageColor.getrgb(colors["fg_green"])
+        self.assertGreater(green, blue)
+        self.assertGreater(blue, red)
+
+    def test_palette_colors_of_grayscale_image(self):
+        colors = palette_colors([PaletteColor((128, 128, 128), 1.0)])
+
+        self.assertEqual(colors["bg_normal"], "#1f1f1f")
+        self.assertEqual(colors["fg_selected"], "#999999")
+        # the named colors keep their hue
+        self.assertEqual(colors["fg_red"], "#ca7272")
+
+    def test_cache_by_content(self):
+        copy = os.path.join(self.tmp_dir, "copy.png")
+        shutil.copyfile(self.wallpaper, copy)
+
+        palette = self.cache.get(self.wallpaper)
+
+        with patch("ebenezer.core.palette.extract_palette") as mock_extract:
+            self.assertEqual(self.cache.get(copy), palette)
+
+        mock_extract.assert_not_called()
+        self.assertEqual(image_hash(copy), image_hash(self.wallpaper))
+
+    def test_cache_clear(self):
+        self.cache.get(self.wallpaper)
+
+        self.assertEqual(len(self.cache.clear()), 1)
+        self.assertEqual(self.cache.clear(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,23 @@
+import asyncio
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from ebenezer.core.requests import request_retry
+from ebenezer.core.requests import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    endpoint_of,
+    request_retry,
+    request_retry_async,
+)
 
 
 class TestRequestRetry(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("ebenezer.core.requests.time.sleep")
+        self.mock_sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_request_retry_success(self):
         operation = MagicMock(return_value="success")
 
@@ -32,6 +45,101 @@ class TestRequestRetry(unittest.TestCase):
         self.assertEqual(result, "success")
         self.assertEqual(operation.call_count, 3)
 
+    def test_request_retry_backoff(self):
+        operation = MagicMock(side_effect=Exception("failure"))
+        policy = RetryPolicy(retries=4, base_delay=1, jitter=0, deadline=None)
+
+        with self.assertRaises(Exception):
+            request_retry(operation, policy=policy)
+
+        self.assertEqual([c.args[0] for c in self.mock_sleep.call_args_list], [1, 2, 4])
+
+    def test_request_retry_jitter(self):
+        policy = RetryPolicy(retries=50, base_delay=1, max_delay=1, jitter=0.5)
+        delays = list(policy.delays())
+
+        self.assertEqual(len(delays), 49)
+        self.assertTrue(all(0.5 <= d <= 1 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_request_retry_deadline(self):
+        operation = MagicMock(side_effect=Exception("failure"))
+        policy = RetryPolicy(retries=10, base_delay=1, jitter=0, deadline=3.5)
+
+        with self.assertRaises(Exception):
+            request_retry(operation, policy=policy)
+
+        # the clock does not move with the mocked sleep, 4s is the first delay to overshoot
+        self.assertEqual([c.args[0] for c in self.mock_sleep.call_args_list], [1, 2])
+
+    def test_request_retry_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        operation = MagicMock(side_effect=ConnectionError("offline"))
+
+        with self.assertRaises(CircuitOpenError):
+            request_retry(
+                operation, retries=5, endpoint="https://api.github.com", breaker=breaker
+            )
+
+        self.assertEqual(operation.call_count, 2)
+
+        with self.assertRaises(CircuitOpenError):
+            request_retry(operation, endpoint="https://api.github.com", breaker=breaker)
+
+        self.assertEqual(operation.call_count, 2)
+        self.assertEqual(
+            request_retry(lambda: "ok", endpoint="https://other.host", breaker=breaker),
+            "ok",
+        )
+
+    @patch("ebenezer.core.requests.time.monotonic")
+    def test_circuit_breaker_probe(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure("host")
+
+        self.assertTrue(breaker.is_open("host"))
+
+        mock_monotonic.return_value = 131
+        self.assertFalse(breaker.is_open("host"))
+        self.assertTrue(breaker.is_open("host"))
+
+        breaker.record_success("host")
+        self.assertFalse(breaker.is_open("host"))
+
+    def test_endpoint_of(self):
+        self.assertEqual(
+            endpoint_of("https://api.github.com/notifications?per_page=50"),
+            "https://api.github.com",
+        )
+
+
+class TestRequestRetryAsync(unittest.TestCase):
+    @patch("ebenezer.core.requests.asyncio.sleep", new_callable=AsyncMock)
+    def test_request_retry_async(self, mock_sleep):
+        operation = AsyncMock(side_effect=[Exception("failure"), "success"])
+        policy = RetryPolicy(base_delay=0.5, jitter=0)
+
+        result = asyncio.run(request_retry_async(operation, policy=policy))
+
+        self.assertEqual(result, "success")
+        self.assertEqual(operation.await_count, 2)
+        mock_sleep.assert_awaited_once_with(0.5)
+
+    def test_request_retry_async_circuit_open(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure("https://icanhazdadjoke.com")
+        operation = AsyncMock()
+
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(
+                request_retry_async(
+                    operation, endpoint="https://icanhazdadjoke.com", breaker=breaker
+                )
+            )
+
+        operation.assert_not_awaited()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,33 +1,159 @@
+import asyncio
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.core.startup import run_startup_once
+from ebenezer.core.startup import (
+    STATUS_FAILED,
+    STATUS_OK,
+    STATUS_SKIPPED,
+    STATUS_TIMEOUT,
+    StartupEntry,
+    build_startup_entries,
+    load_startup_report,
+    run_startup,
+    run_startup_once,
+)
+
+
+class TestBuildStartupEntries(unittest.TestCase):
+    def test_build_startup_entries(self):
+        entries = build_startup_entries(
+            {
+                "command1": "echo 'Running command1'",
+                "command2": {
+                    "cmd": "echo 'Running command2'",
+                    "after": "command1",
+                    "timeout": 5,
+                },
+                "command3": {"cmd": "true", "after": ["command1", "command2"]},
+                "invalid": {"after": "command1"},
+            }
+        )
+
+        self.assertEqual(
+            entries,
+            [
+                StartupEntry("command1", "echo 'Running command1'"),
+                StartupEntry("command2", "echo 'Running command2'", ("command1",), 5.0),
+                StartupEntry("command3", "true", ("command1", "command2")),
+            ],
+        )
+
+
+class TestRunStartup(unittest.TestCase):
+    def test_run_startup_status(self):
+        results = asyncio.run(
+            run_startup(
+                [
+                    StartupEntry("ok", "exit 0"),
+                    StartupEntry("failed", "exit 2"),
+                    StartupEntry("timeout", "sleep 5", timeout=0.1),
+                ]
+            )
+        )
+
+        self.assertEqual(
+            [(r.name, r.status, r.returncode) for r in results],
+            [
+                ("ok", STATUS_OK, 0),
+                ("failed", STATUS_FAILED, 2),
+                ("timeout", STATUS_TIMEOUT, None),
+            ],
+        )
+
+    def test_run_startup_substitutes_once(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = f"{tmp_dir}/output"
+
+            asyncio.run(
+                run_startup(
+                    [StartupEntry("echo", "echo $value > $output")],
+                    value="'$home'",
+                    output=output,
+                )
+            )
+
+            with open(output) as f:
+                self.assertEqual(f.read(), "$home\n")
+
+    def test_run_startup_concurrently(self):
+        entries = [StartupEntry(f"sleep{i}", "sleep 0.3") for i in range(4)]
+
+        results = asyncio.run(run_startup(entries, max_workers=4))
+
+        self.assertTrue(all(r.started_at < 0.2 for r in results))
+
+    def test_run_startup_max_workers(self):
+        entries = [StartupEntry(f"sleep{i}", "sleep 0.2") for i in range(2)]
+
+        results = asyncio.run(run_startup(entries, max_workers=1))
+
+        self.assertGreaterEqual(results[1].started_at, 0.2)
+
+    def test_run_startup_after(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        entries = [
+            StartupEntry("second", f"cat {temp_dir}/first", after=("first",)),
+            StartupEntry("first", f"sleep 0.2 && touch {temp_dir}/first"),
+        ]
+
+        results = asyncio.run(run_startup(entries))
+
+        self.assertEqual([r.status for r in results], [STATUS_OK, STATUS_OK])
+        self.assertGreaterEqual(results[0].started_at, results[1].duration)
+
+    def test_run_startup_cycle(self):
+        entries = [
+            StartupEntry("a", "true", after=("b",)),
+            StartupEntry("b", "true", after=("a",)),
+            StartupEntry("c", "true", after=("unknown",)),
+        ]
+
+        results = asyncio.run(run_startup(entries))
+
+        self.assertEqual(
+            [r.status for r in results], [STATUS_SKIPPED, STATUS_SKIPPED, STATUS_OK]
+        )
 
 
 class TestRunStartupOnce(unittest.TestCase):
-    @patch("ebenezer.core.startup.run_shell_command")
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.patcher = patch("ebenezer.core.startup.cache_home", self.cache_dir)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.cache_dir)
+
     @patch("ebenezer.core.startup._env_substitutions")
-    def test_run_startup_once(self, mock_env_substitutions, mock_run_shell_command):
+    def test_run_startup_once(self, mock_env_substitutions):
         settings = AppSettings()
         settings.startup = {
-            "command1": "echo 'Running command1'",
-            "command2": "echo 'Running command2'",
+            "command1": "test '$key' = 'value'",
+            "command2": "exit 1",
         }
 
         mock_env_substitutions.return_value = {"key": "value"}
 
-        run_startup_once(settings)
+        self.assertIsNone(run_startup_once(settings))
 
-        mock_run_shell_command.assert_any_call(
-            "echo 'Running command1'", timeout=3, key="value"
-        )
-        mock_run_shell_command.assert_any_call(
-            "echo 'Running command2'", timeout=3, key="value"
-        )
+        report = load_startup_report()
 
+        self.assertEqual(
+            [(e["name"], e["status"]) for e in report["entries"]],
+            [("command1", STATUS_OK), ("command2", STATUS_FAILED)],
+        )
         mock_env_substitutions.assert_called_with(settings)
 
+    def test_load_startup_report_missing(self):
+        self.assertIsNone(load_startup_report())
+
 
 if __name__ == "__main__":
     unittest.main()
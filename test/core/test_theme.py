@@ -1,12 +1,21 @@
 import os
+import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
 
 from ebenezer.config.settings import AppSettings, AppSettingsColors
 from ebenezer.core.theme import _apply_theme_color
 
 
 class TestApplyThemeColor(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        cache_patcher = patch("ebenezer.core.cache.cache_home", self.cache_dir)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
     def test_apply_theme_color(self):
         with tempfile.NamedTemporaryFile(
             delete=False, mode="w", suffix=".yaml"
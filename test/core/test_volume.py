@@ -0,0 +1,263 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ebenezer.core.volume import (
+    FakeVolumeBackend,
+    PactlVolumeBackend,
+    SinkState,
+    VolumeEvents,
+    VolumeSnapshot,
+    parse_pactl_event,
+    parse_pactl_sinks,
+)
+
+PACTL_SINKS = json.dumps(
+    [
+        {
+            "index": 55,
+            "state": "SUSPENDED",
+            "name": "alsa_output.pci-0000_00_1f.3.analog-stereo",
+            "description": "Built-in Audio Analog Stereo",
+            "mute": False,
+            "volume": {
+                "front-left": {
+                    "value": 26214,
+                    "value_percent": "40%",
+                    "db": "-23.88 dB",
+                },
+                "front-right": {
+                    "value": 26214,
+                    "value_percent": "40%",
+                    "db": "-23.88 dB",
+                },
+            },
+        },
+        {
+            "index": 78,
+            "state": "RUNNING",
+            "name": "bluez_output.00_1B_66_AA_BB_CC.1",
+            "description": "Headphones",
+            "mute": True,
+            "volume": {
+                "front-left": {
+                    "value": 49152,
+                    "value_percent": "75%",
+                    "db": "-7.50 dB",
+                },
+                "front-right": {
+                    "value": 45875,
+                    "value_percent": "70%",
+                    "db": "-9.30 dB",
+                },
+            },
+        },
+    ]
+)
+
+
+class TestParsePactlSinks(unittest.TestCase):
+    def test_parse_pactl_sinks(self):
+        snapshot = parse_pactl_sinks(PACTL_SINKS)
+
+        self.assertEqual(
+            snapshot.sinks,
+            (
+                SinkState(
+                    55,
+                    "alsa_output.pci-0000_00_1f.3.analog-stereo",
+                    "Built-in Audio Analog Stereo",
+                    40,
+                    False,
+                    "SUSPENDED",
+                ),
+                SinkState(
+                    78,
+                    "bluez_output.00_1B_66_AA_BB_CC.1",
+                    "Headphones",
+                    75,
+                    True,
+                    "RUNNING",
+                ),
+            ),
+        )
+        self.assertEqual(snapshot.levels, {"speaker": 40, "phone": 75})
+        self.assertEqual(snapshot.level, 75)
+        self.assertTrue(snapshot.muted)
+        self.assertFalse(snapshot.phone_plugged)
+
+    def test_parse_pactl_sinks_empty(self):
+        snapshot = parse_pactl_sinks("")
+
+        self.assertEqual(snapshot, VolumeSnapshot())
+        self.assertIsNone(snapshot.level)
+        self.assertFalse(snapshot.muted)
+
+
+class TestPactlVolumeBackend(unittest.TestCase):
+    @patch("ebenezer.core.volume.subprocess.run")
+    def test_snapshot_single_call(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=PACTL_SINKS)
+        backend = PactlVolumeBackend()
+
+        self.assertEqual(backend.snapshot().level, 75)
+        self.assertEqual(backend.snapshot().levels["speaker"], 40)
+
+        mock_run.assert_called_once()
+        self.assertEqual(
+            mock_run.call_args[0][0], ["pactl", "-f", "json", "list", "sinks"]
+        )
+
+    @patch("ebenezer.core.volume.subprocess.run")
+    def test_snapshot_expired(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=PACTL_SINKS)
+        backend = PactlVolumeBackend(max_age=0)
+
+        backend.snapshot()
+        backend.snapshot()
+
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch("ebenezer.core.volume.subprocess.run")
+    def test_snapshot_invalid_output(self, mock_run):
+        mock_run.return_value = MagicMock(stdout="Invalid format")
+
+        self.assertEqual(PactlVolumeBackend().snapshot(), VolumeSnapshot())
+
+    @patch("ebenezer.core.volume.subprocess.run")
+    def test_snapshot_without_pactl(self, mock_run):
+        mock_run.side_effect = FileNotFoundError("pactl")
+
+        self.assertEqual(PactlVolumeBackend().snapshot(), VolumeSnapshot())
+
+    @patch("ebenezer.core.volume.subprocess.run")
+    def test_changes(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=PACTL_SINKS)
+        backend = PactlVolumeBackend()
+
+        backend.snapshot()
+        backend.change_volume(5)
+        backend.change_volume(-5)
+        backend.set_mute(True)
+        backend.set_mute(None)
+        backend.toggle_source_mute()
+        backend.snapshot()
+
+        self.assertEqual(
+            [c[0][0] for c in mock_run.call_args_list],
+            [
+                ["pactl", "-f", "json", "list", "sinks"],
+                ["pactl", "set-sink-volume", "@DEFAULT_SINK@", "+5%"],
+                ["pactl", "set-sink-volume", "@DEFAULT_SINK@", "-5%"],
+                ["pactl", "set-sink-mute", "@DEFAULT_SINK@", "1"],
+                ["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"],
+                ["pactl", "set-source-mute", "@DEFAULT_SOURCE@", "toggle"],
+                ["pactl", "-f", "json", "list", "sinks"],
+            ],
+        )
+
+
+class TestFakeVolumeBackend(unittest.TestCase):
+    def test_fake_volume_backend(self):
+        backend = FakeVolumeBackend(
+            [SinkState(0, "alsa_output.analog-stereo", volume=3)]
+        )
+
+        backend.change_volume(-5)
+        self.assertEqual(backend.snapshot().level, 0)
+
+        backend.set_mute(None)
+        self.assertTrue(backend.snapshot().muted)
+
+        backend.set_mute(False, sink="alsa_output.analog-stereo")
+        self.assertFalse(backend.snapshot().muted)
+        self.assertEqual(backend.reads, 3)
+
+
+class TestParsePactlEvent(unittest.TestCase):
+    def test_parse_pactl_event(self):
+        self.assertEqual(
+            parse_pactl_event("Event 'change' on sink #55\n"), ("change", "sink", 55)
+        )
+        self.assertEqual(
+            parse_pactl_event("Event 'change' on server #-1"), ("change", "server", -1)
+        )
+        self.assertEqual(
+            parse_pactl_event("Event 'new' on sink-input #12"),
+            ("new", "sink-input", 12),
+        )
+        self.assertIsNone(parse_pactl_event("Connection failure"))
+
+
+class TestVolumeEvents(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeVolumeBackend(
+            [SinkState(0, "alsa_output.analog-stereo", volume=40)]
+        )
+
+    def _run(self, command, on_change=None, duration=0.4):
+        events = VolumeEvents(
+            backend=self.backend, command=command, debounce=0.01, restart_delay=0.05
+        )
+        snapshots = []
+
+        def _on_change(snapshot):
+            snapshots.append(snapshot)
+
+            if on_change is not None:
+                on_change(snapshot)
+
+        async def _main():
+            events.subscribe(_on_change)
+            self.assertIsNone(self.backend.max_age)
+            await asyncio.sleep(duration)
+            events.unsubscribe(_on_change)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(_main())
+
+        self.assertFalse(events.running)
+        self.assertEqual(self.backend.max_age, 1.0)
+
+        return snapshots
+
+    def test_publish_on_change(self):
+        def _on_change(snapshot):
+            if snapshot.level == 40:
+                self.backend.sinks[0] = self.backend.sinks[0]._replace(volume=55)
+
+        snapshots = self._run(
+            [
+                "sh",
+                "-c",
+                "sleep 0.1; echo \"Event 'change' on sink-input #3\"; "
+                "sleep 0.1; echo \"Event 'change' on sink #0\"; "
+                "echo \"Event 'change' on sink #0\"; exec sleep 5",
+            ],
+            on_change=_on_change,
+        )
+
+        self.assertEqual([s.level for s in snapshots], [40, 55])
+        self.assertEqual(self.backend.reads, 2)
+
+    def test_publish_only_changes(self):
+        snapshots = self._run(
+            [
+                "sh",
+                "-c",
+                "for i in 1 2 3; do echo \"Event 'change' on sink #0\"; sleep 0.05; done; exec sleep 5",
+            ]
+        )
+
+        self.assertEqual([s.level for s in snapshots], [40])
+        self.assertGreater(self.backend.reads, 1)
+
+    def test_restart(self):
+        snapshots = self._run(["/nonexistent/pactl", "subscribe"], duration=0.2)
+
+        self.assertEqual([s.level for s in snapshots], [40])
+
+
+if __name__ == "__main__":
+    unittest.main()
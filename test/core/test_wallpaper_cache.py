@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from ebenezer.core.wallpaper_cache import (
+    WallpaperCache,
+    scale_wallpaper,
+    screen_resolutions,
+)
+
+
+class TestWallpaperCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.cache = WallpaperCache(Path(self.tmp_dir).joinpath("cache"), workers=1)
+        self.addCleanup(self.cache.shutdown)
+        self.wallpaper = self._save("wallpaper.jpg", (640, 360))
+
+    def _save(self, name: str, size) -> str:
+        path = os.path.join(self.tmp_dir, name)
+        Image.new("RGB", size, "#336699").save(path)
+        return path
+
+    @patch("ebenezer.core.wallpaper_cache.xcffib.connect", side_effect=Exception)
+    def test_screen_resolutions_without_display(self, _):
+        self.assertEqual(screen_resolutions(), [])
+
+    def test_scale_wallpaper(self):
+        target = os.path.join(self.tmp_dir, "scaled.jpg")
+
+        self.assertEqual(scale_wallpaper(self.wallpaper, target, (64, 48)), target)
+
+        with Image.open(target) as image:
+            self.assertEqual(image.size, (64, 48))
+            self.assertEqual(image.format, "JPEG")
+
+    def test_variant_path(self):
+        variant = self.cache.variant_path(self.wallpaper, (64, 36))
+
+        self.assertEqual(variant.parent.name, "64x36")
+        self.assertNotEqual(variant, self.cache.variant_path(self.wallpaper, (32, 18)))
+
+        self._save("wallpaper.jpg", (320, 180))
+        self.assertNotEqual(variant, self.cache.variant_path(self.wallpaper, (64, 36)))
+
+    def test_prefetch(self):
+        self.assertIsNone(self.cache.get(self.wallpaper, (64, 36)))
+
+        futures = self.cache.prefetch([self.wallpaper], [(64, 36), (32, 18), (64, 36)])
+
+        self.assertEqual(len(futures), 2)
+
+        for future in futures:
+            future.result()
+
+        variant = self.cache.get(self.wallpaper, (64, 36))
+
+        with Image.open(variant) as image:
+            self.assertEqual(image.size, (64, 36))
+
+        self.assertEqual(self.cache.prefetch([self.wallpaper], [(64, 36)]), [])
+
+    def test_prefetch_invalid_wallpaper(self):
+        broken = os.path.join(self.tmp_dir, "broken.jpg")
+        Path(broken).write_text("not an image")
+
+        futures = self.cache.prefetch([broken, "/not/found.jpg"], [(64, 36)])
+
+        self.assertEqual(len(futures), 1)
+        self.assertIsNotNone(futures[0].exception())
+        self.assertIsNone(self.cache.get(broken, (64, 36)))
+
+    def test_evict_least_recently_used(self):
+        wallpapers = [self._save(f"{i}.jpg", (64, 36)) for i in range(3)]
+
+        for future in self.cache.prefetch(wallpapers, [(64, 36)]):
+            future.result()
+
+        variants = [self.cache.variant_path(w, (64, 36)) for w in wallpapers]
+
+        for i, variant in enumerate(variants):
+            os.utime(variant, ns=(i * 10**9, i * 10**9))
+
+        # the first variant is used, the second one is now the least recently used
+        self.cache.get(wallpapers[0], (64, 36))
+        self.cache.max_bytes = sum(v.stat().st_size for v in variants) - 1
+
+        self.assertEqual(self.cache.evict(), [str(variants[1])])
+        self.assertTrue(variants[0].exists())
+        self.assertTrue(variants[2].exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from ebenezer.core.wallpaper_cache import WallpaperCache
+from ebenezer.core.wallpaper_daemon import (
+    WallpaperDaemon,
+    image_setter,
+    send_command,
+    socket_path,
+)
+from ebenezer.core.wallpaper_index import WallpaperIndex
+
+
+class TestWallpaperDaemon(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.wallpaper_dir = os.path.join(self.tmp_dir, "wallpapers")
+        os.mkdir(self.wallpaper_dir)
+        self.wallpapers = [self._save(self.wallpaper_dir, f"{i}.png") for i in range(3)]
+        self.socket = os.path.join(self.tmp_dir, "daemon.sock")
+
+        self.index = WallpaperIndex(os.path.join(self.tmp_dir, "index.sqlite3"))
+        self.addCleanup(self.index.close)
+        self.cache = WallpaperCache(os.path.join(self.tmp_dir, "cache"), workers=1)
+        self.addCleanup(self.cache.shutdown)
+
+        resolutions_patcher = patch(
+            "ebenezer.core.wallpaper_daemon.screen_resolutions", return_value=[]
+        )
+        resolutions_patcher.start()
+        self.addCleanup(resolutions_patcher.stop)
+
+        self.shown = []
+        self._setter_override = None
+
+    def _save(self, directory: str, name: str) -> str:
+        path = os.path.join(directory, name)
+        Image.new("RGB", (16, 9)).save(path)
+        return path
+
+    async def _setter(self, images):
+        if self._setter_override is not None:
+            await self._setter_override(images)
+            return
+
+        self.shown.append(images[0])
+
+    async def _start(self, timeout: float = 0) -> WallpaperDaemon:
+        daemon = WallpaperDaemon(
+            self.wallpaper_dir,
+            timeout,
+            index=self.index,
+            cache=self.cache,
+            setter=self._setter,
+        )
+        task = asyncio.create_task(daemon.serve(self.socket))
+
+        async def _stop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        self.addAsyncCleanup(_stop)
+
+        while not self.shown:
+            await asyncio.sleep(0.01)
+
+        return daemon
+
+    async def _send(self, command: str, argument: str | None = None) -> dict:
+        return await asyncio.to_thread(send_command, command, argument, self.socket)
+
+    def test_socket_path(self):
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": "/run/user/1000"}):
+            self.assertEqual(socket_path(), "/run/user/1000/ebenezer-wallpaper.sock")
+
+    def test_send_command_without_daemon(self):
+        with self.assertRaises(OSError):
+            send_command("status", path=self.socket)
+
+    @patch("ebenezer.core.wallpaper_daemon.set_wallpaper_images")
+    async def test_image_setter(self, mock_set_images):
+        await image_setter("feh")(self.wallpapers[:1])
+
+        mock_set_images.assert_called_once_with(self.wallpapers[:1], "feh")
+
+    async def test_next_prev(self):
+        await self._start()
+        first = self.shown[0]
+
+        second = (await self._send("next"))["wallpaper"]
+        third = (await self._send("next"))["wallpaper"]
+
+        self.assertCountEqual([first, second, third], self.wallpapers)
+        self.assertEqual((await self._send("prev"))["wallpaper"], second)
+        self.assertEqual((await self._send("prev"))["wallpaper"], first)
+        self.assertEqual((await self._send("prev"))["wallpaper"], first)
+        self.assertEqual((await self._send("next"))["wallpaper"], second)
+        self.assertEqual(self.shown, [first, second, third, second, first, second])
+
+    async def test_set(self):
+        daemon = await self._start()
+        other_dir = os.path.join(self.tmp_dir, "other")
+        os.mkdir(other_dir)
+        other = self._save(other_dir, "other.png")
+
+        answer = await self._send("set", self.wallpapers[0])
+
+        self.assertEqual(answer["wallpaper"], self.wallpapers[0])
+        self.assertEqual(answer["directory"], self.wallpaper_dir)
+
+        answer = await self._send("set", other_dir)
+
+        self.assertEqual(answer, {**daemon.status(), "wallpaper": other})
+        self.assertEqual(answer["directory"], other_dir)
+        self.assertEqual(self.shown[-1], other)
+
+    async def test_answer_before_upload(self):
+        await self._start()
+        uploaded = asyncio.Event()
+        shown = []
+
+        async def _slow_setter(images):
+            await uploaded.wait()
+            shown.append(images[0])
+
+        self._setter_override = _slow_setter
+
+        second = (await self._send("next"))["wallpaper"]
+        third = (await self._send("next"))["wallpaper"]
+
+        self.assertEqual(shown, [])
+        uploaded.set()
+
+        while len(shown) < 2:
+            await asyncio.sleep(0.01)
+
+        # the burst is folded, the second wallpaper is uploaded while the third waits
+        self.assertEqual(shown, [second, third])
+
+    async def test_invalid_commands(self):
+        await self._start()
+
+        self.assertFalse((await self._send("set"))["ok"])
+        self.assertFalse((await self._send("set", "/not/found"))["ok"])
+        self.assertEqual(
+            await self._send("shuffle"),
+            {"ok": False, "error": "unknown command shuffle"},
+        )
+
+    async def test_rotation_pause_resume(self):
+        await self._start(timeout=0.05)
+
+        while len(self.shown) < 3:
+            await asyncio.sleep(0.01)
+
+        self.assertTrue((await self._send("pause"))["paused"])
+        shown = len(self.shown)
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(len(self.shown), shown)
+        self.assertFalse((await self._send("resume"))["paused"])
+
+        while len(self.shown) == shown:
+            await asyncio.sleep(0.01)
+
+    async def test_single_daemon(self):
+        await self._start()
+
+        with self.assertRaises(RuntimeError):
+            await WallpaperDaemon(self.wallpaper_dir, 0, self.index).serve(self.socket)
+
+    async def test_stale_socket(self):
+        Path(self.socket).write_text("")
+
+        await self._start()
+
+        self.assertTrue((await self._send("status"))["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from ebenezer.core.wallpaper_index import Wallpaper, WallpaperIndex, is_image_file
+
+
+class TestWallpaperIndex(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.wallpaper_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.addCleanup(shutil.rmtree, self.wallpaper_dir)
+        self.index = WallpaperIndex(Path(self.cache_dir).joinpath("wallpapers.sqlite3"))
+        self.addCleanup(self.index.close)
+
+    def _save(self, name: str, size=(32, 18)) -> str:
+        path = os.path.join(self.wallpaper_dir, name)
+        Image.new("RGB", size).save(path)
+        return path
+
+    def _touch_dir(self):
+        # the mtime of a directory may not change within the timestamp granularity
+        stat = os.stat(self.wallpaper_dir)
+        os.utime(self.wallpaper_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    def test_is_image_file(self):
+        self.assertTrue(is_image_file("/wallpapers/a.JPG"))
+        self.assertTrue(is_image_file("b.webp"))
+        self.assertFalse(is_image_file("notes.txt"))
+        self.assertFalse(is_image_file("README"))
+
+    def test_refresh(self):
+        a = self._save("a.png", (64, 36))
+        b = self._save("b.jpg")
+        Path(self.wallpaper_dir).joinpath("notes.txt").write_text("")
+        Path(self.wallpaper_dir).joinpath("broken.png").write_text("not an image")
+        Path(self.wallpaper_dir).joinpath("subdir.jpg").mkdir()
+
+        self.assertTrue(self.index.refresh(self.wallpaper_dir))
+        self.assertEqual(
+            self.index.wallpapers(self.wallpaper_dir),
+            [Wallpaper(a, 64, 36), Wallpaper(b, 32, 18)],
+        )
+
+    def test_refresh_unchanged_directory(self):
+        self._save("a.png")
+        self.index.refresh(self.wallpaper_dir)
+
+        with patch("ebenezer.core.wallpaper_index.os.scandir") as mock_scandir:
+            self.assertFalse(self.index.refresh(self.wallpaper_dir))
+
+        mock_scandir.assert_not_called()
+
+    def test_refresh_modified_in_place(self):
+        a = self._save("a.png")
+        self.index.refresh(self.wallpaper_dir)
+        mtime_ns = os.stat(self.wallpaper_dir).st_mtime_ns
+
+        Image.new("RGB", (64, 36)).save(a)
+        os.utime(a, ns=(mtime_ns, mtime_ns + 1000))
+        os.utime(self.wallpaper_dir, ns=(mtime_ns, mtime_ns))
+
+        with patch("ebenezer.core.wallpaper_index.os.scandir") as mock_scandir:
+            self.assertFalse(self.index.refresh(self.wallpaper_dir))
+
+        mock_scandir.assert_not_called()
+        self.assertEqual(
+            self.index.wallpapers(self.wallpaper_dir), [Wallpaper(a, 64, 36)]
+        )
+
+    def test_refresh_incremental(self):
+        a = self._save("a.png")
+        b = self._save("b.png")
+        self.index.refresh(self.wallpaper_dir)
+
+        os.remove(b)
+        c = self._save("c.png", (8, 8))
+        self._touch_dir()
+
+        with patch(
+            "ebenezer.core.wallpaper_index._read_dimensions", return_value=(8, 8)
+        ) as mock_read_dimensions:
+            self.assertTrue(self.index.refresh(self.wallpaper_dir))
+
+        mock_read_dimensions.assert_called_once_with(c)
+        self.assertEqual(
+            self.index.wallpapers(self.wallpaper_dir),
+            [Wallpaper(a, 32, 18), Wallpaper(c, 8, 8)],
+        )
+
+    def test_draw_shuffle_bag(self):
+        wallpapers = [self._save(f"{i}.png") for i in range(5)]
+        self.index.refresh(self.wallpaper_dir)
+
+        drawn = [self.index.draw(self.wallpaper_dir).path for _ in wallpapers]
+
+        self.assertCountEqual(drawn, wallpapers)
+
+        # the bag is refilled, without the last wallpaper drawn
+        self.assertNotEqual(self.index.draw(self.wallpaper_dir).path, drawn[-1])
+
+    def test_upcoming(self):
+        for i in range(4):
+            self._save(f"{i}.png")
+
+        self.index.refresh(self.wallpaper_dir)
+        upcoming = self.index.upcoming(self.wallpaper_dir, 3)
+
+        self.assertEqual(len(upcoming), 3)
+        self.assertEqual(
+            [self.index.draw(self.wallpaper_dir) for _ in range(3)], upcoming
+        )
+        self.assertEqual(len(self.index.upcoming(self.wallpaper_dir, 3)), 1)
+
+    def test_draw_persistence(self):
+        self._save("a.png")
+        self._save("b.png")
+        self.index.refresh(self.wallpaper_dir)
+        drawn = self.index.draw(self.wallpaper_dir)
+        self.index.close()
+
+        index = WallpaperIndex(self.index.path)
+        self.addCleanup(index.close)
+
+        self.assertNotEqual(index.draw(self.wallpaper_dir), drawn)
+
+    def test_draw_single_and_empty(self):
+        self.index.refresh(self.wallpaper_dir)
+        self.assertIsNone(self.index.draw(self.wallpaper_dir))
+
+        a = self._save("a.png")
+        self._touch_dir()
+        self.index.refresh(self.wallpaper_dir)
+
+        self.assertEqual(self.index.draw(self.wallpaper_dir).path, a)
+        self.assertEqual(self.index.draw(self.wallpaper_dir).path, a)
+
+
+if __name__ == "__main__":
+    unittest.main()
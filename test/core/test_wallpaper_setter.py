@@ -0,0 +1,208 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import xcffib
+import xcffib.xproto
+from PIL import Image
+
+from ebenezer.core.wallpaper_setter import (
+    PUT_IMAGE_HEADER,
+    PUT_IMAGE_OPCODE,
+    Geometry,
+    RootPixmapError,
+    _put_image_core,
+    compose_screens,
+    set_root_pixmap,
+    set_wallpaper_images,
+)
+
+
+class TestWallpaperSetter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.red = self._save("red.png", (32, 18), "#ff0000")
+        self.blue = self._save("blue.png", (16, 16), "#0000ff")
+
+    def _save(self, name: str, size, color: str) -> str:
+        path = os.path.join(self.tmp_dir, name)
+        Image.new("RGB", size, color).save(path)
+        return path
+
+    def test_compose_single_screen(self):
+        image = compose_screens([self.red], [Geometry(0, 0, 64, 36)], (64, 36))
+
+        self.assertEqual(image.size, (64, 36))
+        self.assertEqual(image.getpixel((63, 35)), (255, 0, 0))
+
+    def test_compose_screens(self):
+        geometries = [Geometry(0, 0, 40, 30), Geometry(40, 10, 20, 20)]
+
+        image = compose_screens([self.red, self.blue], geometries, (60, 30))
+
+        self.assertEqual(image.getpixel((39, 29)), (255, 0, 0))
+        self.assertEqual(image.getpixel((40, 10)), (0, 0, 255))
+        self.assertEqual(image.getpixel((59, 29)), (0, 0, 255))
+        # the area no screen covers stays black
+        self.assertEqual(image.getpixel((50, 0)), (0, 0, 0))
+
+    def test_compose_screens_reuses_images(self):
+        geometries = [Geometry(0, 0, 10, 10), Geometry(10, 0, 10, 10)]
+
+        image = compose_screens([self.blue], geometries, (20, 10))
+
+        self.assertEqual(image.getpixel((15, 5)), (0, 0, 255))
+
+    def test_put_image_core_in_strips(self):
+        connection = MagicMock()
+        # 64 rows of 16 pixels fit in a request, with its header
+        connection.get_maximum_request_length.return_value = (
+            64 * 16 * 4 + PUT_IMAGE_HEADER.size
+        ) // 4
+        data = bytes(range(256)) * (16 * 150 * 4 // 256)
+
+        _put_image_core(connection, 7, 8, 24, (16, 150), data)
+
+        requests = [c.args for c in connection.core.send_request.call_args_list]
+        self.assertEqual([opcode for opcode, _ in requests], [PUT_IMAGE_OPCODE] * 3)
+
+        uploaded = b""
+
+        for _, buf in requests:
+            request = buf.getvalue()
+            fields = PUT_IMAGE_HEADER.unpack(request[: PUT_IMAGE_HEADER.size])
+            self.assertEqual(fields[:4], (2, 7, 8, 16))
+            self.assertEqual(fields[5], 0)
+            self.assertEqual(fields[6], len(uploaded) // (16 * 4))
+            self.assertEqual(fields[8], 24)
+            uploaded += request[PUT_IMAGE_HEADER.size :]
+
+        self.assertEqual(uploaded, data)
+
+    @patch(
+        "ebenezer.core.wallpaper_setter.xcffib.connect",
+        side_effect=xcffib.ConnectionException(1),
+    )
+    def test_set_root_pixmap_without_display(self, _):
+        with self.assertRaises(RootPixmapError):
+            set_root_pixmap([self.red])
+
+    @patch("ebenezer.core.wallpaper_setter.subprocess.run")
+    @patch(
+        "ebenezer.core.wallpaper_setter.set_root_pixmap",
+        side_effect=RootPixmapError("no display"),
+    )
+    def test_set_wallpaper_images_falls_back_to_feh(self, _, mock_run):
+        self.assertEqual(set_wallpaper_images([self.red, self.blue]), "feh")
+        mock_run.assert_called_once_with(["feh", "--bg-scale", self.red, self.blue])
+
+    @patch("ebenezer.core.wallpaper_setter.subprocess.run")
+    @patch("ebenezer.core.wallpaper_setter.set_root_pixmap", return_value="shm")
+    def test_set_wallpaper_images_natively(self, mock_set_root_pixmap, mock_run):
+        self.assertEqual(set_wallpaper_images([self.red], "native"), "native")
+        mock_set_root_pixmap.assert_called_once_with([self.red])
+        mock_run.assert_not_called()
+
+    @patch("ebenezer.core.wallpaper_setter.subprocess.run")
+    @patch(
+        "ebenezer.core.wallpaper_setter.set_root_pixmap",
+        side_effect=RootPixmapError("no display"),
+    )
+    def test_set_wallpaper_images_native_error(self, _, mock_run):
+        with self.assertRaises(RootPixmapError):
+            set_wallpaper_images([self.red], "native")
+
+        mock_run.assert_not_called()
+
+    @patch("ebenezer.core.wallpaper_setter.subprocess.run")
+    @patch("ebenezer.core.wallpaper_setter.set_root_pixmap")
+    def test_set_wallpaper_images_with_feh(self, mock_set_root_pixmap, mock_run):
+        self.assertEqual(set_wallpaper_images([self.red], "feh"), "feh")
+        mock_set_root_pixmap.assert_not_called()
+        mock_run.assert_called_once_with(["feh", "--bg-scale", self.red])
+
+
+@unittest.skipUnless(shutil.which("Xvfb"), "Xvfb required")
+class TestRootPixmap(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.wallpaper = os.path.join(self.tmp_dir, "wallpaper.png")
+        Image.new("RGB", (32, 24), "#ff8000").save(self.wallpaper)
+
+        self.server = subprocess.Popen(
+            [
+                "Xvfb",
+                "-displayfd",
+                "1",
+                "-nolisten",
+                "tcp",
+                "-screen",
+                "0",
+                "64x48x24",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self.addCleanup(self.server.wait)
+        self.addCleanup(self.server.terminate)
+        display = f":{self.server.stdout.readline().strip()}"
+
+        env_patcher = patch.dict(os.environ, {"DISPLAY": display})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+        self.connection = xcffib.connect(display=display)
+        self.addCleanup(self.connection.disconnect)
+        self.root = self.connection.get_setup().roots[0].root
+
+    def _root_pixmaps(self):
+        pixmaps = []
+
+        for name in ("_XROOTPMAP_ID", "ESETROOT_PMAP_ID"):
+            atom = self.connection.core.InternAtom(False, len(name), name).reply().atom
+            reply = self.connection.core.GetProperty(
+                False, self.root, atom, xcffib.xproto.Atom.PIXMAP, 0, 1
+            ).reply()
+            pixmaps.append(reply.value.to_atoms()[0])
+
+        return pixmaps
+
+    def _pixel(self, pixmap: int):
+        data = (
+            self.connection.core.GetImage(
+                xcffib.xproto.ImageFormat.ZPixmap, pixmap, 63, 47, 1, 1, 0xFFFFFFFF
+            )
+            .reply()
+            .data.buf()
+        )
+        blue, green, red = data[:3]
+        return red, green, blue
+
+    def test_set_root_pixmap(self):
+        self.assertEqual(set_root_pixmap([self.wallpaper]), "shm")
+
+        pixmap, esetroot = self._root_pixmaps()
+        self.assertNotEqual(pixmap, 0)
+        self.assertEqual(pixmap, esetroot)
+        self.assertEqual(self._pixel(pixmap), (255, 128, 0))
+
+    def test_set_root_pixmap_without_shm(self):
+        self.assertEqual(set_root_pixmap([self.wallpaper]), "shm")
+        previous, _ = self._root_pixmaps()
+
+        self.assertEqual(set_root_pixmap([self.wallpaper], use_shm=False), "core")
+
+        pixmap, esetroot = self._root_pixmaps()
+        self.assertNotEqual(pixmap, previous)
+        self.assertEqual(pixmap, esetroot)
+        self.assertEqual(self._pixel(pixmap), (255, 128, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ebenezer.config.settings import AppSettings
+from ebenezer.config.window_rules import AppSettingsWindowRule
+from ebenezer.core.window_rules import WindowActions, build_window_rules
+
+
+def _build_window(wm_class, name):
+    window = MagicMock()
+    window.get_wm_class.return_value = wm_class
+    window.name = name
+    window.floating = False
+    return window
+
+
+class TestWindowRules(unittest.TestCase):
+    def setUp(self):
+        self.settings = AppSettings()
+        self.settings.floating = {
+            "wm_class": ["pavucontrol", "gnome-calculator"],
+            "title": ["pinentry"],
+        }
+        self.settings.window_rules = [
+            AppSettingsWindowRule(wm_class="mpv", group="5", size="0.5,0.5"),
+            AppSettingsWindowRule(title="^Picture-in-Picture$", floating="yes"),
+            AppSettingsWindowRule(title="([invalid"),
+        ]
+        self.rules = build_window_rules(
+            self.settings, ["ebenezer - configuration manager"]
+        )
+
+    def test_match_by_class(self):
+        actions = self.rules.match(["pavucontrol", "Pavucontrol"], "Volume Control")
+
+        self.assertEqual(actions, WindowActions(floating=True))
+
+    def test_match_by_exact_title(self):
+        self.assertEqual(self.rules.match([], "pinentry"), WindowActions(floating=True))
+        self.assertIsNone(self.rules.match([], "pinentry-gtk"))
+
+    def test_match_center_title_case_insensitive(self):
+        actions = self.rules.match([], "Ebenezer - Configuration Manager")
+
+        self.assertEqual(actions, WindowActions(floating=True, center=True))
+
+    def test_match_window_rule_title_regex(self):
+        actions = self.rules.match(["firefox"], "Picture-in-Picture")
+
+        self.assertEqual(actions, WindowActions(floating=True))
+
+    def test_match_merges_overlapping_titles(self):
+        self.settings.floating["title"].append("ebenezer - configuration manager")
+        self.settings.window_rules.append(
+            AppSettingsWindowRule(title="configuration manager$", group="2")
+        )
+        rules = build_window_rules(self.settings, ["ebenezer - configuration manager"])
+
+        actions = rules.match([], "ebenezer - configuration manager")
+
+        self.assertEqual(actions, WindowActions(floating=True, center=True, group="2"))
+
+    def test_match_merges_class_and_title(self):
+        actions = self.rules.match(["mpv"], "pinentry")
+
+        self.assertEqual(
+            actions, WindowActions(floating=True, group="5", size=(0.5, 0.5))
+        )
+
+    def test_no_match(self):
+        self.assertIsNone(self.rules.match(["kitty"], "zsh"))
+        self.assertIsNone(self.rules.match(None, None))
+
+    def test_apply_floating(self):
+        window = _build_window(["gnome-calculator"], "Calculator")
+
+        self.rules.apply(window)
+
+        self.assertTrue(window.floating)
+        window.togroup.assert_not_called()
+        window.place.assert_not_called()
+
+    @patch("ebenezer.core.window_rules.qtile")
+    def test_apply_group_and_size(self, mock_qtile):
+        mock_qtile.current_screen.width = 1000
+        mock_qtile.current_screen.height = 800
+        window = _build_window(["mpv"], "video.mkv")
+
+        self.rules.apply(window)
+
+        self.assertTrue(window.floating)
+        window.togroup.assert_called_once_with("5")
+        window.place.assert_called_once_with(
+            x=0,
+            y=0,
+            width=500,
+            height=400,
+            borderwidth=1,
+            bordercolor=self.settings.colors.border_color_active,
+        )
+        window.center.assert_called_once()
+
+    def test_apply_no_match(self):
+        window = _build_window(["kitty"], "zsh")
+
+        self.assertIsNone(self.rules.apply(window))
+        self.assertFalse(window.floating)
+
+
+if __name__ == "__main__":
+    unittest.main()
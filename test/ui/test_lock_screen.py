@@ -1,12 +1,29 @@
+import asyncio
 import os
+import shutil
 import subprocess
+import tempfile
+import time
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from PIL import Image
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.ui.lock_screen import _build_background
+from ebenezer.core.jokes import JokeStore
+from ebenezer.core.lock_image import StageTimer
+from ebenezer.ui.lock_screen import (
+    NO_JOKES,
+    _build_background,
+    _get_joke,
+    _load_joke_overlay,
+    _lock_screen_i3,
+    _prepare_joke_overlay,
+    _refill_jokes,
+    _refill_jokes_in_background,
+    _run_i3_lock,
+)
 from ebenezer.ui.lock_screen import main as lock_screen
 
 
@@ -21,36 +38,236 @@ class TestLockScreen(unittest.TestCase):
         image.save(self.output_file)
         image.save(self.quote_file)
 
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        cache_patcher = patch("ebenezer.core.cache.cache_home", self.cache_dir)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+        self.joke_store = JokeStore(Path(self.cache_dir).joinpath("jokes.sqlite3"))
+        self.addCleanup(self.joke_store.close)
+        store_patcher = patch(
+            "ebenezer.ui.lock_screen.get_joke_store", return_value=self.joke_store
+        )
+        store_patcher.start()
+        self.addCleanup(store_patcher.stop)
+
     def tearDown(self):
         if os.path.exists(self.output_file):
             os.remove(self.output_file)
 
-    @patch("ebenezer.ui.lock_screen.ImageFont.truetype")
-    @patch("ebenezer.ui.lock_screen.ImageDraw.Draw")
-    @patch("ebenezer.ui.lock_screen.Image.new")
-    def xtest_build_background(
-        self, mock_image_new, mock_image_draw, mock_imagefont_truetype
-    ):
-        mock_image = MagicMock(spec=Image.Image)
-        mock_image_new.return_value = mock_image
-        mock_draw = MagicMock()
-        mock_image_draw.return_value = mock_draw
-        mock_font = MagicMock()
-        mock_imagefont_truetype.return_value = mock_font
+    def _joke_providers(self, reddit=None, icanhazdad=None):
+        async def _reddit():
+            if isinstance(reddit, Exception):
+                raise reddit
+
+            return reddit or []
+
+        async def _icanhazdad():
+            return icanhazdad or []
+
+        return {"reddit": _reddit, "icanhazdad": _icanhazdad}
+
+    def test_get_joke_from_store(self):
+        self.joke_store.add("reddit", ["A joke"])
+
+        with patch("ebenezer.ui.lock_screen._load_joke_providers") as mock_providers:
+            self.assertEqual(_get_joke(self.settings), "A joke")
+
+        mock_providers.assert_not_called()
+
+    def test_get_joke_refills_empty_store(self):
+        self.settings.lock_screen.joke_providers = ["reddit", "icanhazdad"]
+
+        with patch(
+            "ebenezer.ui.lock_screen._load_joke_providers",
+            return_value=self._joke_providers(["A joke"], ["A joke"]),
+        ):
+            self.assertEqual(_get_joke(self.settings), "A joke")
+
+        self.assertEqual(self.joke_store.unseen(), 0)
+
+    def test_get_joke_without_jokes(self):
+        self.settings.lock_screen.joke_providers = ["reddit"]
+
+        with patch(
+            "ebenezer.ui.lock_screen._load_joke_providers",
+            return_value=self._joke_providers(RuntimeError("offline")),
+        ):
+            self.assertEqual(_get_joke(self.settings), NO_JOKES)
+
+    def test_get_joke_races_providers(self):
+        self.settings.lock_screen.joke_providers = ["reddit", "icanhazdad"]
+        cancelled = []
+
+        async def _slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append("reddit")
+                raise
+
+        async def _fast():
+            return ["A joke"]
+
+        with patch(
+            "ebenezer.ui.lock_screen._load_joke_providers",
+            return_value={"reddit": _slow, "icanhazdad": _fast},
+        ):
+            started_at = time.monotonic()
+            self.assertEqual(_get_joke(self.settings), "A joke")
+
+        self.assertLess(time.monotonic() - started_at, 1)
+        self.assertEqual(cancelled, ["reddit"])
+
+    def test_get_joke_deadline(self):
+        self.settings.lock_screen.joke_providers = ["reddit", "icanhazdad"]
+        self.settings.lock_screen.joke_timeout = 0.1
+
+        async def _slow():
+            await asyncio.sleep(10)
+
+        async def _failing():
+            raise RuntimeError("offline")
+
+        with patch(
+            "ebenezer.ui.lock_screen._load_joke_providers",
+            return_value={"reddit": _slow, "icanhazdad": _failing},
+        ):
+            started_at = time.monotonic()
+            self.assertEqual(_get_joke(self.settings), NO_JOKES)
+
+        self.assertLess(time.monotonic() - started_at, 1)
+
+    def test_refill_jokes(self):
+        self.settings.lock_screen.joke_providers = ["reddit", "icanhazdad"]
+
+        with patch(
+            "ebenezer.ui.lock_screen._load_joke_providers",
+            return_value=self._joke_providers(["a", "b"], ["b", "c"]),
+        ):
+            self.assertEqual(_refill_jokes(self.settings), 3)
+
+    def test_refill_jokes_in_background(self):
+        self.joke_store.low_watermark = 2
+        self.joke_store.add("reddit", ["a", "b"])
+
+        self.assertIsNone(_refill_jokes_in_background(self.settings))
+
+        self.joke_store.next()
+
+        with patch("ebenezer.ui.lock_screen._refill_jokes") as mock_refill:
+            _refill_jokes_in_background(self.settings).join()
+
+        mock_refill.assert_called_once_with(self.settings, self.joke_store)
+
+    @patch("ebenezer.ui.lock_screen._get_joke", return_value="A joke")
+    @patch("ebenezer.ui.lock_screen.grab_screen")
+    def test_build_background(self, mock_grab_screen, mock_get_joke):
+        mock_grab_screen.return_value = Image.new("RGB", (320, 200), "#ffffff")
+        self.settings.colors.lock_screen_quote_foreground_color = "#000000"
+        self.settings.lock_screen.image_format = "png"
+        timer = StageTimer()
+
+        _build_background(self.settings, self.output_file, timer)
+
+        with Image.open(self.output_file) as image:
+            self.assertEqual(image.size, (320, 200))
+            self.assertEqual(image.mode, "RGB")
+            self.assertEqual(image.getpixel((0, 199)), (127, 127, 127))
+
+        self.assertEqual(
+            [name for name, _ in timer.stages],
+            ["grab", "blur", "joke", "overlay", "write"],
+        )
+        mock_get_joke.assert_called_once_with(self.settings)
+
+    @patch("ebenezer.ui.lock_screen._get_joke", return_value="A joke")
+    @patch("ebenezer.ui.lock_screen.grab_screen")
+    def test_build_background_cached_overlay(self, mock_grab_screen, mock_get_joke):
+        mock_grab_screen.return_value = Image.new("RGB", (320, 200), "#ffffff")
+        self.settings.lock_screen.image_format = "png"
+        _prepare_joke_overlay(self.settings, (320, 200))
+        mock_get_joke.reset_mock()
+        timer = StageTimer()
+
+        _build_background(self.settings, self.output_file, timer)
+
+        self.assertEqual(
+            [name for name, _ in timer.stages], ["grab", "blur", "overlay", "write"]
+        )
+        mock_get_joke.assert_not_called()
+
+    @patch("ebenezer.ui.lock_screen._get_joke", return_value="A joke")
+    def test_load_joke_overlay(self, _):
+        _prepare_joke_overlay(self.settings, (320, 200))
+
+        overlay = _load_joke_overlay(self.settings, (320, 200))
+
+        self.assertEqual(overlay.size, (320, 200))
+        self.assertEqual(overlay.text.mode, "RGBA")
+        self.assertIsNone(_load_joke_overlay(self.settings, (640, 400)))
+
+        self.settings.colors.lock_screen_quote_text_color = "#ff0000"
+        self.assertIsNone(_load_joke_overlay(self.settings, (320, 200)))
+
+    @patch("ebenezer.ui.lock_screen.screen_size", return_value=None)
+    @patch("ebenezer.ui.lock_screen._get_joke")
+    def test_prepare_joke_overlay_without_display(self, mock_get_joke, _):
+        _prepare_joke_overlay(self.settings)
+
+        mock_get_joke.assert_not_called()
+
+    @patch("ebenezer.ui.lock_screen._get_joke", return_value="A joke")
+    @patch("ebenezer.ui.lock_screen.grab_screen")
+    @patch("ebenezer.ui.lock_screen.subprocess.Popen")
+    def test_lock_screen_raw(self, mock_subprocess_popen, mock_grab_screen, _):
+        mock_grab_screen.return_value = Image.new("RGB", (320, 200), "#ffffff")
+        mock_subprocess_popen.return_value = MagicMock(stdout=None)
+        self.settings.lock_screen.image_format = "raw"
+        images = []
+
+        def side_effect_popen(cmd, *args, **kwargs):
+            if cmd[0] == "i3lock":
+                image = cmd[cmd.index("-i") + 1]
+                images.append((image, os.path.getsize(image)))
+
+            return MagicMock(stdout=None)
+
+        mock_subprocess_popen.side_effect = side_effect_popen
+
+        with patch("ebenezer.ui.lock_screen.push_notification_no_history"), patch(
+            "ebenezer.ui.lock_screen._is_i3lock_running", return_value=False
+        ), patch("ebenezer.ui.lock_screen.screen_size", return_value=(320, 200)), patch(
+            "ebenezer.ui.lock_screen._refill_jokes"
+        ) as mock_refill:
+            _lock_screen_i3(self.settings)
+
+        cmd = mock_subprocess_popen.call_args[0][0]
+        image, size = images[0]
+        self.assertEqual(cmd[0], "i3lock")
+        self.assertIn("--raw=320x200:rgbx", cmd)
+        self.assertEqual(size, 320 * 200 * 4)
+        self.assertFalse(os.path.exists(image))
+        self.assertIsNotNone(_load_joke_overlay(self.settings, (320, 200)))
+        mock_refill.assert_called_once_with(self.settings, self.joke_store)
+
+    @patch("ebenezer.ui.lock_screen.subprocess.Popen")
+    def test_run_i3_lock_png(self, mock_subprocess_popen):
+        mock_subprocess_popen.return_value = MagicMock(stdout=None)
 
-        _build_background(self.settings, self.output_file)
+        _run_i3_lock(self.settings, image=self.output_file)
 
-        mock_image_new.assert_called_once_with("RGB", (1920, 1080), color="#000")
-        mock_image_draw.assert_called_once_with(mock_image)
-        mock_imagefont_truetype.assert_called_once_with("", 17)
-        mock_draw.text.assert_called_once()
-        mock_image.save.assert_called_once_with(self.quote_file)
+        cmd = mock_subprocess_popen.call_args[0][0]
+        self.assertEqual(cmd[cmd.index("-i") + 1], self.output_file)
+        self.assertFalse(any(option.startswith("--raw") for option in cmd))
 
+    @patch("ebenezer.ui.lock_screen._refill_jokes")
     @patch("ebenezer.ui.lock_screen._build_background")
     @patch("ebenezer.ui.lock_screen.subprocess.Popen")
     @patch("ebenezer.ui.lock_screen.subprocess.run")
     def test_lock_screen(
-        self, mock_subprocess_run, mock_subprocess_popen, mock_build_background
+        self, mock_subprocess_run, mock_subprocess_popen, mock_build_background, _
     ):
         def side_effect_run(cmd, *args, **kwargs):
             if cmd == ["pgrep", "i3lock"]:
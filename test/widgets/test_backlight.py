@@ -1,9 +1,10 @@
 import unittest
+from unittest.mock import patch
 
 from libqtile import widget
 
 from ebenezer.config.settings import AppSettings
-from ebenezer.widgets.backlight import build_backlight_widget
+from ebenezer.widgets.backlight import _backlight_controller, build_backlight_widget
 
 
 class TestBuildBacklightWidget(unittest.TestCase):
@@ -31,5 +32,31 @@ class TestBuildBacklightWidget(unittest.TestCase):
         self.assertEqual(backlight_widget.foreground, "#000000")
 
 
+class TestBacklightKeys(unittest.TestCase):
+    @patch("ebenezer.widgets.backlight.push_notification_progress")
+    @patch("ebenezer.widgets.backlight.backlight_cmd.run_command")
+    def test_backlight_change(self, mock_run_command, mock_push_notification_progress):
+        mock_run_command.return_value = "95%\n"
+
+        self.assertEqual(_backlight_controller.change(10), 100)
+
+        mock_run_command.assert_any_call("brightnessctl set 5%+")
+        mock_push_notification_progress.assert_called_once_with(
+            message="󰃠 Brightness 100%", progress=100
+        )
+
+    @patch("ebenezer.widgets.backlight.push_notification_progress")
+    @patch("ebenezer.widgets.backlight.backlight_cmd.run_command")
+    def test_backlight_change_at_limit(
+        self, mock_run_command, mock_push_notification_progress
+    ):
+        mock_run_command.return_value = "100%\n"
+
+        self.assertEqual(_backlight_controller.change(10), 100)
+
+        mock_run_command.assert_called_once_with("brightnessctl | grep -oP '\\d+%'")
+        mock_push_notification_progress.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
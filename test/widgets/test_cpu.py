@@ -3,6 +3,7 @@ import unittest
 from libqtile.widget import CPU
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.metrics import MetricsSnapshot
 from ebenezer.widgets.cpu import ColorizedCPUWidget
 
 
@@ -38,6 +39,27 @@ class TestColorizedCPUWidget(unittest.TestCase):
         self.assertEqual(cpu_widget.fontsize, 14)
         self.assertEqual(cpu_widget.foreground, "#000000")
 
+    def test_colorized_cpu_widget_format_metrics(self):
+        self.settings.monitoring.threshold_medium = 50
+        self.settings.monitoring.threshold_high = 80
+        self.settings.monitoring.default_color = "#FFFFFF"
+        self.settings.monitoring.medium_color = "#FFFF00"
+        self.settings.monitoring.high_color = "#FF0000"
+
+        cpu_widget = ColorizedCPUWidget(
+            settings=self.settings, format="{load_percent}%"
+        )
+
+        self.assertEqual(
+            cpu_widget.format_metrics(MetricsSnapshot(cpu_percent=12.34)), "12.3%"
+        )
+        self.assertEqual(cpu_widget.foreground, "#FFFFFF")
+
+        self.assertEqual(
+            cpu_widget.format_metrics(MetricsSnapshot(cpu_percent=91.0)), "🔥 91.0%"
+        )
+        self.assertEqual(cpu_widget.foreground, "#FF0000")
+
 
 if __name__ == "__main__":
     unittest.main()
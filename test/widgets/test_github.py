@@ -1,9 +1,14 @@
+import asyncio
+import shutil
+import tempfile
 import unittest
-from unittest.mock import MagicMock, patch
+from test.core.test_github import start_stub_server
 
 from libqtile import widget
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.http import AsyncHttpClient, HttpResponse
+from ebenezer.core.http_cache import ResponseCache
 from ebenezer.widgets.github import GitHubNotifications, _build_github_icon_widget
 
 
@@ -11,15 +16,14 @@ class TestGitHubNotifications(unittest.TestCase):
     def setUp(self):
         self.settings = AppSettings()
         self.settings.environment.github_notifications_token = "fake_token"
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.cache = ResponseCache(cache_dir)
 
-    @patch("ebenezer.widgets.github.request_retry")
-    @patch("ebenezer.widgets.github.requests.get")
-    def test_github_notifications_fetch(self, mock_requests_get, mock_request_retry):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [{"id": 1}, {"id": 2}]
-        mock_requests_get.return_value = mock_response
-        mock_request_retry.side_effect = lambda func: func()
+    def _build_widget(self, pages: list) -> GitHubNotifications:
+        server = start_stub_server(pages)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
 
         config = {
             "icon_widget": _build_github_icon_widget(self.settings, {}),
@@ -28,19 +32,52 @@ class TestGitHubNotifications(unittest.TestCase):
             "token": self.settings.environment.github_notifications_token,
         }
         github_widget = GitHubNotifications(**config)
+        github_widget.client.url = (
+            f"http://127.0.0.1:{server.server_address[1]}/notifications"
+        )
+        github_widget.client.http = AsyncHttpClient()
+        github_widget.client.cache = self.cache
 
-        self.assertEqual(github_widget.poll(), "2+")
+        return github_widget
 
-    @patch("ebenezer.widgets.github.request_retry")
-    @patch("ebenezer.widgets.github.requests.get")
-    def test_github_notifications_fetch_no_notifications(
-        self, mock_requests_get, mock_request_retry
-    ):
-        mock_response = MagicMock()
-        mock_response.json.return_value = []
-        mock_requests_get.return_value = mock_response
-        mock_request_retry.side_effect = lambda func, retries, delay: func()
+    def test_github_notifications_fetch(self):
+        github_widget = self._build_widget([[{"id": 1}, {"id": 2}]])
 
+        self.assertEqual(asyncio.run(github_widget.apoll()), "2+")
+        self.assertEqual(asyncio.run(github_widget.apoll()), "2+")
+        self.assertEqual(github_widget.update_interval, 90)
+
+    def test_github_notifications_fetch_empty(self):
+        github_widget = self._build_widget([[]])
+
+        self.assertEqual(asyncio.run(github_widget.apoll()), "")
+        self.assertEqual(github_widget.icon.text, "")
+
+    def test_github_notifications_restored_before_fetch(self):
+        github_widget = self._build_widget([[{"id": 1}, {"id": 2}]])
+        client = github_widget.client
+        self.cache.store(
+            client.url,
+            client._cache_params(),
+            HttpResponse(client.url, 200, {"etag": '"old"'}, b"7"),
+        )
+        texts = []
+        github_widget.update = texts.append
+
+        self.assertEqual(asyncio.run(github_widget.apoll()), "2+")
+        self.assertEqual(texts, ["7+"])
+
+    def test_github_notifications_no_token(self):
+        config = {
+            "icon_widget": widget.TextBox(""),
+            "settings": self.settings,
+            "token": None,
+        }
+        github_widget = GitHubNotifications(**config)
+
+        self.assertEqual(asyncio.run(github_widget.apoll()), "No github token")
+
+    def test_github_notifications_fetch_no_notifications(self):
         config = {
             "icon_widget": widget.TextBox(""),
             "settings": self.settings,
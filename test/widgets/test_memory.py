@@ -4,9 +4,19 @@ from unittest.mock import patch
 from libqtile.widget import Memory
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.metrics import MemorySnapshot, MetricsSnapshot
 from ebenezer.widgets.memory import ColorizedMemoryWidget
 
 
+def _memory_snapshot(percent: float) -> MetricsSnapshot:
+    total = 4096 * 1024 * 1024
+    used = int(total * percent / 100)
+
+    return MetricsSnapshot(
+        memory=MemorySnapshot(total=total, used=used, percent=percent)
+    )
+
+
 class TestColorizedMemoryWidget(unittest.TestCase):
     def setUp(self):
         self.settings = AppSettings()
@@ -42,9 +52,7 @@ class TestColorizedMemoryWidget(unittest.TestCase):
         self.assertEqual(memory_widget.fontsize, 14)
         self.assertEqual(memory_widget.foreground, "#000000")
 
-    @patch("ebenezer.widgets.memory.psutil.virtual_memory")
-    @patch.object(Memory, "poll", return_value="75%")
-    def test_colorized_memory_widget_update(self, mock_poll, mock_virtual_memory):
+    def test_colorized_memory_widget_update(self):
         config = {
             "settings": self.settings,
             "fontsize": 14,
@@ -53,17 +61,15 @@ class TestColorizedMemoryWidget(unittest.TestCase):
             "medium_color": "#FFFF00",
         }
         memory_widget = ColorizedMemoryWidget(**config)
-        mock_virtual_memory.return_value.percent = 75
 
-        memory_widget.poll()
+        text = memory_widget.format_metrics(_memory_snapshot(75))
 
+        self.assertEqual(text, "3072M/ 4096M")
         self.assertEqual(
             memory_widget.foreground, self.settings.monitoring.medium_color
         )
 
-    @patch("ebenezer.widgets.memory.psutil.virtual_memory")
-    @patch.object(Memory, "poll", return_value="85%")
-    def test_colorized_memory_widget_update_high(self, mock_poll, mock_virtual_memory):
+    def test_colorized_memory_widget_update_high(self):
         config = {
             "settings": self.settings,
             "fontsize": 14,
@@ -72,12 +78,23 @@ class TestColorizedMemoryWidget(unittest.TestCase):
             "medium_color": "#FFFF00",
         }
         memory_widget = ColorizedMemoryWidget(**config)
-        mock_virtual_memory.return_value.percent = 85
 
-        memory_widget.poll()
+        text = memory_widget.format_metrics(_memory_snapshot(85))
 
+        self.assertEqual(text, "🔥 3482M/ 4096M")
         self.assertEqual(memory_widget.foreground, self.settings.monitoring.high_color)
 
+    @patch("ebenezer.widgets.helpers.metrics.get_metrics_sampler")
+    def test_colorized_memory_widget_poll(self, mock_get_metrics_sampler):
+        mock_get_metrics_sampler.return_value.latest = _memory_snapshot(10)
+        memory_widget = ColorizedMemoryWidget(settings=self.settings)
+        memory_widget.format = "{MemPercent:.0f}%"
+
+        self.assertEqual(memory_widget.poll(), "10%")
+        self.assertEqual(
+            memory_widget.foreground, self.settings.monitoring.default_color
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
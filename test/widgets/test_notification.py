@@ -2,6 +2,9 @@ import unittest
 from unittest.mock import MagicMock, patch
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.command import CommandResult
+from ebenezer.core.dunst import DunstCounts
+from ebenezer.rofi.modals.confirm import NO_LABEL, YES_LABEL
 from ebenezer.widgets.notification import DunstWidget, build_notification_widget
 
 
@@ -14,9 +17,8 @@ class TestDunstWidget(unittest.TestCase):
         self.settings.colors.fg_yellow = "#FFFF00"
         self.settings.commands = {"modal_confirm": "echo 'Confirm'"}
 
-    @patch("ebenezer.widgets.notification.subprocess.run")
-    @patch("ebenezer.widgets.notification.subprocess.check_output")
-    def test_poll(self, mock_check_output, mock_run):
+    @patch("ebenezer.core.dunst.subprocess.check_output")
+    def test_poll(self, mock_check_output):
         mock_check_output.return_value = (
             "Waiting: 0\nCurrently displayed: 0\nHistory: 5".encode("utf-8")
         )
@@ -24,29 +26,69 @@ class TestDunstWidget(unittest.TestCase):
         result = widget.poll()
         self.assertEqual(result, "󰂚 5")
 
-    @patch("ebenezer.widgets.notification.subprocess.Popen")
-    def test_show_notifications(self, mock_popen):
+    def test_update_counts(self):
+        widget = DunstWidget(settings=self.settings, foreground_count="#FFFF00")
+        widget.update = MagicMock()
+
+        widget.update_counts(DunstCounts(history=2))
+        widget.update.assert_called_with("󰂚 2")
+        self.assertEqual(widget.foreground, "#FFFF00")
+
+        widget.update_counts(DunstCounts())
+        widget.update.assert_called_with("")
+        self.assertEqual(widget.foreground, "#FFFFFF")
+
+    @patch("ebenezer.widgets.notification.get_dunst_events")
+    def test_timer_setup(self, mock_get_dunst_events):
+        widget = DunstWidget(settings=self.settings)
+        widget.timer_setup()
+
+        mock_get_dunst_events.return_value.subscribe.assert_called_once_with(
+            widget.update_counts
+        )
+
+    @patch("ebenezer.widgets.notification.spawn_command")
+    def test_show_notifications(self, mock_spawn_command):
         widget = DunstWidget(settings=self.settings)
         widget.show_notifications()
-        mock_popen.assert_called_once_with(["dunstctl", "history-pop"])
+        mock_spawn_command.assert_called_once_with(["dunstctl", "history-pop"])
 
-    @patch("ebenezer.widgets.notification.subprocess.run")
-    @patch("ebenezer.widgets.notification.confirm_cmd")
-    def test_clear_notifications(self, mock_confirm_cmd, mock_run):
-        def side_effect_confirm(cmd, *args, **kwargs):
-            return True
+    @patch("ebenezer.widgets.notification.spawn_command")
+    def test_clear_notifications(self, mock_spawn_command):
+        def side_effect_spawn(cmd, on_complete=None, **kwargs):
+            if on_complete is not None:
+                on_complete(CommandResult(0, stdout=f"{YES_LABEL}\n"))
 
-        def side_effect_run(cmd, *args, **kwargs):
-            return MagicMock(stdout="")
+        mock_spawn_command.side_effect = side_effect_spawn
 
-        mock_confirm_cmd.side_effect = side_effect_confirm
-        mock_run.side_effect = side_effect_run
+        widget = DunstWidget(settings=self.settings)
+        widget.count = 5
+        widget.clear_notifications()
+
+        self.assertEqual(mock_spawn_command.call_args_list[0][0][0][0], "rofi")
+        mock_spawn_command.assert_called_with(["dunstctl", "history-clear"])
+
+    @patch("ebenezer.widgets.notification.spawn_command")
+    def test_clear_notifications_not_confirmed(self, mock_spawn_command):
+        def side_effect_spawn(cmd, on_complete=None, **kwargs):
+            if on_complete is not None:
+                on_complete(CommandResult(0, stdout=f"{NO_LABEL}\n"))
+
+        mock_spawn_command.side_effect = side_effect_spawn
 
         widget = DunstWidget(settings=self.settings)
         widget.count = 5
         widget.clear_notifications()
 
-        mock_run.assert_any_call("dunstctl history-clear", shell=True)
+        mock_spawn_command.assert_called_with(["dunstctl", "close-all"])
+
+    @patch("ebenezer.widgets.notification.spawn_command")
+    def test_clear_notifications_empty(self, mock_spawn_command):
+        widget = DunstWidget(settings=self.settings)
+        widget.count = 0
+        widget.clear_notifications()
+
+        mock_spawn_command.assert_not_called()
 
     def test_build_notification_widget_default(self):
         kwargs = {}
@@ -16,11 +16,11 @@ class TestBuildPowermenuWidget(unittest.TestCase):
         self.settings.colors.bg_topbar_arrow = "#000000"
         self.settings.commands = {"powermenu": "echo 'Power Menu'"}
 
-    @patch("ebenezer.widgets.powermenu.run_shell_command")
-    def test_powermenu_modal(self, mock_run_shell_command):
+    @patch("ebenezer.widgets.powermenu.spawn_command")
+    def test_powermenu_modal(self, mock_spawn_command):
         modal = _powermenu_modal()
         modal()
-        mock_run_shell_command.assert_called_once_with("ebenezer ui powermenu", **{})
+        mock_spawn_command.assert_called_once_with("ebenezer ui powermenu")
 
     def test_build_powermenu_widget_default(self):
         kwargs = {}
@@ -5,6 +5,7 @@ from libqtile import widget
 from libqtile.widget import ThermalSensor
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.metrics import MetricsSnapshot
 from ebenezer.widgets.thermal import (
     ColorizedThermalWidget,
     _get_temperature,
@@ -67,18 +68,47 @@ class TestColorizedThermalWidget(unittest.TestCase):
         result = _get_temperature()
         self.assertEqual(result, 55.0)
 
-    @patch("ebenezer.widgets.thermal.ThermalSensor.poll", return_value="75°C")
-    def test_colorized_thermal_widget_poll(self, mock_poll):
+    @patch("ebenezer.widgets.thermal.get_metrics_sampler")
+    @patch("ebenezer.widgets.helpers.metrics.get_metrics_sampler")
+    def test_colorized_thermal_widget_poll(
+        self, mock_get_metrics_sampler, mock_thermal_get_metrics_sampler
+    ):
+        snapshot = MetricsSnapshot(temperatures={"Core 0": 75.4, "Core 1": 40.0})
+        mock_get_metrics_sampler.return_value.latest = snapshot
+        mock_thermal_get_metrics_sampler.return_value.latest = snapshot
+
         config = {
             "settings": self.settings,
             "fontsize": 14,
             "foreground": "#000000",
+            "format": "{temp:.0f}{unit}",
         }
         thermal_widget = ColorizedThermalWidget(**config)
         result = thermal_widget.poll()
+        self.assertEqual(thermal_widget.tag_sensor, "Core 0")
         self.assertEqual(result, "🔥 75°C")
         self.assertEqual(thermal_widget.foreground, self.settings.monitoring.high_color)
 
+    def test_colorized_thermal_widget_format_metrics(self):
+        config = {
+            "settings": self.settings,
+            "format": "{temp:.0f}{unit}",
+            "tag_sensor": "Core 1",
+            "metric": False,
+        }
+        thermal_widget = ColorizedThermalWidget(**config)
+
+        result = thermal_widget.format_metrics(
+            MetricsSnapshot(temperatures={"Core 0": 75.0, "Core 1": 20.0})
+        )
+        self.assertEqual(result, "68°F")
+        self.assertEqual(
+            thermal_widget.foreground, self.settings.monitoring.medium_color
+        )
+
+        result = thermal_widget.format_metrics(MetricsSnapshot(temperatures={}))
+        self.assertEqual(result, "N/A")
+
     def test_build_thermal_widget_default(self):
         kwargs = {"fontsize": 10}
         thermal_widgets = build_thermal_widget(self.settings, kwargs)
@@ -1,9 +1,17 @@
+import asyncio
+import threading
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from libqtile import widget
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.volume import (
+    FakeVolumeBackend,
+    SinkState,
+    VolumeSnapshot,
+    set_volume_backend,
+)
 from ebenezer.widgets.volume import (
     _do_volume_down,
     _do_volume_up,
@@ -16,6 +24,8 @@ from ebenezer.widgets.volume import (
     setup_volume_keys,
 )
 
+SPEAKER_SINK = SinkState(0, "alsa_output.pci-0000_00_1f.3.analog-stereo", volume=50)
+
 
 class TestBuildVolumeWidget(unittest.TestCase):
     def setUp(self):
@@ -33,6 +43,11 @@ class TestBuildVolumeWidget(unittest.TestCase):
             "mute": "echo 'Mute'",
             "mute_off": "echo 'Mute Off'",
         }
+        self.backend = FakeVolumeBackend([SPEAKER_SINK], max_age=None)
+        set_volume_backend(self.backend)
+
+    def tearDown(self):
+        set_volume_backend(None)
 
     def test_build_volume_widget_default(self):
         kwargs = {}
@@ -50,44 +65,140 @@ class TestBuildVolumeWidget(unittest.TestCase):
         self.assertEqual(volume_widget.fontsize, 14)
         self.assertEqual(volume_widget.padding, 10)
 
-    @patch("ebenezer.widgets.volume.volume_cmd.get_volume_level")
-    def test_get_current_volume(self, mock_get_volume_level):
-        mock_get_volume_level.return_value = "50%\n"
+    def test_get_current_volume(self):
         result = _get_current_volume()
         self.assertEqual(result, 50)
 
-    @patch("ebenezer.widgets.volume.volume_cmd.volume_mute_status")
-    def test_is_muted(self, mock_volume_mute_status):
-        mock_volume_mute_status.return_value = "yes\n"
+    def test_get_current_volume_without_sinks(self):
+        self.backend.sinks = []
+        result = _get_current_volume()
+        self.assertEqual(result, 0)
+
+    def test_is_muted(self):
+        self.backend.sinks = [SPEAKER_SINK._replace(muted=True)]
         result = _is_muted()
         self.assertTrue(result)
 
     @patch("ebenezer.widgets.volume.push_notification_progress")
-    @patch("ebenezer.widgets.volume.volume_cmd.get_volume_level")
-    def test_push_volume_notification(
-        self, mock_get_volume_level, mock_push_notification_progress
-    ):
-        mock_get_volume_level.return_value = "50"
+    def test_push_volume_notification(self, mock_push_notification_progress):
         _push_volume_notification("Volume")
         mock_push_notification_progress.assert_called_once_with(
             message="Volume 50%", progress=50
         )
 
+    @patch("ebenezer.widgets.volume.push_notification_progress")
     @patch("ebenezer.widgets.volume._unmute")
-    @patch("ebenezer.widgets.volume.volume_cmd.get_volume_level")
-    def test_do_volume_up(self, mock_get_volume_level, mock_unmute):
-        mock_get_volume_level.return_value = "50"
-
+    def test_do_volume_up(self, mock_unmute, mock_push_notification_progress):
         _do_volume_up()
 
-        mock_get_volume_level.assert_called_with()
         mock_unmute.assert_called_once_with()
+        self.assertEqual(self.backend.sinks[0].volume, 55)
+        mock_push_notification_progress.assert_called_once_with(
+            message="󰝝 Volume 55%", progress=55
+        )
+
+    @patch("ebenezer.widgets.volume.push_notification_progress")
+    @patch("ebenezer.widgets.volume._unmute")
+    def test_do_volume_up_limit(self, mock_unmute, mock_push_notification_progress):
+        self.backend.sinks = [SPEAKER_SINK._replace(volume=120)]
+
+        _do_volume_up()
+
+        mock_unmute.assert_not_called()
+        self.assertEqual(self.backend.sinks[0].volume, 120)
+
+    def test_volume_widget(self):
+        volume_widget = build_volume_widget(self.settings, {})
+
+        self.assertEqual(volume_widget.get_volume(), (50, False))
+
+        volume_widget.increase_vol()
+        volume_widget.mute()
+        self.assertEqual(volume_widget.get_volume(), (55, True))
+
+        self.backend.sinks = []
+        self.backend.invalidate()
+        self.assertEqual(volume_widget.get_volume(), (-1, False))
+
+    def test_volume_widget_off_loop(self):
+        volume_widget = build_volume_widget(self.settings, {})
+        threads = []
+
+        def _change_volume(delta):
+            threads.append(threading.get_ident())
 
-    @patch("ebenezer.widgets.volume.volume_cmd.volume_down")
-    def test_do_volume_down(self, mock_volume_down):
+        async def _increase():
+            volume_widget.increase_vol()
+            await asyncio.sleep(0.1)
+
+        with patch.object(self.backend, "change_volume", _change_volume):
+            asyncio.run(_increase())
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+    @patch("ebenezer.widgets.volume.spawn_command")
+    def test_volume_widget_commands(self, mock_spawn_command):
+        volume_widget = build_volume_widget(
+            self.settings,
+            {
+                "volume_up_command": "amixer set Master 5%+",
+                "volume_down_command": "amixer set Master 5%-",
+                "mute_command": "amixer set Master toggle",
+            },
+        )
+
+        volume_widget.increase_vol()
+        volume_widget.decrease_vol()
+        volume_widget.mute()
+
+        self.assertEqual(
+            [call[0][0] for call in mock_spawn_command.call_args_list],
+            [
+                "amixer set Master 5%+",
+                "amixer set Master 5%-",
+                "amixer set Master toggle",
+            ],
+        )
+        self.assertEqual(self.backend.sinks[0], SPEAKER_SINK)
+
+    def test_volume_widget_update_volume(self):
+        volume_widget = build_volume_widget(self.settings, {})
+        volume_widget.bar = MagicMock()
+        volume_widget._update_drawer = MagicMock()
+
+        volume_widget.update_volume(VolumeSnapshot((SPEAKER_SINK,)))
+        volume_widget.update_volume(VolumeSnapshot((SPEAKER_SINK,)))
+
+        self.assertEqual((volume_widget.volume, volume_widget.is_mute), (50, False))
+        volume_widget.bar.draw.assert_called_once_with()
+
+        volume_widget.update_volume(
+            VolumeSnapshot((SPEAKER_SINK._replace(muted=True),))
+        )
+
+        self.assertTrue(volume_widget.is_mute)
+        self.assertEqual(volume_widget.bar.draw.call_count, 2)
+
+    @patch("ebenezer.widgets.volume.get_volume_events")
+    def test_volume_widget_timer_setup(self, mock_get_volume_events):
+        volume_widget = build_volume_widget(self.settings, {})
+
+        volume_widget.timer_setup()
+
+        mock_get_volume_events.return_value.subscribe.assert_called_once_with(
+            volume_widget.update_volume
+        )
+
+    @patch("ebenezer.widgets.volume.push_notification_progress")
+    @patch("ebenezer.widgets.volume.volume_cmd.volume_change")
+    def test_do_volume_down(self, mock_volume_change, mock_push_notification_progress):
         _do_volume_down()
 
-        mock_volume_down.assert_called_once_with()
+        mock_volume_change.assert_called_once_with(-5)
+        mock_push_notification_progress.assert_called_once_with(
+            message="󰝞 Volume 45%", progress=45
+        )
 
     @patch("ebenezer.widgets.volume.volume_cmd.volume_mute_toggle")
     @patch("ebenezer.widgets.volume.push_notification")
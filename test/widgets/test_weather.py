@@ -1,10 +1,27 @@
+import asyncio
+import json
+import shutil
+import tempfile
 import unittest
 
 from libqtile import widget
 
 from ebenezer.config.settings import AppSettings
+from ebenezer.core.http import HttpResponse
+from ebenezer.core.http_cache import ResponseCache
 from ebenezer.widgets.weather import build_weather_widget
 
+WEATHER_RESPONSE = {
+    "cod": 200,
+    "name": "London",
+    "dt": 1700000000,
+    "timezone": 0,
+    "sys": {"country": "GB", "sunrise": 1700000000, "sunset": 1700030000},
+    "main": {"temp": 12.5, "humidity": 80, "pressure": 1012},
+    "wind": {"speed": 3, "deg": 90},
+    "weather": [{"id": 800, "main": "Clear", "description": "clear", "icon": "01d"}],
+}
+
 
 class TestBuildWeatherWidget(unittest.TestCase):
     def setUp(self):
@@ -35,5 +52,37 @@ class TestBuildWeatherWidget(unittest.TestCase):
         self.assertEqual(weather_widget.location, "New York")
 
 
+class TestOpenWeather(unittest.TestCase):
+    def setUp(self):
+        self.settings = AppSettings()
+        self.settings.environment.city_id = "123456"
+        self.settings.environment.weather_api_key = "fake_api_key"
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.cache = ResponseCache(cache_dir)
+
+        self.weather_widget = build_weather_widget(
+            self.settings, {"format": "{main_temp}{units_temperature}"}
+        )
+        self.weather_widget.cache = self.cache
+
+    def test_apoll_from_cache(self):
+        url = self.weather_widget.url
+        body = json.dumps(WEATHER_RESPONSE).encode()
+        self.cache.store(url, None, HttpResponse(url, 200, {}, body))
+
+        self.assertEqual(asyncio.run(self.weather_widget.apoll()), "12.5C")
+
+    def test_apoll_error_response(self):
+        response = HttpResponse("", 401, {}, b'{"cod": 401, "message": "invalid"}')
+
+        self.assertEqual(self.weather_widget._parse_response(response), "Error 401")
+        self.assertEqual(
+            self.weather_widget._parse_response(HttpResponse("", 502, {}, b"<html>")),
+            "Request failed",
+        )
+
+
 if __name__ == "__main__":
     unittest.main()